@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Simulation: /v1 gateway admission control under a request burst.
+
+Each simulated replica has KV cache room for ``--kv-slots`` concurrent
+requests and shares its compute between the requests it runs.  Beyond
+``--kv-slots`` it preempts: every extra request costs ``--preempt-penalty``
+of a slot's worth of throughput in swapping / recomputation, so a replica
+flooded with 3x its capacity gets much less done than one kept full.
+Each request needs ``--work`` seconds of a slot.  A burst of ``--burst``
+requests arrives within ``--burst-window`` seconds on top of a steady
+``--rate`` per second.
+
+Requests go through ``AdmissionController``
+(``vllm_playground/admission.py``) and ``LoadBalancer`` as in
+``_v1_proxy``, with:
+
+  - ``off``: no limits (every request is forwarded at once),
+  - ``static``: ``backend_limit = --kv-slots``,
+  - ``adaptive``: adaptive limits from simulated scrapes of the waiting
+    count and KV cache usage, every ``--scrape-interval``.
+
+Reports p50 / p99 latency (queueing in the gateway included), the number of
+429s and the time to drain the burst.
+
+Usage:
+    python scripts/bench_admission.py
+    python scripts/bench_admission.py --replicas 2 --burst 400 --kv-slots 16
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from vllm_playground.admission import AdmissionController, AdmissionRejectedError  # noqa: E402
+from vllm_playground.load_balancer import LoadBalancer  # noqa: E402
+
+TICK = 0.005
+
+
+class Replica:
+    def __init__(self, replica_id: str, args):
+        self.id = replica_id
+        self.args = args
+        self.active = {}  # request -> (remaining work, done event)
+
+    @property
+    def efficiency(self) -> float:
+        over = max(0, len(self.active) - self.args.kv_slots)
+        return 1.0 / (1.0 + self.args.preempt_penalty * over / self.args.kv_slots)
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(TICK)
+            if not self.active:
+                continue
+            share = min(1.0, self.args.kv_slots / len(self.active)) * self.efficiency * TICK
+            for request, (remaining, done) in list(self.active.items()):
+                remaining -= share
+                if remaining <= 0:
+                    del self.active[request]
+                    done.set()
+                else:
+                    self.active[request] = (remaining, done)
+
+    async def serve(self, rng: random.Random) -> None:
+        done = asyncio.Event()
+        self.active[object()] = (rng.expovariate(1.0 / self.args.work), done)
+        await done.wait()
+
+    def load(self):
+        n = len(self.active)
+        return {
+            "waiting": max(0, n - self.args.kv_slots),
+            "running": min(n, self.args.kv_slots),
+            "kv_cache": min(1.0, n / self.args.kv_slots) * 0.95,
+        }
+
+
+async def _simulate(mode: str, args):
+    rng = random.Random(args.seed)
+    replicas = [Replica(f"replica-{i}", args) for i in range(args.replicas)]
+    scraped = {}
+
+    async def scraper():
+        while True:
+            for r in replicas:
+                scraped[r.id] = r.load()
+            await asyncio.sleep(args.scrape_interval)
+
+    admission = AdmissionController(
+        backend_limit=args.kv_slots if mode == "static" else 0,
+        queue_size=args.queue_size,
+        queue_timeout=args.queue_timeout,
+        adaptive=mode == "adaptive",
+        load_fn=scraped.get,
+        adapt_interval=args.scrape_interval,
+    )
+    lb = LoadBalancer("least_outstanding", rng=random.Random(args.seed))
+    latencies = []
+    rejected = 0
+
+    async def request():
+        nonlocal rejected
+        start = time.perf_counter()
+        try:
+            replica = await admission.acquire("m", lambda: replicas, lambda room: lb.choose("m", room))
+        except AdmissionRejectedError:
+            rejected += 1
+            return
+        lb.acquire(replica.id)
+        try:
+            await replica.serve(rng)
+        finally:
+            lb.release(replica.id)
+            admission.release("m", replica.id, time.perf_counter() - start)
+        latencies.append(time.perf_counter() - start)
+
+    background = [asyncio.create_task(r.run()) for r in replicas] + [asyncio.create_task(scraper())]
+    tasks = []
+    start = time.perf_counter()
+    for _ in range(args.burst):
+        tasks.append(asyncio.create_task(request()))
+        await asyncio.sleep(rng.uniform(0, 2 * args.burst_window / args.burst))
+    for _ in range(int(args.rate * args.steady_seconds)):
+        tasks.append(asyncio.create_task(request()))
+        await asyncio.sleep(rng.expovariate(args.rate))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    for task in background:
+        task.cancel()
+    latencies.sort()
+    return latencies, rejected, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replicas", type=int, default=2)
+    parser.add_argument("--kv-slots", type=int, default=8, help="Requests a replica runs without preempting")
+    parser.add_argument("--preempt-penalty", type=float, default=1.0, help="Throughput lost per request over capacity")
+    parser.add_argument("--work", type=float, default=0.1, help="Mean slot-seconds per request")
+    parser.add_argument("--burst", type=int, default=300)
+    parser.add_argument("--burst-window", type=float, default=0.3)
+    parser.add_argument("--rate", type=float, default=60.0, help="Steady arrivals per second after the burst")
+    parser.add_argument("--steady-seconds", type=float, default=2.0)
+    parser.add_argument("--queue-size", type=int, default=512)
+    parser.add_argument("--queue-timeout", type=float, default=30.0)
+    parser.add_argument("--scrape-interval", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--modes", default="off,static,adaptive")
+    args = parser.parse_args()
+
+    print(
+        f"replicas: {args.replicas} x {args.kv_slots} KV slots, burst: {args.burst} in {args.burst_window}s, "
+        f"then {args.rate:g}/s for {args.steady_seconds:g}s"
+    )
+    print(f"{'admission':10s} {'p50 ms':>8s} {'p99 ms':>8s} {'429s':>6s} {'drain s':>8s}")
+    for mode in args.modes.split(","):
+        latencies, rejected, elapsed = asyncio.run(_simulate(mode, args))
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+        print(f"{mode:10s} {p50:8.0f} {p99:8.0f} {rejected:6d} {elapsed:8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
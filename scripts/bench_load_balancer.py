@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Simulation: /v1 gateway balancing strategies over replicas of one model.
+
+Runs ``LoadBalancer`` (``vllm_playground/load_balancer.py``) against
+simulated vLLM replicas: each runs up to ``--max-running`` requests at once
+and queues the rest, taking ``--service-time`` seconds per request divided
+by its speed (``--speeds 1,1,0.5`` makes the third replica half as fast).
+Requests arrive as a Poisson process at ``--rate`` per second.  The
+``queue_aware`` strategy sees each replica's waiting count and KV cache
+usage as a scrape would: a snapshot refreshed every ``--scrape-interval``
+(KV cache usage is modelled as 80% with a full batch running).
+``--external-rate`` adds traffic sent straight to the first replica,
+bypassing the gateway, which only scraped metrics reveal.
+
+Reports, per strategy, each replica's share of requests and peak queue,
+the spread between the busiest and idlest replica, and p50 / p99 latency.
+
+Usage:
+    python scripts/bench_load_balancer.py
+    python scripts/bench_load_balancer.py --replicas 3 --speeds 1,1,0.5 --rate 150
+    python scripts/bench_load_balancer.py --external-rate 40
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from vllm_playground.load_balancer import STRATEGIES, LoadBalancer  # noqa: E402
+
+
+class Replica:
+    def __init__(self, replica_id: str, speed: float, max_running: int, service_time: float):
+        self.id = replica_id
+        self.speed = speed
+        self.service_time = service_time
+        self.slots = asyncio.Semaphore(max_running)
+        self.max_running = max_running
+        self.running = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.served = 0
+
+    async def serve(self, rng: random.Random) -> None:
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        async with self.slots:
+            self.waiting -= 1
+            self.running += 1
+            try:
+                await asyncio.sleep(rng.expovariate(1.0 / self.service_time) / self.speed)
+            finally:
+                self.running -= 1
+        self.served += 1
+
+
+async def _simulate(strategy: str, args, speeds):
+    rng = random.Random(args.seed)
+    replicas = [Replica(f"replica-{i}", speeds[i], args.max_running, args.service_time) for i in range(args.replicas)]
+    scraped = {}
+
+    def load_fn(replica_id):
+        return scraped.get(replica_id)
+
+    async def scraper():
+        while True:
+            for r in replicas:
+                scraped[r.id] = {
+                    "waiting": r.waiting,
+                    "running": r.running,
+                    "kv_cache": 0.8 * r.running / r.max_running,
+                }
+            await asyncio.sleep(args.scrape_interval)
+
+    lb = LoadBalancer(strategy, load_fn=load_fn, rng=random.Random(args.seed))
+    latencies = []
+
+    async def request():
+        start = time.perf_counter()
+        replica = lb.choose("model", replicas)
+        lb.acquire(replica.id)
+        try:
+            await replica.serve(rng)
+        finally:
+            lb.release(replica.id)
+        latencies.append(time.perf_counter() - start)
+
+    async def external():
+        while True:
+            await asyncio.sleep(rng.expovariate(args.external_rate))
+            asyncio.create_task(replicas[0].serve(rng))
+
+    scrape_task = asyncio.create_task(scraper())
+    external_task = asyncio.create_task(external()) if args.external_rate > 0 else None
+    tasks = []
+    for _ in range(args.requests):
+        tasks.append(asyncio.create_task(request()))
+        await asyncio.sleep(rng.expovariate(args.rate))
+    await asyncio.gather(*tasks)
+    scrape_task.cancel()
+    if external_task is not None:
+        external_task.cancel()
+    for r in replicas:
+        lb.forget(r.id)
+    latencies.sort()
+    return replicas, latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--speeds", default="", help="Comma-separated relative speeds (default: all 1)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=250.0, help="Arrivals per second")
+    parser.add_argument("--service-time", type=float, default=0.05, help="Mean seconds per request at speed 1")
+    parser.add_argument("--max-running", type=int, default=4, help="Concurrent requests per replica")
+    parser.add_argument("--external-rate", type=float, default=0.0, help="Arrivals/s sent directly to replica 0")
+    parser.add_argument("--scrape-interval", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    args = parser.parse_args()
+
+    speeds = [float(s) for s in args.speeds.split(",")] if args.speeds else [1.0] * args.replicas
+    if len(speeds) != args.replicas:
+        parser.error("--speeds needs one value per replica")
+
+    print(
+        f"replicas: {args.replicas} (speeds {speeds}), requests: {args.requests} at {args.rate:g}/s, "
+        f"service time {args.service_time}s, {args.max_running} running per replica"
+    )
+    print(f"{'strategy':18s} {'shares':24s} {'peak queues':16s} {'spread':>7s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    for strategy in args.strategies.split(","):
+        replicas, latencies = asyncio.run(_simulate(strategy, args, speeds))
+        total = sum(r.served for r in replicas)
+        shares = [r.served / total for r in replicas]
+        spread = max(shares) / min(shares) if min(shares) else float("inf")
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+        print(
+            f"{strategy:18s} {' '.join(f'{s:5.1%}' for s in shares):24s} "
+            f"{' '.join(str(r.peak_waiting) for r in replicas):16s} {spread:7.2f} {p50:8.1f} {p99:8.1f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
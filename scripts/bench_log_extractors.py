@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: log metric extraction.
+
+Runs every line of a vLLM log through the previous inline parsing from
+``broadcast_log`` (lowercase the line, ``import re``, uncompiled
+``re.search`` calls) and through ``log_metrics.EXTRACTORS``, and reports
+lines/s for each.  Also checks both agree on the keys the old code knew.
+
+Without arguments a synthetic log is used (mostly request / access lines,
+with V1, V0, SpecDecoding and preemption stat lines mixed in).
+
+Usage:
+    python scripts/bench_log_extractors.py
+    python scripts/bench_log_extractors.py vllm.log --repeat 5
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from vllm_playground.log_metrics import EXTRACTORS  # noqa: E402
+
+_ORDINARY = (
+    'INFO:     127.0.0.1:{n} - "POST /v1/chat/completions HTTP/1.1" 200 OK',
+    "INFO 01-01 00:00:{s:02d} [logger.py:39] Received request chatcmpl-{n}: prompt: 'Hello, how are you?', "
+    "params: SamplingParams(n=1, temperature=0.7, max_tokens=256), lora_request: None.",
+    "INFO 01-01 00:00:{s:02d} [engine.py:310] Added request chatcmpl-{n}.",
+    "DEBUG 01-01 00:00:{s:02d} [core.py:512] EngineCore waiting for work.",
+    "INFO 01-01 00:00:{s:02d} [async_llm.py:261] Finished request chatcmpl-{n}.",
+)
+_STATS = (
+    "INFO 01-01 00:00:{s:02d} [loggers.py:123] Engine 000: Avg prompt throughput: {a:.1f} tokens/s, "
+    "Avg generation throughput: {b:.1f} tokens/s, Running: {r} reqs, Waiting: {w} reqs, "
+    "GPU KV cache usage: {c:.1f}%, Prefix cache hit rate: {h:.1f}%",
+    "INFO 01-01 00:00:{s:02d} [metrics.py:351] Avg prompt throughput: {a:.1f} tokens/s, "
+    "Avg generation throughput: {b:.1f} tokens/s, Running: {r} reqs, Swapped: 0 reqs, Pending: {w} reqs, "
+    "GPU KV cache usage: {c:.1f}%, CPU KV cache usage: 0.0%.",
+    "INFO 01-01 00:00:{s:02d} [metrics.py:100] SpecDecoding metrics: Mean acceptance length: 2.31, "
+    "Accepted: 120 tokens, Drafted: 300 tokens, Draft acceptance rate: {h:.1f}%",
+    "WARNING 01-01 00:00:{s:02d} [scheduler.py:1560] Sequence group chatcmpl-{n} is preempted by "
+    "PreemptionMode.RECOMPUTE mode because there is not enough KV cache space. total_num_cumulative_preemption={r}",
+)
+
+
+def synthetic_log(lines: int, stat_ratio: float = 0.05, seed: int = 0):
+    rnd = random.Random(seed)
+    out = []
+    for n in range(lines):
+        pool = _STATS if rnd.random() < stat_ratio else _ORDINARY
+        out.append(
+            rnd.choice(pool).format(
+                n=n,
+                s=n % 60,
+                a=rnd.random() * 2000,
+                b=rnd.random() * 500,
+                r=rnd.randint(0, 64),
+                w=rnd.randint(0, 16),
+                c=rnd.random() * 100,
+                h=rnd.random() * 100,
+            )
+        )
+    return out
+
+
+def legacy_extract(message: str) -> dict:
+    """Frozen copy of the parsing previously inlined in ``broadcast_log``."""
+    import re
+
+    latest = {}
+    msg_lower = message.lower()
+
+    if "avg prompt throughput" in msg_lower:
+        m = re.search(r"Avg prompt throughput:\s+([\d.]+)\s+tokens/s", message, re.IGNORECASE)
+        if m:
+            latest["avg_prompt_throughput"] = float(m.group(1))
+
+    if "avg generation throughput" in msg_lower:
+        m = re.search(r"Avg generation throughput:\s+([\d.]+)\s+tokens/s", message, re.IGNORECASE)
+        if m:
+            latest["avg_generation_throughput"] = float(m.group(1))
+
+    if "cache usage" in msg_lower and "%" in message:
+        match = re.search(r"cache usage[:\s]+([\d.]+)\s*%", message, re.IGNORECASE)
+        if match:
+            latest["kv_cache_usage_perc"] = float(match.group(1))
+
+    if "hit rate" in msg_lower and "%" in message:
+        match = re.search(r"hit rate[:\s]+([\d.]+)\s*%", message, re.IGNORECASE)
+        if match:
+            latest["prefix_cache_hit_rate"] = float(match.group(1))
+
+    if "specdecoding metrics" in msg_lower:
+        m = re.search(r"Draft acceptance rate:\s+([\d.]+)%", message)
+        if m:
+            latest["spec_decode_acceptance_rate"] = float(m.group(1))
+    return latest
+
+
+def _time(fn, lines, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            fn(line)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("logs", nargs="*", help="Captured vLLM log files (default: synthetic)")
+    parser.add_argument("--lines", type=int, default=200_000, help="Synthetic log size")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.logs:
+        lines = []
+        for path in args.logs:
+            lines.extend(line.rstrip("\n") for line in open(path, encoding="utf-8", errors="replace"))
+    else:
+        lines = synthetic_log(args.lines)
+
+    mismatches = 0
+    extra_keys = set()
+    for line in lines:
+        old = legacy_extract(line)
+        new = EXTRACTORS.extract(line)
+        if any(new.get(k) != v for k, v in old.items()):
+            mismatches += 1
+        extra_keys.update(new.keys() - old.keys())
+
+    legacy = _time(legacy_extract, lines, args.repeat)
+    table = _time(EXTRACTORS.extract, lines, args.repeat)
+    print(f"lines: {len(lines):,}")
+    print(f"legacy inline re.search: {len(lines) / legacy:12,.0f} lines/s")
+    print(f"EXTRACTORS:              {len(lines) / table:12,.0f} lines/s ({legacy / table:.1f}x)")
+    print(f"lines where legacy keys disagree: {mismatches}")
+    print(f"keys only the extractors find: {sorted(extra_keys)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
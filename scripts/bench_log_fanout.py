@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: /ws/logs fan-out with N clients.
+
+Feeds log lines through the previous fan-out (``await send_text`` on every
+socket, in turn, for every line) and through ``LogFanout`` (per-client
+bounded queues, batched frames) to fake WebSockets whose sends take
+``--send-latency`` seconds; ``--slow`` of them take ``--slow-latency``.
+
+Reports lines/s sustained by the producer (what the subprocess / container
+log readers see) and, for the hub, lines delivered and dropped per client
+class.  With ``--instances N`` lines are spread over N instances and the hub
+runs twice: clients receiving every stream (the old protocol), and clients
+that each subscribe to one instance.
+
+Usage:
+    python scripts/bench_log_fanout.py
+    python scripts/bench_log_fanout.py --clients 20 --slow 2 --lines 50000
+    python scripts/bench_log_fanout.py --instances 6
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from vllm_playground.log_fanout import LogFanout  # noqa: E402
+
+SAMPLE_LINE = (
+    "INFO 01-01 00:00:00 [loggers.py:123] Engine 000: Avg prompt throughput: 1234.5 tokens/s, "
+    "Avg generation throughput: 567.8 tokens/s, Running: 12 reqs, Waiting: 0 reqs, GPU KV cache usage: 42.0%"
+)
+
+
+class FakeWebSocket:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.frames = 0
+        self.lines = 0
+        self.skipped = 0
+
+    async def send_text(self, text: str) -> None:
+        data = json.loads(text)
+        if data.get("type") == "batch":
+            self.lines += len(data["lines"])
+            self.skipped += data["skipped"]
+        else:
+            self.lines += 1
+        self.frames += 1
+        await asyncio.sleep(self.latency)
+
+
+def _make_clients(args):
+    return [FakeWebSocket(args.slow_latency if i < args.slow else args.send_latency) for i in range(args.clients)]
+
+
+async def bench_legacy(args) -> float:
+    clients = _make_clients(args)
+    start = time.perf_counter()
+    deadline = start + args.max_seconds
+    sent = 0
+    for i in range(args.lines):
+        payload = json.dumps({"instance_id": "bench", "message": f"{SAMPLE_LINE} #{i}"})
+        for ws in clients:
+            await ws.send_text(payload)
+        sent += 1
+        if time.perf_counter() > deadline:
+            break
+    return sent / (time.perf_counter() - start)
+
+
+async def bench_hub(args, subscribe: bool = False):
+    clients = _make_clients(args)
+    hub = LogFanout()
+    for n, ws in enumerate(clients):
+        hub.add(ws)
+        if subscribe:
+            hub.subscribe(ws, [f"inst-{n % args.instances}"])
+    start = time.perf_counter()
+    for i in range(args.lines):
+        hub.publish(f"inst-{i % args.instances}", f"{SAMPLE_LINE} #{i}")
+        await asyncio.sleep(0)  # the log readers yield once per line
+    produce_elapsed = time.perf_counter() - start
+
+    # Let the writers drain whatever they still hold
+    drain_deadline = time.perf_counter() + args.max_seconds
+    while any(c.queue for c in hub.clients()) and time.perf_counter() < drain_deadline:
+        await asyncio.sleep(0.01)
+    total_elapsed = time.perf_counter() - start
+    await hub.close()
+    return args.lines / produce_elapsed, total_elapsed, clients
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=10)
+    parser.add_argument("--slow", type=int, default=1, help="Clients using --slow-latency")
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--instances", type=int, default=1, help="Instances the lines are spread over")
+    parser.add_argument("--send-latency", type=float, default=0.0005, help="Seconds per send (normal clients)")
+    parser.add_argument("--slow-latency", type=float, default=0.05, help="Seconds per send (slow clients)")
+    parser.add_argument("--max-seconds", type=float, default=10.0, help="Cap on each phase's wall time")
+    args = parser.parse_args()
+
+    legacy_rate = asyncio.run(bench_legacy(args))
+    print(f"clients: {args.clients} ({args.slow} slow), lines: {args.lines}, instances: {args.instances}")
+    print(f"sequential send_text:  {legacy_rate:12,.0f} lines/s ingested")
+
+    runs = [("LogFanout", False)]
+    if args.instances > 1:
+        runs.append(("LogFanout, subscribed", True))
+    for name, subscribe in runs:
+        hub_rate, hub_elapsed, clients = asyncio.run(bench_hub(args, subscribe))
+        print(f"{name + ':':22s} {hub_rate:12,.0f} lines/s ingested ({legacy_rate and hub_rate / legacy_rate:.0f}x)")
+        for label, group in (("slow", clients[: args.slow]), ("normal", clients[args.slow :])):
+            if not group:
+                continue
+            delivered = sum(c.lines for c in group) / len(group)
+            skipped = sum(c.skipped for c in group) / len(group)
+            frames = sum(c.frames for c in group) / len(group)
+            print(
+                f"  {label:6s} clients: {delivered:9,.0f} lines delivered, {skipped:9,.0f} skipped, "
+                f"{frames:7,.0f} frames (avg per client, {hub_elapsed:.2f}s)"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark: vLLM log pipe readers.
+
+Spawns a child process that writes ``--lines`` vLLM-like log lines to its
+stdout as fast as it can, and reads the pipe with:
+
+  - the previous subprocess reader (``readline()`` in ``wait_for(..., 1.0)``),
+  - the previous container reader (``readline()`` + ``sleep(0.01)`` per line),
+  - ``log_reader.iter_line_batches`` (64 KiB chunks, bulk split).
+
+Each reader hands every line / batch to an ``async`` no-op consumer, like
+``broadcast_log``.  Reports sustained lines/s; slow readers stop after
+``--max-seconds``.
+
+Usage:
+    python scripts/bench_log_readers.py
+    python scripts/bench_log_readers.py --lines 500000 --max-seconds 5
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from vllm_playground.log_reader import iter_line_batches  # noqa: E402
+
+_PRODUCER = r"""
+import sys
+line = ("INFO 01-01 00:00:00 [logger.py:39] Received request chatcmpl-%d: prompt: 'Hello, how are you?', "
+        "params: SamplingParams(n=1, temperature=0.7, max_tokens=256), lora_request: None.\n")
+out = sys.stdout
+for i in range(int(sys.argv[1])):
+    out.write(line % i)
+out.flush()
+"""
+
+
+async def _spawn(lines: int):
+    return await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-c",
+        _PRODUCER,
+        str(lines),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+
+
+async def _consume(_):
+    pass
+
+
+async def legacy_subprocess(process, deadline):
+    count = 0
+    while process.returncode is None and time.perf_counter() < deadline:
+        try:
+            line = await asyncio.wait_for(process.stdout.readline(), timeout=1.0)
+            if not line:
+                break
+            decoded = line.decode().strip()
+            if decoded:
+                await _consume(decoded)
+                count += 1
+        except asyncio.TimeoutError:
+            if process.returncode is not None:
+                break
+    return count
+
+
+async def legacy_container(process, deadline):
+    count = 0
+    while time.perf_counter() < deadline:
+        line = await process.stdout.readline()
+        if not line:
+            break
+        decoded = line.decode("utf-8", errors="replace").rstrip()
+        if decoded:
+            await _consume(decoded)
+            count += 1
+        await asyncio.sleep(0.01)
+    return count
+
+
+async def chunked(process, deadline):
+    count = 0
+    async for lines in iter_line_batches(
+        process.stdout, idle_timeout=1.0, should_stop=lambda: process.returncode is not None
+    ):
+        await _consume(lines)
+        count += len(lines)
+        if time.perf_counter() >= deadline:
+            break
+    return count
+
+
+async def run(reader, lines: int, max_seconds: float):
+    process = await _spawn(lines)
+    start = time.perf_counter()
+    count = await reader(process, start + max_seconds)
+    elapsed = time.perf_counter() - start
+    if process.returncode is None:
+        process.kill()
+    await process.communicate()  # drain the pipe so the transport can close
+    return count, elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=200_000)
+    parser.add_argument("--max-seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"producer lines: {args.lines:,} (readers capped at {args.max_seconds}s)")
+    for name, reader in (
+        ("readline + wait_for (subprocess)", legacy_subprocess),
+        ("readline + sleep(0.01) (container)", legacy_container),
+        ("iter_line_batches", chunked),
+    ):
+        count, elapsed = asyncio.run(run(reader, args.lines, args.max_seconds))
+        print(f"{name:36s} {count:10,} lines in {elapsed:5.2f}s  {count / elapsed:12,.0f} lines/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark: indexed log search vs. a linear scan.
+
+Writes ``--lines`` synthetic vLLM log lines (see ``bench_log_extractors``)
+with a few OOM / CUDA-graph failures mixed in to a temporary ``LogStore``,
+builds the ``log_search`` index from it (the backfill a first search after
+a restart does), then times each query through ``LogSearch.search`` and
+through a scan of every stored line with the same matcher.
+
+Usage:
+    python scripts/bench_log_search.py
+    python scripts/bench_log_search.py --lines 1000000 --repeat 5
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_log_extractors import synthetic_log  # noqa: E402
+
+from vllm_playground.log_search import LEVELS, LogSearch, build_matcher, detect_level, parse_levels  # noqa: E402
+from vllm_playground.log_store import LogArchive  # noqa: E402
+
+_FAILURES = (
+    "ERROR 01-01 00:00:00 [gpu_model_runner.py:2340] torch.OutOfMemoryError: CUDA out of memory. "
+    "Tried to allocate 2.00 GiB. GPU 0 has a total capacity of 79.19 GiB",
+    "ERROR 01-01 00:00:00 [core.py:700] RuntimeError: CUDA error: operation failed due to a previous "
+    "error during capture",
+)
+
+# (label, query, regex, level)
+QUERIES = (
+    ("substring", "CUDA out of memory", False, None),
+    ("partial word", "OutOfMem", False, None),
+    ("regex", r"Tried to allocate [\d.]+ GiB", True, None),
+    ("request id", None, False, None),  # an id from the middle of the log
+    ("level=ERROR", "", False, "ERROR"),
+    ("common + level", "cache", False, "WARNING"),
+)
+
+
+def _linear(store, query, regex, level, limit):
+    matcher, _ = build_matcher(query, regex)
+    _, lines = store.read(store.first_offset, store.next_offset - store.first_offset)
+    if level:
+        wanted = parse_levels(level)
+        out, lvl = [], 1
+        for _, message in lines:
+            lvl = detect_level(message, lvl)
+            if LEVELS[lvl] in wanted and (matcher is None or matcher(message)):
+                out.append(message)
+        return out[-limit:]
+    return [message for _, message in lines if matcher is None or matcher(message)][-limit:]
+
+
+async def _run(args) -> None:
+    lines = synthetic_log(args.lines)
+    for n, i in enumerate(range(args.lines // 7, args.lines, max(args.lines // 5, 1))):
+        lines[i] = _FAILURES[n % len(_FAILURES)]
+    request_id = next(m.group() for m in map(re.compile(r"chatcmpl-\d+").search, lines[len(lines) // 2 :]) if m)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        archive = LogArchive(Path(tmp))
+        store = archive.get("bench")
+        start = time.perf_counter()
+        ts = time.time()
+        for i in range(0, len(lines), 256):
+            store.append(lines[i : i + 256], ts + i / 1000)
+        store.flush()
+        print(f"lines: {len(lines):,}  (store append {len(lines) / (time.perf_counter() - start):,.0f} lines/s)")
+
+        search = LogSearch(archive, max_lines=args.lines)
+        start = time.perf_counter()
+        await search.index("bench").catch_up()
+        elapsed = time.perf_counter() - start
+        print(f"index build from store: {elapsed:.2f}s ({len(lines) / elapsed:,.0f} lines/s)\n")
+
+        print(f"{'query':16s} {'matches':>8s} {'scanned':>9s} {'indexed ms':>11s} {'linear ms':>10s}")
+        for label, query, regex, level in QUERIES:
+            query = request_id if query is None else query
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                result = await search.search(
+                    ["bench"], query, regex=regex, levels=parse_levels(level), limit=args.limit
+                )
+                best = min(best, time.perf_counter() - start)
+            start = time.perf_counter()
+            expected = _linear(store, query, regex, level, args.limit)
+            linear = time.perf_counter() - start
+            got = [m["message"] for m in result["matches"]]
+            flag = "" if got == expected else "  MISMATCH"
+            print(
+                f"{label:16s} {len(got):8,} {result['scanned_lines']:9,} {best * 1000:11.1f} {linear * 1000:10.1f}{flag}"
+            )
+        archive.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=500_000)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
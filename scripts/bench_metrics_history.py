@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark: MetricStore history at full retention.
+
+Fills the previous ``deque`` of snapshot dicts and ``ColumnarHistory`` with
+the same scrapes (8640 snapshots = 12 h at 5 s by default) and reports the
+Python heap each one holds, measured with ``tracemalloc``.
+
+Usage:
+    python scripts/bench_metrics_history.py
+    python scripts/bench_metrics_history.py --snapshots 17280 --models 4
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_prom_parser import synthetic_scrape  # noqa: E402
+
+from vllm_playground.metrics_history import ColumnarHistory  # noqa: E402
+from vllm_playground.prom_parser import parse_exposition, to_metric_entries  # noqa: E402
+
+
+def _scalar_snapshot(entries):
+    return {k: (v.get("value", v.get("p50")) if isinstance(v, dict) else v) for k, v in entries.items()}
+
+
+def _measure(build) -> int:
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    holder = build()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del holder
+    return used
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshots", type=int, default=8640)
+    parser.add_argument("--models", type=int, default=1, help="Label sets in the synthetic scrape")
+    args = parser.parse_args()
+
+    entries = to_metric_entries(parse_exposition(synthetic_scrape(args.models)))
+    template = _scalar_snapshot(entries)
+    keys = list(template)
+    start = time.time() - args.snapshots * 5.0
+
+    def _values(i):
+        rnd = random.Random(i)
+        return {k: (v or 0.0) * (1 + rnd.random() * 0.01) for k, v in template.items()}
+
+    def build_legacy():
+        hist = deque(maxlen=args.snapshots)
+        for i in range(args.snapshots):
+            snap = {"timestamp": datetime.fromtimestamp(start + i * 5.0).isoformat()}
+            snap.update(_values(i))
+            hist.append(snap)
+        return hist
+
+    def build_columnar():
+        hist = ColumnarHistory(args.snapshots)
+        for i in range(args.snapshots):
+            hist.append(start + i * 5.0, _values(i))
+        return hist
+
+    legacy = _measure(build_legacy)
+    columnar = _measure(build_columnar)
+    mib = 1024 * 1024
+    print(f"metrics per snapshot: {len(keys)}, snapshots: {args.snapshots}")
+    print(f"deque of dicts:    {legacy / mib:8.1f} MiB")
+    print(f"ColumnarHistory:   {columnar / mib:8.1f} MiB")
+    print(f"saved:             {(legacy - columnar) / mib:8.1f} MiB ({legacy / max(columnar, 1):.1f}x smaller)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
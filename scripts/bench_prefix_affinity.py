@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Simulation: prefix-cache hit rate per /v1 gateway balancing strategy.
+
+Requests carry one of ``--prefixes`` shared system prompts, drawn with Zipf
+popularity (``--zipf``; the top prefix is hot).  Each simulated replica
+keeps an LRU prefix cache of ``--cache-prefixes`` entries: a hit costs
+``--decode-time`` seconds, a miss adds ``--prefill-time`` for recomputing
+the prefix.  Replicas run ``--max-running`` requests at once and queue the
+rest.  Requests are routed through ``LoadBalancer``
+(``vllm_playground/load_balancer.py``) with the real ``prefix_key`` of
+their chat body.
+
+Reports, per strategy, the overall and per-replica prefix-cache hit rate,
+each replica's share of requests, and p50 / p99 latency.
+
+Usage:
+    python scripts/bench_prefix_affinity.py
+    python scripts/bench_prefix_affinity.py --replicas 4 --prefixes 200 --cache-prefixes 40
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from vllm_playground.load_balancer import LoadBalancer  # noqa: E402
+from vllm_playground.prefix_affinity import prefix_key  # noqa: E402
+
+
+class Replica:
+    def __init__(self, replica_id: str, args):
+        self.id = replica_id
+        self.args = args
+        self.slots = asyncio.Semaphore(args.max_running)
+        self.cache: "OrderedDict[str, None]" = OrderedDict()
+        self.hits = 0
+        self.queries = 0
+
+    async def serve(self, prefix: str) -> None:
+        async with self.slots:
+            self.queries += 1
+            if prefix in self.cache:
+                self.hits += 1
+                self.cache.move_to_end(prefix)
+                cost = self.args.decode_time
+            else:
+                self.cache[prefix] = None
+                if len(self.cache) > self.args.cache_prefixes:
+                    self.cache.popitem(last=False)
+                cost = self.args.decode_time + self.args.prefill_time
+            await asyncio.sleep(cost)
+
+
+async def _simulate(strategy: str, args):
+    rng = random.Random(args.seed)
+    prefixes = [f"You are agent #{i}. " + "Follow the tool protocol exactly. " * 40 for i in range(args.prefixes)]
+    weights = [1.0 / (rank + 1) ** args.zipf for rank in range(args.prefixes)]
+    replicas = [Replica(f"replica-{i}", args) for i in range(args.replicas)]
+    lb = LoadBalancer(strategy, rng=random.Random(args.seed))
+    latencies = []
+
+    async def request(system: str):
+        body = {
+            "model": "m",
+            "messages": [{"role": "system", "content": system}, {"role": "user", "content": "next step?"}],
+        }
+        start = time.perf_counter()
+        replica = lb.choose("m", replicas, prefix=prefix_key(body))
+        lb.acquire(replica.id)
+        try:
+            await replica.serve(system)
+        finally:
+            lb.release(replica.id)
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    for system in rng.choices(prefixes, weights, k=args.requests):
+        tasks.append(asyncio.create_task(request(system)))
+        await asyncio.sleep(rng.expovariate(args.rate))
+    await asyncio.gather(*tasks)
+    for r in replicas:
+        lb.forget(r.id)
+    latencies.sort()
+    return replicas, latencies
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--prefixes", type=int, default=60)
+    parser.add_argument("--zipf", type=float, default=1.1, help="Popularity skew of the prefixes")
+    parser.add_argument("--cache-prefixes", type=int, default=20, help="Prefixes each replica can keep cached")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--rate", type=float, default=150.0, help="Arrivals per second")
+    parser.add_argument("--decode-time", type=float, default=0.02)
+    parser.add_argument("--prefill-time", type=float, default=0.04)
+    parser.add_argument("--max-running", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--strategies", default="round_robin,least_outstanding,prefix_affinity")
+    args = parser.parse_args()
+
+    print(
+        f"replicas: {args.replicas}, prefixes: {args.prefixes} (zipf {args.zipf}), "
+        f"cache: {args.cache_prefixes} prefixes/replica, requests: {args.requests} at {args.rate:g}/s"
+    )
+    print(f"{'strategy':18s} {'hit rate':>8s}  {'per replica':24s} {'shares':24s} {'p50 ms':>8s} {'p99 ms':>8s}")
+    for strategy in args.strategies.split(","):
+        replicas, latencies = asyncio.run(_simulate(strategy, args))
+        hit_rate = sum(r.hits for r in replicas) / sum(r.queries for r in replicas)
+        per_replica = " ".join(f"{r.hits / r.queries if r.queries else 0:5.1%}" for r in replicas)
+        shares = " ".join(f"{r.queries / args.requests:5.1%}" for r in replicas)
+        p50 = statistics.median(latencies) * 1000
+        p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+        print(f"{strategy:18s} {hit_rate:8.1%}  {per_replica:24s} {shares:24s} {p50:8.1f} {p99:8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
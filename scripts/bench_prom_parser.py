@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: streaming Prometheus parser vs. the previous line-by-line parser.
+
+Times ``MetricStore.parse_prometheus_text`` (backed by ``prom_parser``)
+against a frozen copy of the parser it replaced, on captured ``/metrics``
+scrapes or on a synthetic multi-LoRA scrape.
+
+Usage:
+    python scripts/bench_prom_parser.py                       # synthetic scrape
+    python scripts/bench_prom_parser.py scrape1.txt scrape2.txt
+    python scripts/bench_prom_parser.py --models 32 --iterations 200
+
+Capture a scrape with:
+    curl -s http://localhost:8000/metrics > scrape.txt
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from vllm_playground.prom_parser import parse_exposition, to_metric_entries  # noqa: E402
+
+# ---------------------------------------------------------------------------
+# Previous parser (frozen reference copy, do not "fix")
+# ---------------------------------------------------------------------------
+
+
+def _legacy_parse_prom_line(line):
+    brace = line.find("{")
+    if brace >= 0:
+        close = line.find("}", brace)
+        if close < 0:
+            return None, None, None
+        name = line[:brace]
+        labels = line[brace + 1 : close]
+        rest = line[close + 1 :].strip()
+    else:
+        parts = line.split(None, 1)
+        if len(parts) < 2:
+            return None, None, None
+        name = parts[0]
+        labels = ""
+        rest = parts[1]
+    val_parts = rest.split()
+    if not val_parts:
+        return None, None, None
+    try:
+        value = float(val_parts[0])
+    except ValueError:
+        return None, None, None
+    return name, labels, value
+
+
+def _legacy_base_metric_name(name):
+    for suffix in ("_total", "_created", "_bucket", "_count", "_sum"):
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _legacy_extract_le(labels) -> Optional[float]:
+    for part in labels.split(","):
+        part = part.strip()
+        if part.startswith("le="):
+            val = part.split("=", 1)[1].strip('"')
+            if val == "+Inf":
+                return float("inf")
+            try:
+                return float(val)
+            except ValueError:
+                return None
+    return None
+
+
+def _legacy_compute_percentiles(buckets) -> Dict[str, float]:
+    sorted_b = sorted(buckets, key=lambda x: x[0])
+    if not sorted_b:
+        return {}
+    total = sorted_b[-1][1]
+    if total <= 0:
+        return {}
+    result = {}
+    for pname, target in [("p50", 0.50), ("p95", 0.95), ("p99", 0.99)]:
+        threshold = total * target
+        prev_le, prev_count = 0.0, 0.0
+        for le, count in sorted_b:
+            if le == float("inf"):
+                break
+            if count >= threshold:
+                if count == prev_count:
+                    result[pname] = le
+                else:
+                    frac = (threshold - prev_count) / (count - prev_count)
+                    result[pname] = prev_le + frac * (le - prev_le)
+                break
+            prev_le, prev_count = le, count
+        else:
+            result[pname] = prev_le
+    return result
+
+
+def legacy_parse_prometheus_text(text):
+    types = {}
+    metrics = {}
+    histogram_buckets = {}
+    for line in text.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("# TYPE "):
+            parts = line.split()
+            if len(parts) >= 4:
+                types[parts[2]] = parts[3]
+            continue
+        if line.startswith("#"):
+            continue
+        name, labels, value = _legacy_parse_prom_line(line)
+        if name is None or value is None:
+            continue
+        if not name.startswith("vllm:"):
+            continue
+        base_name = _legacy_base_metric_name(name)
+        mtype = types.get(base_name, "unknown")
+        if name.endswith("_created"):
+            continue
+        if name.endswith("_bucket"):
+            le_val = _legacy_extract_le(labels)
+            if le_val is not None:
+                histogram_buckets.setdefault(base_name, []).append((le_val, value))
+            continue
+        if name.endswith("_count") or name.endswith("_sum"):
+            suffix = "_count" if name.endswith("_count") else "_sum"
+            metrics[base_name + suffix] = {"value": value, "type": "counter", "labels": labels}
+            continue
+        entry_key = base_name if name.endswith("_total") else name
+        metrics[entry_key] = {"value": value, "type": mtype if mtype != "unknown" else "gauge", "labels": labels}
+    for base_name, buckets in histogram_buckets.items():
+        percentiles = _legacy_compute_percentiles(buckets)
+        if percentiles:
+            metrics[base_name] = {"type": "histogram", "labels": "", **percentiles}
+            for le_val, count in sorted(buckets, key=lambda x: x[0]):
+                le_str = "+Inf" if le_val == float("inf") else str(le_val)
+                metrics[f"{base_name}_bucket_le_{le_str}"] = {
+                    "value": count,
+                    "type": "histogram_bucket",
+                    "labels": f'le="{le_str}"',
+                }
+    return metrics, types
+
+
+# ---------------------------------------------------------------------------
+# Synthetic scrape
+# ---------------------------------------------------------------------------
+
+_GAUGES = ("num_requests_running", "num_requests_waiting", "kv_cache_usage_perc")
+_COUNTERS = ("prompt_tokens", "generation_tokens", "num_preemptions", "prefix_cache_hits", "prefix_cache_queries")
+_HISTOGRAMS = (
+    "time_to_first_token_seconds",
+    "time_per_output_token_seconds",
+    "e2e_request_latency_seconds",
+    "request_queue_time_seconds",
+    "request_prompt_tokens",
+    "request_generation_tokens",
+)
+_LE = ("0.001", "0.005", "0.01", "0.02", "0.04", "0.06", "0.08", "0.1", "0.25", "0.5", "1.0", "2.5", "5.0", "10.0")
+_REASONS = ("stop", "length", "abort")
+
+
+def synthetic_scrape(models: int) -> str:
+    """Build a vLLM-style exposition with one label set per served LoRA model."""
+    out = []
+    label_sets = [f'engine="0",model_name="lora-adapter-{i:03d}"' for i in range(models)]
+    for g in _GAUGES:
+        out.append(f"# HELP vllm:{g} Gauge {g}.")
+        out.append(f"# TYPE vllm:{g} gauge")
+        for i, ls in enumerate(label_sets):
+            out.append(f"vllm:{g}{{{ls}}} {i % 7}.0")
+    for c in _COUNTERS:
+        out.append(f"# HELP vllm:{c}_total Counter {c}.")
+        out.append(f"# TYPE vllm:{c} counter")
+        for i, ls in enumerate(label_sets):
+            out.append(f"vllm:{c}_total{{{ls}}} {1000.0 * (i + 1)}")
+            out.append(f"vllm:{c}_created{{{ls}}} 1.7e+09")
+    out.append("# TYPE vllm:request_success counter")
+    for i, ls in enumerate(label_sets):
+        for r in _REASONS:
+            out.append(f'vllm:request_success_total{{{ls},finished_reason="{r}"}} {i * 3 + 1}.0')
+    for h in _HISTOGRAMS:
+        out.append(f"# HELP vllm:{h} Histogram {h}.")
+        out.append(f"# TYPE vllm:{h} histogram")
+        for i, ls in enumerate(label_sets):
+            cum = 0
+            for j, le in enumerate(_LE):
+                cum += (i + j) % 5 + 1
+                out.append(f'vllm:{h}_bucket{{{ls},le="{le}"}} {float(cum)}')
+            out.append(f'vllm:{h}_bucket{{{ls},le="+Inf"}} {float(cum)}')
+            out.append(f"vllm:{h}_count{{{ls}}} {float(cum)}")
+            out.append(f"vllm:{h}_sum{{{ls}}} {cum * 0.37}")
+            out.append(f"vllm:{h}_created{{{ls}}} 1.7e+09")
+    out.append("# HELP python_gc_objects_collected_total Objects collected during gc")
+    out.append("# TYPE python_gc_objects_collected_total counter")
+    for gen in range(3):
+        out.append(f'python_gc_objects_collected_total{{generation="{gen}"}} 1234.0')
+    return "\n".join(out) + "\n"
+
+
+def _new_parse(text):
+    scrape = parse_exposition(text)
+    return to_metric_entries(scrape), scrape.types
+
+
+def _time(fn, text: str, iterations: int) -> float:
+    fn(text)  # warm caches
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(text)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scrapes", nargs="*", help="Captured /metrics text files (default: synthetic scrape)")
+    parser.add_argument("--models", type=int, default=24, help="Label sets in the synthetic scrape")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    inputs = []
+    if args.scrapes:
+        for path in args.scrapes:
+            inputs.append((path, Path(path).read_text(encoding="utf-8")))
+    else:
+        inputs.append((f"synthetic ({args.models} models)", synthetic_scrape(args.models)))
+
+    print(f"{'scrape':<32} {'lines':>7} {'series':>7} {'legacy ms':>10} {'new ms':>8} {'speedup':>8}")
+    for label, text in inputs:
+        lines = text.count("\n")
+        legacy = _time(legacy_parse_prometheus_text, text, args.iterations)
+        new = _time(_new_parse, text, args.iterations)
+        series = parse_exposition(text).series_count()
+        print(f"{label[:32]:<32} {lines:>7} {series:>7} {legacy * 1e3:>10.2f} {new * 1e3:>8.2f} {legacy / new:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+CPU benchmark: parse / re-encode vs. raw-bytes pass-through in the /v1 proxy.
+
+Starts a fake OpenAI-compatible backend on localhost and two minimal
+Starlette proxies in front of it, driven in-process through httpx's ASGI
+transport:
+
+  - ``parse``: the proxy as it used to be: ``await request.json()``, route
+    on ``body["model"]``, forward with ``json=body``, read the answer with
+    ``resp.json()`` and return it through ``JSONResponse``.
+  - ``passthrough``: ``scan_request`` on the raw body
+    (``vllm_playground/passthrough.py``), forward the original bytes and
+    stream the upstream body back unchanged.
+
+Each request is a chat completion carrying an image of ``--sizes``
+megabytes as a base64 data URL (the shape of multimodal traffic); the
+backend answers ``--response-kb`` of JSON.  Reports requests/s and the
+process CPU time per request (client, proxy and backend share the
+process, so the difference between the rows is the proxy's saving).
+
+Usage:
+    python scripts/bench_proxy_passthrough.py
+    python scripts/bench_proxy_passthrough.py --sizes 0.01,1,4,16 --requests 50
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+import aiohttp  # noqa: E402
+import httpx  # noqa: E402
+from aiohttp import web  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse, StreamingResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from vllm_playground.http_pool import UpstreamPool  # noqa: E402
+from vllm_playground.passthrough import response_headers, scan_request  # noqa: E402
+
+TIMEOUT = aiohttp.ClientTimeout(total=60)
+
+
+async def _start_backend(response_kb: int):
+    reply = json.dumps(
+        {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "x" * (response_kb * 1024)}}],
+        }
+    ).encode()
+
+    async def chat(request):
+        await request.read()
+        return web.Response(body=reply, content_type="application/json")
+
+    app = web.Application(client_max_size=1024**3)
+    app.router.add_post("/v1/chat/completions", chat)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{runner.addresses[0][1]}/v1/chat/completions"
+
+
+def _proxy_app(pool: UpstreamPool, url: str) -> Starlette:
+    async def parse(request: Request):
+        body = await request.json()
+        if not body.get("model"):
+            return JSONResponse({"detail": "model field is required"}, status_code=400)
+        resp = await pool.post(url, json=body, timeout=TIMEOUT)
+        try:
+            content = await resp.json()
+        finally:
+            resp.release()
+        return JSONResponse(content, status_code=resp.status)
+
+    async def passthrough(request: Request):
+        raw = await request.body()
+        fields = scan_request(raw) or json.loads(raw)
+        if not fields.get("model"):
+            return JSONResponse({"detail": "model field is required"}, status_code=400)
+        resp = await pool.post(url, data=raw, headers={"Content-Type": "application/json"}, timeout=TIMEOUT)
+
+        async def body_stream():
+            try:
+                async for chunk in resp.content.iter_any():
+                    yield chunk
+            finally:
+                resp.release()
+
+        return StreamingResponse(body_stream(), status_code=resp.status, headers=response_headers(resp.headers))
+
+    return Starlette(
+        routes=[Route("/parse", parse, methods=["POST"]), Route("/passthrough", passthrough, methods=["POST"])]
+    )
+
+
+def _payload(megabytes: float) -> bytes:
+    image = base64.b64encode(os.urandom(int(megabytes * 1024 * 1024 * 3 / 4))).decode()
+    return json.dumps(
+        {
+            "model": "bench",
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {"type": "text", "text": "What is in this image?"},
+                        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image}"}},
+                    ],
+                }
+            ],
+            "max_tokens": 64,
+        }
+    ).encode()
+
+
+async def _run(client: httpx.AsyncClient, route: str, payload: bytes, requests: int):
+    headers = {"Content-Type": "application/json"}
+    await client.post(route, content=payload, headers=headers)  # warm-up
+    wall, cpu = time.perf_counter(), time.process_time()
+    for _ in range(requests):
+        response = await client.post(route, content=payload, headers=headers)
+        response.raise_for_status()
+    return requests / (time.perf_counter() - wall), (time.process_time() - cpu) / requests
+
+
+async def _main(args) -> None:
+    runner, url = await _start_backend(args.response_kb)
+    pool = UpstreamPool()
+    transport = httpx.ASGITransport(app=_proxy_app(pool, url))
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://proxy", timeout=60) as client:
+            print(f"requests: {args.requests} per size, response: {args.response_kb} KiB")
+            print(f"{'payload MB':>10s} {'proxy':12s} {'req/s':>8s} {'CPU ms/req':>11s}")
+            for size in (float(s) for s in args.sizes.split(",")):
+                payload = _payload(size)
+                for route in ("parse", "passthrough"):
+                    rate, cpu = await _run(client, f"/{route}", payload, args.requests)
+                    print(f"{len(payload) / 1024**2:10.2f} {route:12s} {rate:8.1f} {cpu * 1000:11.2f}")
+    finally:
+        await pool.close()
+        await runner.cleanup()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="0.01,1,8", help="Comma-separated image sizes in MB")
+    parser.add_argument("--requests", type=int, default=30)
+    parser.add_argument("--response-kb", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(_main(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -86,6 +86,29 @@ curl -s -X POST "${RESET}" > /dev/null
 log_success "Metrics cleared"
 sleep 1
 
+# ── History ordering: each simulate backfills 30 s of points; history must stay in time order ──
+
+log_step "Step 0b: History Ordering Check"
+inject '{"kv_cache_usage_perc": 10}'
+sleep 2
+inject '{"kv_cache_usage_perc": 12}'
+if curl -s "${API}/history?seconds=60" | python3 -c '
+import json, sys
+from datetime import datetime
+ts = [datetime.fromisoformat(s["timestamp"]).timestamp() for s in json.load(sys.stdin)]
+assert ts, "no history returned"
+assert ts == sorted(ts), "history timestamps are out of order"
+newest = ts[-1]
+recent = [t for t in ts if t >= newest - 10]
+assert len(recent) <= 11, f"{len(recent)} points in the last 10 s (expected at most 11)"
+'; then
+    log_success "History stays in time order after repeated simulate calls"
+else
+    log_error "History query after simulate returned out-of-order or duplicated points"
+    exit 1
+fi
+curl -s -X POST "${RESET}" > /dev/null
+
 # =================================================================
 # SCENARIO 1: Healthy baseline — low KV cache, no prefix cache
 # =================================================================
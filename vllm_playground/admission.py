@@ -0,0 +1,370 @@
+"""
+Admission control for the ``/v1`` gateway.
+
+Forwarding a burst straight to vLLM makes its scheduler preempt running
+sequences and swap or recompute their KV blocks, and tail latency grows for
+every request on the replica.  ``AdmissionController`` caps the requests the
+gateway has in flight per model and per backend and parks the excess in a
+bounded FIFO queue per model, so vLLM sees a steady batch while the gateway
+absorbs the burst.
+
+``_v1_proxy`` calls ``acquire(model, candidates, choose)``: when the model
+is under its limit and at least one candidate backend is under its own, the
+request is admitted at once and ``choose`` (the load balancer) picks among
+the backends that still have room.  Otherwise the request waits in the
+model's queue; each ``release`` hands freed slots to the oldest waiters.
+The slot is reserved before the waiter wakes up, so a newer request cannot
+overtake it.  ``candidates`` is a callable evaluated at every admission
+attempt, so a backend marked unhealthy while a request waits is not
+chosen for it.  A waiter whose candidates are all at their limit is skipped
+so that it does not hold up later waiters with other candidates; one whose
+candidates are gone fails.  A full queue or a wait longer than
+``queue_timeout`` raises ``AdmissionRejectedError`` (HTTP 429 with
+``Retry-After``); no candidate backend at all raises it with reason
+``no_candidates`` (HTTP 503).
+
+With ``adaptive`` enabled, each backend's limit follows its scraped load
+(``load_fn``, at most once per ``adapt_interval``).  It starts at
+``backend_limit`` (``ADAPTIVE_INITIAL_LIMIT`` when no static limit is set)
+and shrinks by a quarter, down to the scraped running count, while vLLM
+reports waiting requests or KV cache usage above ``kv_high_watermark``.
+It grows by a quarter while the KV cache is below ``kv_low_watermark``,
+nothing waits and at least three quarters of the limit are in use, up to
+``backend_limit`` (or ``ADAPTIVE_MAX_LIMIT``).
+
+A limit of 0 means unlimited; with every limit at 0 (the default) requests
+are never queued.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Sequence
+
+from .self_metrics import ADMISSION_LIMIT, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTED, ADMISSION_WAIT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_QUEUE_TIMEOUT = 30.0
+ADAPTIVE_MIN_LIMIT = 1
+ADAPTIVE_INITIAL_LIMIT = 16
+ADAPTIVE_MAX_LIMIT = 256
+
+# load_fn(backend_id) -> {"waiting": float, "running": float, "kv_cache": 0..1} or None when unknown
+LoadFn = Callable[[str], Optional[Dict[str, float]]]
+ChooseFn = Callable[[Sequence[Any]], Any]
+# candidates() -> the backends that may serve the request right now (e.g. the model's healthy replicas)
+CandidatesFn = Callable[[], Sequence[Any]]
+
+_SETTINGS = ("model_limit", "backend_limit", "model_limits", "queue_size", "queue_timeout", "adaptive")
+
+
+class AdmissionRejectedError(Exception):
+    """The request was not admitted (``reason`` is ``queue_full``, ``timeout`` or ``no_candidates``)."""
+
+    def __init__(self, reason: str, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _parse_model_limits(spec: str) -> Dict[str, int]:
+    limits = {}
+    for item in spec.split(","):
+        model, _, value = item.strip().rpartition("=")
+        if not model:
+            continue
+        try:
+            limits[model] = int(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid admission model limit: {item!r}")
+    return limits
+
+
+class _Waiter:
+    __slots__ = ("model", "candidates", "choose", "future")
+
+    def __init__(self, model: str, candidates: CandidatesFn, choose: ChooseFn):
+        self.model = model
+        self.candidates = candidates
+        self.choose = choose
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class AdmissionController:
+    """Per-model / per-backend in-flight limits with a bounded FIFO wait queue per model."""
+
+    def __init__(
+        self,
+        model_limit: int = 0,
+        backend_limit: int = 0,
+        model_limits: Optional[Dict[str, int]] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+        adaptive: bool = False,
+        load_fn: Optional[LoadFn] = None,
+        kv_high_watermark: float = 0.9,
+        kv_low_watermark: float = 0.7,
+        adapt_interval: float = 5.0,
+    ):
+        self.model_limit = model_limit
+        self.backend_limit = backend_limit
+        self.model_limits = dict(model_limits or {})
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.adaptive = adaptive
+        self.load_fn = load_fn
+        self.kv_high_watermark = kv_high_watermark
+        self.kv_low_watermark = kv_low_watermark
+        self.adapt_interval = adapt_interval
+        self.model_in_flight: Dict[str, int] = {}
+        self.backend_in_flight: Dict[str, int] = {}
+        self.admitted: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {}
+        self._queues: Dict[str, Deque[_Waiter]] = {}
+        self._adaptive_limits: Dict[str, float] = {}
+        self._adapted_at: Dict[str, float] = {}
+        self._hold_time: Dict[str, float] = {}  # per-model moving average of slot hold time (for Retry-After)
+
+    @classmethod
+    def from_env(cls, load_fn: Optional[LoadFn] = None) -> "AdmissionController":
+        env = os.environ
+        return cls(
+            model_limit=int(env.get("VLLM_PLAYGROUND_ADMISSION_MODEL_LIMIT") or 0),
+            backend_limit=int(env.get("VLLM_PLAYGROUND_ADMISSION_BACKEND_LIMIT") or 0),
+            model_limits=_parse_model_limits(env.get("VLLM_PLAYGROUND_ADMISSION_MODEL_LIMITS", "")),
+            queue_size=int(env.get("VLLM_PLAYGROUND_ADMISSION_QUEUE_SIZE") or DEFAULT_QUEUE_SIZE),
+            queue_timeout=float(env.get("VLLM_PLAYGROUND_ADMISSION_QUEUE_TIMEOUT") or DEFAULT_QUEUE_TIMEOUT),
+            adaptive=env.get("VLLM_PLAYGROUND_ADMISSION_ADAPTIVE", "").lower() in ("1", "true", "yes"),
+            load_fn=load_fn,
+        )
+
+    def configure(self, **settings) -> None:
+        """Update limits / queue settings (keys of ``_SETTINGS``); raises ValueError on bad values."""
+        unknown = set(settings) - set(_SETTINGS)
+        if unknown:
+            raise ValueError(f"Unknown admission settings: {', '.join(sorted(unknown))}")
+        for name in ("model_limit", "backend_limit", "queue_size"):
+            if name in settings and (not isinstance(settings[name], int) or settings[name] < 0):
+                raise ValueError(f"{name} must be a non-negative integer")
+        if "queue_timeout" in settings:
+            if not isinstance(settings["queue_timeout"], (int, float)) or settings["queue_timeout"] <= 0:
+                raise ValueError("queue_timeout must be a positive number of seconds")
+        model_limits = settings.get("model_limits")
+        if model_limits is not None and (
+            not isinstance(model_limits, dict) or not all(isinstance(v, int) and v >= 0 for v in model_limits.values())
+        ):
+            raise ValueError("model_limits must map model names to non-negative integers")
+
+        if "model_limits" in settings:
+            settings["model_limits"] = dict(model_limits or {})
+        for name, value in settings.items():
+            setattr(self, name, bool(value) if name == "adaptive" else value)
+        if "adaptive" in settings or "backend_limit" in settings:
+            self._adaptive_limits.clear()
+            self._adapted_at.clear()
+        # Raised limits may admit waiters right away
+        self._dispatch()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.model_limit or self.backend_limit or self.adaptive or any(self.model_limits.values()))
+
+    # -- Limits -------------------------------------------------------------------
+
+    def limit_for_model(self, model: str) -> int:
+        return self.model_limits.get(model, self.model_limit)
+
+    def limit_for_backend(self, backend_id: str) -> int:
+        if not self.adaptive or self.load_fn is None:
+            return self.backend_limit
+        ceiling = self.backend_limit or ADAPTIVE_MAX_LIMIT
+        limit = self._adaptive_limits.get(backend_id, self.backend_limit or ADAPTIVE_INITIAL_LIMIT)
+        now = time.monotonic()
+        if now - self._adapted_at.get(backend_id, -math.inf) >= self.adapt_interval:
+            load = self.load_fn(backend_id)
+            if load:
+                kv = load.get("kv_cache") or 0.0
+                if (load.get("waiting") or 0.0) > 0 or kv >= self.kv_high_watermark:
+                    # vLLM is queueing or short on KV blocks: back off towards what it actually runs
+                    running = load.get("running") or 0.0
+                    limit = max(ADAPTIVE_MIN_LIMIT, min(limit * 0.75, running) if running else limit * 0.75)
+                elif kv < self.kv_low_watermark and self.backend_in_flight.get(backend_id, 0) >= 0.75 * limit:
+                    # Headroom and the limit is in use: grow by a quarter
+                    limit = min(ceiling, limit + max(1.0, limit * 0.25))
+                self._adapted_at[backend_id] = now
+            self._adaptive_limits[backend_id] = limit
+            ADMISSION_LIMIT.set(int(limit), backend=backend_id)
+        return int(limit)
+
+    # -- Admission ----------------------------------------------------------------
+
+    def _model_full(self, model: str) -> bool:
+        model_limit = self.limit_for_model(model)
+        return bool(model_limit) and self.model_in_flight.get(model, 0) >= model_limit
+
+    def _try_admit(self, model: str, candidates: Sequence[Any], choose: ChooseFn) -> Optional[Any]:
+        """Reserve a slot and return the chosen backend, or None when the limits are reached."""
+        if self._model_full(model):
+            return None
+        room = []
+        for entry in candidates:
+            limit = self.limit_for_backend(entry.id)
+            if not limit or self.backend_in_flight.get(entry.id, 0) < limit:
+                room.append(entry)
+        if not room:
+            return None
+        chosen = choose(room)
+        self.model_in_flight[model] = self.model_in_flight.get(model, 0) + 1
+        self.backend_in_flight[chosen.id] = self.backend_in_flight.get(chosen.id, 0) + 1
+        self.admitted[model] = self.admitted.get(model, 0) + 1
+        return chosen
+
+    def _retry_after(self, model: str, depth: int) -> int:
+        """Seconds until roughly *depth* + 1 slots free up for *model*, in 1..queue_timeout."""
+        slots = self.limit_for_model(model) or max(1, self.backend_limit)
+        estimate = self._hold_time.get(model, 1.0) * (depth + 1) / slots
+        return max(1, min(math.ceil(estimate), math.ceil(self.queue_timeout)))
+
+    def _reject(self, model: str, reason: str, detail: str) -> AdmissionRejectedError:
+        self.rejected[model] = self.rejected.get(model, 0) + 1
+        ADMISSION_REJECTED.inc(model=model, reason=reason)
+        return AdmissionRejectedError(reason, self._retry_after(model, len(self._queues.get(model, ()))), detail)
+
+    def _no_candidates(self, model: str) -> AdmissionRejectedError:
+        return self._reject(model, "no_candidates", f"No backend is available for model '{model}'")
+
+    async def acquire(self, model: str, candidates: CandidatesFn, choose: ChooseFn) -> Any:
+        """Wait for a slot for *model* and return the backend ``choose`` picked from ``candidates()``.
+
+        Every successful ``acquire`` must be paired with ``release(model, backend.id)``.
+        """
+        current = candidates()
+        if not current:
+            raise self._no_candidates(model)
+        queue = self._queues.get(model)
+        if not queue:
+            chosen = self._try_admit(model, current, choose)
+            if chosen is not None:
+                ADMISSION_WAIT.observe(0.0, model=model, outcome="admitted")
+                return chosen
+            queue = self._queues.setdefault(model, deque())
+        if len(queue) >= self.queue_size:
+            raise self._reject(model, "queue_full", f"Admission queue for model '{model}' is full ({len(queue)})")
+
+        waiter = _Waiter(model, candidates, choose)
+        queue.append(waiter)
+        ADMISSION_QUEUE_DEPTH.set(len(queue), model=model)
+        # The waiters ahead may be blocked on backends this request does not need
+        self._dispatch()
+        started = time.perf_counter()
+        try:
+            chosen = await asyncio.wait_for(waiter.future, self.queue_timeout)
+        except AdmissionRejectedError:
+            ADMISSION_WAIT.observe(time.perf_counter() - started, model=model, outcome="rejected")
+            raise
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Woken with a reserved slot just as the wait ended: hand the slot back
+                self.release(model, waiter.future.result().id)
+            self._discard(waiter)
+            ADMISSION_WAIT.observe(time.perf_counter() - started, model=model, outcome="abandoned")
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject(
+                model, "timeout", f"Timed out after {self.queue_timeout:g}s waiting for a slot for model '{model}'"
+            ) from None
+        ADMISSION_WAIT.observe(time.perf_counter() - started, model=model, outcome="admitted")
+        return chosen
+
+    def release(self, model: str, backend_id: str, held: Optional[float] = None) -> None:
+        """Free the slot taken by ``acquire``; *held* (seconds) feeds the Retry-After estimate."""
+        for counts, key in ((self.model_in_flight, model), (self.backend_in_flight, backend_id)):
+            n = counts.get(key, 0) - 1
+            if n > 0:
+                counts[key] = n
+            else:
+                counts.pop(key, None)
+        if held is not None:
+            previous = self._hold_time.get(model)
+            self._hold_time[model] = held if previous is None else 0.8 * previous + 0.2 * held
+        self._dispatch()
+
+    def _discard(self, waiter: _Waiter) -> None:
+        queue = self._queues.get(waiter.model)
+        if queue is None:
+            return
+        try:
+            queue.remove(waiter)
+        except ValueError:
+            pass
+        self._update_depth(waiter.model, queue)
+
+    def _update_depth(self, model: str, queue: Deque[_Waiter]) -> None:
+        ADMISSION_QUEUE_DEPTH.set(len(queue), model=model)
+        if not queue:
+            self._queues.pop(model, None)
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the waiters of each model's queue, oldest first.
+
+        A waiter whose candidate backends are all at their limit is skipped
+        (a later waiter may be able to use another backend), and one with no
+        candidates left is failed.  The scan stops once the model is full.
+        """
+        for model, queue in list(self._queues.items()):
+            for waiter in list(queue):
+                if self._model_full(model):
+                    break
+                if waiter.future.done():
+                    queue.remove(waiter)
+                    continue
+                current = waiter.candidates()
+                if not current:
+                    queue.remove(waiter)
+                    waiter.future.set_exception(self._no_candidates(model))
+                    continue
+                chosen = self._try_admit(model, current, waiter.choose)
+                if chosen is not None:
+                    queue.remove(waiter)
+                    waiter.future.set_result(chosen)
+            self._update_depth(model, queue)
+
+    def forget(self, backend_id: str) -> None:
+        """Drop the adaptive limit of a removed backend."""
+        self._adaptive_limits.pop(backend_id, None)
+        self._adapted_at.pop(backend_id, None)
+        ADMISSION_LIMIT.remove(backend=backend_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        models = {}
+        for model in sorted(set(self.model_in_flight) | set(self._queues) | set(self.admitted)):
+            models[model] = {
+                "limit": self.limit_for_model(model),
+                "in_flight": self.model_in_flight.get(model, 0),
+                "queued": len(self._queues.get(model, ())),
+                "admitted": self.admitted.get(model, 0),
+                "rejected": self.rejected.get(model, 0),
+                "avg_hold_seconds": round(self._hold_time[model], 3) if model in self._hold_time else None,
+            }
+        backends = {}
+        for backend_id in sorted(set(self.backend_in_flight) | set(self._adaptive_limits)):
+            backends[backend_id] = {
+                "limit": self.limit_for_backend(backend_id),
+                "in_flight": self.backend_in_flight.get(backend_id, 0),
+            }
+        return {
+            "enabled": self.enabled,
+            "model_limit": self.model_limit,
+            "backend_limit": self.backend_limit,
+            "model_limits": dict(self.model_limits),
+            "queue_size": self.queue_size,
+            "queue_timeout": self.queue_timeout,
+            "adaptive": self.adaptive,
+            "models": models,
+            "backends": backends,
+        }
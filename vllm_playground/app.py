@@ -4,11 +4,14 @@ CONTAINERIZED VERSION - Uses Podman to run vLLM in containers
 """
 
 import asyncio
+import concurrent.futures
 import json
+import hashlib
 import logging
 import math
 import os
 import random
+import re
 import sys
 import subprocess
 import tempfile
@@ -16,11 +19,11 @@ import shutil
 import time
 from collections import deque
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any, Literal, Union, Tuple
+from typing import Optional, List, Dict, Any, Iterable, Literal, Union, Tuple
 from pathlib import Path
 
-from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect, HTTPException, Query
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 import uvicorn
@@ -49,6 +52,48 @@ except ImportError:
 # Instance registry for multi-instance support
 from .backend_registry import InstanceRegistry, InstanceEntry, BackendEntry
 import vllm_playground.backend_registry as _ir_mod
+from .prom_parser import parse_exposition, to_metric_entries
+from .metrics_history import DOWNSAMPLE_MODES, ROLLUP_AGGS, ColumnarHistory, RollupTier, downsample, select_tier
+from .metrics_segments import SegmentStore, migrate_jsonl
+from .fleet_metrics import FleetScraper
+from .metrics_stream import MetricFilter, MetricsStream
+from .histogram_windows import HistogramWindows
+from .counter_rates import CounterRates
+from .log_fanout import LogFanout
+from .log_metrics import EXTRACTORS as LOG_EXTRACTORS
+from .log_reader import iter_line_batches
+from .log_store import LogArchive, default_log_root
+from .log_search import LogSearch, build_matcher, parse_levels, scan_lines
+from .http_pool import upstream_pool
+from .load_balancer import DEFAULT_STRATEGY, STRATEGIES, LoadBalancer
+from .admission import AdmissionController, AdmissionRejectedError
+from .prefix_affinity import prefix_key
+from .passthrough import response_headers as passthrough_headers, scan_request
+from .response_cache import CachedResponse, ResponseCache, cache_key, is_deterministic
+from .single_flight import SingleFlight
+from .failover import RETRYABLE_STATUSES, FailoverPolicy
+from .startup_profile import StartupProfiler, StartupProfileStore, compare_profiles, default_profile_path
+from .self_metrics import (
+    BENCHMARK_DURATION,
+    BENCHMARK_RUNNING,
+    BENCHMARK_RUNS,
+    CHAT_REQUESTS,
+    CHAT_STREAM_DURATION,
+    CHAT_TIME_TO_FIRST_CHUNK,
+    CONTENT_TYPE as SELF_METRICS_CONTENT_TYPE,
+    LOG_BROADCAST_DURATION,
+    LOG_BROADCAST_MESSAGES,
+    LOG_WEBSOCKET_CLIENTS,
+    PROXY_BACKEND_EJECTIONS,
+    PROXY_DURATION,
+    PROXY_FAILED_ATTEMPTS,
+    PROXY_IN_FLIGHT,
+    PROXY_OVERHEAD,
+    PROXY_REQUESTS,
+    PROXY_UPSTREAM_LATENCY,
+    REGISTRY as SELF_METRICS,
+    SCRAPE_DURATION,
+)
 
 app = FastAPI(title="vLLM Playground", version="1.0.0")
 
@@ -56,9 +101,9 @@ app = FastAPI(title="vLLM Playground", version="1.0.0")
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks on app startup."""
-    metric_store._load_from_disk()
-    metric_store._open_history_file()
-    await metric_store.start_scrape_loop()
+    await asyncio.to_thread(_default_metric_store._load_from_disk)
+    _default_metric_store._open_history_file()
+    await _default_metric_store.start_scrape_loop()
     logger.info("MetricStore background scrape loop started")
 
     # Initialize instance registry
@@ -69,12 +114,22 @@ async def startup_event():
     asyncio.create_task(registry.recover_on_startup())
     logger.info("InstanceRegistry initialized")
 
+    if registry.active_id:
+        await _point_metric_store(registry.active_id)
+    fleet_scraper.start(lambda: _ir_mod.instance_registry)
+    await asyncio.to_thread(response_cache.load)
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Clean up MCP connections and background tasks on shutdown"""
-    await metric_store.stop_scrape_loop()
-    metric_store.close_history_file()
+    await _default_metric_store.stop_scrape_loop()
+    _default_metric_store.close_history_file()
+    await fleet_scraper.stop()
+    _metrics_history_writer.shutdown(wait=True)
+    await log_fanout.close()
+    _log_archive_writer.shutdown(wait=True)
+    log_archive.close()
 
     # Shutdown instance registry (stop health loops, persist state)
     if _ir_mod.instance_registry:
@@ -94,6 +149,9 @@ async def shutdown_event():
         logger.debug(f"Error during MCP cleanup: {e}")
     logger.info("MCP cleanup complete")
 
+    # Last: the pool reopens a closed session on use, so nothing may call a backend after this
+    await upstream_pool.close()
+
 
 # Get base directory
 BASE_DIR = Path(__file__).parent
@@ -108,7 +166,8 @@ vllm_process: Optional[asyncio.subprocess.Process] = None  # Process (for subpro
 vllm_running: bool = False
 current_run_mode: Optional[str] = None  # Track current run mode
 log_queue: asyncio.Queue = asyncio.Queue()
-websocket_connections: List[WebSocket] = []
+log_fanout = LogFanout()  # /ws/logs clients
+LOG_WEBSOCKET_CLIENTS.set_function(lambda: len(log_fanout))
 latest_vllm_metrics: Dict[str, Any] = {}  # Store latest metrics from logs
 metrics_timestamp: Optional[datetime] = None  # Track when metrics were last updated
 metrics_history: deque = deque(maxlen=120)  # ~6 min of history at 3s intervals (legacy)
@@ -117,10 +176,28 @@ metrics_history: deque = deque(maxlen=120)  # ~6 min of history at 3s intervals
 _log_reader_tasks: Dict[str, asyncio.Task] = {}
 _log_buffers: Dict[str, deque] = {}
 _LOG_BUFFER_MAX = 2000
+_LOG_READ_MAX = 10000  # lines per /api/instances/{id}/logs response
+log_archive = LogArchive(default_log_root())  # durable per-instance logs, survives restarts
+# Appends run off the event loop on one thread, so they (and the offsets sent to clients) stay in call order
+_log_archive_writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-archive")
+# MetricStore segment appends, seals and index writes, kept off the event loop and in call order
+_metrics_history_writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="metrics-history")
+log_search = LogSearch(log_archive)  # in-memory search index over log_archive
+_LOG_SEARCH_MAX = 5000
 _globals_version: int = 0
 
 
-def _flush_global_logs_to_instance(inst_id: Optional[str]) -> None:
+def _record_last_startup(timeline) -> None:
+    """Keep the finished cold-start summary on the instance (persisted for saved instances)."""
+    registry = _ir_mod.instance_registry
+    if registry and timeline.instance_id:
+        asyncio.create_task(registry.update(timeline.instance_id, last_startup=timeline.summary()))
+
+
+startup_profiler = StartupProfiler(StartupProfileStore(default_profile_path()), on_complete=_record_last_startup)
+
+
+async def _flush_global_logs_to_instance(inst_id: Optional[str]) -> None:
     """Move pending ``__global__`` log buffer entries into a specific instance buffer.
 
     Called right after ``_auto_register_instance()`` so that pre-registration
@@ -134,8 +211,24 @@ def _flush_global_logs_to_instance(inst_id: Optional[str]) -> None:
         return
     if inst_id not in _log_buffers:
         _log_buffers[inst_id] = deque(maxlen=_LOG_BUFFER_MAX)
-    _log_buffers[inst_id].extend(global_buf)
+    messages = list(global_buf)
+    _log_buffers[inst_id].extend(messages)
     global_buf.clear()
+    await _archive_log_lines(inst_id, messages)
+
+
+async def _archive_log_lines(instance_id: str, messages: List[str]) -> Optional[int]:
+    """Append lines to the instance's durable log on the writer thread; returns the first line's offset."""
+    ts = time.time()
+    try:
+        first_offset = await asyncio.get_running_loop().run_in_executor(
+            _log_archive_writer, lambda: log_archive.get(instance_id).append(messages, ts)
+        )
+    except Exception as e:
+        logger.debug(f"Log archive append failed for {instance_id}: {e}")
+        return None
+    log_search.add(instance_id, first_offset, messages, ts)
+    return first_offset
 
 
 # ---------------------------------------------------------------------------
@@ -151,127 +244,155 @@ class MetricStore:
     comments, and stores structured entries.
 
     A background asyncio task scrapes the Prometheus endpoint every
-    ``scrape_interval`` seconds and appends timestamped snapshots to a ring
-    buffer for time-series charting.
+    ``scrape_interval`` seconds and appends timestamped snapshots to a
+    columnar ring buffer (``ColumnarHistory``) for time-series charting.
+    Each snapshot is also folded into 1-minute and 1-hour rollup tiers
+    (``RollupTier``) with longer retention, and ``query_history()`` serves
+    wide windows from the coarsest tier that still has enough resolution.
+
+    Every registered instance gets its own store (``instance_id`` set),
+    scraped by ``fleet_scraper``; the store without an ``instance_id`` serves
+    servers that are not (yet) in the registry.
     """
 
-    _HISTORY_MAX_FILE_BYTES = 50 * 1024 * 1024  # 50 MB rotation threshold
+    # (name, bucket seconds, rows kept in memory / retention)
+    ROLLUP_TIERS = (
+        ("1m", 60.0, 3 * 24 * 60),  # 3 days
+        ("1h", 3600.0, 90 * 24),  # 90 days
+    )
 
-    def __init__(self, history_maxlen: int = 8640, scrape_interval: float = 5.0, history_path: Optional[str] = None):
+    def __init__(
+        self,
+        history_maxlen: int = 8640,
+        scrape_interval: float = 5.0,
+        history_path: Optional[str] = None,
+        instance_id: Optional[str] = None,
+    ):
+        self.instance_id = instance_id
         self.latest: Dict[str, Any] = {}
-        self.history: deque = deque(maxlen=history_maxlen)
+        self.stream = MetricsStream()  # push subscribers (/ws/metrics)
+        self.history = ColumnarHistory(history_maxlen)
         self.scrape_interval = scrape_interval
         self.last_scrape: Optional[datetime] = None
         self.last_simulated: Optional[datetime] = None
         self._task: Optional[asyncio.Task] = None
         self._types: Dict[str, str] = {}  # metric name -> gauge/counter/histogram/...
+        self._hist_windows = HistogramWindows()  # 1m/5m/15m percentiles from bucket deltas
+        self._counter_rates = CounterRates()  # <counter>_rate_1m / _increase_5m series
         self._scrape_warned: bool = False
         self._dirty: bool = False
 
         default_dir = Path.home() / ".vllm-playground"
-        self._history_path = Path(history_path) if history_path else default_dir / "metrics-history.jsonl"
-        self._history_file: Optional[Any] = None
-        self._disk_write_count: int = 0
+        self._history_dir = Path(history_path) if history_path else default_dir / "metrics-history"
+        # Pre-segment JSONL history, migrated once on startup
+        self._legacy_history_path = self._history_dir.with_name(self._history_dir.name + ".jsonl")
+        self._segments = SegmentStore(self._history_dir)
+
+        self.rollups: List[RollupTier] = []
+        self._rollup_segments: Dict[str, SegmentStore] = {}
+        for name, resolution, maxlen in self.ROLLUP_TIERS:
+            self.rollups.append(RollupTier(name, resolution, maxlen))
+            self._rollup_segments[name] = SegmentStore(
+                self._history_dir / name,
+                segment_seconds=max(3600.0, resolution * 24),
+                retention_seconds=resolution * maxlen,
+            )
 
-    # -- JSONL disk persistence -----------------------------------------------
+    # -- Segmented disk persistence --------------------------------------------
 
     def _open_history_file(self):
-        """Open the JSONL file for appending, creating parent dirs if needed."""
-        if self._history_file is not None:
-            return
-        try:
-            self._history_path.parent.mkdir(parents=True, exist_ok=True)
-            self._history_file = open(self._history_path, "a", encoding="utf-8")
-            logger.info("MetricStore: history file opened at %s", self._history_path)
-        except OSError as exc:
-            logger.warning("MetricStore: cannot open history file %s: %s", self._history_path, exc)
-            self._history_file = None
-
-    def _append_to_disk(self, snapshot: dict):
-        """Append a single snapshot as a JSONL line.  Flushes every 10 writes."""
-        if self._history_file is None:
-            return
-        try:
-            self._history_file.write(json.dumps(snapshot, default=str) + "\n")
-            self._disk_write_count += 1
-            if self._disk_write_count >= 10:
-                self._history_file.flush()
-                self._disk_write_count = 0
-        except OSError as exc:
-            logger.warning("MetricStore: disk write failed: %s", exc)
+        """Open the segment stores for appending, creating the directories if needed."""
+        self._segments.open()
+        for store in self._rollup_segments.values():
+            store.open()
 
-    def _load_from_disk(self):
-        """Load persisted history from the JSONL file into the in-memory deque.
+    def _append_to_disk(self, ts: float, values: Dict[str, Any], closed: Dict[str, Tuple[float, Dict[str, float]]]):
+        """Queue a snapshot and any closed rollup rows for the history writer thread.
 
-        If the file exceeds ``_HISTORY_MAX_FILE_BYTES``, it is rotated first
-        (trimmed to the last ``history.maxlen`` lines).
+        Segment appends, seals and index writes all run there, in call order.
         """
-        if not self._history_path.exists():
-            logger.info("MetricStore: no history file at %s — starting fresh", self._history_path)
-            return
+        _metrics_history_writer.submit(self._write_to_disk, ts, values, closed)
 
+    def _write_to_disk(self, ts: float, values: Dict[str, Any], closed: Dict[str, Tuple[float, Dict[str, float]]]):
         try:
-            file_size = self._history_path.stat().st_size
-        except OSError:
-            return
+            self._segments.append(ts, values)
+            for name, (row_ts, row) in closed.items():
+                self._rollup_segments[name].append(row_ts, row)
+        except Exception as exc:
+            logger.warning("MetricStore: history write failed: %s", exc)
 
-        if file_size > self._HISTORY_MAX_FILE_BYTES:
-            self._rotate_history_file()
+    def _replay_into_rollups(self, tiers: List[RollupTier], ts: float, values: Dict[str, Any]):
+        """Feed a migrated legacy snapshot through *tiers*, persisting closed rows.
 
-        loaded = 0
-        try:
-            with open(self._history_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        snap = json.loads(line)
-                        self.history.append(snap)
-                        loaded += 1
-                    except (json.JSONDecodeError, ValueError):
-                        continue
-        except OSError as exc:
-            logger.warning("MetricStore: cannot read history file: %s", exc)
-            return
+        Legacy snapshots carry no metric types, so Prometheus ``*_total``
+        series are rolled up as counters.
+        """
+        rollup_values = {k: v for k, v in values.items() if "_bucket_le_" not in k}
+        counters = [k for k in rollup_values if k.endswith("_total")]
+        for tier in tiers:
+            closed = tier.add(ts, rollup_values, counters)
+            if closed is not None:
+                self._rollup_segments[tier.name].append(*closed)
 
-        if loaded:
-            logger.info("MetricStore: restored %d snapshots from disk", loaded)
+    def _load_from_disk(self):
+        """Refill the in-memory ring from the newest on-disk segments.
 
-    def _rotate_history_file(self):
-        """Truncate the JSONL file to the last ``history.maxlen`` lines."""
-        try:
-            with open(self._history_path, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            keep = lines[-self.history.maxlen :] if len(lines) > self.history.maxlen else lines
-            with open(self._history_path, "w", encoding="utf-8") as f:
-                f.writelines(keep)
-            logger.info(
-                "MetricStore: rotated history file from %d to %d lines",
-                len(lines),
-                len(keep),
+        A legacy ``metrics-history.jsonl`` file is migrated into segments first
+        (one-shot).  Only the segments needed to cover ``history.maxlen``
+        snapshots are memory-mapped.  Blocking; run it off the event loop.
+        """
+        self._segments.open()
+        for tier in self.rollups:
+            store = self._rollup_segments[tier.name]
+            store.open()
+            rows = 0
+            for ts, row in store.iter_recent(tier.rows.maxlen):
+                tier.rows.append(ts, row)
+                rows += 1
+            if rows:
+                logger.info("MetricStore: restored %d %s rollup rows", rows, tier.name)
+
+        if self._legacy_history_path.exists():
+            # Only tiers without persisted rows are rebuilt, so replayed buckets never precede stored ones
+            tiers = [tier for tier in self.rollups if not tier.rows]
+            migrate_jsonl(
+                self._legacy_history_path,
+                self._segments,
+                on_snapshot=lambda ts, values: self._replay_into_rollups(tiers, ts, values),
             )
-        except OSError as exc:
-            logger.warning("MetricStore: rotation failed: %s", exc)
+
+        loaded = 0
+        for ts, values in self._segments.iter_recent(self.history.maxlen):
+            self.history.append(ts, values)
+            loaded += 1
+
+        if loaded:
+            logger.info("MetricStore: restored %d snapshots from %s", loaded, self._history_dir)
+        else:
+            logger.info("MetricStore: no history segments in %s — starting fresh", self._history_dir)
 
     def flush_history_file(self):
-        """Flush any buffered writes to disk."""
-        if self._history_file is not None:
-            try:
-                self._history_file.flush()
-            except OSError:
-                pass
+        """Flush any buffered writes to disk once the queued appends have run."""
+        _metrics_history_writer.submit(self._flush_segments).result()
+
+    def _flush_segments(self):
+        self._segments.flush()
+        for store in self._rollup_segments.values():
+            store.flush()
 
     def close_history_file(self):
-        """Flush and close the history file handle."""
-        if self._history_file is not None:
-            try:
-                self._history_file.flush()
-                self._history_file.close()
-            except OSError:
-                pass
-            self._history_file = None
-            logger.info("MetricStore: history file closed")
+        """Seal the active segments and write the indexes, after the queued appends.
+
+        The rollup buckets still being filled are not persisted; they are
+        rebuilt from new samples after a restart.
+        """
+        _metrics_history_writer.submit(self._close_segments).result()
+        logger.info("MetricStore: history segments closed")
+
+    def _close_segments(self):
+        self._segments.close()
+        for store in self._rollup_segments.values():
+            store.close()
 
     # -- Generic Prometheus parser -------------------------------------------
 
@@ -283,171 +404,12 @@ class MetricStore:
           metrics_dict: {metric_name: {"value": float, "type": str, "labels": str}}
           types_dict:   {metric_name: type_str}
 
-        For histogram metrics, bucket/sum/count lines are collected and
-        percentiles (p50, p95, p99) are computed.
+        Delegates to the single-pass parser in ``prom_parser``.  Metrics with
+        several label sets carry a ``series`` list; histogram percentiles
+        (p50, p95, p99) are computed per label set and over merged buckets.
         """
-        types: Dict[str, str] = {}
-        metrics: Dict[str, Any] = {}
-        histogram_buckets: Dict[str, list] = {}
-
-        for line in text.split("\n"):
-            line = line.strip()
-            if not line:
-                continue
-
-            if line.startswith("# TYPE "):
-                parts = line.split()
-                if len(parts) >= 4:
-                    name = parts[2]
-                    mtype = parts[3]
-                    types[name] = mtype
-                continue
-
-            if line.startswith("#"):
-                continue
-
-            name, labels, value = MetricStore._parse_prom_line(line)
-            if name is None or value is None:
-                continue
-
-            if not name.startswith("vllm:"):
-                continue
-
-            base_name = MetricStore._base_metric_name(name)
-            mtype = types.get(base_name, "unknown")
-
-            if name.endswith("_created"):
-                continue
-
-            if name.endswith("_bucket"):
-                le_val = MetricStore._extract_le(labels)
-                if le_val is not None:
-                    histogram_buckets.setdefault(base_name, []).append((le_val, value))
-                continue
-
-            if name.endswith("_count") or name.endswith("_sum"):
-                suffix = "_count" if name.endswith("_count") else "_sum"
-                entry_key = base_name + suffix
-                metrics[entry_key] = {
-                    "value": value,
-                    "type": "counter",
-                    "labels": labels,
-                }
-                continue
-
-            if name.endswith("_total"):
-                entry_key = base_name
-            else:
-                entry_key = name
-
-            metrics[entry_key] = {
-                "value": value,
-                "type": mtype if mtype != "unknown" else ("gauge" if "{" not in name else "gauge"),
-                "labels": labels,
-            }
-
-        for base_name, buckets in histogram_buckets.items():
-            percentiles = MetricStore._compute_percentiles(buckets)
-            if percentiles:
-                metrics[base_name] = {
-                    "type": "histogram",
-                    "labels": "",
-                    **percentiles,
-                }
-                sorted_buckets = sorted(buckets, key=lambda x: x[0])
-                for le_val, count in sorted_buckets:
-                    le_str = "+Inf" if le_val == float("inf") else str(le_val)
-                    bucket_key = f"{base_name}_bucket_le_{le_str}"
-                    metrics[bucket_key] = {
-                        "value": count,
-                        "type": "histogram_bucket",
-                        "labels": f'le="{le_str}"',
-                    }
-
-        return metrics, types
-
-    @staticmethod
-    def _parse_prom_line(line: str):
-        """Parse a single Prometheus metric line into (name, labels, value)."""
-        brace = line.find("{")
-        if brace >= 0:
-            close = line.find("}", brace)
-            if close < 0:
-                return None, None, None
-            name = line[:brace]
-            labels = line[brace + 1 : close]
-            rest = line[close + 1 :].strip()
-        else:
-            parts = line.split(None, 1)
-            if len(parts) < 2:
-                return None, None, None
-            name = parts[0]
-            labels = ""
-            rest = parts[1]
-
-        val_parts = rest.split()
-        if not val_parts:
-            return None, None, None
-        try:
-            value = float(val_parts[0])
-        except ValueError:
-            return None, None, None
-
-        return name, labels, value
-
-    @staticmethod
-    def _base_metric_name(name: str) -> str:
-        """Strip _total, _created, _bucket, _count, _sum suffixes."""
-        for suffix in ("_total", "_created", "_bucket", "_count", "_sum"):
-            if name.endswith(suffix):
-                return name[: -len(suffix)]
-        return name
-
-    @staticmethod
-    def _extract_le(labels: str) -> Optional[float]:
-        """Extract the 'le' label value from a histogram bucket line."""
-        for part in labels.split(","):
-            part = part.strip()
-            if part.startswith("le="):
-                val = part.split("=", 1)[1].strip('"')
-                if val == "+Inf":
-                    return float("inf")
-                try:
-                    return float(val)
-                except ValueError:
-                    return None
-        return None
-
-    @staticmethod
-    def _compute_percentiles(buckets: list) -> Dict[str, float]:
-        """Compute p50, p95, p99 from cumulative histogram buckets."""
-        sorted_b = sorted(buckets, key=lambda x: x[0])
-        if not sorted_b:
-            return {}
-
-        total = sorted_b[-1][1] if sorted_b[-1][0] == float("inf") else sorted_b[-1][1]
-        if total <= 0:
-            return {}
-
-        result = {}
-        for pname, target in [("p50", 0.50), ("p95", 0.95), ("p99", 0.99)]:
-            threshold = total * target
-            prev_le, prev_count = 0.0, 0.0
-            for le, count in sorted_b:
-                if le == float("inf"):
-                    break
-                if count >= threshold:
-                    if count == prev_count:
-                        result[pname] = le
-                    else:
-                        frac = (threshold - prev_count) / (count - prev_count)
-                        result[pname] = prev_le + frac * (le - prev_le)
-                    break
-                prev_le, prev_count = le, count
-            else:
-                result[pname] = prev_le
-
-        return result
+        scrape = parse_exposition(text)
+        return to_metric_entries(scrape), scrape.types
 
     # -- Flat dict conversion for legacy compat ------------------------------
 
@@ -522,6 +484,8 @@ class MetricStore:
             "avg_generation_throughput": "vllm:avg_generation_throughput_toks_per_s",
             "num_requests_running": "vllm:num_requests_running",
             "num_requests_waiting": "vllm:num_requests_waiting",
+            "num_requests_swapped": "vllm:num_requests_swapped",
+            "num_preemptions": "vllm:num_preemptions",
             "spec_decode_accepted": "vllm:spec_decode_num_accepted_tokens",
             "spec_decode_draft": "vllm:spec_decode_num_draft_tokens",
             "spec_decode_acceptance_rate": "vllm:spec_decode_acceptance_rate",
@@ -556,16 +520,58 @@ class MetricStore:
         """
         if not self.latest:
             return
-        now = datetime.now()
-        snapshot = {"timestamp": now.isoformat()}
-        for k, v in self.latest.items():
+        self._record_snapshot(datetime.now(), self.latest)
+        self._dirty = False
+
+    def _record_snapshot(self, now: datetime, entries: Dict[str, Any]):
+        """Flatten structured *entries* to scalars and append them to history and disk."""
+        values = {}
+        counters = set()
+        for k, v in entries.items():
             if isinstance(v, dict):
-                snapshot[k] = v.get("value", v.get("p50"))
+                values[k] = v.get("value", v.get("p50"))
+                if v.get("type") == "counter":
+                    counters.add(k)
             else:
-                snapshot[k] = v
-        self.history.append(snapshot)
-        self._append_to_disk(snapshot)
-        self._dirty = False
+                values[k] = v
+        self._record_values(now.timestamp(), values, counters)
+
+    def _record_values(self, ts: float, values: Dict[str, Any], counters: Iterable[str] = ()):
+        """Append scalar *values* to the raw ring, the rollup tiers and disk.
+
+        History is searched by bisection and rolled up in time order, so a
+        sample older than the newest one recorded is dropped.
+        """
+        newest = self.history.newest_ts()
+        if newest is not None and ts < newest:
+            logger.debug(f"MetricStore: dropping out-of-order sample at {ts:.3f} (newest {newest:.3f})")
+            return
+        self.history.append(ts, values)
+
+        rollup_values = {k: v for k, v in values.items() if "_bucket_le_" not in k}
+        closed_rows = {}
+        for tier in self.rollups:
+            closed = tier.add(ts, rollup_values, counters)
+            if closed is not None:
+                closed_rows[tier.name] = closed
+        self._append_to_disk(ts, values, closed_rows)
+        self.stream.mark_dirty()
+
+    def clear_history(self):
+        """Drop in-memory raw and rollup history (on-disk segments age out on their own)."""
+        self.history.clear()
+        for tier in self.rollups:
+            tier.clear()
+
+    def reset(self):
+        """Forget latest values, history and scrape timestamps (fresh dashboard)."""
+        self.latest.clear()
+        self.clear_history()
+        self._hist_windows.clear()
+        self._counter_rates.clear()
+        self.last_scrape = None
+        self.last_simulated = None
+        self.stream.mark_dirty()
 
     # -- Background scrape ---------------------------------------------------
 
@@ -611,32 +617,46 @@ class MetricStore:
             await asyncio.sleep(self.scrape_interval)
 
     async def _do_scrape(self):
-        """Single scrape: fetch, parse, merge, snapshot."""
+        """Single scrape: fetch, parse, merge, snapshot.
+
+        Registered instances are scraped through ``fleet_scraper``; this
+        store's own fetch only runs for a server outside the registry.
+        """
+        registry = _ir_mod.instance_registry
+        if self.instance_id is not None:
+            entry = await registry.get(self.instance_id) if registry else None
+            if entry is not None:
+                await fleet_scraper.scrape_instance(entry)
+            return
+        if registry is not None and registry.active_id is not None:
+            return
         if current_config is None:
             return
         if not await check_vllm_server_running():
             return
 
+        scrape_started = time.perf_counter()
         try:
             base_url = get_vllm_base_url()
             metrics_url = f"{base_url}/metrics"
             auth_headers = get_vllm_auth_headers()
             timeout = aiohttp.ClientTimeout(total=5 if current_run_mode == "remote" else 3)
 
-            async with aiohttp.ClientSession(headers=auth_headers) as session:
-                async with session.get(metrics_url, timeout=timeout) as response:
-                    if response.status != 200:
-                        if not self._scrape_warned:
-                            logger.warning(
-                                "MetricStore: Prometheus scrape returned %d from %s (will retry silently)",
-                                response.status,
-                                metrics_url,
-                            )
-                            self._scrape_warned = True
-                        return
-                    text = await response.text()
-                    self._scrape_warned = False
+            async with upstream_pool.get(metrics_url, headers=auth_headers, timeout=timeout) as response:
+                if response.status != 200:
+                    if not self._scrape_warned:
+                        logger.warning(
+                            "MetricStore: Prometheus scrape returned %d from %s (will retry silently)",
+                            response.status,
+                            metrics_url,
+                        )
+                        self._scrape_warned = True
+                    SCRAPE_DURATION.observe(time.perf_counter() - scrape_started, instance="default", outcome="error")
+                    return
+                text = await response.text()
+                self._scrape_warned = False
         except Exception as exc:
+            SCRAPE_DURATION.observe(time.perf_counter() - scrape_started, instance="default", outcome="error")
             if not self._scrape_warned:
                 logger.warning(
                     "MetricStore: cannot reach %s/metrics (%s: %s). Sidebar will use log-parsed fallback.",
@@ -647,56 +667,172 @@ class MetricStore:
                 self._scrape_warned = True
             return
 
+        first_success = not self.latest
+        count = self.ingest_prometheus_text(text)
+        SCRAPE_DURATION.observe(
+            time.perf_counter() - scrape_started, instance="default", outcome="ok" if count else "empty"
+        )
+        if count and first_success:
+            logger.info("MetricStore: first successful scrape — %d metrics from %s/metrics", count, get_vllm_base_url())
+
+    def ingest_prometheus_text(self, text: str) -> int:
+        """Parse a ``/metrics`` body, merge it into ``latest`` and record a snapshot.
+
+        Returns the number of metrics parsed (0 when the scrape had none).
+        """
         parsed, types = self.parse_prometheus_text(text)
         if not parsed:
-            return
+            return 0
 
-        first_success = not self.latest
+        now = datetime.now()
+        self._hist_windows.annotate(parsed, now.timestamp())
+        self._counter_rates.annotate(parsed, now.timestamp())
         self._types.update(types)
         self.latest.update(parsed)
-        now = datetime.now()
         self.last_scrape = now
         self._scrape_warned = False
+        self._record_snapshot(now, parsed)
+        return len(parsed)
 
-        if first_success:
-            logger.info(
-                "MetricStore: first successful scrape — %d metrics from %s/metrics", len(parsed), get_vllm_base_url()
-            )
+    def history_window(
+        self,
+        minutes: Optional[int] = None,
+        seconds: Optional[int] = None,
+        names: Optional[List[str]] = None,
+    ) -> tuple:
+        """Return ``(timestamps, {metric: values})`` columns for a time window.
 
-        snapshot = {"timestamp": now.isoformat()}
-        for k, v in parsed.items():
-            if isinstance(v, dict):
-                snapshot[k] = v.get("value", v.get("p50"))
-            else:
-                snapshot[k] = v
-        self.history.append(snapshot)
-        self._append_to_disk(snapshot)
+        ``seconds`` takes precedence over ``minutes`` when both are given.
+        *names* restricts the columns returned.  Missing samples are NaN.
+        """
+        if seconds is not None:
+            cutoff = datetime.now().timestamp() - seconds
+        elif minutes is not None:
+            cutoff = datetime.now().timestamp() - minutes * 60
+        else:
+            cutoff = None
+        return self.history.window(cutoff, names=names)
+
+    def query_history(
+        self,
+        minutes: Optional[int] = None,
+        seconds: Optional[int] = None,
+        names: Optional[List[str]] = None,
+        max_points: Optional[int] = None,
+        agg: str = "auto",
+    ) -> tuple:
+        """Like ``history_window()``, but served from the best tier.
+
+        The raw ring is used while it still reaches back to the window start
+        (and, with *max_points*, while its resolution is needed); otherwise the
+        coarsest rollup tier whose bucket size is at most ``window /
+        max_points`` is used.  *agg* picks the rollup aggregate per metric
+        (``auto`` = avg for gauges, last for counters).
+
+        Returns ``(tier_name, timestamps, columns)``; ``tier_name`` is
+        ``"raw"`` for the in-memory ring.
+        """
+        now = datetime.now().timestamp()
+        if seconds is not None:
+            since = now - seconds
+        elif minutes is not None:
+            since = now - minutes * 60
+        else:
+            since = None
+
+        raw = _RawTier(self.history, self.scrape_interval)
+        tier = select_tier([raw, *self.rollups], since, now, max_points)
+        if tier is raw:
+            return ("raw", *self.history.window(since, names=names))
+        return (tier.name, *tier.window(since, names=names, agg=agg))
 
     def get_history(self, minutes: Optional[int] = None, seconds: Optional[int] = None) -> list:
         """Return history snapshots, optionally filtered by time window.
 
         ``seconds`` takes precedence over ``minutes`` when both are given.
         """
-        if seconds is not None:
-            window_secs = seconds
-        elif minutes is not None:
-            window_secs = minutes * 60
-        else:
-            return list(self.history)
+        return ColumnarHistory.to_snapshots(*self.history_window(minutes=minutes, seconds=seconds))
 
-        cutoff = datetime.now().timestamp() - window_secs
-        result = []
-        for snap in self.history:
-            try:
-                ts = datetime.fromisoformat(snap["timestamp"]).timestamp()
-                if ts >= cutoff:
-                    result.append(snap)
-            except (KeyError, ValueError):
-                result.append(snap)
-        return result
+
+class _RawTier:
+    """Adapts the raw ring to the ``resolution`` / ``oldest_ts()`` shape used by ``select_tier``."""
+
+    name = "raw"
+
+    def __init__(self, history: ColumnarHistory, resolution: float):
+        self.resolution = resolution
+        self._history = history
+
+    def oldest_ts(self) -> Optional[float]:
+        return self._history.oldest_ts()
+
+
+_default_metric_store = MetricStore(history_maxlen=8640, scrape_interval=5.0)
+# Points at the active instance's store; swapped by _point_metric_store()
+metric_store = _default_metric_store
+
+fleet_scraper = FleetScraper(
+    lambda instance_id: MetricStore(
+        history_maxlen=8640,
+        scrape_interval=5.0,
+        history_path=str(fleet_scraper.history_dir(instance_id)),
+        instance_id=instance_id,
+    ),
+    history_root=_default_metric_store._history_dir / "instances",
+    scrape_interval=5.0,
+)
+
+
+def _scraped_backend_load(instance_id: str) -> Optional[Dict[str, float]]:
+    """Queue depth and KV cache usage (0..1) from the instance's last scrape; None if missing or stale."""
+    store = fleet_scraper.stores.get(instance_id)
+    status = fleet_scraper.status.get(instance_id)
+    if store is None or status is None or status.last_success is None:
+        return None
+    if time.time() - status.last_success > 3 * fleet_scraper.scrape_interval:
+        return None
+
+    def value(name: str) -> Optional[float]:
+        entry = store.latest.get(name)
+        return entry.get("value") if isinstance(entry, dict) else entry
+
+    kv = value("vllm:kv_cache_usage_perc")
+    if kv is None:
+        kv = value("vllm:gpu_cache_usage_perc")
+    # Prefix cache hit rate over the last 5 minutes, else since the replica started
+    hits, queries = value("vllm:prefix_cache_hits_increase_5m"), value("vllm:prefix_cache_queries_increase_5m")
+    if not queries:
+        hits, queries = value("vllm:prefix_cache_hits"), value("vllm:prefix_cache_queries")
+    return {
+        "waiting": value("vllm:num_requests_waiting") or 0.0,
+        "running": value("vllm:num_requests_running") or 0.0,
+        "kv_cache": kv / 100 if kv is not None and kv > 1.0 else kv,
+        "prefix_cache_hit_rate": round(hits / queries, 4) if hits is not None and queries else None,
+    }
+
+
+_lb_strategy = os.environ.get("VLLM_PLAYGROUND_LB_STRATEGY", DEFAULT_STRATEGY)
+if _lb_strategy not in STRATEGIES:
+    logger.warning(f"Unknown VLLM_PLAYGROUND_LB_STRATEGY '{_lb_strategy}', using {DEFAULT_STRATEGY}")
+    _lb_strategy = DEFAULT_STRATEGY
+load_balancer = LoadBalancer(_lb_strategy, load_fn=_scraped_backend_load)  # /v1 gateway replica selection
+admission = AdmissionController.from_env(load_fn=_scraped_backend_load)  # /v1 gateway in-flight limits and queue
+response_cache = ResponseCache.from_env()  # /v1 gateway cache of deterministic responses (opt-in)
+single_flight = SingleFlight.from_env()  # /v1 gateway coalescing of identical in-flight requests
+failover = FailoverPolicy.from_env()  # /v1 gateway retries on another replica before the first byte
+
+
+async def _point_metric_store(instance_id: Optional[str]) -> MetricStore:
+    """Re-point ``metric_store`` at *instance_id*'s store (``None`` = default store)."""
+    global metric_store
+    previous = metric_store
+    metric_store = await fleet_scraper.get_store(instance_id) if instance_id else _default_metric_store
+    if previous is not metric_store:
+        # /ws/metrics subscribers following the active instance re-sync
+        previous.stream.wake_all()
+    return metric_store
 
 
-metric_store = MetricStore(history_maxlen=8640, scrape_interval=5.0)
 current_model_identifier: Optional[str] = None  # Track the actual model identifier passed to vLLM
 current_served_model_name: Optional[str] = None  # Track the served model name alias (for API calls)
 # OpenAI ``model`` field as advertised by this vLLM process (GET /v1/models); source of truth for chat.
@@ -761,19 +897,18 @@ async def sync_current_api_model_id_from_backend() -> None:
         url = f"{base_url}/v1/models"
         auth_headers = get_vllm_auth_headers()
         timeout = aiohttp.ClientTimeout(total=15, connect=5)
-        async with aiohttp.ClientSession(timeout=timeout, headers=auth_headers) as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    logger.warning("sync_current_api_model_id: /v1/models returned %s", response.status)
-                    return
-                data = await response.json()
-                models = data.get("data") or []
-                if not models:
-                    return
-                mid = models[0].get("id")
-                if mid:
-                    current_api_model_id = str(mid)
-                    logger.info("OpenAI API model id synced from vLLM: %s", current_api_model_id)
+        async with upstream_pool.get(url, headers=auth_headers, timeout=timeout) as response:
+            if response.status != 200:
+                logger.warning("sync_current_api_model_id: /v1/models returned %s", response.status)
+                return
+            data = await response.json()
+            models = data.get("data") or []
+            if not models:
+                return
+            mid = models[0].get("id")
+            if mid:
+                current_api_model_id = str(mid)
+                logger.info("OpenAI API model id synced from vLLM: %s", current_api_model_id)
     except Exception as e:
         logger.debug("sync_current_api_model_id: %s", e)
 
@@ -920,10 +1055,10 @@ def _max_context_from_litellm_model_info(mi: Optional[Dict[str, Any]]) -> Option
 
 
 async def _enrich_remote_models_from_litellm_model_info(
-    session: Any,
     remote_url: str,
     headers: Dict[str, str],
     discovered_models_list: List[Dict[str, Any]],
+    timeout: aiohttp.ClientTimeout,
 ) -> None:
     """Fill ``max_model_len`` when the gateway is LiteLLM (OpenAI /v1/models omits it)."""
     if not discovered_models_list or any(m.get("max_model_len") for m in discovered_models_list):
@@ -932,7 +1067,7 @@ async def _enrich_remote_models_from_litellm_model_info(
     for path in ("/v1/model/info", "/model/info"):
         url = f"{root}{path}"
         try:
-            async with session.get(url, headers=headers) as resp:
+            async with upstream_pool.get(url, headers=headers, timeout=timeout) as resp:
                 if resp.status != 200:
                     continue
                 payload = await resp.json()
@@ -971,29 +1106,26 @@ async def fetch_remote_v1_models_enriched(
     discovered_models_list: List[Dict[str, Any]] = []
     try:
         timeout = aiohttp.ClientTimeout(total=30, connect=20)
-        async with aiohttp.ClientSession(timeout=timeout, headers=auth_headers) as session:
-            async with session.get(models_url) as response:
-                status = response.status
-                if response.status != 200:
-                    return [], status, None
-                data = await response.json()
-                models = data.get("data", [])
-                if not models:
-                    return [], status, None
-                discovered_models_list = [
-                    {
-                        "id": m.get("id", "unknown"),
-                        "owned_by": m.get("owned_by", ""),
-                        "max_model_len": m.get("max_model_len"),
-                        "root": m.get("root", ""),
-                    }
-                    for m in models
-                ]
-                if not any(m.get("max_model_len") for m in discovered_models_list):
-                    await _enrich_remote_models_from_litellm_model_info(
-                        session, root, auth_headers, discovered_models_list
-                    )
-                return discovered_models_list, status, None
+        async with upstream_pool.get(models_url, headers=auth_headers, timeout=timeout) as response:
+            status = response.status
+            if response.status != 200:
+                return [], status, None
+            data = await response.json()
+            models = data.get("data", [])
+            if not models:
+                return [], status, None
+            discovered_models_list = [
+                {
+                    "id": m.get("id", "unknown"),
+                    "owned_by": m.get("owned_by", ""),
+                    "max_model_len": m.get("max_model_len"),
+                    "root": m.get("root", ""),
+                }
+                for m in models
+            ]
+            if not any(m.get("max_model_len") for m in discovered_models_list):
+                await _enrich_remote_models_from_litellm_model_info(root, auth_headers, discovered_models_list, timeout)
+            return discovered_models_list, status, None
     except (aiohttp.ClientError, asyncio.TimeoutError, OSError, ValueError, TypeError, KeyError) as e:
         return [], None, e
 
@@ -1996,16 +2128,15 @@ async def test_vllm_connection():
 
         timeout = aiohttp.ClientTimeout(total=5)
         auth_headers = get_vllm_auth_headers()
-        async with aiohttp.ClientSession(timeout=timeout, headers=auth_headers) as session:
-            async with session.get(health_url) as response:
-                status = response.status
-                text = await response.text()
-                return {
-                    "success": True,
-                    "status_code": status,
-                    "url_tested": health_url,
-                    "response": text[:500],  # Limit response size
-                }
+        async with upstream_pool.get(health_url, headers=auth_headers, timeout=timeout) as response:
+            status = response.status
+            text = await response.text()
+            return {
+                "success": True,
+                "status_code": status,
+                "url_tested": health_url,
+                "response": text[:500],  # Limit response size
+            }
     except Exception as e:
         return {"success": False, "error": str(e), "error_type": type(e).__name__, "url_tested": health_url}
 
@@ -2885,14 +3016,13 @@ async def start_server(config: VLLMConfig):
             logger.info(f"Port {old_port} in use, auto-allocated port {config.port}")
 
     # Clear stale metrics from any previous session so the observability
-    # dashboard starts fresh for this server instance.
+    # dashboard starts fresh for this server instance.  Registered instances
+    # keep their own stores; only the default (unregistered) store is reset.
     latest_vllm_metrics.clear()
     metrics_timestamp = None
     metrics_history.clear()
-    metric_store.latest.clear()
-    metric_store.history.clear()
-    metric_store.last_scrape = None
-    metric_store.last_simulated = None
+    await _point_metric_store(None)
+    metric_store.reset()
 
     # =========================================================================
     # Remote mode - connect to an existing vLLM instance
@@ -3012,7 +3142,7 @@ async def start_server(config: VLLMConfig):
 
             # Auto-register in backend registry
             inst_id = await _auto_register_instance(current_config, current_model_identifier)
-            _flush_global_logs_to_instance(inst_id)
+            await _flush_global_logs_to_instance(inst_id)
 
             return {
                 "status": "connected",
@@ -3434,6 +3564,7 @@ async def start_server(config: VLLMConfig):
             await broadcast_log(f"[WEBUI] 🚀 Speculative decoding enabled: {_json.dumps(spec_cfg)}")
 
         # Start server based on mode
+        startup = startup_profiler.begin(config.run_mode, model_source, config.model_dump())
         if config.run_mode == "container":
             await broadcast_log(f"[WEBUI] Starting vLLM container...")
 
@@ -3475,6 +3606,7 @@ async def start_server(config: VLLMConfig):
 
             # Start container
             container_info = await container_manager.start_container(vllm_config_dict)
+            startup.add_timings(container_info.get("timings", {}))
 
             container_id = container_info["id"]
             vllm_running = True
@@ -3508,7 +3640,8 @@ async def start_server(config: VLLMConfig):
 
             # Register first so log reader has an instance_id
             inst_id = await _auto_register_instance(config, model_source)
-            _flush_global_logs_to_instance(inst_id)
+            await _flush_global_logs_to_instance(inst_id)
+            startup_profiler.bind(inst_id, startup)
 
             # Start per-instance log reader
             if inst_id:
@@ -3518,7 +3651,10 @@ async def start_server(config: VLLMConfig):
             await broadcast_log(f"[WEBUI] ⏳ Waiting for vLLM to initialize and become ready...", inst_id)
             await broadcast_log(f"[WEBUI] This may take 30-120 seconds depending on model size...", inst_id)
 
+            startup.begin_phase("wait_for_ready")
             readiness = await container_manager.wait_for_ready(port=config.port, timeout=180)
+            startup.end_phase("wait_for_ready", ready=bool(readiness.get("ready")))
+            startup_profiler.finish(inst_id, "ready" if readiness.get("ready") else readiness.get("error", "unknown"))
 
             if readiness.get("ready"):
                 await broadcast_log(f"[WEBUI] ✅ vLLM is ready! (took {readiness['elapsed_time']}s)", inst_id)
@@ -3565,9 +3701,11 @@ async def start_server(config: VLLMConfig):
             await broadcast_log(f"[WEBUI] Command: {' '.join(cmd)}")
 
             # Start subprocess
+            spawn_started = time.time()
             vllm_process = await asyncio.create_subprocess_exec(
                 *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, env=env
             )
+            startup.add_phase("process_spawn", spawn_started, time.time(), pid=vllm_process.pid)
 
             vllm_running = True
             current_config = config
@@ -3580,7 +3718,8 @@ async def start_server(config: VLLMConfig):
 
             # Register first, then start per-instance log reader with the ID
             inst_id = await _auto_register_instance(config, model_source)
-            _flush_global_logs_to_instance(inst_id)
+            await _flush_global_logs_to_instance(inst_id)
+            startup_profiler.bind(inst_id, startup)
 
             if inst_id:
                 _log_reader_tasks[inst_id] = asyncio.create_task(read_logs_subprocess(inst_id, vllm_process))
@@ -3798,6 +3937,7 @@ async def _auto_register_instance(config: VLLMConfig, model: Optional[str] = Non
             _process=vllm_process if vllm_process else None,
         )
         await registry.set_active(existing.id)
+        await _point_metric_store(existing.id)
         registry.start_health_loop(existing.id)
         logger.info(f"Updated existing instance {existing.id} ({existing.name}) as active")
         return existing.id
@@ -3824,6 +3964,7 @@ async def _auto_register_instance(config: VLLMConfig, model: Optional[str] = Non
 
         await registry.add(entry)
         await registry.set_active(entry.id)
+        await _point_metric_store(entry.id)
         registry.start_health_loop(entry.id)
         logger.info(f"Auto-registered instance {entry.id} ({entry.name}) as active")
         return entry.id
@@ -3843,10 +3984,129 @@ async def get_next_port():
 
 
 @app.get("/api/instances/{instance_id}/logs")
-async def get_instance_logs(instance_id: str):
-    """Return the buffered log history for a specific instance."""
-    buf = _log_buffers.get(instance_id, deque())
-    return {"instance_id": instance_id, "logs": list(buf)}
+async def get_instance_logs(
+    instance_id: str,
+    since_offset: Optional[int] = None,
+    tail: Optional[int] = None,
+    from_ts: Optional[float] = None,
+    limit: int = _LOG_BUFFER_MAX,
+):
+    """Return log history for a specific instance.
+
+    Lines are read from the instance's durable log and addressed by offset:
+    ``since_offset`` returns lines from that offset on (e.g. the ``next_offset``
+    of a previous response, to catch up after a reconnect), ``from_ts`` the
+    lines logged at or after a unix timestamp, and ``tail`` the last N lines.
+    Without any of them the last ``limit`` lines are returned.  At most
+    ``limit`` lines come back; ``has_more`` tells whether to fetch again from
+    ``next_offset``.
+    """
+    if any(v is not None and v < 0 for v in (since_offset, tail)) or limit < 1:
+        raise HTTPException(status_code=400, detail="since_offset, tail and limit must be non-negative")
+    limit = min(limit, _LOG_READ_MAX)
+
+    if not log_archive.exists(instance_id):
+        buf = _log_buffers.get(instance_id, deque())
+        return {"instance_id": instance_id, "logs": list(buf)}
+
+    # Opening a store and reading segments is file I/O: keep it off the event loop
+    store = await asyncio.to_thread(log_archive.get, instance_id)
+    end = store.next_offset
+    if since_offset is not None:
+        start = since_offset
+    elif from_ts is not None:
+        start = await asyncio.to_thread(store.offset_for_ts, from_ts)
+    elif tail is not None:
+        start = end - min(tail, limit)
+    else:
+        start = end - limit
+    first, lines = await asyncio.to_thread(store.read, max(start, 0), limit)
+    next_offset = first + len(lines)
+    return {
+        "instance_id": instance_id,
+        "logs": [message for _, message in lines],
+        "timestamps": [ts for ts, _ in lines],
+        "first_offset": first,
+        "next_offset": next_offset,
+        "oldest_offset": store.first_offset,
+        "has_more": next_offset < end,
+    }
+
+
+@app.get("/api/instances/{instance_id}/startup")
+async def get_instance_startup(instance_id: str, limit: int = 20):
+    """Cold-start timeline of an instance: the current (or last) launch and earlier ones.
+
+    Phases cover image pull / container create (container mode), process spawn
+    (subprocess mode), the vLLM startup milestones recognised in its logs
+    (weight download and load, torch.compile, CUDA graph capture, KV cache
+    allocation) and the readiness wait; offsets are seconds from launch.
+    """
+    timeline = startup_profiler.get(instance_id)
+    history = startup_profiler.store.query(instance_id=instance_id, limit=max(1, limit))
+    current = timeline.to_dict() if timeline else (history[-1] if history else None)
+    if current is None:
+        raise HTTPException(status_code=404, detail=f"No startup profile for instance '{instance_id}'")
+    return {"instance_id": instance_id, "current": current, "history": history}
+
+
+@app.get("/api/startup-profiles")
+async def get_startup_profiles(model: Optional[str] = None, limit: int = 100):
+    """Finished cold-start timelines (newest last) and per-config phase statistics for comparison."""
+    profiles = startup_profiler.store.query(model=model, limit=max(1, min(limit, 500)))
+    return {"profiles": profiles, "comparison": compare_profiles(profiles)}
+
+
+@app.get("/api/logs/search")
+async def search_logs(
+    q: str = "",
+    regex: bool = False,
+    case_sensitive: bool = False,
+    instance_id: Optional[str] = None,
+    level: Optional[str] = None,
+    from_ts: Optional[float] = None,
+    to_ts: Optional[float] = None,
+    limit: int = 200,
+):
+    """Search instance logs, including history persisted across restarts.
+
+    ``q`` is a substring (or a regular expression with ``regex=true``),
+    case-insensitive unless ``case_sensitive=true``.  ``level`` is a
+    comma-separated list (``ERROR,WARNING``), ``from_ts`` / ``to_ts`` bound
+    the unix time the lines were logged.  Without ``instance_id`` every
+    instance with stored logs is searched.  Returns the newest ``limit``
+    matches, oldest first.
+    """
+    try:
+        levels = parse_levels(level)
+        matcher, _ = build_matcher(q, regex, case_sensitive)
+    except (ValueError, re.error) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    limit = max(1, min(limit, _LOG_SEARCH_MAX))
+
+    instance_ids = [instance_id] if instance_id else log_archive.instance_ids()
+    archived = [i for i in instance_ids if log_archive.exists(i)]
+    started = time.perf_counter()
+    result = await log_search.search(
+        archived,
+        q,
+        regex=regex,
+        case_sensitive=case_sensitive,
+        levels=levels,
+        from_ts=from_ts,
+        to_ts=to_ts,
+        limit=limit,
+    )
+
+    # Lines not yet tied to an instance (or of an instance without stored logs) live only in memory
+    if instance_id and instance_id not in archived and from_ts is None and to_ts is None:
+        buffered = scan_lines(_log_buffers.get(instance_id, ()), matcher, levels, limit)
+        result["matches"] = [
+            {"instance_id": instance_id, "offset": None, "ts": None, "level": lvl, "message": message}
+            for lvl, message in buffered
+        ]
+    result["took_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
 
 
 @app.get("/api/instances")
@@ -3892,13 +4152,12 @@ async def create_instance(request: Request):
                 if entry.api_key:
                     headers["Authorization"] = f"Bearer {entry.api_key}"
                 timeout = _aiohttp.ClientTimeout(total=5)
-                async with _aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
-                    async with session.get(f"{entry.url}/v1/models") as resp:
-                        if resp.status == 200:
-                            data = await resp.json()
-                            models = data.get("data", [])
-                            if models:
-                                await registry.update(entry.id, model=models[0].get("id"))
+                async with upstream_pool.get(f"{entry.url}/v1/models", headers=headers, timeout=timeout) as resp:
+                    if resp.status == 200:
+                        data = await resp.json()
+                        models = data.get("data", [])
+                        if models:
+                            await registry.update(entry.id, model=models[0].get("id"))
             except Exception:
                 pass
         return {"backend": entry.to_dict()}
@@ -3931,6 +4190,13 @@ async def delete_instance(backend_id: str):
         except asyncio.CancelledError:
             pass
     _log_buffers.pop(backend_id, None)
+    log_search.drop(backend_id)
+    log_archive.drop(backend_id)
+    startup_profiler.drop(backend_id)
+    load_balancer.forget(backend_id)
+    admission.forget(backend_id)
+    failover.forget(backend_id)
+    fleet_scraper.drop(backend_id)
 
     was_active = registry.active_id == backend_id
     await registry.remove(backend_id)
@@ -3950,6 +4216,7 @@ async def delete_instance(backend_id: str):
             current_served_model_name = None
             current_api_model_id = None
             await registry.set_active(None)
+            await _point_metric_store(None)
 
     return {"status": "removed", "backend_id": backend_id}
 
@@ -4001,6 +4268,7 @@ async def _park_active_instance() -> None:
     current_api_model_id = None
 
     await registry.set_active(None)
+    await _point_metric_store(None)
     logger.info(f"Parked instance {entry.id} ({entry.name}) — process kept alive")
 
 
@@ -4020,12 +4288,10 @@ async def _do_activate(backend_id: str) -> dict:
     if entry is None:
         raise HTTPException(status_code=404, detail="Backend not found")
 
-    # Clear stale metrics from previous backend
+    # Log-parsed fallback metrics belong to the previous backend; the
+    # Prometheus metrics of each instance live in their own store.
     latest_vllm_metrics = {}
     metrics_timestamp = None
-    metric_store.latest.clear()
-    metric_store.history.clear()
-    metric_store._scrape_warned = False
 
     # Bump version to prevent get_status() from overwriting (Safety Risk 2)
     _globals_version += 1
@@ -4059,12 +4325,13 @@ async def _do_activate(backend_id: str) -> dict:
         vllm_process = None
 
     await registry.set_active(backend_id)
+    await _point_metric_store(backend_id)
     logger.info(f"Activated instance {backend_id} ({entry.name})")
 
     if entry.managed and vllm_running:
         await sync_current_api_model_id_from_backend()
 
-    # Trigger immediate metrics scrape for the new instance
+    # Refresh the new instance's store right away instead of waiting a fleet cycle
     asyncio.ensure_future(metric_store._do_scrape())
 
     return {
@@ -4151,6 +4418,73 @@ async def v1_list_models():
     return {"object": "list", "data": models}
 
 
+@app.get("/api/gateway/balancer")
+async def get_gateway_balancer():
+    """Replica selection strategy of the /v1 gateway with per-backend in-flight / pick counts,
+    scraped load and prefix-cache hit rate, and prefix-affinity routing counts."""
+    return load_balancer.snapshot()
+
+
+@app.put("/api/gateway/balancer")
+async def set_gateway_balancer(request: Request):
+    """Switch the /v1 gateway's balancing strategy (``{"strategy": "least_outstanding"}``)."""
+    body = await request.json()
+    try:
+        load_balancer.strategy = body.get("strategy", "")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"/v1 gateway balancing strategy: {load_balancer.strategy}")
+    return load_balancer.snapshot()
+
+
+@app.get("/api/gateway/admission")
+async def get_gateway_admission():
+    """Admission control settings of the /v1 gateway with per-model in-flight / queued / rejected
+    counts and per-backend (possibly adaptive) limits."""
+    return admission.snapshot()
+
+
+@app.put("/api/gateway/admission")
+async def set_gateway_admission(request: Request):
+    """Change admission limits, e.g. ``{"model_limit": 32, "backend_limit": 16, "queue_timeout": 20}``
+    (0 = unlimited; also ``model_limits``, ``queue_size``, ``adaptive``)."""
+    body = await request.json()
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Expected a JSON object")
+    try:
+        admission.configure(**body)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logger.info(f"/v1 gateway admission settings: {body}")
+    return admission.snapshot()
+
+
+@app.get("/api/gateway/cache")
+async def get_gateway_cache():
+    """Response cache of the /v1 gateway: tier sizes and per-model hits / misses."""
+    return response_cache.snapshot()
+
+
+@app.delete("/api/gateway/cache")
+async def invalidate_gateway_cache(model: Optional[str] = Query(None)):
+    """Drop cached /v1 responses of *model* (all models when omitted)."""
+    removed = await response_cache.invalidate(model)
+    logger.info(f"Response cache: invalidated {removed} entries" + (f" of {model}" if model else ""))
+    return {"removed": removed, **response_cache.snapshot()}
+
+
+@app.get("/api/gateway/coalescing")
+async def get_gateway_coalescing():
+    """Single-flight coalescing of the /v1 gateway: upstream calls made and saved per model."""
+    return single_flight.snapshot()
+
+
+@app.get("/api/gateway/failover")
+async def get_gateway_failover():
+    """Failover settings of the /v1 gateway with retry budget usage, consecutive failures and ejections."""
+    return failover.snapshot()
+
+
 @app.post("/v1/chat/completions")
 async def v1_chat_completions(request: Request):
     """Proxy to the backend that serves the requested model."""
@@ -4163,65 +4497,267 @@ async def v1_completions(request: Request):
     return await _v1_proxy(request, "/v1/completions")
 
 
+_PROXY_TIMEOUT = aiohttp.ClientTimeout(total=300)
+_SCANNED_FIELDS = ("model", "stream", "temperature", "seed")
+
+
+def _cached_response(cached: CachedResponse):
+    """Replay a cached /v1 response (event by event for a cached stream)."""
+    headers = {
+        "Content-Type": cached.content_type,
+        "X-Cache": "HIT",
+        "X-Backend-Id": cached.backend_id,
+        "X-Backend-Model": cached.model,
+    }
+    if cached.stream:
+        return StreamingResponse(iter(list(cached.events())), headers=headers)
+    return Response(content=cached.body, headers=headers)
+
+
+async def _cache_store(
+    key: str, model: str, path: str, stream: bool, resp: aiohttp.ClientResponse, backend_id: str, body: bytes
+) -> None:
+    """Store a complete 200 response from the /v1 proxy in the response cache."""
+    if stream and not body.rstrip().endswith(b"data: [DONE]"):
+        return
+    content_type = resp.headers.get("Content-Type") or ("text/event-stream" if stream else "application/json")
+    entry = CachedResponse(key, model, path, stream, content_type, body, backend_id=backend_id)
+    try:
+        await response_cache.store(entry)
+    except Exception as e:
+        logger.warning(f"Response cache: failed to store response for {model}: {e}")
+
+
 async def _v1_proxy(request: Request, path: str):
     """Route a /v1/ request to the correct backend based on the model field."""
+    started = time.perf_counter()
     registry = _ir_mod.instance_registry
     if registry is None:
         raise HTTPException(status_code=503, detail="Backend registry not initialized")
 
-    body = await request.json()
-    model_name = body.get("model")
-    if not model_name:
+    # Route on fields scanned from the raw body and forward the bytes unchanged;
+    # parse only when the scan gives up or the balancer needs the prompt prefix
+    raw = await request.body()
+    # Read once: PUT /api/gateway/balancer may switch strategies while this request is in flight
+    needs_prefix = load_balancer.needs_prefix
+    try:
+        fields = scan_request(raw, _SCANNED_FIELDS)
+        # The response cache keys on the whole body, but only of deterministic requests
+        cacheable = response_cache.enabled and fields is not None and is_deterministic(fields)
+        body = json.loads(raw) if fields is None or needs_prefix or cacheable else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+    if body is not None:
+        if not isinstance(body, dict):
+            raise HTTPException(status_code=400, detail="Invalid JSON body: Request body must be a JSON object")
+        fields = body
+    model_name = fields.get("model")
+    if not model_name or not isinstance(model_name, str):
         raise HTTPException(status_code=400, detail="model field is required")
 
-    matches = registry.find_by_model(model_name)
-    if not matches:
-        available = [e.model for e in await registry.list_all() if e.health == "healthy" and e.model]
-        raise HTTPException(
-            status_code=404,
-            detail=f"No healthy backend serves model '{model_name}'. Available: {available}",
+    key = None
+    if response_cache.enabled and is_deterministic(fields):
+        cache_control = request.headers.get("cache-control", "").lower()
+        if "no-store" not in cache_control:
+            key = cache_key(path, body)
+        if key is not None and "no-cache" not in cache_control:
+            cached = await response_cache.lookup(key, model_name)
+            if cached is not None:
+                PROXY_REQUESTS.inc(path=path, backend="cache", status=200)
+                return _cached_response(cached)
+
+    prefix = prefix_key(body) if needs_prefix else None
+
+    def forward():
+        return _v1_forward(registry, path, raw, fields, prefix, model_name, key, started)
+
+    # Identical deterministic non-streaming requests in flight at the same time share one upstream call
+    if (
+        single_flight.enabled
+        and not fields.get("stream")
+        and is_deterministic(fields)
+        and request.headers.get("x-coalesce", "").lower() not in ("0", "false", "no", "off")
+    ):
+        flight_key = hashlib.sha256(path.encode() + b"\0" + raw).hexdigest()
+        (status, headers, content), shared = await single_flight.do(
+            flight_key, model_name, lambda: _buffered(forward())
         )
+        if shared:
+            headers = {**headers, "X-Coalesced": "true"}
+        return Response(content=content, status_code=status, headers=headers)
+    return await forward()
 
-    target = matches[0]
-    root = normalize_vllm_remote_root_url(target.url)
-    target_url = f"{root.rstrip('/')}{path}"
-
-    headers = {"Content-Type": "application/json"}
-    if target.api_key:
-        headers["Authorization"] = f"Bearer {target.api_key}"
 
-    is_stream = body.get("stream", False)
+async def _eject_backend(registry: InstanceRegistry, backend_id: str, reason: str) -> bool:
+    """Take a backend that keeps failing /v1 requests out of rotation until its next good health check.
 
-    try:
-        timeout = aiohttp.ClientTimeout(total=300)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(target_url, json=body, headers=headers) as resp:
-                response_headers = {
-                    "X-Backend-Id": target.id,
-                    "X-Backend-Model": target.model or "",
-                }
-
-                if is_stream:
-                    from starlette.responses import StreamingResponse
+    Returns whether this call changed its health (False when it is gone or already out of rotation).
+    """
+    entry = await registry.get(backend_id)
+    if entry is None or entry.health != "healthy":
+        return False
+    health = "unreachable" if reason == "connection" else "unhealthy"
+    # Set before the first await so concurrent failures against the same backend eject it only once
+    entry.health = health
+    await registry.update(backend_id, health=health, health_checked_at=datetime.now().isoformat())
+    PROXY_BACKEND_EJECTIONS.inc(backend=backend_id)
+    logger.warning(
+        f"/v1 proxy: marked backend {backend_id} {health} after {failover.failure_threshold} failed requests "
+        f"(last: {reason})"
+    )
+    return True
 
-                    async def stream_generator():
-                        async for chunk in resp.content.iter_any():
-                            yield chunk
 
-                    return StreamingResponse(
-                        stream_generator(),
-                        media_type=resp.content_type or "text/event-stream",
-                        headers=response_headers,
-                    )
-                else:
-                    resp_body = await resp.json()
-                    return JSONResponse(
-                        content=resp_body,
-                        status_code=resp.status,
-                        headers=response_headers,
-                    )
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Failed to proxy to backend {target.id}: {str(e)}")
+async def _buffered(response_coro) -> Tuple[int, Dict[str, str], bytes]:
+    """``(status, headers, body)`` of a /v1 proxy response read to the end."""
+    response = await response_coro
+    if isinstance(response, StreamingResponse):
+        try:
+            content = b"".join([chunk async for chunk in response.body_iterator])
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"Upstream response broke off: {e}")
+    else:
+        content = response.body
+    headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in response.raw_headers if k != b"content-length"}
+    return response.status_code, headers, content
+
+
+async def _v1_forward(
+    registry: InstanceRegistry,
+    path: str,
+    raw: bytes,
+    fields: Dict[str, Any],
+    prefix: Optional[int],
+    model_name: str,
+    key: Optional[str],
+    started: float,
+):
+    """Pick a backend for *model_name*, send it *raw* and stream its response back."""
+    if not registry.find_by_model(model_name):
+        available = [e.model for e in await registry.list_all() if e.health == "healthy" and e.model]
+        raise HTTPException(
+            status_code=404,
+            detail=f"No healthy backend serves model '{model_name}'. Available: {available}",
+        )
+
+    is_stream = fields.get("stream", False)
+    failover.budget.record_request()
+
+    # Nothing has reached the client until the response is returned, so a backend that cannot be
+    # connected to or answers 502 / 503 can be replaced by another replica (see failover.py)
+    tried = set()
+
+    def candidates():
+        # Re-read on every admission attempt: replicas can be ejected while the request is queued
+        return [e for e in registry.find_by_model(model_name) if e.id not in tried]
+
+    def choose(room):
+        # The prefix ring spans all healthy replicas; the admission room set only limits the pick
+        replicas = registry.find_by_model(model_name) if prefix is not None else None
+        return load_balancer.choose(model_name, room, prefix=prefix, replicas=replicas)
+
+    attempt = 0
+    waited = 0.0  # queueing, upstream and backoff time of earlier attempts (not proxy overhead)
+    while True:
+        queued = time.perf_counter()
+        try:
+            target = await admission.acquire(model_name, candidates, choose)
+        except AdmissionRejectedError as e:
+            # Every replica was ejected (or already tried) before a slot came up
+            status = 503 if e.reason == "no_candidates" else 429
+            PROXY_REQUESTS.inc(path=path, backend="", status=status)
+            raise HTTPException(status_code=status, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+        admitted = time.perf_counter()
+        root = normalize_vllm_remote_root_url(target.url)
+        target_url = f"{root.rstrip('/')}{path}"
+
+        headers = {"Content-Type": "application/json"}
+        if target.api_key:
+            headers["Authorization"] = f"Bearer {target.api_key}"
+
+        def finish(status: int, target=target, admitted=admitted) -> None:
+            PROXY_IN_FLIGHT.dec()
+            load_balancer.release(target.id)
+            admission.release(model_name, target.id, time.perf_counter() - admitted)
+            PROXY_REQUESTS.inc(path=path, backend=target.id, status=status)
+            PROXY_DURATION.observe(time.perf_counter() - started, path=path, stream=str(bool(is_stream)).lower())
+
+        # The response outlives this function for streamed responses, so it is
+        # released by the stream generator rather than by a context manager.
+        PROXY_IN_FLIGHT.inc()
+        load_balancer.acquire(target.id)
+        resp = None
+        try:
+            sent = time.perf_counter()
+            # Time spent queued is reported by the admission metrics, not as proxy overhead
+            PROXY_OVERHEAD.observe(sent - started - waited - (admitted - queued), path=path)
+            resp = await upstream_pool.post(target_url, data=raw, headers=headers, timeout=_PROXY_TIMEOUT)
+            PROXY_UPSTREAM_LATENCY.observe(time.perf_counter() - sent, path=path, backend=target.id)
+        except aiohttp.ClientConnectorError as e:
+            # Only a failed connect is safe to retry: once the request may have been sent, the backend
+            # could already be generating, and a second replica would run (and bill) it twice
+            error = e
+        except Exception as e:
+            finish(502)
+            raise HTTPException(status_code=502, detail=f"Failed to proxy to backend {target.id}: {str(e)}")
+        answered = time.perf_counter()
+
+        if resp is not None and resp.status not in RETRYABLE_STATUSES:
+            failover.record_success(target.id)
+            break
+
+        reason = "connection" if resp is None else str(resp.status)
+        if failover.record_failure(target.id) and await _eject_backend(registry, target.id, reason):
+            failover.record_ejection(target.id)
+        tried.add(target.id)
+        if not failover.may_retry(attempt, len(candidates())):
+            PROXY_FAILED_ATTEMPTS.inc(backend=target.id, reason=reason, action="gave_up")
+            if resp is not None:
+                break  # the backend's own error response goes to the client
+            finish(502)
+            raise HTTPException(status_code=502, detail=f"Failed to proxy to backend {target.id}: {str(error)}")
+
+        PROXY_FAILED_ATTEMPTS.inc(backend=target.id, reason=reason, action="retried")
+        if resp is not None:
+            resp.release()
+        finish(502 if resp is None else resp.status)
+        logger.info(f"/v1 proxy: backend {target.id} failed ({reason}), retrying {model_name} on another replica")
+        backoff_started = time.perf_counter()
+        await asyncio.sleep(failover.backoff(attempt))
+        waited += (admitted - queued) + (answered - sent) + (time.perf_counter() - backoff_started)
+        attempt += 1
+
+    # Stream the upstream body through unchanged (SSE or JSON) with its status and headers
+    response_headers = passthrough_headers(resp.headers)
+    response_headers["X-Backend-Id"] = target.id
+    response_headers["X-Backend-Model"] = target.model or ""
+    if key is not None:
+        response_headers["X-Cache"] = "MISS"
+
+    async def body_stream():
+        status = resp.status
+        captured = [] if key is not None and status == 200 else None
+        size = 0
+        try:
+            async for chunk in resp.content.iter_any():
+                if captured is not None:
+                    size += len(chunk)
+                    if size > response_cache.max_entry_bytes:
+                        captured = None
+                    else:
+                        captured.append(chunk)
+                yield chunk
+            if captured is not None:
+                await _cache_store(key, model_name, path, bool(is_stream), resp, target.id, b"".join(captured))
+        except Exception as e:
+            logger.warning(f"/v1 proxy: upstream body from {target.id} broke off: {e}")
+            status = 502
+            raise
+        finally:
+            resp.release()
+            finish(status)
+
+    return StreamingResponse(body_stream(), status_code=resp.status, headers=response_headers)
 
 
 async def read_logs_container(instance_id: str):
@@ -4234,17 +4770,13 @@ async def read_logs_container(instance_id: str):
     try:
         await broadcast_log("[WEBUI] Starting log stream from container...", instance_id)
 
-        async for log_line in container_manager.stream_logs():
-            if log_line:
-                line = log_line.strip()
-                if line:
-                    await broadcast_log(line, instance_id)
-                    logger.debug(f"vLLM [{instance_id[:8]}]: {line}")
-
-            # Check if the task has been cancelled (instance stopped/removed)
-            await asyncio.sleep(0.01)
+        # Cancellation (instance stopped/removed) lands on the pending chunk read
+        async for lines in container_manager.stream_log_batches():
+            await broadcast_log_batch(lines, instance_id)
+            _debug_log_lines(lines, instance_id)
 
         await broadcast_log("[WEBUI] Container log stream ended", instance_id)
+        startup_profiler.finish(instance_id, "exited")
 
     except asyncio.CancelledError:
         logger.info(f"Log reader for container instance {instance_id} cancelled")
@@ -4259,28 +4791,20 @@ async def read_logs_subprocess(instance_id: str, process: asyncio.subprocess.Pro
     try:
         await broadcast_log("[WEBUI] Starting log stream from subprocess...", instance_id)
 
-        while process and process.returncode is None:
+        if process and process.returncode is None:
             try:
-                line = await asyncio.wait_for(process.stdout.readline(), timeout=1.0)
-
-                if line:
-                    decoded_line = line.decode().strip()
-                    if decoded_line:
-                        await broadcast_log(decoded_line, instance_id)
-                        logger.debug(f"vLLM [{instance_id[:8]}]: {decoded_line}")
-                else:
-                    break
-
-            except asyncio.TimeoutError:
-                if process.returncode is not None:
-                    break
-                continue
-
+                async for lines in iter_line_batches(
+                    process.stdout, idle_timeout=1.0, should_stop=lambda: process.returncode is not None
+                ):
+                    await broadcast_log_batch(lines, instance_id)
+                    _debug_log_lines(lines, instance_id)
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error reading line: {e}")
-                break
 
         await broadcast_log("[WEBUI] Subprocess log stream ended", instance_id)
+        startup_profiler.finish(instance_id, "exited")
 
     except asyncio.CancelledError:
         logger.info(f"Log reader for subprocess instance {instance_id} cancelled")
@@ -4289,120 +4813,106 @@ async def read_logs_subprocess(instance_id: str, process: asyncio.subprocess.Pro
         await broadcast_log(f"[WEBUI] Error reading logs: {e}", instance_id)
 
 
+def _debug_log_lines(lines: List[str], instance_id: str) -> None:
+    if logger.isEnabledFor(logging.DEBUG):
+        for line in lines:
+            logger.debug(f"vLLM [{instance_id[:8]}]: {line}")
+
+
 async def broadcast_log(message: str, instance_id: Optional[str] = None):
     """Broadcast log message to all connected websockets, tagged with instance_id.
 
     Messages are stored in per-instance ring buffers and sent as JSON so the
     frontend can filter by active instance.
     """
+    if message:
+        await _broadcast_log_lines([message], instance_id)
+
+
+async def broadcast_log_batch(messages: List[str], instance_id: Optional[str] = None):
+    """Broadcast a batch of log lines (as read by the chunked log readers) in one pass."""
+    if messages:
+        await _broadcast_log_lines(messages, instance_id)
+
+
+async def _broadcast_log_lines(messages: List[str], instance_id: Optional[str]) -> None:
     global latest_vllm_metrics, metrics_timestamp
 
-    if not message:
+    messages = [m for m in messages if m]
+    if not messages:
         return
 
     # Store in per-instance buffer
     buf_key = instance_id or "__global__"
     if buf_key not in _log_buffers:
         _log_buffers[buf_key] = deque(maxlen=_LOG_BUFFER_MAX)
-    _log_buffers[buf_key].append(message)
+    _log_buffers[buf_key].extend(messages)
+    first_offset = await _archive_log_lines(instance_id, messages) if instance_id else None
+    if instance_id:
+        startup_profiler.observe(instance_id, messages, time.time())
 
     # Parse metrics only for the currently active instance
     registry = _ir_mod.instance_registry
     is_active = instance_id is None or (registry and registry.active_id == instance_id)
 
     if is_active:
-        import re
-
-        metrics_updated = False
-        msg_lower = message.lower()
-
-        if "avg prompt throughput" in msg_lower:
-            m = re.search(r"Avg prompt throughput:\s+([\d.]+)\s+tokens/s", message, re.IGNORECASE)
-            if m:
-                latest_vllm_metrics["avg_prompt_throughput"] = float(m.group(1))
-                metrics_updated = True
-
-        if "avg generation throughput" in msg_lower:
-            m = re.search(r"Avg generation throughput:\s+([\d.]+)\s+tokens/s", message, re.IGNORECASE)
-            if m:
-                latest_vllm_metrics["avg_generation_throughput"] = float(m.group(1))
-                metrics_updated = True
-
-        if "cache usage" in msg_lower and "%" in message:
-            match = re.search(r"cache usage[:\s]+([\d.]+)\s*%", message, re.IGNORECASE)
-            if match:
-                latest_vllm_metrics["kv_cache_usage_perc"] = float(match.group(1))
-                metrics_updated = True
-
-        if "hit rate" in msg_lower and "%" in message:
-            match = re.search(r"hit rate[:\s]+([\d.]+)\s*%", message, re.IGNORECASE)
-            if match:
-                latest_vllm_metrics["prefix_cache_hit_rate"] = float(match.group(1))
-                metrics_updated = True
-
-        if "specdecoding metrics" in msg_lower:
-            m = re.search(r"Draft acceptance rate:\s+([\d.]+)%", message)
-            if m:
-                latest_vllm_metrics["spec_decode_acceptance_rate"] = float(m.group(1))
-                metrics_updated = True
-
-        if metrics_updated:
+        store = None
+        any_ingested = False
+        for message in messages:
+            parsed = LOG_EXTRACTORS.extract(message)
+            if not parsed:
+                continue
+            latest_vllm_metrics.update(parsed)
             metrics_timestamp = datetime.now()
             latest_vllm_metrics["timestamp"] = metrics_timestamp.isoformat()
 
-            any_ingested = False
-            for key in (
-                "kv_cache_usage_perc",
-                "prefix_cache_hit_rate",
-                "spec_decode_acceptance_rate",
-                "avg_prompt_throughput",
-                "avg_generation_throughput",
-            ):
-                val = latest_vllm_metrics.get(key)
-                if val is not None:
-                    if metric_store.ingest_log_parsed(key, val):
-                        any_ingested = True
-
-            if any_ingested:
-                metric_store.append_snapshot_from_latest()
-
-    # Send tagged JSON to all connected websockets
-    payload = json.dumps({"instance_id": instance_id, "message": message})
-    disconnected = []
-    for ws in websocket_connections:
-        try:
-            await ws.send_text(payload)
-        except Exception as e:
-            logger.error(f"Error sending to websocket: {e}")
-            disconnected.append(ws)
-
-    for ws in disconnected:
-        websocket_connections.remove(ws)
+            if store is None:
+                store = fleet_scraper.stores.get(instance_id) if instance_id else None
+                if store is None:
+                    store = metric_store
+            for key, val in parsed.items():
+                if store.ingest_log_parsed(key, val):
+                    any_ingested = True
+
+        if any_ingested:
+            store.append_snapshot_from_latest()
+
+    # Queue tagged JSON for every connected websocket (sent in batches by each client's writer)
+    fanout_started = time.perf_counter()
+    if first_offset is None:
+        for message in messages:
+            log_fanout.publish(instance_id, message)
+    else:
+        for i, message in enumerate(messages):
+            log_fanout.publish(instance_id, message, first_offset + i)
+    LOG_BROADCAST_MESSAGES.inc(len(messages))
+    LOG_BROADCAST_DURATION.observe(time.perf_counter() - fanout_started)
 
 
 @app.websocket("/ws/logs")
 async def websocket_logs(websocket: WebSocket):
-    """WebSocket endpoint for streaming logs"""
+    """WebSocket endpoint for streaming logs (see ``log_fanout`` for the subscribe protocol)"""
     await websocket.accept()
-    websocket_connections.append(websocket)
+    log_fanout.add(websocket)
 
     try:
-        await websocket.send_text(json.dumps({"instance_id": None, "message": "[WEBUI] Connected to log stream"}))
+        log_fanout.send_to(websocket, None, "[WEBUI] Connected to log stream")
 
-        # Keep connection alive
+        # Keep connection alive; client messages (un)subscribe streams
         while True:
             try:
-                await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
+                text = await asyncio.wait_for(websocket.receive_text(), timeout=30.0)
             except asyncio.TimeoutError:
-                await websocket.send_text(json.dumps({"instance_id": None, "message": ""}))
+                log_fanout.send_to(websocket, None, "")
+                continue
+            log_fanout.handle_message(websocket, text)
 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        if websocket in websocket_connections:
-            websocket_connections.remove(websocket)
+        await log_fanout.remove(websocket)
 
 
 # =============================================================================
@@ -4758,101 +5268,110 @@ async def chat(request: ChatRequestWithStopTokens):
             """Generator for streaming responses"""
             full_response_text = ""  # Accumulate response for logging
             buffer = ""  # Buffer for incomplete lines
+            stream_started = time.perf_counter()
+            first_chunk = True
+            outcome = "aborted"  # until the stream ends on its own
             try:
                 # Set reasonable timeout to prevent hanging
                 # sock_read=120 is needed for VLM models that may take longer
                 # to process images before producing the first token
                 timeout = aiohttp.ClientTimeout(total=300, connect=10, sock_read=120)
                 auth_headers = get_vllm_auth_headers()
-                async with aiohttp.ClientSession(timeout=timeout, headers=auth_headers) as session:
-                    async with session.post(url, json=payload) as response:
-                        if response.status != 200:
-                            text = await response.text()
-                            logger.error(f"=== vLLM ERROR RESPONSE ===")
-                            logger.error(f"Status: {response.status}")
-                            logger.error(f"Error: {text}")
-                            logger.error(f"==========================")
-                            yield f"data: {{'error': '{text}'}}\n\n"
-                            return
-
-                        logger.info(f"=== vLLM STREAMING RESPONSE START ===")
-                        # Stream the response chunk by chunk
-                        # OpenAI-compatible chat completions format
-                        try:
-                            async for chunk in response.content.iter_any():
-                                if chunk:
-                                    # Decode the chunk and add to buffer
-                                    buffer += chunk.decode("utf-8")
-
-                                    # Process complete lines from buffer
-                                    while "\n" in buffer:
-                                        line, buffer = buffer.split("\n", 1)
-                                        line = line.strip()
-
-                                        if line:
-                                            # Log each chunk received
-                                            if line != "data: [DONE]":
-                                                logger.debug(f"vLLM chunk: {line}")
-                                            # Try to extract content from SSE data
-                                            import json
-
-                                            if line.startswith("data: "):
-                                                try:
-                                                    data_str = line[6:].strip()
-                                                    if data_str and data_str != "[DONE]":
-                                                        data = json.loads(data_str)
-                                                        if "choices" in data and len(data["choices"]) > 0:
-                                                            choice = data["choices"][0]
-                                                            delta = choice.get("delta", {})
-                                                            content = delta.get("content", "")
-                                                            finish_reason = choice.get("finish_reason")
-
-                                                            if content:
-                                                                full_response_text += content
-
-                                                            # Log tool calls if present
-                                                            if delta.get("tool_calls"):
-                                                                logger.info(
-                                                                    f"🔧 Streaming tool_calls in delta: {delta['tool_calls']}"
+                async with upstream_pool.post(url, json=payload, headers=auth_headers, timeout=timeout) as response:
+                    if response.status != 200:
+                        text = await response.text()
+                        logger.error(f"=== vLLM ERROR RESPONSE ===")
+                        logger.error(f"Status: {response.status}")
+                        logger.error(f"Error: {text}")
+                        logger.error(f"==========================")
+                        outcome = "upstream_error"
+                        yield f"data: {{'error': '{text}'}}\n\n"
+                        return
+
+                    logger.info(f"=== vLLM STREAMING RESPONSE START ===")
+                    # Stream the response chunk by chunk
+                    # OpenAI-compatible chat completions format
+                    try:
+                        async for chunk in response.content.iter_any():
+                            if chunk:
+                                if first_chunk:
+                                    first_chunk = False
+                                    CHAT_TIME_TO_FIRST_CHUNK.observe(time.perf_counter() - stream_started)
+                                # Decode the chunk and add to buffer
+                                buffer += chunk.decode("utf-8")
+
+                                # Process complete lines from buffer
+                                while "\n" in buffer:
+                                    line, buffer = buffer.split("\n", 1)
+                                    line = line.strip()
+
+                                    if line:
+                                        # Log each chunk received
+                                        if line != "data: [DONE]":
+                                            logger.debug(f"vLLM chunk: {line}")
+                                        # Try to extract content from SSE data
+                                        import json
+
+                                        if line.startswith("data: "):
+                                            try:
+                                                data_str = line[6:].strip()
+                                                if data_str and data_str != "[DONE]":
+                                                    data = json.loads(data_str)
+                                                    if "choices" in data and len(data["choices"]) > 0:
+                                                        choice = data["choices"][0]
+                                                        delta = choice.get("delta", {})
+                                                        content = delta.get("content", "")
+                                                        finish_reason = choice.get("finish_reason")
+
+                                                        if content:
+                                                            full_response_text += content
+
+                                                        # Log tool calls if present
+                                                        if delta.get("tool_calls"):
+                                                            logger.info(
+                                                                f"🔧 Streaming tool_calls in delta: {delta['tool_calls']}"
+                                                            )
+
+                                                        # Log finish reason for debugging
+                                                        if finish_reason:
+                                                            logger.info(f"🏁 Finish reason: {finish_reason}")
+                                                            if finish_reason == "tool_calls" and not delta.get(
+                                                                "tool_calls"
+                                                            ):
+                                                                logger.warning(
+                                                                    f"⚠️ finish_reason is 'tool_calls' but no tool_calls data in delta!"
                                                                 )
+                                                                logger.warning(f"⚠️ Full chunk data: {data}")
+                                            except Exception as parse_err:
+                                                logger.debug(f"Failed to parse SSE data: {parse_err}")
+                                        # Pass through the SSE formatted data
+                                        yield line + "\n"
+
+                        # Process any remaining data in buffer
+                        if buffer.strip():
+                            logger.debug(f"vLLM final chunk: {buffer.strip()}")
+                            yield buffer
+
+                    except (aiohttp.ClientError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                        # Connection error during streaming (e.g., server stopped)
+                        logger.warning(f"Stream interrupted: {type(e).__name__}: {e}")
+                        outcome = "interrupted"
+                        # Send a final error message to the client
+                        yield f"data: {{'error': 'Stream interrupted: server may have stopped'}}\n\n"
+                        yield "data: [DONE]\n\n"
+                        return
 
-                                                            # Log finish reason for debugging
-                                                            if finish_reason:
-                                                                logger.info(f"🏁 Finish reason: {finish_reason}")
-                                                                if finish_reason == "tool_calls" and not delta.get(
-                                                                    "tool_calls"
-                                                                ):
-                                                                    logger.warning(
-                                                                        f"⚠️ finish_reason is 'tool_calls' but no tool_calls data in delta!"
-                                                                    )
-                                                                    logger.warning(f"⚠️ Full chunk data: {data}")
-                                                except Exception as parse_err:
-                                                    logger.debug(f"Failed to parse SSE data: {parse_err}")
-                                            # Pass through the SSE formatted data
-                                            yield line + "\n"
-
-                            # Process any remaining data in buffer
-                            if buffer.strip():
-                                logger.debug(f"vLLM final chunk: {buffer.strip()}")
-                                yield buffer
-
-                        except (aiohttp.ClientError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
-                            # Connection error during streaming (e.g., server stopped)
-                            logger.warning(f"Stream interrupted: {type(e).__name__}: {e}")
-                            # Send a final error message to the client
-                            yield f"data: {{'error': 'Stream interrupted: server may have stopped'}}\n\n"
-                            yield "data: [DONE]\n\n"
-                            return
-
-                        # Log the complete response
-                        logger.info(f"=== vLLM COMPLETE RESPONSE ===")
-                        logger.info(f"Full text: {full_response_text}")
-                        logger.info(f"Length: {len(full_response_text)} chars")
-                        logger.info(f"===============================")
+                    outcome = "ok"
+                    # Log the complete response
+                    logger.info(f"=== vLLM COMPLETE RESPONSE ===")
+                    logger.info(f"Full text: {full_response_text}")
+                    logger.info(f"Length: {len(full_response_text)} chars")
+                    logger.info(f"===============================")
 
             except (aiohttp.ClientError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
                 # Connection error before streaming started
                 logger.error(f"Failed to connect to vLLM: {type(e).__name__}: {e}")
+                outcome = "connection_error"
                 yield f"data: {{'error': 'Failed to connect to vLLM server'}}\n\n"
             except Exception as e:
                 # Unexpected error
@@ -4860,7 +5379,11 @@ async def chat(request: ChatRequestWithStopTokens):
                 import traceback
 
                 logger.error(traceback.format_exc())
+                outcome = "error"
                 yield f"data: {{'error': 'Internal error during streaming'}}\n\n"
+            finally:
+                CHAT_REQUESTS.inc(stream="true", outcome=outcome)
+                CHAT_STREAM_DURATION.observe(time.perf_counter() - stream_started, outcome=outcome)
 
         if request.stream:
             # Return streaming response using SSE
@@ -4877,38 +5400,39 @@ async def chat(request: ChatRequestWithStopTokens):
             # Set reasonable timeout - VLM image processing may need extra time
             timeout = aiohttp.ClientTimeout(total=120, connect=10)
             auth_headers = get_vllm_auth_headers()
-            async with aiohttp.ClientSession(timeout=timeout, headers=auth_headers) as session:
-                async with session.post(url, json=payload) as response:
-                    if response.status != 200:
-                        text = await response.text()
-                        logger.error(f"=== vLLM ERROR RESPONSE (non-streaming) ===")
-                        logger.error(f"Status: {response.status}")
-                        logger.error(f"Error: {text}")
-                        logger.error(f"===========================================")
-                        # Provide meaningful error message even if vLLM returns empty body
-                        error_detail = text.strip() if text.strip() else f"vLLM server returned HTTP {response.status}"
-                        raise HTTPException(status_code=response.status, detail=error_detail)
+            async with upstream_pool.post(url, json=payload, headers=auth_headers, timeout=timeout) as response:
+                if response.status != 200:
+                    text = await response.text()
+                    logger.error(f"=== vLLM ERROR RESPONSE (non-streaming) ===")
+                    logger.error(f"Status: {response.status}")
+                    logger.error(f"Error: {text}")
+                    logger.error(f"===========================================")
+                    # Provide meaningful error message even if vLLM returns empty body
+                    error_detail = text.strip() if text.strip() else f"vLLM server returned HTTP {response.status}"
+                    CHAT_REQUESTS.inc(stream="false", outcome="upstream_error")
+                    raise HTTPException(status_code=response.status, detail=error_detail)
 
-                    data = await response.json()
-                    # Log the complete response
-                    logger.info(f"=== vLLM RESPONSE (non-streaming) ===")
-                    logger.info(f"Full response: {data}")
-                    if "choices" in data and len(data["choices"]) > 0:
-                        message = data["choices"][0].get("message", {})
-                        content = message.get("content", "")
-                        tool_calls = message.get("tool_calls", [])
-
-                        if content:
-                            logger.info(f"Response text: {content}")
-                            logger.info(f"Length: {len(content)} chars")
-
-                        if tool_calls:
-                            logger.info(f"🔧 Tool calls detected: {len(tool_calls)}")
-                            for tc in tool_calls:
-                                func = tc.get("function", {})
-                                logger.info(f"  - {func.get('name', 'unknown')}: {func.get('arguments', '{}')}")
-                    logger.info(f"=====================================")
-                    return data
+                data = await response.json()
+                # Log the complete response
+                logger.info(f"=== vLLM RESPONSE (non-streaming) ===")
+                logger.info(f"Full response: {data}")
+                if "choices" in data and len(data["choices"]) > 0:
+                    message = data["choices"][0].get("message", {})
+                    content = message.get("content", "")
+                    tool_calls = message.get("tool_calls", [])
+
+                    if content:
+                        logger.info(f"Response text: {content}")
+                        logger.info(f"Length: {len(content)} chars")
+
+                    if tool_calls:
+                        logger.info(f"🔧 Tool calls detected: {len(tool_calls)}")
+                        for tc in tool_calls:
+                            func = tc.get("function", {})
+                            logger.info(f"  - {func.get('name', 'unknown')}: {func.get('arguments', '{}')}")
+                logger.info(f"=====================================")
+                CHAT_REQUESTS.inc(stream="false", outcome="ok")
+                return data
 
     except HTTPException:
         # Re-raise HTTPExceptions as-is (they already have proper status and detail)
@@ -4917,6 +5441,7 @@ async def chat(request: ChatRequestWithStopTokens):
         # Handle aiohttp client errors (connection issues, timeouts, etc.)
         error_msg = f"Connection error to vLLM server: {type(e).__name__}: {str(e) or 'Unknown error'}"
         logger.error(f"Chat error: {error_msg}")
+        CHAT_REQUESTS.inc(stream=str(request.stream).lower(), outcome="connection_error")
         raise HTTPException(status_code=503, detail=error_msg)
     except Exception as e:
         # Handle all other errors with detailed logging
@@ -4925,6 +5450,7 @@ async def chat(request: ChatRequestWithStopTokens):
         error_msg = str(e) if str(e) else f"{type(e).__name__}: Unknown error"
         logger.error(f"Chat error: {error_msg}")
         logger.error(traceback.format_exc())
+        CHAT_REQUESTS.inc(stream=str(request.stream).lower(), outcome="error")
         raise HTTPException(status_code=500, detail=error_msg)
 
 
@@ -5231,14 +5757,14 @@ async def completion(request: CompletionRequest):
         }
 
         auth_headers = get_vllm_auth_headers()
-        async with aiohttp.ClientSession(headers=auth_headers) as session:
-            async with session.post(url, json=payload) as response:
-                if response.status != 200:
-                    text = await response.text()
-                    raise HTTPException(status_code=response.status, detail=text)
+        timeout = aiohttp.ClientTimeout(total=300)
+        async with upstream_pool.post(url, json=payload, headers=auth_headers, timeout=timeout) as response:
+            if response.status != 200:
+                text = await response.text()
+                raise HTTPException(status_code=response.status, detail=text)
 
-                data = await response.json()
-                return data
+            data = await response.json()
+            return data
 
     except Exception as e:
         logger.error(f"Completion error: {e}")
@@ -5899,22 +6425,21 @@ async def check_vllm_health():
         auth_headers = get_vllm_auth_headers()
         timeout = aiohttp.ClientTimeout(total=10, connect=5)
 
-        async with aiohttp.ClientSession(timeout=timeout, headers=auth_headers) as session:
-            if current_run_mode == "remote":
-                models_url = f"{base_url}/v1/models"
-                async with session.get(models_url) as response:
-                    if response.status == 200:
-                        return {"success": True, "status_code": 200, "message": "Remote API reachable (/v1/models)"}
-                    return {
-                        "success": False,
-                        "status_code": response.status,
-                        "error": f"/v1/models returned {response.status}",
-                    }
-            health_url = f"{base_url}/health"
-            async with session.get(health_url) as response:
+        if current_run_mode == "remote":
+            models_url = f"{base_url}/v1/models"
+            async with upstream_pool.get(models_url, headers=auth_headers, timeout=timeout) as response:
                 if response.status == 200:
-                    return {"success": True, "status_code": 200, "message": "Server is healthy"}
-                return {"success": False, "status_code": response.status, "error": "Health check failed"}
+                    return {"success": True, "status_code": 200, "message": "Remote API reachable (/v1/models)"}
+                return {
+                    "success": False,
+                    "status_code": response.status,
+                    "error": f"/v1/models returned {response.status}",
+                }
+        health_url = f"{base_url}/health"
+        async with upstream_pool.get(health_url, headers=auth_headers, timeout=timeout) as response:
+            if response.status == 200:
+                return {"success": True, "status_code": 200, "message": "Server is healthy"}
+            return {"success": False, "status_code": response.status, "error": "Health check failed"}
     except Exception as e:
         return {"success": False, "status_code": 503, "error": _format_async_client_error(e)}
 
@@ -5963,23 +6488,55 @@ def _derive_computed_metrics(metrics: dict):
             }
 
 
-def _derive_history_metrics(snapshot: dict):
-    """Derive computed metrics for a flat history snapshot.
+# Derived history columns -> the stored columns they are computed from
+_HISTORY_DERIVED_SOURCES = {
+    "vllm:spec_decode_acceptance_rate": ("vllm:spec_decode_num_accepted_tokens", "vllm:spec_decode_num_draft_tokens"),
+    "vllm:prefix_cache_hit_rate": ("vllm:prefix_cache_hits", "vllm:prefix_cache_queries"),
+}
+
 
-    History snapshots store raw scalars (not wrapped dicts), so this is
-    the flat-value counterpart of ``_derive_computed_metrics``.
+def _derive_history_metrics(columns: dict):
+    """Derive computed metrics for history columns.
+
+    History is stored column-wise (``{metric: [values...]}`` with NaN for
+    missing samples), so this is the columnar counterpart of
+    ``_derive_computed_metrics``.  Derived columns are only added when absent.
     """
-    if "vllm:spec_decode_acceptance_rate" not in snapshot:
-        acc = snapshot.get("vllm:spec_decode_num_accepted_tokens")
-        draft = snapshot.get("vllm:spec_decode_num_draft_tokens")
-        if acc is not None and draft is not None and draft > 0:
-            snapshot["vllm:spec_decode_acceptance_rate"] = acc / draft
 
-    if "vllm:prefix_cache_hit_rate" not in snapshot:
-        hits = snapshot.get("vllm:prefix_cache_hits")
-        queries = snapshot.get("vllm:prefix_cache_queries")
-        if hits is not None and queries is not None and queries > 0:
-            snapshot["vllm:prefix_cache_hit_rate"] = hits / queries
+    def _ratio(num_key: str, den_key: str):
+        num = columns.get(num_key)
+        den = columns.get(den_key)
+        if num is None or den is None:
+            return None
+        # NaN compares False, so missing samples fall through to NaN
+        return [n / d if d > 0 and n == n else float("nan") for n, d in zip(num, den)]
+
+    if "vllm:spec_decode_acceptance_rate" not in columns:
+        derived = _ratio("vllm:spec_decode_num_accepted_tokens", "vllm:spec_decode_num_draft_tokens")
+        if derived is not None:
+            columns["vllm:spec_decode_acceptance_rate"] = derived
+
+    if "vllm:prefix_cache_hit_rate" not in columns:
+        derived = _ratio("vllm:prefix_cache_hits", "vllm:prefix_cache_queries")
+        if derived is not None:
+            columns["vllm:prefix_cache_hit_rate"] = derived
+
+
+@app.get("/metrics")
+async def get_playground_metrics():
+    """Prometheus exposition of the playground's own hot-path metrics.
+
+    Covers ``/v1`` proxy overhead and upstream latency, ``/api/chat`` stream
+    durations, ``/metrics`` scrape durations, ``/ws/logs`` fan-out time and
+    benchmark task state.  vLLM's own metrics stay under ``/api/vllm/metrics*``.
+    """
+    return Response(content=SELF_METRICS.render(), media_type=SELF_METRICS_CONTENT_TYPE)
+
+
+@app.get("/api/http-pool")
+async def get_http_pool_stats():
+    """Keep-alive connection pool statistics per backend origin (see ``http_pool``)."""
+    return upstream_pool.stats()
 
 
 @app.get("/api/vllm/metrics/all")
@@ -5993,9 +6550,111 @@ async def get_vllm_metrics_all():
     converting legacy keys to canonical ``vllm:`` entries so the
     frontend receives a consistent shape.
     """
-    metrics = dict(metric_store.latest)
+    return _metrics_all_payload(metric_store, use_fallback=True, run_mode=current_run_mode)
 
-    if latest_vllm_metrics:
+
+@app.websocket("/ws/metrics")
+async def websocket_metrics(websocket: WebSocket):
+    """Push the ``/api/vllm/metrics/all`` state once, then only what changed.
+
+    Query parameters: ``instance_id`` pins the stream to one registered
+    instance (default: follow the active instance, re-syncing on switch);
+    ``metrics`` is a comma-separated filter of names or ``prefix*`` patterns.
+    Clients may send ``{"type": "subscribe", "metrics": [...]}`` to change the
+    filter, which is answered with a new full frame.  Frames are described in
+    ``metrics_stream.py``; a ``meta`` frame is sent when nothing changed for
+    one scrape interval.
+    """
+    await websocket.accept()
+    instance_id = websocket.query_params.get("instance_id") or None
+    flt = MetricFilter.parse(websocket.query_params.get("metrics"))
+
+    if instance_id is not None:
+        registry = _ir_mod.instance_registry
+        if registry is None or await registry.get(instance_id) is None:
+            await websocket.send_text(json.dumps({"type": "error", "detail": "Instance not found"}))
+            await websocket.close(code=4404)
+            return
+
+    store: Optional[MetricStore] = None
+    event: Optional[asyncio.Event] = None
+    seen = -1
+    receiver = asyncio.ensure_future(websocket.receive_text())
+    try:
+        while True:
+            target = await fleet_scraper.get_store(instance_id) if instance_id else metric_store
+            if target is not store:
+                if store is not None:
+                    store.stream.remove_waiter(event)
+                store = target
+                event = store.stream.add_waiter()
+                seen = -1
+
+            event.clear()
+            stream = store.stream
+            run_mode = await _store_run_mode(store)
+            stream.refresh(lambda: _metrics_all_payload(store, store is metric_store, run_mode))
+            if seen < 0:
+                await websocket.send_text(stream.full_frame(flt, instance_id=store.instance_id))
+            else:
+                frame = stream.delta_frame(seen, flt)
+                if frame is not None:
+                    await websocket.send_text(frame)
+            seen = stream.version
+
+            waiter = asyncio.ensure_future(event.wait())
+            done, _ = await asyncio.wait(
+                {receiver, waiter}, timeout=store.scrape_interval, return_when=asyncio.FIRST_COMPLETED
+            )
+            waiter.cancel()
+            if receiver in done:
+                msg = receiver.result()
+                receiver = asyncio.ensure_future(websocket.receive_text())
+                try:
+                    data = json.loads(msg)
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(data, dict) and data.get("type") == "subscribe":
+                    patterns = data.get("metrics") or []
+                    flt = MetricFilter(patterns) if patterns else None
+                    seen = -1
+            elif not done:
+                age = _store_scrape_age(store)
+                await websocket.send_text(stream.meta_frame(scrape_age_seconds=age))
+
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.debug(f"Metrics WebSocket error: {e}")
+    finally:
+        receiver.cancel()
+        if store is not None and event is not None:
+            store.stream.remove_waiter(event)
+
+
+async def _store_run_mode(store: MetricStore) -> Optional[str]:
+    if store is metric_store or store.instance_id is None:
+        return current_run_mode
+    registry = _ir_mod.instance_registry
+    entry = await registry.get(store.instance_id) if registry else None
+    return entry.run_mode if entry else None
+
+
+def _store_scrape_age(store: MetricStore) -> Optional[float]:
+    ts = store.last_scrape or store.last_simulated
+    return round((datetime.now() - ts).total_seconds(), 1) if ts else None
+
+
+def _metrics_all_payload(store: MetricStore, use_fallback: bool, run_mode: Optional[str]) -> dict:
+    """Build the ``/metrics/all`` response for *store*.
+
+    The log-parsed ``latest_vllm_metrics`` fallback only applies to the
+    active store (*use_fallback*).
+    """
+    metrics = dict(store.latest)
+    use_fallback = use_fallback and bool(latest_vllm_metrics)
+
+    if use_fallback:
         _inject_legacy_fallback(metrics, latest_vllm_metrics)
 
     _derive_computed_metrics(metrics)
@@ -6006,18 +6665,18 @@ async def get_vllm_metrics_all():
             "scrape_age_seconds": None,
             "metric_count": 0,
             "source": "none",
-            "run_mode": current_run_mode or "unknown",
+            "run_mode": run_mode or "unknown",
         }
 
     now = datetime.now()
     scrape_age = None
-    if metric_store.last_scrape:
+    if store.last_scrape:
         source = "prometheus"
-        scrape_age = round((now - metric_store.last_scrape).total_seconds(), 1)
-    elif metric_store.last_simulated:
+        scrape_age = round((now - store.last_scrape).total_seconds(), 1)
+    elif store.last_simulated:
         source = "simulated"
-        scrape_age = round((now - metric_store.last_simulated).total_seconds(), 1)
-    elif metrics_timestamp and latest_vllm_metrics:
+        scrape_age = round((now - store.last_simulated).total_seconds(), 1)
+    elif metrics_timestamp and use_fallback:
         source = "fallback"
         scrape_age = round((now - metrics_timestamp).total_seconds(), 1)
     else:
@@ -6028,7 +6687,7 @@ async def get_vllm_metrics_all():
         "scrape_age_seconds": scrape_age,
         "metric_count": len(metrics),
         "source": source,
-        "run_mode": current_run_mode or "unknown",
+        "run_mode": run_mode or "unknown",
     }
 
 
@@ -6046,6 +6705,7 @@ def _inject_legacy_fallback(target: dict, legacy: dict):
         "num_preemptions": "vllm:num_preemptions",
         "num_requests_running": "vllm:num_requests_running",
         "num_requests_waiting": "vllm:num_requests_waiting",
+        "num_requests_swapped": "vllm:num_requests_swapped",
         "avg_prompt_throughput": "vllm:avg_prompt_throughput_toks_per_s",
         "avg_generation_throughput": "vllm:avg_generation_throughput_toks_per_s",
         "spec_decode_accepted": "vllm:spec_decode_num_accepted_tokens",
@@ -6106,20 +6766,66 @@ async def get_vllm_metrics():
 async def get_vllm_metrics_history(
     minutes: Optional[int] = None,
     seconds: Optional[int] = None,
+    max_points: Optional[int] = None,
+    metrics: Optional[str] = None,
+    downsample_mode: str = Query("minmax", alias="downsample"),
+    agg: str = "auto",
 ):
     """Return time-series metrics snapshots for charting.
 
     Accepts either ``seconds`` or ``minutes`` as the time window.
     ``seconds`` takes precedence when both are supplied.
+    ``metrics`` is a comma-separated list of metric names to return, and
+    ``max_points`` caps the number of snapshots by downsampling
+    (``downsample=minmax|lttb|avg``), so wide windows cost the same to
+    serve as narrow ones.
+    Windows the raw ring no longer covers (or that are too wide to need
+    5 s resolution) are served from the 1 min / 1 h rollups; ``agg``
+    selects the rollup aggregate (``auto|avg|min|max|last|delta``) and the
+    ``X-History-Tier`` response header names the tier used.
     Falls back to the legacy ``metrics_history`` deque if MetricStore has
     no data (e.g. remote mode with only log-parsed metrics).
     """
-    if metric_store.history:
-        snapshots = metric_store.get_history(minutes=minutes, seconds=seconds)
-        for snap in snapshots:
-            _derive_history_metrics(snap)
-        return snapshots
-    return list(metrics_history)
+    response = _history_response(metric_store, minutes, seconds, max_points, metrics, downsample_mode, agg)
+    if response is None:
+        return list(metrics_history)
+    return response
+
+
+def _history_response(
+    store: MetricStore,
+    minutes: Optional[int],
+    seconds: Optional[int],
+    max_points: Optional[int],
+    metrics: Optional[str],
+    downsample_mode: str,
+    agg: str,
+) -> Optional[JSONResponse]:
+    """Serve a history query from *store*; ``None`` when it holds no history at all."""
+    if downsample_mode not in DOWNSAMPLE_MODES:
+        raise HTTPException(status_code=400, detail=f"downsample must be one of {list(DOWNSAMPLE_MODES)}")
+    if agg not in ROLLUP_AGGS:
+        raise HTTPException(status_code=400, detail=f"agg must be one of {list(ROLLUP_AGGS)}")
+
+    if store.history or any(t.oldest_ts() is not None for t in store.rollups):
+        names = None
+        requested = None
+        if metrics:
+            requested = [m.strip() for m in metrics.split(",") if m.strip()]
+            names = list(requested)
+            for derived, sources in _HISTORY_DERIVED_SOURCES.items():
+                if derived in requested:
+                    names.extend(sources)
+        tier, timestamps, columns = store.query_history(
+            minutes=minutes, seconds=seconds, names=names, max_points=max_points, agg=agg
+        )
+        _derive_history_metrics(columns)
+        if requested is not None:
+            columns = {k: v for k, v in columns.items() if k in requested}
+        if max_points:
+            timestamps, columns = downsample(timestamps, columns, max_points, downsample_mode)
+        return JSONResponse(content=ColumnarHistory.to_snapshots(timestamps, columns), headers={"X-History-Tier": tier})
+    return None
 
 
 @app.get("/api/vllm/metrics/history/summary")
@@ -6129,34 +6835,125 @@ async def get_vllm_metrics_history_summary():
     Lets the frontend know whether older data exists outside the current
     time window so it can prompt the user to widen the range.
     """
-    total = len(metric_store.history)
-    if total == 0:
-        return {"total": 0, "oldest": None, "newest": None, "span_seconds": 0, "oldest_age_seconds": 0}
+    return _history_summary_payload(metric_store)
 
-    oldest_snap = metric_store.history[0]
-    newest_snap = metric_store.history[-1]
-
-    def _ts(snap):
-        try:
-            return datetime.fromisoformat(snap["timestamp"]).timestamp()
-        except (KeyError, ValueError):
-            return None
 
+def _history_summary_payload(store: MetricStore) -> dict:
     now = datetime.now().timestamp()
-    oldest_ts = _ts(oldest_snap)
-    newest_ts = _ts(newest_snap)
-    span = round(newest_ts - oldest_ts, 1) if oldest_ts and newest_ts else 0
-    oldest_age = round(now - oldest_ts, 1) if oldest_ts else 0
+    tiers = []
+    for tier in store.rollups:
+        oldest = tier.oldest_ts()
+        tiers.append(
+            {
+                "name": tier.name,
+                "resolution_seconds": tier.resolution,
+                "rows": len(tier.rows),
+                "oldest": datetime.fromtimestamp(oldest).isoformat() if oldest is not None else None,
+                "retention_seconds": tier.resolution * tier.rows.maxlen,
+                "memory_bytes": tier.rows.nbytes(),
+            }
+        )
+
+    total = len(store.history)
+    if total == 0:
+        return {
+            "total": 0,
+            "oldest": None,
+            "newest": None,
+            "span_seconds": 0,
+            "oldest_age_seconds": 0,
+            "tiers": tiers,
+        }
+
+    oldest_ts = store.history.oldest_ts()
+    newest_ts = store.history.newest_ts()
+    span = round(newest_ts - oldest_ts, 1)
+    oldest_age = round(now - oldest_ts, 1)
 
     return {
         "total": total,
-        "oldest": oldest_snap.get("timestamp"),
-        "newest": newest_snap.get("timestamp"),
+        "oldest": datetime.fromtimestamp(oldest_ts).isoformat(),
+        "newest": datetime.fromtimestamp(newest_ts).isoformat(),
         "span_seconds": span,
         "oldest_age_seconds": oldest_age,
+        "memory_bytes": store.history.nbytes(),
+        "tiers": tiers,
     }
 
 
+# --- Per-instance metrics (fleet scraper) ---
+
+
+async def _instance_store(instance_id: str) -> MetricStore:
+    registry = _ir_mod.instance_registry
+    if registry is None:
+        raise HTTPException(status_code=503, detail="Backend registry not initialized")
+    if await registry.get(instance_id) is None:
+        raise HTTPException(status_code=404, detail="Instance not found")
+    return await fleet_scraper.get_store(instance_id)
+
+
+@app.get("/api/instances/metrics")
+async def get_fleet_metrics():
+    """Headline metrics and scrape status for every registered instance."""
+    registry = _ir_mod.instance_registry
+    if registry is None:
+        return {"instances": [], "active_id": None}
+
+    instances = []
+    for entry in await registry.list_all():
+        store = fleet_scraper.stores.get(entry.id)
+        status = fleet_scraper.status.get(entry.id)
+        instances.append(
+            {
+                "instance_id": entry.id,
+                "name": entry.name,
+                "health": entry.health,
+                "metrics": store.to_legacy_dict() if store else {},
+                "history_points": len(store.history) if store else 0,
+                "scrape": status.to_dict() if status else None,
+            }
+        )
+    return {"instances": instances, "active_id": registry.active_id}
+
+
+@app.get("/api/instances/{instance_id}/metrics")
+async def get_instance_metrics(instance_id: str):
+    """``/api/vllm/metrics/all`` for one registered instance, active or parked."""
+    store = await _instance_store(instance_id)
+    entry = await _ir_mod.instance_registry.get(instance_id)
+    is_active = store is metric_store
+    payload = _metrics_all_payload(
+        store, use_fallback=is_active, run_mode=current_run_mode if is_active else entry.run_mode
+    )
+    status = fleet_scraper.status.get(instance_id)
+    payload["instance_id"] = instance_id
+    payload["scrape"] = status.to_dict() if status else None
+    return payload
+
+
+@app.get("/api/instances/{instance_id}/metrics/history")
+async def get_instance_metrics_history(
+    instance_id: str,
+    minutes: Optional[int] = None,
+    seconds: Optional[int] = None,
+    max_points: Optional[int] = None,
+    metrics: Optional[str] = None,
+    downsample_mode: str = Query("minmax", alias="downsample"),
+    agg: str = "auto",
+):
+    """``/api/vllm/metrics/history`` for one registered instance (same parameters)."""
+    store = await _instance_store(instance_id)
+    response = _history_response(store, minutes, seconds, max_points, metrics, downsample_mode, agg)
+    return response if response is not None else []
+
+
+@app.get("/api/instances/{instance_id}/metrics/history/summary")
+async def get_instance_metrics_history_summary(instance_id: str):
+    """``/api/vllm/metrics/history/summary`` for one registered instance."""
+    return _history_summary_payload(await _instance_store(instance_id))
+
+
 # --- Tokenize proxy for Live Token Counter ---
 
 
@@ -6173,16 +6970,16 @@ async def tokenize_text(request: TokenizeRequest):
     try:
         base_url = get_vllm_base_url()
         auth_headers = get_vllm_auth_headers()
-        async with aiohttp.ClientSession(headers=auth_headers) as session:
-            async with session.post(
-                f"{base_url}/tokenize",
-                json={"model": get_model_name_for_api(), "prompt": request.text},
-                timeout=aiohttp.ClientTimeout(total=2),
-            ) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    return {"count": data.get("count", len(data.get("tokens", [])))}
-                return {"count": None, "error": "Tokenize endpoint unavailable"}
+        async with upstream_pool.post(
+            f"{base_url}/tokenize",
+            json={"model": get_model_name_for_api(), "prompt": request.text},
+            headers=auth_headers,
+            timeout=aiohttp.ClientTimeout(total=2),
+        ) as resp:
+            if resp.status == 200:
+                data = await resp.json()
+                return {"count": data.get("count", len(data.get("tokens", [])))}
+            return {"count": None, "error": "Tokenize endpoint unavailable"}
     except Exception as e:
         logger.debug(f"Tokenize proxy error: {e}")
         return {"count": None, "error": str(e)}
@@ -6242,11 +7039,15 @@ async def simulate_vllm_metrics(req: SimulateMetricsRequest):
             base_values[k] = v if isinstance(v, (int, float)) else 0
 
     # Generate 30 seconds of time-varying history so the time-series chart
-    # shows realistic curves rather than flat lines.
+    # shows realistic curves rather than flat lines.  Only the points newer
+    # than what history already holds are kept (it must stay in time order).
     num_points = 30
+    newest = metric_store.history.newest_ts()
     for i in range(num_points):
         ts = now - timedelta(seconds=num_points - 1 - i)
-        snap = {"timestamp": ts.isoformat()}
+        if newest is not None and ts.timestamp() <= newest:
+            continue
+        values = {}
         t = i / num_points  # normalised 0..1
         for k, base in base_values.items():
             if isinstance(base, (int, float)) and base > 0:
@@ -6255,12 +7056,10 @@ async def simulate_vllm_metrics(req: SimulateMetricsRequest):
                     + 0.06 * math.sin(2 * math.pi * t * 5.3)
                     + random.uniform(-0.03, 0.03)
                 )
-                snap[k] = max(0, base * (1 + wave))
+                values[k] = max(0, base * (1 + wave))
             else:
-                snap[k] = base
-        _derive_history_metrics(snap)
-        metric_store.history.append(snap)
-        metric_store._append_to_disk(snap)
+                values[k] = base
+        metric_store._record_values(ts.timestamp(), values)
 
     metric_store._dirty = False
 
@@ -6298,14 +7097,30 @@ async def simulate_reset_metrics():
     metrics_history.clear()
 
     # Also clear MetricStore
-    metric_store.latest.clear()
-    metric_store.history.clear()
-    metric_store.last_scrape = None
-    metric_store.last_simulated = None
+    metric_store.reset()
 
     return {"status": "ok", "message": "Metrics reset"}
 
 
+def _track_benchmark_task(task: asyncio.Task, kind: str) -> None:
+    """Record a benchmark task's running state and outcome in the playground's own metrics."""
+    started = time.perf_counter()
+    BENCHMARK_RUNNING.set(1, kind=kind)
+
+    def _done(t: asyncio.Task) -> None:
+        if t.cancelled():
+            outcome = "cancelled"
+        elif t.exception() is not None or benchmark_results is None:
+            outcome = "failed"
+        else:
+            outcome = "completed"
+        BENCHMARK_RUNNING.set(0, kind=kind)
+        BENCHMARK_RUNS.inc(kind=kind, outcome=outcome)
+        BENCHMARK_DURATION.observe(time.perf_counter() - started, kind=kind)
+
+    task.add_done_callback(_done)
+
+
 @app.post("/api/benchmark/start")
 async def start_benchmark(config: BenchmarkConfig):
     """Start a benchmark test using either built-in or GuideLLM"""
@@ -6359,6 +7174,7 @@ async def start_benchmark(config: BenchmarkConfig):
                     config, current_config, target_base_url, target_auth_headers, target_model_id=target_model_id
                 )
             )
+            _track_benchmark_task(benchmark_task, "guidellm")
             await broadcast_log(f"[BENCHMARK] Starting GuideLLM benchmark against {target_base_url}...")
         else:
             benchmark_task = asyncio.create_task(
@@ -6366,6 +7182,7 @@ async def start_benchmark(config: BenchmarkConfig):
                     config, current_config, target_base_url, target_auth_headers, target_model_id=target_model_id
                 )
             )
+            _track_benchmark_task(benchmark_task, "builtin")
             await broadcast_log(f"[BENCHMARK] Starting built-in benchmark against {target_base_url}...")
 
         return {"status": "started", "message": "Benchmark started"}
@@ -6454,59 +7271,58 @@ async def run_benchmark(
             session_auth = get_vllm_auth_headers()
             if session_auth.get("Authorization") and _benchmark_target_is_active_remote(base_url):
                 auth_headers.update(session_auth)
-        async with aiohttp.ClientSession(headers=auth_headers) as session:
-            # Send requests
-            for i in range(config.total_requests):
-                request_start = time.time()
+        # Send requests
+        for i in range(config.total_requests):
+            request_start = time.time()
 
-                try:
-                    payload = {
-                        "model": model_name,
-                        "messages": [{"role": "user", "content": prompt_text}],
-                        "max_tokens": config.output_tokens,
-                        "temperature": 0.7,
-                    }
+            try:
+                payload = {
+                    "model": model_name,
+                    "messages": [{"role": "user", "content": prompt_text}],
+                    "max_tokens": config.output_tokens,
+                    "temperature": 0.7,
+                }
 
-                    # Add stop tokens only if user configured custom ones
-                    # Otherwise let vLLM handle stop tokens automatically
-                    if server_config.custom_stop_tokens:
-                        payload["stop"] = server_config.custom_stop_tokens
+                # Add stop tokens only if user configured custom ones
+                # Otherwise let vLLM handle stop tokens automatically
+                if server_config.custom_stop_tokens:
+                    payload["stop"] = server_config.custom_stop_tokens
 
-                    async with session.post(url, json=payload, timeout=aiohttp.ClientTimeout(total=60)) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            request_end = time.time()
-                            latency = (request_end - request_start) * 1000  # ms
+                async with upstream_pool.post(
+                    url, json=payload, headers=auth_headers, timeout=aiohttp.ClientTimeout(total=60)
+                ) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        request_end = time.time()
+                        latency = (request_end - request_start) * 1000  # ms
 
-                            # Extract token counts
-                            usage = data.get("usage", {})
-                            completion_tokens = usage.get("completion_tokens", config.output_tokens)
+                        # Extract token counts
+                        usage = data.get("usage", {})
+                        completion_tokens = usage.get("completion_tokens", config.output_tokens)
 
-                            # Debug: Log token extraction for first few requests
-                            if i < 3:
-                                logger.info(f"[BENCHMARK DEBUG] Request {i + 1} usage: {usage}")
-                                logger.info(f"[BENCHMARK DEBUG] Request {i + 1} completion_tokens: {completion_tokens}")
+                        # Debug: Log token extraction for first few requests
+                        if i < 3:
+                            logger.info(f"[BENCHMARK DEBUG] Request {i + 1} usage: {usage}")
+                            logger.info(f"[BENCHMARK DEBUG] Request {i + 1} completion_tokens: {completion_tokens}")
 
-                            results.append({"latency": latency, "tokens": completion_tokens})
-                            successful += 1
-                        else:
-                            failed += 1
-                            logger.warning(f"Request {i + 1} failed with status {response.status}")
+                        results.append({"latency": latency, "tokens": completion_tokens})
+                        successful += 1
+                    else:
+                        failed += 1
+                        logger.warning(f"Request {i + 1} failed with status {response.status}")
 
-                except Exception as e:
-                    failed += 1
-                    logger.error(f"Request {i + 1} error: {e}")
+            except Exception as e:
+                failed += 1
+                logger.error(f"Request {i + 1} error: {e}")
 
-                # Progress update
-                if (i + 1) % max(1, config.total_requests // 10) == 0:
-                    progress = ((i + 1) / config.total_requests) * 100
-                    await broadcast_log(
-                        f"[BENCHMARK] Progress: {progress:.0f}% ({i + 1}/{config.total_requests} requests)"
-                    )
+            # Progress update
+            if (i + 1) % max(1, config.total_requests // 10) == 0:
+                progress = ((i + 1) / config.total_requests) * 100
+                await broadcast_log(f"[BENCHMARK] Progress: {progress:.0f}% ({i + 1}/{config.total_requests} requests)")
 
-                # Rate limiting
-                if config.request_rate > 0:
-                    await asyncio.sleep(1.0 / config.request_rate)
+            # Rate limiting
+            if config.request_rate > 0:
+                await asyncio.sleep(1.0 / config.request_rate)
 
         end_time = time.time()
         duration = end_time - start_time
@@ -6924,12 +7740,11 @@ async def check_omni_health():
         headers = get_omni_auth_headers()
 
         timeout = aiohttp.ClientTimeout(total=3)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(health_url, headers=headers) as response:
-                if response.status == 200:
-                    return {"success": True, "ready": True, "message": "Server is healthy"}
-                else:
-                    return {"success": False, "ready": False, "error": f"Health check returned {response.status}"}
+        async with upstream_pool.get(health_url, headers=headers, timeout=timeout) as response:
+            if response.status == 200:
+                return {"success": True, "ready": True, "message": "Server is healthy"}
+            else:
+                return {"success": False, "ready": False, "error": f"Health check returned {response.status}"}
     except Exception as e:
         return {"success": False, "ready": False, "error": str(e)}
 
@@ -7256,56 +8071,53 @@ async def start_omni_server(config: OmniConfig):
             try:
                 headers = get_omni_auth_headers()
                 timeout = aiohttp.ClientTimeout(total=10)
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    # Try /health first
-                    health_ok = False
-                    try:
-                        async with session.get(f"{remote_base}/health", headers=headers) as resp:
-                            if resp.status == 200:
-                                health_ok = True
-                                await broadcast_omni_log("[OMNI] ✅ Remote health check passed")
-                            else:
-                                await broadcast_omni_log(f"[OMNI] ⚠️  Health endpoint returned {resp.status}")
-                    except Exception as he:
-                        await broadcast_omni_log(f"[OMNI] ⚠️  Health endpoint not available: {he}")
+                # Try /health first
+                health_ok = False
+                try:
+                    async with upstream_pool.get(f"{remote_base}/health", headers=headers, timeout=timeout) as resp:
+                        if resp.status == 200:
+                            health_ok = True
+                            await broadcast_omni_log("[OMNI] ✅ Remote health check passed")
+                        else:
+                            await broadcast_omni_log(f"[OMNI] ⚠️  Health endpoint returned {resp.status}")
+                except Exception as he:
+                    await broadcast_omni_log(f"[OMNI] ⚠️  Health endpoint not available: {he}")
 
-                    # Try /v1/models to confirm it's a vLLM instance and get details
-                    discovered_models_list = []
-                    try:
-                        async with session.get(f"{remote_base}/v1/models", headers=headers) as resp:
-                            if resp.status == 200:
-                                if not health_ok:
-                                    health_ok = True
-                                    await broadcast_omni_log(
-                                        "[OMNI] ✓ Using /v1/models as health signal (/health not OK)"
-                                    )
-                                models_data = await resp.json()
-                                models_raw = models_data.get("data", [])
-                                model_ids = [m.get("id", "unknown") for m in models_raw]
-                                discovered_models_list = [
-                                    {
-                                        "id": m.get("id", "unknown"),
-                                        "owned_by": m.get("owned_by", ""),
-                                        "max_model_len": m.get("max_model_len"),
-                                        "root": m.get("root", ""),
-                                    }
-                                    for m in models_raw
-                                ]
-                                await broadcast_omni_log(f"[OMNI] ✅ Remote models: {', '.join(model_ids)}")
-                                if models_raw and models_raw[0].get("max_model_len"):
-                                    await broadcast_omni_log(
-                                        f"[OMNI] ✅ Max context length: {models_raw[0]['max_model_len']}"
-                                    )
-                                if model_ids:
-                                    # Auto-set model name if available
-                                    config.model = model_ids[0]
-                            else:
-                                await broadcast_omni_log(f"[OMNI] ⚠️  Models endpoint returned {resp.status}")
-                    except Exception as me:
-                        await broadcast_omni_log(f"[OMNI] ⚠️  Models endpoint not available: {me}")
+                # Try /v1/models to confirm it's a vLLM instance and get details
+                discovered_models_list = []
+                try:
+                    async with upstream_pool.get(f"{remote_base}/v1/models", headers=headers, timeout=timeout) as resp:
+                        if resp.status == 200:
+                            if not health_ok:
+                                health_ok = True
+                                await broadcast_omni_log("[OMNI] ✓ Using /v1/models as health signal (/health not OK)")
+                            models_data = await resp.json()
+                            models_raw = models_data.get("data", [])
+                            model_ids = [m.get("id", "unknown") for m in models_raw]
+                            discovered_models_list = [
+                                {
+                                    "id": m.get("id", "unknown"),
+                                    "owned_by": m.get("owned_by", ""),
+                                    "max_model_len": m.get("max_model_len"),
+                                    "root": m.get("root", ""),
+                                }
+                                for m in models_raw
+                            ]
+                            await broadcast_omni_log(f"[OMNI] ✅ Remote models: {', '.join(model_ids)}")
+                            if models_raw and models_raw[0].get("max_model_len"):
+                                await broadcast_omni_log(
+                                    f"[OMNI] ✅ Max context length: {models_raw[0]['max_model_len']}"
+                                )
+                            if model_ids:
+                                # Auto-set model name if available
+                                config.model = model_ids[0]
+                        else:
+                            await broadcast_omni_log(f"[OMNI] ⚠️  Models endpoint returned {resp.status}")
+                except Exception as me:
+                    await broadcast_omni_log(f"[OMNI] ⚠️  Models endpoint not available: {me}")
 
-                    if not health_ok:
-                        await broadcast_omni_log("[OMNI] ⚠️  Proceeding without confirmed health check")
+                if not health_ok:
+                    await broadcast_omni_log("[OMNI] ⚠️  Proceeding without confirmed health check")
 
             except Exception as e:
                 raise HTTPException(
@@ -7635,43 +8447,40 @@ async def generate_omni_image(request: ImageGenerationRequest):
 
         logger.info(f"Sending image generation request to vLLM-Omni: {omni_url}")
 
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                omni_url, json=payload, headers=omni_headers, timeout=aiohttp.ClientTimeout(total=300)
-            ) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"vLLM-Omni error: {error_text}")
-                    return ImageGenerationResponse(success=False, error=error_text)
+        async with upstream_pool.post(
+            omni_url, json=payload, headers=omni_headers, timeout=aiohttp.ClientTimeout(total=300)
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                logger.error(f"vLLM-Omni error: {error_text}")
+                return ImageGenerationResponse(success=False, error=error_text)
 
-                result = await response.json()
+            result = await response.json()
 
-                # Extract base64 image from response
-                # vLLM-Omni returns: choices[0].message.content[0].image_url.url (data:image/png;base64,...)
-                try:
-                    content = result["choices"][0]["message"]["content"]
-                    if isinstance(content, list) and len(content) > 0:
-                        image_url = content[0].get("image_url", {}).get("url", "")
-                        if image_url.startswith("data:image"):
-                            # Extract base64 part after the comma
-                            base64_data = image_url.split(",", 1)[1] if "," in image_url else image_url
-                        else:
-                            base64_data = image_url
+            # Extract base64 image from response
+            # vLLM-Omni returns: choices[0].message.content[0].image_url.url (data:image/png;base64,...)
+            try:
+                content = result["choices"][0]["message"]["content"]
+                if isinstance(content, list) and len(content) > 0:
+                    image_url = content[0].get("image_url", {}).get("url", "")
+                    if image_url.startswith("data:image"):
+                        # Extract base64 part after the comma
+                        base64_data = image_url.split(",", 1)[1] if "," in image_url else image_url
                     else:
-                        # Fallback for different response formats
-                        base64_data = str(content)
+                        base64_data = image_url
+                else:
+                    # Fallback for different response formats
+                    base64_data = str(content)
 
-                    generation_time = time.time() - start_time
-                    logger.info(f"Image generated in {generation_time:.2f}s")
+                generation_time = time.time() - start_time
+                logger.info(f"Image generated in {generation_time:.2f}s")
 
-                    return ImageGenerationResponse(
-                        success=True, image_base64=base64_data, generation_time=generation_time
-                    )
+                return ImageGenerationResponse(success=True, image_base64=base64_data, generation_time=generation_time)
 
-                except (KeyError, IndexError, TypeError) as e:
-                    logger.error(f"Failed to parse vLLM-Omni response: {e}")
-                    logger.error(f"Response: {result}")
-                    return ImageGenerationResponse(success=False, error=f"Failed to parse response: {e}")
+            except (KeyError, IndexError, TypeError) as e:
+                logger.error(f"Failed to parse vLLM-Omni response: {e}")
+                logger.error(f"Response: {result}")
+                return ImageGenerationResponse(success=False, error=f"Failed to parse response: {e}")
 
     except aiohttp.ClientError as e:
         logger.error(f"Connection error to vLLM-Omni: {e}")
@@ -7739,56 +8548,55 @@ async def generate_video(request: VideoGenerationRequest) -> VideoGenerationResp
 
     try:
         timeout = aiohttp.ClientTimeout(total=600)  # 10 minutes for video generation
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(omni_url, json=payload, headers=omni_headers) as response:
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"vLLM-Omni error: {error_text}")
-                    return VideoGenerationResponse(success=False, error=f"vLLM-Omni error: {error_text}")
+        async with upstream_pool.post(omni_url, json=payload, headers=omni_headers, timeout=timeout) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                logger.error(f"vLLM-Omni error: {error_text}")
+                return VideoGenerationResponse(success=False, error=f"vLLM-Omni error: {error_text}")
 
-                result = await response.json()
+            result = await response.json()
 
-                try:
-                    # Parse the response to extract video data
-                    choices = result.get("choices", [])
-                    if not choices:
-                        return VideoGenerationResponse(success=False, error="No choices in response")
+            try:
+                # Parse the response to extract video data
+                choices = result.get("choices", [])
+                if not choices:
+                    return VideoGenerationResponse(success=False, error="No choices in response")
 
-                    message = choices[0].get("message", {})
-                    content = message.get("content", [])
+                message = choices[0].get("message", {})
+                content = message.get("content", [])
 
-                    # Handle different response formats
-                    base64_data = None
-                    if isinstance(content, list):
-                        for item in content:
-                            if item.get("type") == "video":
-                                video_url = item.get("video_url", {}).get("url", "")
-                                if video_url.startswith("data:video"):
-                                    base64_data = video_url.split(",", 1)[1] if "," in video_url else video_url
-                                else:
-                                    base64_data = video_url
-                                break
-                    elif isinstance(content, str):
-                        # Some models return base64 directly
-                        base64_data = content
+                # Handle different response formats
+                base64_data = None
+                if isinstance(content, list):
+                    for item in content:
+                        if item.get("type") == "video":
+                            video_url = item.get("video_url", {}).get("url", "")
+                            if video_url.startswith("data:video"):
+                                base64_data = video_url.split(",", 1)[1] if "," in video_url else video_url
+                            else:
+                                base64_data = video_url
+                            break
+                elif isinstance(content, str):
+                    # Some models return base64 directly
+                    base64_data = content
 
-                    if not base64_data:
-                        return VideoGenerationResponse(success=False, error="No video data in response")
+                if not base64_data:
+                    return VideoGenerationResponse(success=False, error="No video data in response")
 
-                    generation_time = time.time() - start_time
-                    logger.info(f"Video generated in {generation_time:.2f}s")
+                generation_time = time.time() - start_time
+                logger.info(f"Video generated in {generation_time:.2f}s")
 
-                    return VideoGenerationResponse(
-                        success=True,
-                        video_base64=base64_data,
-                        duration=request.duration,
-                        generation_time=generation_time,
-                    )
+                return VideoGenerationResponse(
+                    success=True,
+                    video_base64=base64_data,
+                    duration=request.duration,
+                    generation_time=generation_time,
+                )
 
-                except (KeyError, IndexError, TypeError) as e:
-                    logger.error(f"Failed to parse vLLM-Omni video response: {e}")
-                    logger.error(f"Response: {result}")
-                    return VideoGenerationResponse(success=False, error=f"Failed to parse response: {e}")
+            except (KeyError, IndexError, TypeError) as e:
+                logger.error(f"Failed to parse vLLM-Omni video response: {e}")
+                logger.error(f"Response: {result}")
+                return VideoGenerationResponse(success=False, error=f"Failed to parse response: {e}")
 
     except aiohttp.ClientError as e:
         logger.error(f"Connection error to vLLM-Omni: {e}")
@@ -7837,53 +8645,52 @@ async def generate_tts(request: TTSGenerationRequest) -> AudioGenerationResponse
 
     try:
         timeout = aiohttp.ClientTimeout(total=300)  # 5 minutes for audio generation
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(omni_url, json=payload, headers=omni_headers) as response:
-                content_type = response.headers.get("Content-Type", "")
+        async with upstream_pool.post(omni_url, json=payload, headers=omni_headers, timeout=timeout) as response:
+            content_type = response.headers.get("Content-Type", "")
 
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"vLLM-Omni TTS error: {error_text}")
-                    return AudioGenerationResponse(success=False, error=f"vLLM-Omni error: {error_text}")
+            if response.status != 200:
+                error_text = await response.text()
+                logger.error(f"vLLM-Omni TTS error: {error_text}")
+                return AudioGenerationResponse(success=False, error=f"vLLM-Omni error: {error_text}")
 
-                # TTS returns raw audio bytes
-                if "audio" in content_type or "application/octet-stream" in content_type:
-                    audio_bytes = await response.read()
+            # TTS returns raw audio bytes
+            if "audio" in content_type or "application/octet-stream" in content_type:
+                audio_bytes = await response.read()
 
-                    if not audio_bytes:
-                        return AudioGenerationResponse(success=False, error="No audio data returned")
+                if not audio_bytes:
+                    return AudioGenerationResponse(success=False, error="No audio data returned")
 
-                    import base64
+                import base64
 
-                    base64_data = base64.b64encode(audio_bytes).decode("utf-8")
+                base64_data = base64.b64encode(audio_bytes).decode("utf-8")
 
-                    # Determine format from content type
-                    if "wav" in content_type:
-                        audio_format = "audio/wav"
-                    elif "mp3" in content_type or "mpeg" in content_type:
-                        audio_format = "audio/mpeg"
-                    elif "flac" in content_type:
-                        audio_format = "audio/flac"
-                    else:
-                        audio_format = "audio/wav"
+                # Determine format from content type
+                if "wav" in content_type:
+                    audio_format = "audio/wav"
+                elif "mp3" in content_type or "mpeg" in content_type:
+                    audio_format = "audio/mpeg"
+                elif "flac" in content_type:
+                    audio_format = "audio/flac"
+                else:
+                    audio_format = "audio/wav"
 
-                    generation_time = time.time() - start_time
-                    logger.info(f"TTS audio generated in {generation_time:.2f}s")
+                generation_time = time.time() - start_time
+                logger.info(f"TTS audio generated in {generation_time:.2f}s")
 
-                    return AudioGenerationResponse(
-                        success=True,
-                        audio_base64=base64_data,
-                        audio_format=audio_format,
-                        duration=None,
-                        generation_time=generation_time,
-                    )
-                else:
-                    # Unexpected response format
-                    error_text = await response.text()
-                    return AudioGenerationResponse(
-                        success=False,
-                        error=f"Unexpected response format: {content_type}. Response: {error_text[:500]}",
-                    )
+                return AudioGenerationResponse(
+                    success=True,
+                    audio_base64=base64_data,
+                    audio_format=audio_format,
+                    duration=None,
+                    generation_time=generation_time,
+                )
+            else:
+                # Unexpected response format
+                error_text = await response.text()
+                return AudioGenerationResponse(
+                    success=False,
+                    error=f"Unexpected response format: {content_type}. Response: {error_text[:500]}",
+                )
 
     except asyncio.TimeoutError:
         return AudioGenerationResponse(success=False, error="TTS generation timed out (5 minute limit)")
@@ -8074,163 +8881,154 @@ async def generate_audio(request: AudioGenerationRequest) -> AudioGenerationResp
 
     try:
         timeout = aiohttp.ClientTimeout(total=300)  # 5 minutes for audio generation
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.post(omni_url, json=payload, headers=omni_headers) as response:
-                content_type = response.headers.get("Content-Type", "")
-
-                if response.status != 200:
-                    error_text = await response.text()
-                    logger.error(f"vLLM-Omni audio error: {error_text}")
-                    return AudioGenerationResponse(success=False, error=f"vLLM-Omni error: {error_text}")
-
-                # Diffusion returns JSON with audio data
-                result = await response.json()
-
-                # Debug: Log the full response structure to understand the format
-                logger.info(f"Audio response keys: {list(result.keys())}")
-                logger.info(f"Full audio response: {str(result)[:1000]}...")
-
-                # Check for error in response
-                if "error" in result:
-                    error_msg = result["error"]
-                    if isinstance(error_msg, dict):
-                        error_msg = error_msg.get("message", str(error_msg))
-                    return AudioGenerationResponse(success=False, error=f"Generation failed: {error_msg}")
-
-                base64_data = None
-                audio_format = "audio/wav"
-
-                # ═══════════════════════════════════════════════════════════════
-                # Format 1: /v1/images/generations response format
-                # { "data": [{"url": "data:audio/wav;base64,..."} or {"b64_json": "..."}] }
-                # ═══════════════════════════════════════════════════════════════
-                if "data" in result and result["data"]:
-                    logger.info(f"Found 'data' array with {len(result['data'])} items")
-                    for item in result["data"]:
-                        # Check for b64_json format
-                        if "b64_json" in item:
-                            base64_data = item["b64_json"]
-                            logger.info("Extracted audio from b64_json field")
+        async with upstream_pool.post(omni_url, json=payload, headers=omni_headers, timeout=timeout) as response:
+            content_type = response.headers.get("Content-Type", "")
+
+            if response.status != 200:
+                error_text = await response.text()
+                logger.error(f"vLLM-Omni audio error: {error_text}")
+                return AudioGenerationResponse(success=False, error=f"vLLM-Omni error: {error_text}")
+
+            # Diffusion returns JSON with audio data
+            result = await response.json()
+
+            # Debug: Log the full response structure to understand the format
+            logger.info(f"Audio response keys: {list(result.keys())}")
+            logger.info(f"Full audio response: {str(result)[:1000]}...")
+
+            # Check for error in response
+            if "error" in result:
+                error_msg = result["error"]
+                if isinstance(error_msg, dict):
+                    error_msg = error_msg.get("message", str(error_msg))
+                return AudioGenerationResponse(success=False, error=f"Generation failed: {error_msg}")
+
+            base64_data = None
+            audio_format = "audio/wav"
+
+            # ═══════════════════════════════════════════════════════════════
+            # Format 1: /v1/images/generations response format
+            # { "data": [{"url": "data:audio/wav;base64,..."} or {"b64_json": "..."}] }
+            # ═══════════════════════════════════════════════════════════════
+            if "data" in result and result["data"]:
+                logger.info(f"Found 'data' array with {len(result['data'])} items")
+                for item in result["data"]:
+                    # Check for b64_json format
+                    if "b64_json" in item:
+                        base64_data = item["b64_json"]
+                        logger.info("Extracted audio from b64_json field")
+                        break
+                    # Check for url format (data URL)
+                    if "url" in item:
+                        url = item["url"]
+                        logger.info(f"Found URL field, prefix: {url[:50] if url else 'empty'}...")
+                        if url.startswith("data:audio"):
+                            try:
+                                mime_part = url.split(";")[0]
+                                audio_format = mime_part.replace("data:", "")
+                            except (IndexError, ValueError):
+                                audio_format = "audio/wav"
+                            base64_data = url.split(",", 1)[1] if "," in url else url
+                            logger.info(f"Extracted audio from URL, format: {audio_format}")
+                            break
+                        elif url.startswith("data:"):
+                            # Some other data format, try to extract
+                            base64_data = url.split(",", 1)[1] if "," in url else url
+                            logger.info("Extracted data from URL (non-audio mime type)")
                             break
-                        # Check for url format (data URL)
-                        if "url" in item:
-                            url = item["url"]
-                            logger.info(f"Found URL field, prefix: {url[:50] if url else 'empty'}...")
-                            if url.startswith("data:audio"):
-                                try:
-                                    mime_part = url.split(";")[0]
-                                    audio_format = mime_part.replace("data:", "")
-                                except (IndexError, ValueError):
-                                    audio_format = "audio/wav"
-                                base64_data = url.split(",", 1)[1] if "," in url else url
-                                logger.info(f"Extracted audio from URL, format: {audio_format}")
-                                break
-                            elif url.startswith("data:"):
-                                # Some other data format, try to extract
-                                base64_data = url.split(",", 1)[1] if "," in url else url
-                                logger.info("Extracted data from URL (non-audio mime type)")
-                                break
-
-                # ═══════════════════════════════════════════════════════════════
-                # Format 2: /v1/chat/completions response format (fallback)
-                # ═══════════════════════════════════════════════════════════════
-                if not base64_data and "choices" in result and result["choices"]:
-                    msg = result["choices"][0].get("message", {})
-                    logger.info(f"Message keys: {list(msg.keys())}")
-
-                    # Check message.audio (Qwen3-Omni format)
-                    audio_obj = msg.get("audio")
-                    if audio_obj:
-                        if isinstance(audio_obj, dict):
-                            base64_data = audio_obj.get("data")
-                            audio_format = f"audio/{audio_obj.get('format', 'wav')}"
-                        elif isinstance(audio_obj, str):
-                            base64_data = audio_obj
-
-                    # Check content list
-                    if not base64_data:
-                        content = msg.get("content", [])
-                        logger.info(
-                            f"Content type: {type(content)}, content: {str(content)[:200] if content else 'empty'}..."
-                        )
-                        if isinstance(content, list):
-                            for item in content:
-                                if isinstance(item, dict):
-                                    item_type = item.get("type", "")
-                                    logger.info(f"Content item type: {item_type}")
-                                    # Check for audio_url type (used when final_output_type: audio)
-                                    if item_type == "audio_url":
-                                        audio_url = item.get("audio_url", {}).get("url", "")
-                                        logger.info(f"Found audio_url: {audio_url[:50] if audio_url else 'empty'}...")
-                                        if audio_url:
-                                            if audio_url.startswith("data:audio"):
-                                                try:
-                                                    mime_part = audio_url.split(";")[0]
-                                                    audio_format = mime_part.replace("data:", "")
-                                                except (IndexError, ValueError):
-                                                    audio_format = "audio/wav"
-                                                base64_data = (
-                                                    audio_url.split(",", 1)[1] if "," in audio_url else audio_url
-                                                )
-                                                logger.info(f"Extracted audio from audio_url, format: {audio_format}")
-                                                break
-                                            else:
-                                                # Raw base64 data
-                                                base64_data = (
-                                                    audio_url.split(",", 1)[1] if "," in audio_url else audio_url
-                                                )
-                                                logger.info("Extracted raw base64 from audio_url")
-                                                break
-                                    # Check for image_url type (fallback for diffusion models)
-                                    elif item_type == "image_url":
-                                        image_url = item.get("image_url", {}).get("url", "")
-                                        if image_url:
-                                            if image_url.startswith("data:audio"):
-                                                try:
-                                                    mime_part = image_url.split(";")[0]
-                                                    audio_format = mime_part.replace("data:", "")
-                                                except (IndexError, ValueError):
-                                                    audio_format = "audio/wav"
-                                                base64_data = (
-                                                    image_url.split(",", 1)[1] if "," in image_url else image_url
-                                                )
-                                                break
-                                            elif not image_url.startswith("data:image"):
-                                                base64_data = (
-                                                    image_url.split(",", 1)[1] if "," in image_url else image_url
-                                                )
-                                                break
-                        elif isinstance(content, str) and content:
-                            base64_data = content
-
-                # Also check for audio at the response level (some models return it there)
-                if not base64_data and "audio" in result:
-                    audio_data = result["audio"]
-                    if isinstance(audio_data, dict):
-                        base64_data = audio_data.get("data") or audio_data.get("url")
-                        audio_format = f"audio/{audio_data.get('format', 'wav')}"
-                    elif isinstance(audio_data, str):
-                        base64_data = audio_data
 
+            # ═══════════════════════════════════════════════════════════════
+            # Format 2: /v1/chat/completions response format (fallback)
+            # ═══════════════════════════════════════════════════════════════
+            if not base64_data and "choices" in result and result["choices"]:
+                msg = result["choices"][0].get("message", {})
+                logger.info(f"Message keys: {list(msg.keys())}")
+
+                # Check message.audio (Qwen3-Omni format)
+                audio_obj = msg.get("audio")
+                if audio_obj:
+                    if isinstance(audio_obj, dict):
+                        base64_data = audio_obj.get("data")
+                        audio_format = f"audio/{audio_obj.get('format', 'wav')}"
+                    elif isinstance(audio_obj, str):
+                        base64_data = audio_obj
+
+                # Check content list
                 if not base64_data:
-                    # Log the full response for debugging
-                    logger.error(f"No audio data found. Full response: {result}")
-                    return AudioGenerationResponse(
-                        success=False,
-                        error="No audio data in response - generation may have failed (check server logs for OOM errors)",
+                    content = msg.get("content", [])
+                    logger.info(
+                        f"Content type: {type(content)}, content: {str(content)[:200] if content else 'empty'}..."
                     )
+                    if isinstance(content, list):
+                        for item in content:
+                            if isinstance(item, dict):
+                                item_type = item.get("type", "")
+                                logger.info(f"Content item type: {item_type}")
+                                # Check for audio_url type (used when final_output_type: audio)
+                                if item_type == "audio_url":
+                                    audio_url = item.get("audio_url", {}).get("url", "")
+                                    logger.info(f"Found audio_url: {audio_url[:50] if audio_url else 'empty'}...")
+                                    if audio_url:
+                                        if audio_url.startswith("data:audio"):
+                                            try:
+                                                mime_part = audio_url.split(";")[0]
+                                                audio_format = mime_part.replace("data:", "")
+                                            except (IndexError, ValueError):
+                                                audio_format = "audio/wav"
+                                            base64_data = audio_url.split(",", 1)[1] if "," in audio_url else audio_url
+                                            logger.info(f"Extracted audio from audio_url, format: {audio_format}")
+                                            break
+                                        else:
+                                            # Raw base64 data
+                                            base64_data = audio_url.split(",", 1)[1] if "," in audio_url else audio_url
+                                            logger.info("Extracted raw base64 from audio_url")
+                                            break
+                                # Check for image_url type (fallback for diffusion models)
+                                elif item_type == "image_url":
+                                    image_url = item.get("image_url", {}).get("url", "")
+                                    if image_url:
+                                        if image_url.startswith("data:audio"):
+                                            try:
+                                                mime_part = image_url.split(";")[0]
+                                                audio_format = mime_part.replace("data:", "")
+                                            except (IndexError, ValueError):
+                                                audio_format = "audio/wav"
+                                            base64_data = image_url.split(",", 1)[1] if "," in image_url else image_url
+                                            break
+                                        elif not image_url.startswith("data:image"):
+                                            base64_data = image_url.split(",", 1)[1] if "," in image_url else image_url
+                                            break
+                    elif isinstance(content, str) and content:
+                        base64_data = content
 
-                generation_time = time.time() - start_time
-                logger.info(f"Diffusion audio generated in {generation_time:.2f}s, format: {audio_format}")
-
+            # Also check for audio at the response level (some models return it there)
+            if not base64_data and "audio" in result:
+                audio_data = result["audio"]
+                if isinstance(audio_data, dict):
+                    base64_data = audio_data.get("data") or audio_data.get("url")
+                    audio_format = f"audio/{audio_data.get('format', 'wav')}"
+                elif isinstance(audio_data, str):
+                    base64_data = audio_data
+
+            if not base64_data:
+                # Log the full response for debugging
+                logger.error(f"No audio data found. Full response: {result}")
                 return AudioGenerationResponse(
-                    success=True,
-                    audio_base64=base64_data,
-                    audio_format=audio_format,
-                    duration=None,
-                    generation_time=generation_time,
+                    success=False,
+                    error="No audio data in response - generation may have failed (check server logs for OOM errors)",
                 )
 
+            generation_time = time.time() - start_time
+            logger.info(f"Diffusion audio generated in {generation_time:.2f}s, format: {audio_format}")
+
+            return AudioGenerationResponse(
+                success=True,
+                audio_base64=base64_data,
+                audio_format=audio_format,
+                duration=None,
+                generation_time=generation_time,
+            )
+
     except aiohttp.ClientError as e:
         logger.error(f"Connection error to vLLM-Omni: {e}")
         return AudioGenerationResponse(success=False, error=f"Connection error: {e}")
@@ -8271,104 +9069,99 @@ async def omni_chat(request: OmniChatRequest):
 
         try:
             timeout = aiohttp.ClientTimeout(total=120)  # 2 minutes for audio generation
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.post(omni_url, json=payload, headers=omni_headers) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        logger.error(f"vLLM-Omni error: {error_text}")
-                        yield f"data: {json.dumps({'error': error_text})}\n\n"
-                        return
+            async with upstream_pool.post(omni_url, json=payload, headers=omni_headers, timeout=timeout) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"vLLM-Omni error: {error_text}")
+                    yield f"data: {json.dumps({'error': error_text})}\n\n"
+                    return
 
-                    if request.stream:
-                        # Stream the response
-                        async for line in response.content:
-                            line_text = line.decode("utf-8", errors="replace").strip()
-                            if not line_text:
-                                continue
+                if request.stream:
+                    # Stream the response
+                    async for line in response.content:
+                        line_text = line.decode("utf-8", errors="replace").strip()
+                        if not line_text:
+                            continue
 
-                            if line_text.startswith("data: "):
-                                data = line_text[6:]
-                                if data == "[DONE]":
-                                    yield "data: [DONE]\n\n"
-                                    continue
-
-                                try:
-                                    parsed = json.loads(data)
-                                    choices = parsed.get("choices", [])
-                                    if choices:
-                                        delta = choices[0].get("delta", {})
-                                        content = delta.get("content", "")
-
-                                        # Handle text content
-                                        if isinstance(content, str) and content:
-                                            full_text += content
-                                            yield f"data: {json.dumps({'text': content})}\n\n"
-
-                                        # Handle multimodal content (list format)
-                                        elif isinstance(content, list):
-                                            for item in content:
-                                                if item.get("type") == "text":
-                                                    text = item.get("text", "")
-                                                    full_text += text
-                                                    yield f"data: {json.dumps({'text': text})}\n\n"
-                                                elif item.get("type") == "audio":
-                                                    audio_url = item.get("audio_url", {}).get("url", "")
-                                                    if audio_url.startswith("data:audio"):
-                                                        # Extract audio format from data URL
-                                                        audio_format = "audio/wav"
-                                                        try:
-                                                            mime_part = audio_url.split(";")[0]
-                                                            audio_format = mime_part.replace("data:", "")
-                                                        except (IndexError, ValueError):
-                                                            pass
-                                                        audio_data = (
-                                                            audio_url.split(",", 1)[1]
-                                                            if "," in audio_url
-                                                            else audio_url
-                                                        )
-                                                        yield f"data: {json.dumps({'audio': audio_data, 'audio_format': audio_format})}\n\n"
-
-                                except json.JSONDecodeError:
-                                    continue
+                        if line_text.startswith("data: "):
+                            data = line_text[6:]
+                            if data == "[DONE]":
+                                yield "data: [DONE]\n\n"
+                                continue
 
-                    else:
-                        # Non-streaming response
-                        result = await response.json()
-                        try:
-                            choices = result.get("choices", [])
-                            if choices:
-                                message = choices[0].get("message", {})
-                                content = message.get("content", "")
-
-                                # Handle string content
-                                if isinstance(content, str):
-                                    yield f"data: {json.dumps({'text': content})}\n\n"
-
-                                # Handle multimodal content (list format)
-                                elif isinstance(content, list):
-                                    for item in content:
-                                        if item.get("type") == "text":
-                                            yield f"data: {json.dumps({'text': item.get('text', '')})}\n\n"
-                                        elif item.get("type") == "audio":
-                                            audio_url = item.get("audio_url", {}).get("url", "")
-                                            if audio_url.startswith("data:audio"):
-                                                # Extract audio format from data URL
-                                                audio_format = "audio/wav"
-                                                try:
-                                                    mime_part = audio_url.split(";")[0]
-                                                    audio_format = mime_part.replace("data:", "")
-                                                except (IndexError, ValueError):
-                                                    pass
-                                                audio_data = (
-                                                    audio_url.split(",", 1)[1] if "," in audio_url else audio_url
-                                                )
-                                                yield f"data: {json.dumps({'audio': audio_data, 'audio_format': audio_format})}\n\n"
-
-                        except (KeyError, IndexError, TypeError) as e:
-                            logger.error(f"Failed to parse vLLM-Omni response: {e}")
-                            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                            try:
+                                parsed = json.loads(data)
+                                choices = parsed.get("choices", [])
+                                if choices:
+                                    delta = choices[0].get("delta", {})
+                                    content = delta.get("content", "")
+
+                                    # Handle text content
+                                    if isinstance(content, str) and content:
+                                        full_text += content
+                                        yield f"data: {json.dumps({'text': content})}\n\n"
+
+                                    # Handle multimodal content (list format)
+                                    elif isinstance(content, list):
+                                        for item in content:
+                                            if item.get("type") == "text":
+                                                text = item.get("text", "")
+                                                full_text += text
+                                                yield f"data: {json.dumps({'text': text})}\n\n"
+                                            elif item.get("type") == "audio":
+                                                audio_url = item.get("audio_url", {}).get("url", "")
+                                                if audio_url.startswith("data:audio"):
+                                                    # Extract audio format from data URL
+                                                    audio_format = "audio/wav"
+                                                    try:
+                                                        mime_part = audio_url.split(";")[0]
+                                                        audio_format = mime_part.replace("data:", "")
+                                                    except (IndexError, ValueError):
+                                                        pass
+                                                    audio_data = (
+                                                        audio_url.split(",", 1)[1] if "," in audio_url else audio_url
+                                                    )
+                                                    yield f"data: {json.dumps({'audio': audio_data, 'audio_format': audio_format})}\n\n"
+
+                            except json.JSONDecodeError:
+                                continue
 
-                        yield "data: [DONE]\n\n"
+                else:
+                    # Non-streaming response
+                    result = await response.json()
+                    try:
+                        choices = result.get("choices", [])
+                        if choices:
+                            message = choices[0].get("message", {})
+                            content = message.get("content", "")
+
+                            # Handle string content
+                            if isinstance(content, str):
+                                yield f"data: {json.dumps({'text': content})}\n\n"
+
+                            # Handle multimodal content (list format)
+                            elif isinstance(content, list):
+                                for item in content:
+                                    if item.get("type") == "text":
+                                        yield f"data: {json.dumps({'text': item.get('text', '')})}\n\n"
+                                    elif item.get("type") == "audio":
+                                        audio_url = item.get("audio_url", {}).get("url", "")
+                                        if audio_url.startswith("data:audio"):
+                                            # Extract audio format from data URL
+                                            audio_format = "audio/wav"
+                                            try:
+                                                mime_part = audio_url.split(";")[0]
+                                                audio_format = mime_part.replace("data:", "")
+                                            except (IndexError, ValueError):
+                                                pass
+                                            audio_data = audio_url.split(",", 1)[1] if "," in audio_url else audio_url
+                                            yield f"data: {json.dumps({'audio': audio_data, 'audio_format': audio_format})}\n\n"
+
+                    except (KeyError, IndexError, TypeError) as e:
+                        logger.error(f"Failed to parse vLLM-Omni response: {e}")
+                        yield f"data: {json.dumps({'error': str(e)})}\n\n"
+
+                    yield "data: [DONE]\n\n"
 
         except aiohttp.ClientError as e:
             logger.error(f"Connection error to vLLM-Omni: {e}")
@@ -24,6 +24,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+from .http_pool import upstream_pool
+
 logger = logging.getLogger(__name__)
 
 _PERSISTENCE_VERSION = 2
@@ -59,6 +61,8 @@ class InstanceEntry:
     health_checked_at: Optional[str] = None
     created_at: Optional[str] = None
     saved: bool = False
+    # Summary of the most recent cold start (see startup_profile.StartupTimeline.summary)
+    last_startup: Optional[Dict[str, Any]] = None
 
     # In-memory only (not persisted) -- subprocess process handle
     _process: Optional[Any] = field(default=None, repr=False, compare=False)
@@ -251,14 +255,9 @@ class InstanceRegistry:
                 headers["Authorization"] = f"Bearer {entry.api_key}"
 
             timeout = aiohttp.ClientTimeout(total=5)
-            async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
-                if entry.run_mode == "remote":
-                    async with session.get(f"{root}/v1/models", headers=headers) as response:
-                        health = "healthy" if response.status == 200 else "unhealthy"
-                else:
-                    health_url = f"{root}/health"
-                    async with session.get(health_url) as response:
-                        health = "healthy" if response.status == 200 else "unhealthy"
+            url = f"{root}/v1/models" if entry.run_mode == "remote" else f"{root}/health"
+            async with upstream_pool.get(url, headers=headers, timeout=timeout) as response:
+                health = "healthy" if response.status == 200 else "unhealthy"
         except Exception:
             health = "unreachable"
 
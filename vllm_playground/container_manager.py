@@ -12,7 +12,10 @@ import platform
 import shutil
 import subprocess
 import time
-from typing import Optional, Dict, Any, AsyncIterator
+from typing import Optional, Dict, Any, AsyncIterator, List
+
+from .http_pool import upstream_pool
+from .log_reader import iter_line_batches
 
 logger = logging.getLogger(__name__)
 
@@ -463,7 +466,7 @@ class VLLMContainerManager:
             logger.warning(f"Error checking config: {e}, will recreate container")
             return True
 
-    async def _pull_image_with_progress(self, image: str) -> bool:
+    async def _pull_image_with_progress(self, image: str, timings: Optional[Dict[str, Any]] = None) -> bool:
         """
         Pull container image with progress logging.
 
@@ -471,19 +474,28 @@ class VLLMContainerManager:
 
         Args:
             image: Container image to pull
+            timings: If given, receives ``image_pull`` with start/end wall times and
+                whether the image was already cached locally
 
         Returns:
             True if pull succeeded or image already exists, False on error
         """
+        started = time.time()
+
         # First check if image already exists locally
         try:
             result = await self._run_podman_cmd_async("image", "exists", image, check=False)
             if result.returncode == 0:
                 logger.info(f"Image already exists locally: {image}")
+                if timings is not None:
+                    timings["image_pull"] = {"start": started, "end": time.time(), "cached": True}
                 return True
         except Exception:
             pass
 
+        if timings is not None:
+            timings["image_pull"] = {"start": started, "end": started, "cached": False}
+
         # Image doesn't exist, need to pull
         logger.info(f"Pulling container image: {image} (this may take several minutes for large images...)")
 
@@ -521,6 +533,8 @@ class VLLMContainerManager:
                         last_log_time = current_time
 
             await process.wait()
+            if timings is not None:
+                timings["image_pull"]["end"] = time.time()
 
             if process.returncode == 0:
                 logger.info(f"✅ Image pulled successfully: {image}")
@@ -558,9 +572,12 @@ class VLLMContainerManager:
             container_name: Custom container name (default: CONTAINER_NAME)
 
         Returns:
-            Dictionary with container info (id, name, status, ready, etc.)
+            Dictionary with container info (id, name, status, ready, etc.);
+            ``timings`` holds start/end wall times of the image pull and the
+            container create or restart
         """
         target_name = container_name or self.CONTAINER_NAME
+        timings: Dict[str, Any] = {}
 
         use_cpu = vllm_config.get("use_cpu", False)
         accelerator = vllm_config.get("accelerator", "nvidia")
@@ -595,7 +612,9 @@ class VLLMContainerManager:
                     container_id = id_result.stdout.strip()
                 else:
                     # Start the stopped container
+                    started = time.time()
                     await self._run_podman_cmd_async("start", target_name)
+                    timings["container_restart"] = {"start": started, "end": time.time()}
                     logger.info(f"Container restarted: {target_name}")
 
                     # Get container ID
@@ -608,6 +627,7 @@ class VLLMContainerManager:
                     "status": "running",
                     "image": image,
                     "reused": True,
+                    "timings": timings,
                 }
 
                 # Wait for readiness if requested
@@ -625,7 +645,7 @@ class VLLMContainerManager:
             await self.stop_container(remove=True, container_name=container_name)
 
             # Pull image first (with progress streaming)
-            await self._pull_image_with_progress(image)
+            await self._pull_image_with_progress(image, timings)
 
             # Build container configuration
             config = self.build_container_config(vllm_config)
@@ -731,7 +751,9 @@ class VLLMContainerManager:
                 logger.info(f"vLLM arguments: {' '.join(config['vllm_args'])}")
 
             # Run container
+            started = time.time()
             result = await self._run_podman_cmd_async(*podman_cmd)
+            timings["container_create"] = {"start": started, "end": time.time()}
             container_id = result.stdout.strip()
 
             logger.info(f"Container started: {container_id[:12]}")
@@ -742,6 +764,7 @@ class VLLMContainerManager:
                 "status": "started",
                 "image": image,
                 "reused": False,
+                "timings": timings,
             }
 
             # Wait for readiness if requested
@@ -795,16 +818,15 @@ class VLLMContainerManager:
                     return {"ready": False, "error": "container_stopped", "elapsed_time": round(elapsed, 1)}
 
                 # Try to hit the health endpoint
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(
-                        f"http://localhost:{port}/health", timeout=aiohttp.ClientTimeout(total=3)
-                    ) as response:
-                        if response.status == 200:
-                            elapsed = time.time() - start_time
-                            logger.info(f"✅ vLLM is ready! (took {elapsed:.1f}s)")
-                            return {"ready": True, "elapsed_time": round(elapsed, 1)}
-                        else:
-                            last_error = f"HTTP {response.status}"
+                async with upstream_pool.get(
+                    f"http://localhost:{port}/health", timeout=aiohttp.ClientTimeout(total=3)
+                ) as response:
+                    if response.status == 200:
+                        elapsed = time.time() - start_time
+                        logger.info(f"✅ vLLM is ready! (took {elapsed:.1f}s)")
+                        return {"ready": True, "elapsed_time": round(elapsed, 1)}
+                    else:
+                        last_error = f"HTTP {response.status}"
 
             except aiohttp.ClientError as e:
                 last_error = f"Connection error: {type(e).__name__}"
@@ -936,9 +958,29 @@ class VLLMContainerManager:
         Yields:
             Log lines from container
         """
+        async for batch in self.stream_log_batches(container_name):
+            for line in batch:
+                yield line
+
+    async def stream_log_batches(self, container_name: str = None) -> AsyncIterator[List[str]]:
+        """
+        Stream container logs in batches of lines
+
+        The ``logs -f`` output is read in large chunks and split in bulk, so
+        ingestion keeps up with verbose startup / request logging.  The
+        ``logs -f`` process is terminated when the consumer stops iterating
+        (including on task cancellation).
+
+        Args:
+            container_name: Optional container name (defaults to CONTAINER_NAME)
+
+        Yields:
+            Lists of log lines from container
+        """
         target_container = container_name or self.CONTAINER_NAME
         logger.info(f"Starting log stream for container: {target_container}")
 
+        process = None
         try:
             # Build command (with sudo if needed for GPU mode)
             if self._should_use_sudo():
@@ -957,27 +999,26 @@ class VLLMContainerManager:
             if process.returncode is not None:
                 error_msg = f"Log process exited immediately with code {process.returncode}"
                 logger.error(error_msg)
-                yield f"[ERROR] {error_msg}"
+                yield [f"[ERROR] {error_msg}"]
                 return
 
             logger.info(f"Log stream started for {target_container}")
 
-            # Read logs line by line
-            while True:
-                line = await process.stdout.readline()
-                if not line:
-                    break
-
-                log_line = line.decode("utf-8", errors="replace").rstrip()
-                if log_line:
-                    yield log_line
+            async for batch in iter_line_batches(process.stdout):
+                yield batch
 
             await process.wait()
             logger.info(f"Log stream ended for {target_container} (exit code: {process.returncode})")
 
         except Exception as e:
             logger.error(f"Error streaming logs for {target_container}: {e}")
-            yield f"[ERROR] Failed to stream logs: {e}"
+            yield [f"[ERROR] Failed to stream logs: {e}"]
+        finally:
+            if process is not None and process.returncode is None:
+                try:
+                    process.terminate()
+                except ProcessLookupError:
+                    pass
 
     # =========================================================================
     # vLLM-Omni Container Methods
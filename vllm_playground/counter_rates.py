@@ -0,0 +1,119 @@
+"""
+Per-second rates and windowed increases for counter series.
+
+Counters (``prompt_tokens``, ``generation_tokens``, ``num_preemptions``,
+``prefix_cache_hits``, histogram ``_sum`` / ``_count`` ...) land in history as
+raw monotonic totals.  ``CounterRates`` differences them once at ingest time
+so charts and alerting can read throughput directly.
+
+Counter type comes from the ``# TYPE`` comments (``MetricStore._types``) via
+each entry's ``type`` field.  Resets (value going down after a vLLM restart)
+are folded into a reset-adjusted running total, like Prometheus ``rate()``.
+
+``annotate()`` adds, for every counter ``<name>`` in a scrape:
+
+  - ``<name>_rate_1m``      per-second rate over the last minute (``counter_rate``)
+  - ``<name>_increase_5m``  increase over the last five minutes (``counter_increase``)
+
+Windows longer than the recorded history use what is available.
+"""
+
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+RATE_WINDOWS: Tuple[Tuple[str, float], ...] = (("1m", 60.0),)
+INCREASE_WINDOWS: Tuple[Tuple[str, float], ...] = (("5m", 300.0),)
+
+
+class _Series:
+    """Reset-adjusted running total of one counter over time."""
+
+    __slots__ = ("last_raw", "adjusted", "ring")
+
+    def __init__(self, raw: float, ts: float):
+        self.last_raw = raw
+        self.adjusted = raw
+        self.ring: Deque[Tuple[float, float]] = deque([(ts, raw)])
+
+
+class CounterRates:
+    """Rate / increase tracker for every counter-typed series of one store."""
+
+    def __init__(
+        self,
+        rate_windows: Tuple[Tuple[str, float], ...] = RATE_WINDOWS,
+        increase_windows: Tuple[Tuple[str, float], ...] = INCREASE_WINDOWS,
+    ):
+        self.rate_windows = rate_windows
+        self.increase_windows = increase_windows
+        self._horizon = max(seconds for _, seconds in (*rate_windows, *increase_windows))
+        self._series: Dict[str, _Series] = {}
+
+    def clear(self) -> None:
+        self._series = {}
+
+    def observe(self, name: str, ts: float, value: float) -> None:
+        series = self._series.get(name)
+        if series is None:
+            self._series[name] = _Series(value, ts)
+            return
+        if value < series.last_raw:
+            series.adjusted += value  # reset: all of `value` happened since the restart
+        else:
+            series.adjusted += value - series.last_raw
+        series.last_raw = value
+
+        ring = series.ring
+        ring.append((ts, series.adjusted))
+        cutoff = ts - self._horizon
+        while len(ring) >= 2 and ring[1][0] <= cutoff:
+            ring.popleft()
+
+    def _window(self, name: str, seconds: float) -> Optional[Tuple[float, float]]:
+        """Return ``(increase, elapsed_seconds)`` over the last *seconds*, or ``None``."""
+        series = self._series.get(name)
+        if series is None or len(series.ring) < 2:
+            return None
+        ring = series.ring
+        end_ts, end = ring[-1]
+        cutoff = end_ts - seconds
+        start_ts, start = ring[0]
+        for ts, adjusted in ring:
+            if ts > cutoff:
+                break
+            start_ts, start = ts, adjusted
+        if end_ts <= start_ts:
+            return None
+        return end - start, end_ts - start_ts
+
+    def rate(self, name: str, seconds: float) -> Optional[float]:
+        window = self._window(name, seconds)
+        return window[0] / window[1] if window else None
+
+    def increase(self, name: str, seconds: float) -> Optional[float]:
+        window = self._window(name, seconds)
+        return window[0] if window else None
+
+    def annotate(self, entries: Dict[str, Dict], ts: float) -> None:
+        """Observe every counter entry and add its derived rate / increase entries."""
+        derived: Dict[str, Dict] = {}
+        for name, entry in entries.items():
+            if not isinstance(entry, dict) or entry.get("type") != "counter":
+                continue
+            value = entry.get("value")
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            self.observe(name, ts, float(value))
+            for window_name, seconds in self.rate_windows:
+                derived[f"{name}_rate_{window_name}"] = {
+                    "value": self.rate(name, seconds),
+                    "type": "counter_rate",
+                    "labels": f'window="{window_name}"',
+                }
+            for window_name, seconds in self.increase_windows:
+                derived[f"{name}_increase_{window_name}"] = {
+                    "value": self.increase(name, seconds),
+                    "type": "counter_increase",
+                    "labels": f'window="{window_name}"',
+                }
+        entries.update(derived)
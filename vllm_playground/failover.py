@@ -0,0 +1,173 @@
+"""
+Pre-first-byte failover for the ``/v1`` gateway.
+
+When the connection to the backend ``_v1_proxy`` picked cannot be made
+(``aiohttp.ClientConnectorError``: no request byte was sent) or the
+backend answers 502 / 503, nothing has reached the client yet, so the
+request can go to another healthy replica of the model instead of
+surfacing a 502.  ``FailoverPolicy`` decides whether to retry:
+
+  - at most ``max_attempts`` backends per request, each one only once;
+  - a full-jitter exponential backoff between attempts
+    (``uniform(0, min(backoff_cap, backoff_base * 2 ** attempt))``), so
+    retries of a burst do not land on the next replica in lockstep;
+  - a ``RetryBudget``: retries in the last ``window`` seconds may not
+    exceed ``ratio`` of the requests in that window (plus a small floor of
+    ``min_per_second``), so when every replica is down retries add at most
+    ``ratio`` extra load instead of multiplying it.
+
+Errors after the connection is made (a dropped connection, a timeout) are
+not retried: the backend may already be generating, and a second replica
+would run the completion twice.  Nothing is retried once response bytes
+have been sent.
+
+``record_failure`` counts consecutive failures per backend; at
+``failure_threshold`` the proxy marks the backend unhealthy in the registry
+right away, which takes it out of ``find_by_model`` until the next health
+check (``start_health_loop``) finds it healthy again.  ``record_ejection``
+counts only the calls that actually changed its health.
+"""
+
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = frozenset((502, 503))
+
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_FAILURE_THRESHOLD = 2
+DEFAULT_BUDGET_RATIO = 0.2
+
+
+class RetryBudget:
+    """Retries allowed per sliding window: ``min_per_second * window + ratio * requests``."""
+
+    def __init__(
+        self,
+        ratio: float = DEFAULT_BUDGET_RATIO,
+        min_per_second: float = 1.0,
+        window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._clock = clock
+        self._buckets: Deque[List[int]] = deque()  # [second, requests, retries]
+        self.exhausted = 0
+
+    def _bucket(self) -> List[int]:
+        now = int(self._clock())
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+        if not self._buckets or self._buckets[-1][0] != now:
+            self._buckets.append([now, 0, 0])
+        return self._buckets[-1]
+
+    def record_request(self) -> None:
+        self._bucket()[1] += 1
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False (and nothing taken) when it is used up."""
+        bucket = self._bucket()
+        requests = sum(b[1] for b in self._buckets)
+        retries = sum(b[2] for b in self._buckets)
+        if retries + 1 > self.min_per_second * self.window + self.ratio * requests:
+            self.exhausted += 1
+            return False
+        bucket[2] += 1
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._bucket()
+        return {
+            "ratio": self.ratio,
+            "min_per_second": self.min_per_second,
+            "window": self.window,
+            "requests": sum(b[1] for b in self._buckets),
+            "retries": sum(b[2] for b in self._buckets),
+            "exhausted": self.exhausted,
+        }
+
+
+class FailoverPolicy:
+    """Retry limits, backoff and consecutive-failure tracking for the ``/v1`` proxy."""
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        budget: Optional[RetryBudget] = None,
+        backoff_base: float = 0.025,
+        backoff_cap: float = 0.5,
+        rng: Optional[random.Random] = None,
+    ):
+        self.max_attempts = max_attempts
+        self.failure_threshold = failure_threshold
+        self.budget = budget or RetryBudget()
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._rng = rng or random.Random()
+        self.consecutive_failures: Dict[str, int] = {}
+        self.failovers = 0
+        self.ejections: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "FailoverPolicy":
+        env = os.environ
+        return cls(
+            max_attempts=int(env.get("VLLM_PLAYGROUND_RETRY_ATTEMPTS") or DEFAULT_MAX_ATTEMPTS),
+            failure_threshold=int(env.get("VLLM_PLAYGROUND_FAILURE_THRESHOLD") or DEFAULT_FAILURE_THRESHOLD),
+            budget=RetryBudget(ratio=float(env.get("VLLM_PLAYGROUND_RETRY_BUDGET") or DEFAULT_BUDGET_RATIO)),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number *attempt* (0-based), full jitter."""
+        return self._rng.uniform(0, min(self.backoff_cap, self.backoff_base * 2**attempt))
+
+    def may_retry(self, attempt: int, remaining: int) -> bool:
+        """Whether to try another backend after *attempt* + 1 failed attempts with *remaining* untried replicas."""
+        if attempt + 1 >= self.max_attempts or remaining == 0:
+            return False
+        if not self.budget.try_spend():
+            return False
+        self.failovers += 1
+        return True
+
+    def record_success(self, backend_id: str) -> None:
+        self.consecutive_failures.pop(backend_id, None)
+
+    def record_failure(self, backend_id: str) -> bool:
+        """Count a failure; True when the backend reached ``failure_threshold`` and should be marked down."""
+        n = self.consecutive_failures.get(backend_id, 0) + 1
+        if n < self.failure_threshold:
+            self.consecutive_failures[backend_id] = n
+            return False
+        # Start counting afresh for when the health check brings it back
+        self.consecutive_failures.pop(backend_id, None)
+        return True
+
+    def record_ejection(self, backend_id: str) -> None:
+        """Count a backend taken out of rotation (only when its health actually changed)."""
+        self.ejections[backend_id] = self.ejections.get(backend_id, 0) + 1
+
+    def forget(self, backend_id: str) -> None:
+        self.consecutive_failures.pop(backend_id, None)
+        self.ejections.pop(backend_id, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_attempts": self.max_attempts,
+            "failure_threshold": self.failure_threshold,
+            "backoff_base": self.backoff_base,
+            "backoff_cap": self.backoff_cap,
+            "failovers": self.failovers,
+            "budget": self.budget.snapshot(),
+            "consecutive_failures": dict(self.consecutive_failures),
+            "ejections": dict(self.ejections),
+        }
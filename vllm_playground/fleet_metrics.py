@@ -0,0 +1,215 @@
+"""
+Fleet-wide Prometheus scraping for every registered vLLM instance.
+
+``FleetScraper`` keeps one metrics store per ``InstanceEntry`` id and, every
+``scrape_interval`` seconds, scrapes ``/metrics`` on all live instances
+concurrently through the shared ``http_pool.upstream_pool``, so scrapes
+reuse the keep-alive connections of the proxy and health checks and count
+in its per-origin limits and stats.  Concurrency is also bounded by a
+semaphore, so a large fleet or a slow remote cannot pile up sockets.
+
+Stores are created through a factory supplied by ``app.py`` (the store class
+lives there), which keeps this module free of app globals.  A store only
+needs ``ingest_prometheus_text(text)``, ``append_snapshot_from_latest()``,
+``latest``, ``_dirty`` and ``close_history_file()``.
+
+Parked instances therefore keep accumulating history, and activating an
+instance only re-points the app's ``metric_store`` at its store.
+"""
+
+import asyncio
+import logging
+import shutil
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .http_pool import upstream_pool
+from .self_metrics import SCRAPE_DURATION
+
+logger = logging.getLogger(__name__)
+
+# Health states worth scraping (same notion of "running" as instance activation)
+_LIVE_HEALTH = ("healthy", "unknown")
+
+
+def _root_url(url: str) -> str:
+    u = (url or "").strip().rstrip("/")
+    if u.lower().endswith("/v1"):
+        return u[:-3].rstrip("/")
+    return u
+
+
+class ScrapeStatus:
+    """Outcome of the most recent scrape of one instance."""
+
+    __slots__ = ("ok", "error", "duration_ms", "metric_count", "last_attempt", "last_success", "failures")
+
+    def __init__(self):
+        self.ok: Optional[bool] = None
+        self.error: Optional[str] = None
+        self.duration_ms: Optional[float] = None
+        self.metric_count = 0
+        self.last_attempt: Optional[float] = None
+        self.last_success: Optional[float] = None
+        self.failures = 0  # consecutive
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class FleetScraper:
+    """Concurrent scraper with one metrics store per registered instance."""
+
+    def __init__(
+        self,
+        store_factory: Callable[[str], Any],
+        history_root: Path,
+        scrape_interval: float = 5.0,
+        max_concurrency: int = 8,
+        timeout: float = 3.0,
+        remote_timeout: float = 5.0,
+    ):
+        self._store_factory = store_factory
+        self.history_root = Path(history_root)
+        self.scrape_interval = scrape_interval
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.remote_timeout = remote_timeout
+
+        self.stores: Dict[str, Any] = {}
+        self.status: Dict[str, ScrapeStatus] = {}
+        self._registry_getter: Optional[Callable[[], Any]] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None  # created on the running loop
+        self._task: Optional[asyncio.Task] = None
+        self._warned: set = set()
+
+    # -- Stores ---------------------------------------------------------------
+
+    def history_dir(self, instance_id: str) -> Path:
+        return self.history_root / instance_id
+
+    async def get_store(self, instance_id: str):
+        """Return the store for *instance_id*, creating and loading it on first use."""
+        store = self.stores.get(instance_id)
+        if store is None:
+            store = self._store_factory(instance_id)
+            self.stores[instance_id] = store
+            self.status.setdefault(instance_id, ScrapeStatus())
+            await asyncio.to_thread(store._load_from_disk)
+        return store
+
+    def drop(self, instance_id: str, delete_history: bool = True) -> None:
+        """Forget an instance's store (e.g. when the instance is removed)."""
+        store = self.stores.pop(instance_id, None)
+        self.status.pop(instance_id, None)
+        self._warned.discard(instance_id)
+        if store is not None:
+            store.close_history_file()
+        if delete_history:
+            shutil.rmtree(self.history_dir(instance_id), ignore_errors=True)
+
+    # -- Scraping -------------------------------------------------------------
+
+    async def scrape_instance(self, entry) -> bool:
+        """Scrape one instance's ``/metrics`` into its store.  Returns True on success."""
+        import aiohttp
+
+        store = await self.get_store(entry.id)
+        status = self.status.setdefault(entry.id, ScrapeStatus())
+        headers = {"Authorization": f"Bearer {entry.api_key}"} if entry.api_key else None
+        timeout = aiohttp.ClientTimeout(total=self.remote_timeout if entry.run_mode == "remote" else self.timeout)
+        url = f"{_root_url(entry.url)}/metrics"
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            start = time.perf_counter()
+            status.last_attempt = time.time()
+            try:
+                async with upstream_pool.get(url, headers=headers, timeout=timeout) as response:
+                    if response.status != 200:
+                        raise RuntimeError(f"HTTP {response.status}")
+                    text = await response.text()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                status.ok = False
+                status.error = f"{type(exc).__name__}: {exc}"
+                status.failures += 1
+                status.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+                SCRAPE_DURATION.observe(status.duration_ms / 1000, instance=entry.id, outcome="error")
+                if entry.id not in self._warned:
+                    logger.warning("MetricStore: cannot scrape %s (%s): %s", entry.id, url, status.error)
+                    self._warned.add(entry.id)
+                if store.latest and store._dirty:
+                    store.append_snapshot_from_latest()
+                return False
+
+        count = store.ingest_prometheus_text(text)
+        status.ok = count > 0
+        status.error = None if count else "no vllm:* metrics in scrape"
+        status.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        status.metric_count = count
+        SCRAPE_DURATION.observe(status.duration_ms / 1000, instance=entry.id, outcome="ok" if count else "empty")
+        if count:
+            status.last_success = time.time()
+            status.failures = 0
+            self._warned.discard(entry.id)
+        return bool(count)
+
+    async def scrape_all(self, registry=None) -> Dict[str, bool]:
+        """Scrape every live instance in *registry* (default: the one given to ``start()``) concurrently."""
+        if registry is None and self._registry_getter is not None:
+            registry = self._registry_getter()
+        if registry is None:
+            return {}
+        entries: List[Any] = [e for e in await registry.list_all() if e.health in _LIVE_HEALTH and e.url]
+        if not entries:
+            return {}
+        results = await asyncio.gather(*(self.scrape_instance(e) for e in entries), return_exceptions=True)
+        outcome = {}
+        for entry, result in zip(entries, results):
+            if isinstance(result, BaseException):
+                logger.debug("MetricStore: scrape of %s raised %r", entry.id, result)
+                result = False
+            outcome[entry.id] = result
+        return outcome
+
+    async def _loop(self) -> None:
+        while True:
+            started = time.monotonic()
+            try:
+                await self.scrape_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.debug("MetricStore: fleet scrape error", exc_info=True)
+            elapsed = time.monotonic() - started
+            await asyncio.sleep(max(0.0, self.scrape_interval - elapsed))
+
+    # -- Lifecycle ------------------------------------------------------------
+
+    def start(self, registry_getter: Callable[[], Any]) -> None:
+        """Start the background fleet scrape loop."""
+        self._registry_getter = registry_getter
+        if self._task is not None and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(
+            "MetricStore: fleet scrape started (interval=%ss, concurrency=%d)",
+            self.scrape_interval,
+            self.max_concurrency,
+        )
+
+    async def stop(self) -> None:
+        """Stop the loop and seal every store's history (the shared HTTP pool is closed by the app)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for store in self.stores.values():
+            store.close_history_file()
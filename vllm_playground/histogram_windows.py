@@ -0,0 +1,159 @@
+"""
+Sliding-window percentiles for vLLM latency histograms.
+
+Prometheus histograms are cumulative since the server started, so after a
+few hours the p50/p95/p99 computed from them barely move even when latency
+spikes.  ``HistogramWindows`` keeps a short ring of bucket vectors per
+histogram and computes percentiles over the last 1 / 5 / 15 minutes from
+bucket *deltas*.
+
+Counter resets (vLLM restart, or the instance being replaced behind the same
+URL) are folded into a reset-adjusted running total: when any bucket count
+goes down, the new counts are taken as the increase since the reset, the same
+way Prometheus ``increase()`` treats resets.
+
+``annotate()`` adds the results to a scrape's metric entries:
+
+  - ``entry["windows"] = {"1m": {"p50", "p95", "p99", "count", "span_seconds"}, ...}``
+    on each ``histogram`` entry, and
+  - flat ``<name>_p95_5m``-style entries of type ``histogram_window`` so the
+    windowed percentiles are recorded as history series.
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from .prom_parser import compute_percentiles
+
+WINDOWS: Tuple[Tuple[str, float], ...] = (("1m", 60.0), ("5m", 300.0), ("15m", 900.0))
+
+_BUCKET_MARK = "_bucket_le_"
+_QUANTILES = (("p50", "0.5"), ("p95", "0.95"), ("p99", "0.99"))
+
+
+class _Track:
+    """Reset-adjusted cumulative bucket counts of one histogram over time."""
+
+    __slots__ = ("les", "last_raw", "adjusted", "ring")
+
+    def __init__(self, les: Tuple[float, ...], raw: List[float], ts: float):
+        self.les = les
+        self.last_raw = raw
+        self.adjusted = list(raw)
+        self.ring: Deque[Tuple[float, Tuple[float, ...]]] = deque([(ts, tuple(raw))])
+
+
+class HistogramWindows:
+    """Per-histogram bucket history for windowed percentiles."""
+
+    def __init__(self, windows: Tuple[Tuple[str, float], ...] = WINDOWS):
+        self.windows = windows
+        self._horizon = max(seconds for _, seconds in windows)
+        self._tracks: Dict[str, _Track] = {}
+
+    def clear(self) -> None:
+        self._tracks = {}
+
+    @staticmethod
+    def buckets_from_entries(entries: Dict[str, Dict]) -> Dict[str, List[Tuple[float, float]]]:
+        """Collect ``{base: [(le, cumulative_count), ...]}`` from ``*_bucket_le_*`` entries."""
+        buckets: Dict[str, List[Tuple[float, float]]] = {}
+        for key, entry in entries.items():
+            if not isinstance(entry, dict) or entry.get("type") != "histogram_bucket":
+                continue
+            base, sep, le_str = key.rpartition(_BUCKET_MARK)
+            if not sep:
+                continue
+            try:
+                le = float(le_str)
+            except ValueError:
+                continue
+            value = entry.get("value")
+            if isinstance(value, (int, float)):
+                buckets.setdefault(base, []).append((le, float(value)))
+        return buckets
+
+    def observe(self, ts: float, buckets: Dict[str, List[Tuple[float, float]]]) -> None:
+        """Record one scrape's cumulative buckets per histogram."""
+        for base, pairs in buckets.items():
+            pairs = sorted(pairs)
+            les = tuple(le for le, _ in pairs)
+            raw = [count for _, count in pairs]
+            track = self._tracks.get(base)
+            if track is None or track.les != les:
+                self._tracks[base] = _Track(les, raw, ts)
+                continue
+
+            last = track.last_raw
+            adjusted = track.adjusted
+            if any(cur < prev for cur, prev in zip(raw, last)):
+                # Counter reset: everything counted now happened after the reset
+                for i, cur in enumerate(raw):
+                    adjusted[i] += cur
+            else:
+                for i, cur in enumerate(raw):
+                    adjusted[i] += cur - last[i]
+            track.last_raw = raw
+
+            ring = track.ring
+            ring.append((ts, tuple(adjusted)))
+            # Keep exactly one sample at or before the longest window's start
+            cutoff = ts - self._horizon
+            while len(ring) >= 2 and ring[1][0] <= cutoff:
+                ring.popleft()
+
+    def percentiles(self, base: str, now: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """Return ``{window: {"p50", "p95", "p99", "count", "span_seconds"}}`` for *base*.
+
+        A window longer than the recorded history covers what is available
+        (``span_seconds`` says how much); windows without observations only
+        carry ``count`` = 0.
+        """
+        track = self._tracks.get(base)
+        if track is None or len(track.ring) < 2:
+            return {}
+        ring = track.ring
+        latest_ts, latest = ring[-1]
+        now = latest_ts if now is None else now
+
+        result: Dict[str, Dict[str, float]] = {}
+        for name, seconds in self.windows:
+            cutoff = now - seconds
+            start_ts, start = ring[0]
+            for ts, adjusted in ring:
+                if ts > cutoff:
+                    break
+                start_ts, start = ts, adjusted
+            if start_ts >= latest_ts:
+                continue
+            delta = [max(0.0, cur - prev) for cur, prev in zip(latest, start)]
+            window: Dict[str, float] = {
+                "count": delta[-1] if delta else 0.0,
+                "span_seconds": round(latest_ts - start_ts, 1),
+            }
+            window.update(compute_percentiles(list(zip(track.les, delta))))
+            result[name] = window
+        return result
+
+    def annotate(self, entries: Dict[str, Dict], ts: float) -> None:
+        """Observe the histogram buckets in *entries* and add windowed percentiles to them."""
+        buckets = self.buckets_from_entries(entries)
+        if not buckets:
+            return
+        self.observe(ts, buckets)
+        for base in buckets:
+            windows = self.percentiles(base, ts)
+            if not windows:
+                continue
+            entry = entries.get(base)
+            if isinstance(entry, dict) and entry.get("type") == "histogram":
+                entry["windows"] = windows
+            for window_name, stats in windows.items():
+                for pname, quantile in _QUANTILES:
+                    # None (no observations in the window) replaces a stale value in ``latest``
+                    value = stats.get(pname)
+                    entries[f"{base}_{pname}_{window_name}"] = {
+                        "value": value,
+                        "type": "histogram_window",
+                        "labels": f'quantile="{quantile}",window="{window_name}"',
+                    }
@@ -0,0 +1,190 @@
+"""
+Shared keep-alive HTTP client for all traffic to vLLM backends.
+
+Opening an ``aiohttp.ClientSession`` per call costs a TCP connect (and a TLS
+handshake for remote / LiteLLM backends) on every proxied request, chat
+turn, scrape and health check.  ``UpstreamPool`` keeps one session per
+upstream origin (``scheme://host:port``) whose connector holds idle
+connections open between calls:
+
+  - ``limit_per_host`` caps concurrent connections to one origin;
+    ``host_limits`` overrides it for specific origins,
+  - DNS answers are cached for ``dns_ttl`` seconds,
+  - idle connections are closed after ``keepalive_timeout`` seconds.
+
+Sessions carry no default headers or timeout: callers pass ``headers=`` and
+``timeout=`` per request, exactly as they did with their private sessions.
+The pool is created lazily inside the running loop and closed on app
+shutdown.  ``stats()`` reports requests, connections opened vs. reused, and
+connections in use / idle per origin (``GET /api/http-pool``).
+
+Environment:
+    VLLM_PLAYGROUND_HTTP_LIMIT_PER_HOST   default 100
+    VLLM_PLAYGROUND_HTTP_HOST_LIMITS      e.g. "http://gpu-a:8000=32,https://llm.example.com=8"
+    VLLM_PLAYGROUND_HTTP_KEEPALIVE        seconds, default 30
+    VLLM_PLAYGROUND_HTTP_DNS_TTL          seconds, default 300
+"""
+
+import logging
+import os
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+from .self_metrics import UPSTREAM_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT_PER_HOST = 100
+DEFAULT_KEEPALIVE = 30.0
+DEFAULT_DNS_TTL = 300
+
+
+def origin_of(url: str) -> str:
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    return f"{parts.scheme}://{parts.hostname}:{port}"
+
+
+def _parse_host_limits(spec: str) -> Dict[str, int]:
+    limits = {}
+    for item in spec.split(","):
+        origin, _, value = item.strip().rpartition("=")
+        if not origin:
+            continue
+        try:
+            limits[origin_of(origin)] = int(value)
+        except ValueError:
+            logger.warning(f"Ignoring invalid HTTP host limit: {item!r}")
+    return limits
+
+
+class _OriginStats:
+    __slots__ = ("requests", "opened", "reused", "errors")
+
+    def __init__(self):
+        self.requests = 0
+        self.opened = 0
+        self.reused = 0
+        self.errors = 0
+
+
+class UpstreamPool:
+    """Per-origin ``aiohttp`` sessions with keep-alive connection pools."""
+
+    def __init__(
+        self,
+        limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+        host_limits: Optional[Dict[str, int]] = None,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE,
+        dns_ttl: int = DEFAULT_DNS_TTL,
+    ):
+        self.limit_per_host = limit_per_host
+        self.host_limits = {origin_of(k): v for k, v in (host_limits or {}).items()}
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self._sessions: Dict[str, Any] = {}
+        self._stats: Dict[str, _OriginStats] = {}
+
+    @classmethod
+    def from_env(cls) -> "UpstreamPool":
+        env = os.environ
+        return cls(
+            limit_per_host=int(env.get("VLLM_PLAYGROUND_HTTP_LIMIT_PER_HOST") or DEFAULT_LIMIT_PER_HOST),
+            host_limits=_parse_host_limits(env.get("VLLM_PLAYGROUND_HTTP_HOST_LIMITS", "")),
+            keepalive_timeout=float(env.get("VLLM_PLAYGROUND_HTTP_KEEPALIVE") or DEFAULT_KEEPALIVE),
+            dns_ttl=int(env.get("VLLM_PLAYGROUND_HTTP_DNS_TTL") or DEFAULT_DNS_TTL),
+        )
+
+    def limit_for(self, origin: str) -> int:
+        return self.host_limits.get(origin, self.limit_per_host)
+
+    def session(self, url: str):
+        """The shared session for *url*'s origin (created on first use)."""
+        origin = origin_of(url)
+        session = self._sessions.get(origin)
+        if session is None or session.closed:
+            session = self._sessions[origin] = self._new_session(origin)
+        return session
+
+    def _new_session(self, origin: str):
+        import aiohttp
+
+        stats = self._stats.setdefault(origin, _OriginStats())
+
+        async def on_request_start(session, ctx, params):
+            stats.requests += 1
+
+        async def on_connection_create_end(session, ctx, params):
+            stats.opened += 1
+            UPSTREAM_CONNECTIONS.inc(origin=origin, outcome="opened")
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats.reused += 1
+            UPSTREAM_CONNECTIONS.inc(origin=origin, outcome="reused")
+
+        async def on_request_exception(session, ctx, params):
+            stats.errors += 1
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_request_exception.append(on_request_exception)
+
+        limit = self.limit_for(origin)
+        connector = aiohttp.TCPConnector(
+            limit=limit,
+            limit_per_host=limit,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_ttl,
+            enable_cleanup_closed=origin.startswith("https:"),
+        )
+        # No session-wide timeout: every caller passes its own
+        return aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=None), trace_configs=[trace]
+        )
+
+    def request(self, method: str, url: str, **kwargs):
+        """``session.request`` on the shared session for *url*; use as ``async with``."""
+        return self.session(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        origins = {}
+        for origin, s in self._stats.items():
+            session = self._sessions.get(origin)
+            connector = session.connector if session is not None and not session.closed else None
+            # aiohttp exposes no public counters for pooled connections
+            in_use = len(getattr(connector, "_acquired", ())) if connector else 0
+            idle = sum(len(c) for c in getattr(connector, "_conns", {}).values()) if connector else 0
+            origins[origin] = {
+                "requests": s.requests,
+                "connections_opened": s.opened,
+                "connections_reused": s.reused,
+                "reuse_ratio": round(s.reused / (s.opened + s.reused), 3) if s.opened + s.reused else None,
+                "errors": s.errors,
+                "in_use": in_use,
+                "idle": idle,
+                "limit": self.limit_for(origin),
+                "open": connector is not None,
+            }
+        return {
+            "limit_per_host": self.limit_per_host,
+            "keepalive_timeout": self.keepalive_timeout,
+            "dns_ttl": self.dns_ttl,
+            "origins": origins,
+        }
+
+    async def close(self) -> None:
+        sessions, self._sessions = self._sessions, {}
+        for session in sessions.values():
+            if not session.closed:
+                await session.close()
+
+
+upstream_pool = UpstreamPool.from_env()
@@ -0,0 +1,225 @@
+"""
+Replica selection for the ``/v1`` gateway.
+
+``_v1_proxy`` asks ``LoadBalancer.choose`` which of the healthy backends
+serving a model gets the request, and brackets the upstream call with
+``acquire`` / ``release`` so the balancer knows how many requests each
+backend has outstanding through this gateway.
+
+Strategies (``STRATEGIES``):
+
+  - ``round_robin``: rotate through the replicas, per model.
+  - ``least_outstanding``: fewest requests in flight through the proxy;
+    ties rotate like round robin.
+  - ``power_of_two``: sample two replicas at random, take the one with
+    fewer requests in flight (cheap, avoids herding on one "best" replica
+    when several gateways share the backends).
+  - ``queue_aware``: uses each replica's last scraped
+    ``vllm:num_requests_waiting`` and ``vllm:kv_cache_usage_perc`` (via
+    ``load_fn``).  Replicas whose KV cache is above ``kv_high_watermark``
+    are avoided while others are available; the rest are ranked by their
+    request count, then KV cache usage.  Without scraped metrics it
+    degrades to ``least_outstanding``.
+  - ``prefix_affinity``: requests sharing a prompt prefix go to the same
+    replica (consistent hashing with bounded loads, see
+    ``prefix_affinity``) so vLLM's prefix cache hits; requests without a
+    prefix key fall back to ``least_outstanding``.
+
+A replica's request count is the larger of its scraped running + waiting
+requests (which include traffic that bypasses this gateway, but lag by up
+to one scrape interval) and the proxy's own in-flight count (current, but
+blind to other clients).
+"""
+
+import itertools
+import logging
+import random
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from .prefix_affinity import DEFAULT_LOAD_FACTOR, AffinityStats, HashRing
+from .self_metrics import PROXY_BACKEND_IN_FLIGHT
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("round_robin", "least_outstanding", "power_of_two", "queue_aware", "prefix_affinity")
+DEFAULT_STRATEGY = "round_robin"
+
+# load_fn(backend_id) -> {"waiting": float, "running": float, "kv_cache": 0..1} or None when unknown
+LoadFn = Callable[[str], Optional[Dict[str, float]]]
+
+
+class LoadBalancer:
+    """Picks a replica per request and tracks requests in flight per backend."""
+
+    def __init__(
+        self,
+        strategy: str = DEFAULT_STRATEGY,
+        load_fn: Optional[LoadFn] = None,
+        kv_high_watermark: float = 0.9,
+        load_factor: float = DEFAULT_LOAD_FACTOR,
+        rng: Optional[random.Random] = None,
+    ):
+        self.strategy = strategy
+        self.load_fn = load_fn
+        self.kv_high_watermark = kv_high_watermark
+        self.load_factor = load_factor
+        self.affinity = AffinityStats()
+        self._rings: Dict[str, HashRing] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.picks: Dict[str, int] = {}
+        self._rr: Dict[str, itertools.count] = {}
+        self._rng = rng or random.Random()
+
+    @property
+    def strategy(self) -> str:
+        return self._strategy
+
+    @strategy.setter
+    def strategy(self, name: str) -> None:
+        if name not in STRATEGIES:
+            raise ValueError(f"Unknown balancing strategy '{name}' (choose from {', '.join(STRATEGIES)})")
+        self._strategy = name
+
+    # -- Selection ----------------------------------------------------------------
+
+    @property
+    def needs_prefix(self) -> bool:
+        """Whether ``choose`` uses the request's prefix key (so the caller should compute it)."""
+        return self._strategy == "prefix_affinity"
+
+    def choose(
+        self,
+        key: str,
+        candidates: Sequence[Any],
+        strategy: Optional[str] = None,
+        prefix: Optional[int] = None,
+        replicas: Optional[Sequence[Any]] = None,
+    ) -> Any:
+        """Pick one of *candidates* (objects with an ``id``) for a request on *key* (the model).
+
+        *prefix* is the request's ``prefix_affinity.prefix_key`` and *replicas*
+        all healthy replicas of the model (default: *candidates*), both used by
+        ``prefix_affinity``: the ring spans *replicas*, so a prefix keeps its
+        owner while that replica is temporarily not a candidate.
+        """
+        if len(candidates) == 1:
+            chosen = candidates[0]
+        else:
+            chosen = _SELECTORS[strategy or self._strategy](self, key, candidates, prefix, replicas)
+        self.picks[chosen.id] = self.picks.get(chosen.id, 0) + 1
+        return chosen
+
+    def _rotation(self, key: str, candidates: Sequence[Any]) -> Sequence[Any]:
+        counter = self._rr.get(key)
+        if counter is None:
+            counter = self._rr[key] = itertools.count()
+        start = next(counter) % len(candidates)
+        return list(candidates[start:]) + list(candidates[:start])
+
+    def _round_robin(
+        self,
+        key: str,
+        candidates: Sequence[Any],
+        prefix: Optional[int] = None,
+        replicas: Optional[Sequence[Any]] = None,
+    ) -> Any:
+        return self._rotation(key, candidates)[0]
+
+    def _least_outstanding(
+        self,
+        key: str,
+        candidates: Sequence[Any],
+        prefix: Optional[int] = None,
+        replicas: Optional[Sequence[Any]] = None,
+    ) -> Any:
+        return min(self._rotation(key, candidates), key=lambda e: self.in_flight.get(e.id, 0))
+
+    def _power_of_two(
+        self,
+        key: str,
+        candidates: Sequence[Any],
+        prefix: Optional[int] = None,
+        replicas: Optional[Sequence[Any]] = None,
+    ) -> Any:
+        a, b = self._rng.sample(list(candidates), 2)
+        return a if self.in_flight.get(a.id, 0) <= self.in_flight.get(b.id, 0) else b
+
+    def _queue_aware(
+        self,
+        key: str,
+        candidates: Sequence[Any],
+        prefix: Optional[int] = None,
+        replicas: Optional[Sequence[Any]] = None,
+    ) -> Any:
+        loads = {e.id: self.load_fn(e.id) if self.load_fn else None for e in candidates}
+        if not any(loads.values()):
+            return self._least_outstanding(key, candidates)
+
+        def score(entry):
+            load = loads[entry.id] or {}
+            kv = load.get("kv_cache") or 0.0
+            scraped = (load.get("waiting") or 0.0) + (load.get("running") or 0.0)
+            return (kv >= self.kv_high_watermark, max(scraped, self.in_flight.get(entry.id, 0)), kv)
+
+        return min(self._rotation(key, candidates), key=score)
+
+    def _prefix_affinity(
+        self,
+        key: str,
+        candidates: Sequence[Any],
+        prefix: Optional[int] = None,
+        replicas: Optional[Sequence[Any]] = None,
+    ) -> Any:
+        if prefix is None:
+            return self._least_outstanding(key, candidates)
+        by_id = {e.id: e for e in candidates}
+        # The ring follows the model's healthy replicas, not the admission room set, so
+        # it is only rebuilt when a replica joins or leaves
+        ids = tuple(sorted(by_id.keys() | {e.id for e in replicas or ()}))
+        ring = self._rings.get(key)
+        if ring is None or ring.replica_ids != ids:
+            ring = self._rings[key] = HashRing(ids)
+        replica_id, is_owner = ring.lookup(prefix, self.in_flight, self.load_factor, allowed=by_id.keys())
+        self.affinity.record(replica_id, prefix, is_owner)
+        return by_id[replica_id]
+
+    # -- In-flight accounting -------------------------------------------------------
+
+    def acquire(self, backend_id: str) -> None:
+        self.in_flight[backend_id] = self.in_flight.get(backend_id, 0) + 1
+        PROXY_BACKEND_IN_FLIGHT.inc(backend=backend_id)
+
+    def release(self, backend_id: str) -> None:
+        n = self.in_flight.get(backend_id, 0) - 1
+        if n > 0:
+            self.in_flight[backend_id] = n
+        else:
+            self.in_flight.pop(backend_id, None)
+        PROXY_BACKEND_IN_FLIGHT.dec(backend=backend_id)
+
+    def forget(self, backend_id: str) -> None:
+        """Drop counters of a removed backend."""
+        self.in_flight.pop(backend_id, None)
+        self.picks.pop(backend_id, None)
+        self.affinity.forget(backend_id)
+        PROXY_BACKEND_IN_FLIGHT.remove(backend=backend_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        backends = {}
+        for backend_id in sorted(set(self.picks) | set(self.in_flight)):
+            backends[backend_id] = {
+                "in_flight": self.in_flight.get(backend_id, 0),
+                "picks": self.picks.get(backend_id, 0),
+                "load": self.load_fn(backend_id) if self.load_fn else None,
+                "affinity": self.affinity.to_dict(backend_id),
+            }
+        return {"strategy": self._strategy, "strategies": list(STRATEGIES), "backends": backends}
+
+
+_SELECTORS = {
+    "round_robin": LoadBalancer._round_robin,
+    "least_outstanding": LoadBalancer._least_outstanding,
+    "power_of_two": LoadBalancer._power_of_two,
+    "queue_aware": LoadBalancer._queue_aware,
+    "prefix_affinity": LoadBalancer._prefix_affinity,
+}
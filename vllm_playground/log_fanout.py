@@ -0,0 +1,349 @@
+"""
+Fan-out of vLLM log lines to ``/ws/logs`` clients.
+
+``broadcast_log`` used to await ``send_text`` on every WebSocket in turn for
+every line, so one slow browser tab throttled log ingestion for all
+instances (and the subprocess / container readers calling it).  The
+``LogFanout`` hub decouples the two sides:
+
+  - ``publish()`` is synchronous and never blocks: it JSON-encodes the line
+    once and appends it to each client's bounded queue.
+  - Each client has its own writer task that coalesces queued lines into one
+    frame every ``flush_interval`` seconds (or as soon as ``max_batch``
+    lines are waiting):
+
+        {"type": "batch", "skipped": 0,
+         "lines": [{"instance_id": "...", "message": "...", "offset": 123}, ...]}
+
+``offset`` is the line's position in the instance's durable log (see
+``log_store``); it is omitted for lines not tied to an instance.
+
+Subscriptions: a new client receives every stream, as before.  Once it sends
+a ``subscribe`` message it receives only the streams it subscribed to::
+
+    {"type": "subscribe", "instance_ids": ["abc123", "__global__"],
+     "levels": ["WARNING", "ERROR"], "prefixes": ["[BENCHMARK]"],
+     "exclude_prefixes": ["[GUIDELLM]"], "replace": true}
+    {"type": "unsubscribe", "instance_ids": ["abc123"]}
+
+``__global__`` is the stream of lines not tied to an instance and ``*``
+matches every stream.  The optional filters apply to the listed streams;
+``replace`` drops all other subscriptions first.  The server answers with
+``{"type": "subscriptions", "streams": {...}}`` (or ``{"type": "error"}``).
+``publish()`` looks up the interested clients per stream, so a line nobody
+subscribed to is never encoded.
+
+Slow-consumer policy: a client whose queue is full loses its *oldest*
+queued lines (the newest output is what a log view needs).  The number of
+lines dropped is reported in the ``skipped`` field of the client's next
+frame and counted in the playground's own metrics.  A client whose send
+fails is removed.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Set
+
+from .log_search import LEVELS, detect_level, parse_levels
+from .self_metrics import LOG_BROADCAST_SEND_ERRORS, LOG_FRAMES_SENT, LOG_LINES_DROPPED
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 0.05  # seconds
+MAX_BATCH = 256  # lines per frame
+MAX_QUEUE = 5000  # lines buffered per client before dropping
+
+GLOBAL_STREAM = "__global__"  # lines published without an instance_id
+ALL_STREAMS = "*"
+
+
+def encode_line(instance_id: Optional[str], message: str, offset: Optional[int] = None) -> str:
+    if offset is None:
+        return json.dumps({"instance_id": instance_id, "message": message})
+    return json.dumps({"instance_id": instance_id, "message": message, "offset": offset})
+
+
+class LogFilter:
+    """Per-stream line filter of one subscription."""
+
+    __slots__ = ("levels", "prefixes", "exclude_prefixes")
+
+    def __init__(
+        self,
+        levels: Optional[Set[str]] = None,
+        prefixes: Sequence[str] = (),
+        exclude_prefixes: Sequence[str] = (),
+    ):
+        self.levels = {LEVELS.index(name) for name in levels} if levels else None
+        self.prefixes = tuple(prefixes)
+        self.exclude_prefixes = tuple(exclude_prefixes)
+
+    @classmethod
+    def from_message(cls, data: Dict[str, Any]) -> Optional["LogFilter"]:
+        """Filter from a subscribe message; None when it filters nothing.  Raises ValueError."""
+        levels = data.get("levels")
+        if isinstance(levels, list):
+            levels = ",".join(str(level) for level in levels)
+        prefixes = data.get("prefixes") or []
+        exclude_prefixes = data.get("exclude_prefixes") or []
+        if not all(isinstance(p, str) for p in (*prefixes, *exclude_prefixes)):
+            raise ValueError("prefixes must be strings")
+        parsed = parse_levels(levels)
+        if not parsed and not prefixes and not exclude_prefixes:
+            return None
+        return cls(parsed, prefixes, exclude_prefixes)
+
+    @property
+    def needs_level(self) -> bool:
+        return self.levels is not None
+
+    def accepts(self, message: str, level: Optional[int]) -> bool:
+        if self.prefixes and not message.startswith(self.prefixes):
+            return False
+        if self.exclude_prefixes and message.startswith(self.exclude_prefixes):
+            return False
+        return self.levels is None or level in self.levels
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "levels": sorted(LEVELS[code] for code in self.levels) if self.levels else None,
+            "prefixes": list(self.prefixes),
+            "exclude_prefixes": list(self.exclude_prefixes),
+        }
+
+
+class LogClient:
+    """One ``/ws/logs`` connection: bounded line queue plus its writer task."""
+
+    def __init__(self, websocket: Any, hub: "LogFanout"):
+        self.websocket = websocket
+        self._hub = hub
+        self.streams: Dict[str, Optional[LogFilter]] = {ALL_STREAMS: None}
+        self.subscribed = False  # True once the client chose its streams
+        self.queue: Deque[str] = deque()
+        self.control: Deque[str] = deque()  # subscription replies, sent ahead of queued lines
+        self.skipped = 0  # dropped since the last frame
+        self.dropped_total = 0
+        self.frames_sent = 0
+        self.lines_sent = 0
+        self._ready = asyncio.Event()
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def push(self, encoded: str) -> None:
+        queue = self.queue
+        if len(queue) >= self._hub.max_queue:
+            queue.popleft()
+            self.skipped += 1
+            self.dropped_total += 1
+            LOG_LINES_DROPPED.inc()
+        queue.append(encoded)
+        self._ready.set()
+        if len(queue) >= self._hub.max_batch:
+            self._full.set()
+
+    def push_control(self, frame: Dict[str, Any]) -> None:
+        self.control.append(json.dumps(frame))
+        self._ready.set()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._writer())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _next_frame(self) -> str:
+        queue = self.queue
+        n = min(len(queue), self._hub.max_batch)
+        lines = [queue.popleft() for _ in range(n)]
+        skipped, self.skipped = self.skipped, 0
+        if not queue and not self.control:
+            self._ready.clear()
+        if len(queue) < self._hub.max_batch:
+            self._full.clear()
+        self.lines_sent += n
+        return '{"type": "batch", "skipped": %d, "lines": [%s]}' % (skipped, ", ".join(lines))
+
+    async def _writer(self) -> None:
+        hub = self._hub
+        try:
+            while True:
+                await self._ready.wait()
+                while self.control:
+                    await self.websocket.send_text(self.control.popleft())
+                if not self.queue:
+                    self._ready.clear()
+                    continue
+                if len(self.queue) < hub.max_batch:
+                    # Give more lines a chance to join this frame
+                    try:
+                        await asyncio.wait_for(self._full.wait(), hub.flush_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                await self.websocket.send_text(self._next_frame())
+                self.frames_sent += 1
+                LOG_FRAMES_SENT.inc()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"Log WebSocket send failed, dropping client: {e}")
+            LOG_BROADCAST_SEND_ERRORS.inc()
+            hub.discard(self.websocket)
+
+
+class LogFanout:
+    """Hub holding every ``/ws/logs`` client."""
+
+    def __init__(self, flush_interval: float = FLUSH_INTERVAL, max_batch: int = MAX_BATCH, max_queue: int = MAX_QUEUE):
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self._clients: Dict[int, LogClient] = {}
+        self._streams: Dict[str, Dict[int, LogClient]] = {}  # stream -> subscribed clients
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def add(self, websocket: Any) -> LogClient:
+        client = LogClient(websocket, self)
+        self._clients[id(websocket)] = client
+        self._streams.setdefault(ALL_STREAMS, {})[id(websocket)] = client
+        client.start()
+        return client
+
+    def discard(self, websocket: Any) -> Optional[LogClient]:
+        """Forget a client without waiting for its writer (safe from inside the writer)."""
+        client = self._clients.pop(id(websocket), None)
+        if client is not None:
+            for stream in client.streams:
+                self._unlink(stream, id(websocket))
+        return client
+
+    def _unlink(self, stream: str, key: int) -> None:
+        members = self._streams.get(stream)
+        if members is not None:
+            members.pop(key, None)
+            if not members:
+                del self._streams[stream]
+
+    def subscribe(
+        self,
+        websocket: Any,
+        streams: Sequence[str],
+        line_filter: Optional[LogFilter] = None,
+        replace: bool = False,
+    ) -> None:
+        """Add (or update the filter of) *streams* for a client.
+
+        The first subscribe of a client, or one with *replace*, drops the
+        streams it had before, including the implicit ``*`` of a new client.
+        """
+        client = self._clients.get(id(websocket))
+        if client is None:
+            return
+        key = id(websocket)
+        if replace or not client.subscribed:
+            for stream in client.streams:
+                self._unlink(stream, key)
+            client.streams = {}
+            client.subscribed = True
+        for stream in streams:
+            client.streams[stream] = line_filter
+            self._streams.setdefault(stream, {})[key] = client
+
+    def unsubscribe(self, websocket: Any, streams: Sequence[str]) -> None:
+        client = self._clients.get(id(websocket))
+        if client is None:
+            return
+        client.subscribed = True
+        for stream in streams:
+            if client.streams.pop(stream, 0) != 0:
+                self._unlink(stream, id(websocket))
+
+    def handle_message(self, websocket: Any, text: str) -> None:
+        """Apply a client's ``subscribe`` / ``unsubscribe`` message and queue the reply.
+
+        Anything that is not a JSON object with one of those types (e.g. a
+        keep-alive ping) is ignored.
+        """
+        client = self._clients.get(id(websocket))
+        if client is None:
+            return
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return
+        if not isinstance(data, dict) or data.get("type") not in ("subscribe", "unsubscribe"):
+            return
+        streams = data.get("instance_ids")
+        if isinstance(streams, str):
+            streams = [streams]
+        try:
+            if not isinstance(streams, list) or not all(isinstance(s, str) and s for s in streams):
+                raise ValueError("instance_ids must be a list of instance ids")
+            if data["type"] == "subscribe":
+                self.subscribe(websocket, streams, LogFilter.from_message(data), bool(data.get("replace")))
+            else:
+                self.unsubscribe(websocket, streams)
+        except ValueError as e:
+            client.push_control({"type": "error", "detail": str(e)})
+            return
+        client.push_control(
+            {
+                "type": "subscriptions",
+                "streams": {s: (f.to_dict() if f else None) for s, f in client.streams.items()},
+            }
+        )
+
+    async def remove(self, websocket: Any) -> None:
+        client = self.discard(websocket)
+        if client is not None:
+            await client.stop()
+
+    def publish(self, instance_id: Optional[str], message: str, offset: Optional[int] = None) -> None:
+        """Queue one line for every interested client; never waits on a socket."""
+        stream = instance_id or GLOBAL_STREAM
+        direct = self._streams.get(stream)
+        wildcard = self._streams.get(ALL_STREAMS)
+        if not direct and not wildcard:
+            return
+        encoded = None
+        level = None
+        for members, key in ((direct, stream), (wildcard, ALL_STREAMS)):
+            if not members:
+                continue
+            for client in list(members.values()):
+                if key == ALL_STREAMS and direct and id(client.websocket) in direct:
+                    continue  # the stream's own subscription (and filter) wins
+                line_filter = client.streams.get(key)
+                if line_filter is not None:
+                    if level is None and line_filter.needs_level:
+                        level = detect_level(message)
+                    if not line_filter.accepts(message, level):
+                        continue
+                if encoded is None:
+                    encoded = encode_line(instance_id, message, offset)
+                client.push(encoded)
+
+    def send_to(self, websocket: Any, instance_id: Optional[str], message: str) -> None:
+        """Queue one line for a single client (greeting, keep-alive)."""
+        client = self._clients.get(id(websocket))
+        if client is not None:
+            client.push(encode_line(instance_id, message))
+
+    def clients(self) -> List[LogClient]:
+        return list(self._clients.values())
+
+    async def close(self) -> None:
+        clients, self._clients = self._clients, {}
+        self._streams = {}
+        for client in clients.values():
+            await client.stop()
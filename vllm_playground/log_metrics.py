@@ -0,0 +1,132 @@
+"""
+Metric extraction from vLLM log lines.
+
+When ``/metrics`` cannot be scraped, the dashboard falls back to the periodic
+stat lines vLLM prints, e.g.::
+
+    Engine 000: Avg prompt throughput: 1.0 tokens/s, Avg generation throughput: 9.5 tokens/s,
+    Running: 2 reqs, Waiting: 0 reqs, GPU KV cache usage: 1.2%, Prefix cache hit rate: 50.0%
+
+Every log line of the active instance passes through here, and nearly all of
+them are not stat lines, so extraction is table-driven with a cheap gate:
+
+  - each ``LogExtractor`` declares trigger ``keywords`` (plain, case-sensitive
+    substrings as vLLM prints them) and ``fields`` (key, precompiled pattern);
+  - ``ExtractorRegistry`` checks each distinct keyword with ``in`` on the raw
+    line (no lowercasing, no regex); only extractors whose keyword is present
+    run their patterns.
+
+Keys are the flat legacy names understood by ``MetricStore.ingest_log_parsed``
+(percentages stay 0-100 there).  Extra extractors can be added with
+``EXTRACTORS.register(...)``.
+"""
+
+import re
+from typing import Dict, Iterable, List, Pattern, Sequence, Tuple
+
+
+class LogExtractor:
+    """One family of stat-line fields sharing trigger keywords."""
+
+    __slots__ = ("name", "keywords", "fields")
+
+    def __init__(self, name: str, keywords: Sequence[str], fields: Sequence[Tuple[str, str]]):
+        self.name = name
+        self.keywords = tuple(keywords)
+        self.fields: Tuple[Tuple[str, Pattern], ...] = tuple((key, re.compile(pattern)) for key, pattern in fields)
+
+    def extract(self, message: str, out: Dict[str, float]) -> None:
+        for key, pattern in self.fields:
+            m = pattern.search(message)
+            if m:
+                try:
+                    out[key] = float(m.group(1))
+                except ValueError:
+                    pass
+
+
+class ExtractorRegistry:
+    """Keyword-gated dispatch over registered extractors."""
+
+    def __init__(self, extractors: Iterable[LogExtractor] = ()):
+        self._extractors: List[LogExtractor] = []
+        self._dispatch: Tuple[Tuple[str, Tuple[LogExtractor, ...]], ...] = ()
+        for extractor in extractors:
+            self.register(extractor)
+
+    def register(self, extractor: LogExtractor) -> None:
+        self._extractors = [e for e in self._extractors if e.name != extractor.name] + [extractor]
+        by_keyword: Dict[str, List[LogExtractor]] = {}
+        for e in self._extractors:
+            for keyword in e.keywords:
+                by_keyword.setdefault(keyword, []).append(e)
+        self._dispatch = tuple((k, tuple(v)) for k, v in by_keyword.items())
+
+    @property
+    def extractors(self) -> List[LogExtractor]:
+        return list(self._extractors)
+
+    def extract(self, message: str) -> Dict[str, float]:
+        """Return ``{key: value}`` for every field found in *message* (empty for ordinary lines)."""
+        out: Dict[str, float] = {}
+        done = None
+        for keyword, extractors in self._dispatch:
+            if keyword not in message:
+                continue
+            for extractor in extractors:
+                if done is None:
+                    done = {extractor.name}
+                elif extractor.name in done:
+                    continue
+                else:
+                    done.add(extractor.name)
+                extractor.extract(message, out)
+        return out
+
+
+DEFAULT_EXTRACTORS = (
+    LogExtractor(
+        "throughput",
+        ("throughput",),
+        (
+            ("avg_prompt_throughput", r"Avg prompt throughput:\s+([\d.]+)\s+tokens/s"),
+            ("avg_generation_throughput", r"Avg generation throughput:\s+([\d.]+)\s+tokens/s"),
+        ),
+    ),
+    LogExtractor(
+        "scheduler",
+        ("Running:",),
+        (
+            ("num_requests_running", r"Running:\s+(\d+)\s+reqs"),
+            ("num_requests_waiting", r"Waiting:\s+(\d+)\s+reqs"),
+            ("num_requests_waiting", r"Pending:\s+(\d+)\s+reqs"),  # vLLM V0 name
+            ("num_requests_swapped", r"Swapped:\s+(\d+)\s+reqs"),
+        ),
+    ),
+    LogExtractor(
+        "kv_cache",
+        ("cache usage",),
+        (
+            # V0 prints "GPU KV cache usage" before "CPU KV cache usage"; the first hit is the GPU one
+            ("kv_cache_usage_perc", r"cache usage[:\s]+([\d.]+)\s*%"),
+            ("cpu_cache_usage_perc", r"CPU KV cache usage[:\s]+([\d.]+)\s*%"),
+        ),
+    ),
+    LogExtractor(
+        "prefix_cache",
+        ("hit rate",),
+        (("prefix_cache_hit_rate", r"hit rate[:\s]+([\d.]+)\s*%"),),
+    ),
+    LogExtractor(
+        "spec_decode",
+        ("SpecDecoding",),
+        (("spec_decode_acceptance_rate", r"Draft acceptance rate:\s+([\d.]+)%"),),
+    ),
+    LogExtractor(
+        "preemption",
+        ("preempted",),
+        (("num_preemptions", r"total_num_cumulative_preemption=(\d+)"),),
+    ),
+)
+
+EXTRACTORS = ExtractorRegistry(DEFAULT_EXTRACTORS)
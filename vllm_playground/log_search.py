@@ -0,0 +1,499 @@
+"""
+Indexed search over instance logs.
+
+Lines are indexed as ``broadcast_log`` archives them (see ``log_store``), so
+a search for e.g. ``CUDA out of memory`` over millions of lines reads only
+the few places that can match instead of every line.
+
+Index layout per instance (all addressed by durable log offset):
+
+  - lines are grouped into *blocks* of ``BLOCK_LINES`` consecutive offsets
+    and blocks into *chunks* of ``CHUNK_BLOCKS`` blocks;
+  - each chunk keeps token postings (lowercase ``[a-z0-9_]`` word ->
+    ascending block numbers within the chunk), a level bit mask and the
+    first / last timestamp per block, and one level byte per line;
+  - the index covers at most ``max_lines`` of the newest lines; older
+    chunks are dropped whole.
+
+A query is reduced to literal fragments (the substring itself, or the
+literal runs a regex requires), and each fragment to word tokens.  A token
+in the middle of a fragment must be a whole line token (postings lookup);
+one at a fragment's edge may be a suffix / prefix of a line token, so the
+chunk vocabulary is scanned for it.  Candidate blocks are the intersection
+of all tokens' postings, narrowed by the level mask and time range; only
+their lines are read back from the store and matched.
+
+Levels come from the usual prefixes (``INFO 01-01 ...``, ``(APIServer
+pid=1) WARNING ...``, ``ERROR:  ...``); tracebacks and ``...Error:`` lines
+count as ERROR and other lines inherit the level of the line before them.
+
+The index is in memory only.  After a restart it is rebuilt from the store
+on the first search of each instance.  Store reads (backfill batches and
+candidate blocks) run in a worker thread; the index itself is only changed
+on the event loop.
+"""
+
+import asyncio
+import re
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .log_store import LogArchive, LogStore
+
+BLOCK_LINES = 64
+CHUNK_BLOCKS = 1024
+CHUNK_LINES = BLOCK_LINES * CHUNK_BLOCKS
+MAX_INDEXED_LINES = 1_000_000
+BACKFILL_BATCH = 4096
+READ_BATCH_BLOCKS = 16  # candidate blocks read per worker-thread hop
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+_LEVEL_CODE = {name: i for i, name in enumerate(LEVELS)}
+_LEVEL_ALIASES = {"WARN": "WARNING", "FATAL": "CRITICAL"}
+_INFO = _LEVEL_CODE["INFO"]
+
+_LEVEL_PREFIX = re.compile(r"(?:\([^)]{0,64}\)\s*)?(DEBUG|INFO|WARNING|WARN|ERROR|CRITICAL|FATAL)\b")
+_ERROR_LINE = re.compile(r"Traceback \(most recent call last\)|[\w.]*(?:Error|Exception)\b:")
+# Tokens are runs of [a-z0-9_] (and non-ASCII characters) in the lowercased text;
+# str.translate + split is about twice as fast as re.findall here
+_NON_WORD = str.maketrans({c: " " for c in map(chr, range(128)) if not (c.isalnum() or c == "_")})
+_MIN_EDGE_TOKEN = 3
+
+
+def parse_levels(value: Optional[str]) -> Optional[Set[str]]:
+    """``"error,warn"`` -> ``{"ERROR", "WARNING"}``; raises ValueError on unknown names."""
+    if not value:
+        return None
+    levels = set()
+    for name in value.split(","):
+        name = name.strip().upper()
+        if not name:
+            continue
+        name = _LEVEL_ALIASES.get(name, name)
+        if name not in _LEVEL_CODE:
+            raise ValueError(f"unknown log level {name!r} (expected one of {', '.join(LEVELS)})")
+        levels.add(name)
+    return levels or None
+
+
+def detect_level(message: str, previous: int = _INFO) -> int:
+    """Level code of *message*; lines without a level marker inherit *previous*."""
+    m = _LEVEL_PREFIX.match(message)
+    if m:
+        name = m.group(1)
+        return _LEVEL_CODE[_LEVEL_ALIASES.get(name, name)]
+    if _ERROR_LINE.match(message):
+        return _LEVEL_CODE["ERROR"]
+    return previous
+
+
+# -- Query planning -----------------------------------------------------------
+
+
+def regex_fragments(pattern: str) -> List[str]:
+    """Literal runs every match of *pattern* must contain (conservative).
+
+    Only text outside groups and classes counts; a top-level ``|`` means
+    nothing is required.  A character followed by ``?``, ``*`` or ``{`` is
+    optional and ends the run.
+    """
+    fragments: List[str] = []
+    run: List[str] = []
+    depth = 0
+    i = 0
+    n = len(pattern)
+
+    def cut():
+        if run:
+            fragments.append("".join(run))
+            run.clear()
+
+    while i < n:
+        c = pattern[i]
+        if c == "\\" and i + 1 < n:
+            nxt = pattern[i + 1]
+            i += 2
+            if depth or nxt.isalnum():  # \d, \w, \b, backreferences ...
+                cut()
+                continue
+            char = nxt
+        elif c == "[":
+            cut()
+            j = i + 1
+            if j < n and pattern[j] == "^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 2 if pattern[j] == "\\" else 1
+            i = j + 1
+            continue
+        elif c == "(":
+            cut()
+            depth += 1
+            i += 1
+            continue
+        elif c == ")":
+            depth = max(depth - 1, 0)
+            i += 1
+            continue
+        elif c == "|":
+            if depth == 0:
+                return []
+            i += 1
+            continue
+        elif c in ".^$+":
+            cut()
+            i += 1
+            continue
+        elif c in "?*{":
+            cut()
+            i += 1
+            if c == "{":
+                while i < n and pattern[i] != "}":
+                    i += 1
+                i += 1
+            continue
+        else:
+            char = c
+            i += 1
+        if depth:
+            continue
+        # A quantifier makes this character optional
+        if i < n and pattern[i] in "?*{":
+            cut()
+            continue
+        run.append(char)
+    cut()
+    return fragments
+
+
+def fragment_terms(fragment: str) -> List[Tuple[str, bool, bool]]:
+    """``(token, open_left, open_right)`` per word token of a literal fragment.
+
+    An open side means the token touches the fragment's edge there, so the
+    line token may extend beyond it.
+    """
+    text = fragment.lower().translate(_NON_WORD)
+    tokens = text.split()
+    terms = []
+    for i, token in enumerate(tokens):
+        open_left = i == 0 and not text.startswith(" ")
+        open_right = i == len(tokens) - 1 and not text.endswith(" ")
+        if (open_left or open_right) and len(token) < _MIN_EDGE_TOKEN:
+            continue  # too short to narrow anything down
+        terms.append((token, open_left, open_right))
+    return terms
+
+
+class _Chunk:
+    """Index of ``CHUNK_LINES`` consecutive offsets starting at ``base``."""
+
+    __slots__ = ("base", "count", "postings", "block_levels", "block_first_ts", "block_last_ts", "line_levels")
+
+    def __init__(self, base: int):
+        self.base = base
+        self.count = 0
+        self.postings: Dict[str, array] = {}
+        self.block_levels = bytearray()
+        self.block_first_ts = array("d")
+        self.block_last_ts = array("d")
+        self.line_levels = bytearray()
+
+    @property
+    def end(self) -> int:
+        return self.base + self.count
+
+    @property
+    def first_ts(self) -> float:
+        return self.block_first_ts[0] if self.block_first_ts else 0.0
+
+    @property
+    def last_ts(self) -> float:
+        return self.block_last_ts[-1] if self.block_last_ts else 0.0
+
+    def extend(self, lines: Sequence[Tuple[float, str]], levels: Sequence[int]) -> None:
+        """Index consecutive lines (at most the chunk's remaining room)."""
+        postings = self.postings
+        i = 0
+        while i < len(lines):
+            local = self.count
+            block = local // BLOCK_LINES
+            n = min(len(lines) - i, (block + 1) * BLOCK_LINES - local)
+            part = lines[i : i + n]
+            part_levels = levels[i : i + n]
+            if block == len(self.block_levels):
+                self.block_levels.append(0)
+                self.block_first_ts.append(part[0][0])
+                self.block_last_ts.append(part[0][0])
+            mask = 0
+            for level in set(part_levels):
+                mask |= 1 << level
+            self.block_levels[block] |= mask
+            self.block_last_ts[block] = part[-1][0]
+            self.line_levels.extend(part_levels)
+            # One tokenizer pass per block slice; repeated words collapse before touching postings
+            text = "\n".join([message for _, message in part]).lower().translate(_NON_WORD)
+            for token in set(text.split()):
+                blocks = postings.get(token)
+                if blocks is None:
+                    postings[token] = array("H", (block,))
+                elif blocks[-1] != block:
+                    blocks.append(block)
+            self.count = local + n
+            i += n
+
+    def term_blocks(self, token: str, open_left: bool, open_right: bool) -> Set[int]:
+        if not open_left and not open_right:
+            return set(self.postings.get(token, ()))
+        if open_left and open_right:
+            keys = [k for k in self.postings if token in k]
+        elif open_left:
+            keys = [k for k in self.postings if k.endswith(token)]
+        else:
+            keys = [k for k in self.postings if k.startswith(token)]
+        out: Set[int] = set()
+        for key in keys:
+            out.update(self.postings[key])
+        return out
+
+    def candidate_blocks(
+        self,
+        terms: Sequence[Tuple[str, bool, bool]],
+        level_mask: int,
+        from_ts: Optional[float],
+        to_ts: Optional[float],
+    ) -> List[int]:
+        """Block numbers (within the chunk) that may hold a match, newest first."""
+        blocks: Optional[Set[int]] = None
+        for term in terms:
+            found = self.term_blocks(*term)
+            blocks = found if blocks is None else blocks & found
+            if not blocks:
+                return []
+        order = sorted(blocks, reverse=True) if blocks is not None else range(len(self.block_levels) - 1, -1, -1)
+        out = []
+        for block in order:
+            if level_mask and not self.block_levels[block] & level_mask:
+                continue
+            if from_ts is not None and self.block_last_ts[block] < from_ts:
+                continue
+            if to_ts is not None and self.block_first_ts[block] > to_ts:
+                continue
+            out.append(block)
+        return out
+
+
+class LogIndex:
+    """Token / level / time index over the newest lines of one instance's ``LogStore``."""
+
+    def __init__(self, store: LogStore, max_lines: int = MAX_INDEXED_LINES):
+        self.store = store
+        self.max_chunks = max(1, -(-max_lines // CHUNK_LINES))
+        self._chunks: List[_Chunk] = []
+        self._next: Optional[int] = None  # next offset to index; None until first backfill
+        self._last_level = _INFO
+        self._backfilling = False
+
+    @property
+    def indexed_lines(self) -> int:
+        return sum(c.count for c in self._chunks)
+
+    def add(self, first_offset: int, messages: Sequence[str], ts: float) -> None:
+        """Index freshly archived lines; a gap (backfill pending) is left to ``catch_up``."""
+        if self._next is None or first_offset != self._next or self._backfilling:
+            return
+        self._add_lines(first_offset, [(ts, m) for m in messages])
+
+    def _add_lines(self, offset: int, lines: Sequence[Tuple[float, str]]) -> None:
+        levels = []
+        level = self._last_level
+        for _, message in lines:
+            level = detect_level(message, level)
+            levels.append(level)
+        self._last_level = level
+
+        chunk = self._chunks[-1] if self._chunks else None
+        i = 0
+        while i < len(lines):
+            if chunk is None or chunk.count >= CHUNK_LINES or chunk.end != offset:
+                chunk = _Chunk(offset)
+                self._chunks.append(chunk)
+                if len(self._chunks) > self.max_chunks:
+                    self._chunks.pop(0)
+            n = min(len(lines) - i, CHUNK_LINES - chunk.count)
+            chunk.extend(lines[i : i + n], levels[i : i + n])
+            offset += n
+            i += n
+        self._next = offset
+
+    async def catch_up(self) -> None:
+        """Index whatever the store holds beyond the indexed range, yielding between batches."""
+        store = self.store
+        if self._backfilling:
+            while self._backfilling:
+                await asyncio.sleep(0.01)
+            return
+        self._backfilling = True
+        try:
+            if self._next is None:
+                self._next = max(store.first_offset, store.next_offset - self.max_chunks * CHUNK_LINES)
+            # Drop chunks whose segments were removed by retention
+            while self._chunks and self._chunks[0].end <= store.first_offset:
+                self._chunks.pop(0)
+            while self._next < store.next_offset:
+                first, lines = await asyncio.to_thread(store.read, self._next, BACKFILL_BATCH)
+                if not lines:
+                    break
+                if first != self._next:
+                    self._chunks.clear()
+                self._add_lines(first, lines)
+        finally:
+            self._backfilling = False
+
+    def _read_blocks(self, ranges: Sequence[Tuple[int, int]]) -> List[Tuple[int, List[Tuple[float, str]]]]:
+        return [self.store.read(start, count) for start, count in ranges]
+
+    async def search(
+        self,
+        matcher,
+        terms: Sequence[Tuple[str, bool, bool]],
+        levels: Optional[Set[str]],
+        from_ts: Optional[float],
+        to_ts: Optional[float],
+        limit: int,
+    ) -> Tuple[List[Tuple[int, float, int, str]], Dict[str, int]]:
+        """Newest-first ``(offset, ts, level, message)`` matches plus scan stats.
+
+        Candidate blocks are read from the store in a worker thread,
+        ``READ_BATCH_BLOCKS`` at a time.
+        """
+        level_codes = {_LEVEL_CODE[name] for name in levels} if levels else set()
+        level_mask = sum(1 << code for code in level_codes)
+        stats = {"indexed_lines": self.indexed_lines, "candidate_blocks": 0, "scanned_lines": 0}
+        matches: List[Tuple[int, float, int, str]] = []
+        # A copy: new lines may add chunks while the reads are awaited
+        for chunk in reversed(list(self._chunks)):
+            if from_ts is not None and chunk.last_ts < from_ts:
+                break
+            if to_ts is not None and chunk.first_ts > to_ts:
+                continue
+            blocks = chunk.candidate_blocks(terms, level_mask, from_ts, to_ts)
+            stats["candidate_blocks"] += len(blocks)
+            for b in range(0, len(blocks), READ_BATCH_BLOCKS):
+                ranges = []
+                for block in blocks[b : b + READ_BATCH_BLOCKS]:
+                    start = chunk.base + block * BLOCK_LINES
+                    ranges.append((start, min(BLOCK_LINES, chunk.end - start)))
+                for first, lines in await asyncio.to_thread(self._read_blocks, ranges):
+                    stats["scanned_lines"] += len(lines)
+                    found = []
+                    for i, (ts, message) in enumerate(lines):
+                        offset = first + i
+                        level = chunk.line_levels[offset - chunk.base]
+                        if level_codes and level not in level_codes:
+                            continue
+                        if (from_ts is not None and ts < from_ts) or (to_ts is not None and ts > to_ts):
+                            continue
+                        if matcher is None or matcher(message):
+                            found.append((offset, ts, level, message))
+                    matches.extend(reversed(found))
+                    if len(matches) >= limit:
+                        return matches[:limit], stats
+        return matches, stats
+
+
+class LogSearch:
+    """``LogIndex`` per instance of a ``LogArchive``."""
+
+    def __init__(self, archive: LogArchive, max_lines: int = MAX_INDEXED_LINES):
+        self.archive = archive
+        self.max_lines = max_lines
+        self._indexes: Dict[str, LogIndex] = {}
+
+    def index(self, instance_id: str) -> LogIndex:
+        index = self._indexes.get(instance_id)
+        if index is None:
+            index = LogIndex(self.archive.get(instance_id), self.max_lines)
+            self._indexes[instance_id] = index
+        return index
+
+    def add(self, instance_id: str, first_offset: int, messages: Sequence[str], ts: float) -> None:
+        index = self._indexes.get(instance_id)
+        if index is not None:
+            index.add(first_offset, messages, ts)
+
+    def drop(self, instance_id: str) -> None:
+        self._indexes.pop(instance_id, None)
+
+    async def search(
+        self,
+        instance_ids: Sequence[str],
+        query: str = "",
+        regex: bool = False,
+        case_sensitive: bool = False,
+        levels: Optional[Set[str]] = None,
+        from_ts: Optional[float] = None,
+        to_ts: Optional[float] = None,
+        limit: int = 200,
+    ) -> Dict:
+        """Most recent *limit* matching lines across *instance_ids*, oldest first.
+
+        Raises ``re.error`` for an invalid regex.
+        """
+        matcher, terms = build_matcher(query, regex, case_sensitive)
+        results = []
+        totals = {"indexed_lines": 0, "candidate_blocks": 0, "scanned_lines": 0}
+        truncated = False
+        for instance_id in instance_ids:
+            index = self.index(instance_id)
+            await index.catch_up()
+            matches, stats = await index.search(matcher, terms, levels, from_ts, to_ts, limit)
+            truncated = truncated or len(matches) >= limit
+            for key, value in stats.items():
+                totals[key] += value
+            results.extend((ts, offset, instance_id, level, message) for offset, ts, level, message in matches)
+        results.sort(key=lambda r: (r[0], r[1]))
+        truncated = truncated or len(results) > limit
+        results = results[-limit:]
+        return {
+            "matches": [
+                {"instance_id": inst, "offset": offset, "ts": ts, "level": LEVELS[level], "message": message}
+                for ts, offset, inst, level, message in results
+            ],
+            "truncated": truncated,
+            **totals,
+        }
+
+
+def build_matcher(query: str, regex: bool = False, case_sensitive: bool = False):
+    """``(predicate or None, index terms)`` for a query string."""
+    if not query:
+        return None, []
+    if regex:
+        compiled = re.compile(query, 0 if case_sensitive else re.IGNORECASE)
+        fragments = regex_fragments(query)
+        matcher = compiled.search
+    else:
+        fragments = [query]
+        if case_sensitive:
+            matcher = lambda message: query in message  # noqa: E731
+        else:
+            needle = query.lower()
+            matcher = lambda message: needle in message.lower()  # noqa: E731
+    terms = [term for fragment in fragments for term in fragment_terms(fragment)]
+    return matcher, terms
+
+
+def scan_lines(lines: Iterable[str], matcher, levels: Optional[Set[str]], limit: int) -> List[Tuple[str, str]]:
+    """Unindexed search of in-memory lines (e.g. the pre-registration buffer); newest *limit* matches."""
+    level_codes = {_LEVEL_CODE[name] for name in levels} if levels else None
+    found = []
+    level = _INFO
+    for message in lines:
+        level = detect_level(message, level)
+        if level_codes is not None and level not in level_codes:
+            continue
+        if matcher is None or matcher(message):
+            found.append((level, message))
+    return [(LEVELS[level], message) for level, message in found[-limit:]]
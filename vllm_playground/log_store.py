@@ -0,0 +1,505 @@
+"""
+Durable, offset-addressable vLLM log storage per instance.
+
+Each instance's log lines are appended to segment files under
+``~/.vllm-playground/logs/<instance_id>/``.  Every line gets a monotonically
+increasing *offset* (its sequence number over the instance's lifetime), so
+clients can page through history and, after a reconnect, fetch only the
+lines after the last offset they saw.
+
+Layout of one segment (named by the offset of its first line)::
+
+    00000000000000004096.log    one line per record: b"<unix ts>\\t<message>\\n"
+    00000000000000004096.idx    sparse index, <u64 offset><u64 byte pos><f64 ts>
+                                every ``index_interval`` lines
+
+Newlines and backslashes inside a message are escaped (``\\n``, ``\\\\``).
+The active segment rolls over at ``segment_bytes``; retention deletes whole
+segments, oldest first, while the instance's total exceeds ``max_bytes``.
+
+A lookup by offset or timestamp bisects the segment list, then that
+segment's index, and reads at most ``index_interval`` lines before the first
+line it needs.  On open, a torn trailing line (crash mid-write) is
+truncated and a missing or damaged index is rebuilt by scanning.
+
+The app appends and reads from worker threads; a lock per ``LogStore``
+(and one in ``LogArchive.get``) keeps those calls from interleaving.
+"""
+
+import logging
+import os
+import re
+import shutil
+import struct
+import threading
+import time
+from bisect import bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+_IDX = struct.Struct("<QQd")
+_UNESCAPE = re.compile(r"\\(.)")
+_SAFE_ID = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9._-]*$")
+
+
+def _escape(message: str) -> str:
+    if "\\" in message or "\n" in message:
+        return message.replace("\\", "\\\\").replace("\n", "\\n")
+    return message
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    return _UNESCAPE.sub(lambda m: "\n" if m.group(1) == "n" else m.group(1), text)
+
+
+def _parse(raw: bytes) -> Tuple[float, str]:
+    ts, _, message = raw.rstrip(b"\n").partition(b"\t")
+    try:
+        ts_value = float(ts)
+    except ValueError:
+        ts_value = 0.0
+    return ts_value, _unescape(message.decode("utf-8", errors="replace"))
+
+
+class _Segment:
+    """One ``.log`` file plus its in-memory sparse index."""
+
+    __slots__ = ("base", "path", "idx_path", "index_offsets", "index_entries", "count", "bytes", "last_ts")
+
+    def __init__(self, directory: Path, base: int):
+        self.base = base
+        self.path = directory / f"{base:020d}.log"
+        self.idx_path = directory / f"{base:020d}.idx"
+        self.index_offsets: List[int] = []
+        self.index_entries: List[Tuple[int, int, float]] = []  # (offset, pos, ts)
+        self.count = 0
+        self.bytes = 0
+        self.last_ts = 0.0
+
+    @property
+    def first_ts(self) -> float:
+        return self.index_entries[0][2] if self.index_entries else self.last_ts
+
+    @property
+    def end(self) -> int:
+        """Offset one past this segment's last line."""
+        return self.base + self.count
+
+    def add_index(self, offset: int, pos: int, ts: float) -> None:
+        self.index_offsets.append(offset)
+        self.index_entries.append((offset, pos, ts))
+
+    def seek_entry(self, offset: int) -> Tuple[int, int]:
+        """Nearest indexed ``(offset, pos)`` at or before *offset*."""
+        i = bisect_right(self.index_offsets, offset) - 1
+        if i < 0:
+            return self.base, 0
+        entry = self.index_entries[i]
+        return entry[0], entry[1]
+
+    def seek_ts(self, ts: float) -> Tuple[int, int]:
+        """Indexed ``(offset, pos)`` from which the first line with time >= *ts* can be scanned."""
+        entries = self.index_entries
+        # Appends stamp wall-clock time, so index timestamps are non-decreasing
+        lo, hi = 0, len(entries)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if entries[mid][2] < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return self.base, 0
+        entry = entries[lo - 1]
+        return entry[0], entry[1]
+
+
+class LogStore:
+    """Append-only, segmented log of one instance."""
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_bytes: int = 8 * 1024 * 1024,
+        max_bytes: int = 256 * 1024 * 1024,
+        index_interval: int = 256,
+    ):
+        self.directory = Path(directory)
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.index_interval = index_interval
+        self._segments: List[_Segment] = []
+        self._bases: List[int] = []
+        self._fh = None
+        self._idx_fh = None
+        self._opened = False
+        self._pending = 0
+        self._lock = threading.RLock()
+
+    # -- Open / recovery ------------------------------------------------------
+
+    def open(self) -> None:
+        with self._lock:
+            self._open()
+
+    def _open(self) -> None:
+        if self._opened:
+            return
+        self._opened = True
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            logger.warning("LogStore: cannot create log dir %s: %s", self.directory, exc)
+            return
+        for path in sorted(self.directory.glob("*.log")):
+            try:
+                base = int(path.stem)
+            except ValueError:
+                continue
+            segment = self._recover(_Segment(self.directory, base))
+            if segment is not None:
+                self._segments.append(segment)
+        self._bases = [s.base for s in self._segments]
+
+    def _recover(self, segment: _Segment) -> Optional[_Segment]:
+        """Load a segment's index and count its lines, repairing a torn tail."""
+        try:
+            size = segment.path.stat().st_size
+        except OSError:
+            return None
+        if size == 0:
+            self._delete(segment)
+            return None
+
+        entries: List[Tuple[int, int, float]] = []
+        try:
+            with open(segment.idx_path, "rb") as f:
+                data = f.read()
+            usable = len(data) - len(data) % _IDX.size
+            entries = [e for e in _IDX.iter_unpack(data[:usable]) if e[1] < size]
+        except OSError:
+            pass
+        if not entries or entries[0][0] != segment.base:
+            entries = []
+
+        # Count the lines after the last index entry (or the whole file without one),
+        # indexing any that the index file is missing
+        offset, pos = (entries[-1][0], entries[-1][1]) if entries else (segment.base, 0)
+        last_ts = entries[-1][2] if entries else 0.0
+        indexed = len(entries)
+        with open(segment.path, "r+b") as f:
+            f.seek(pos)
+            good = pos
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # torn trailing line
+                last_ts = _parse(raw)[0]
+                if (offset - segment.base) % self.index_interval == 0 and (not entries or offset > entries[-1][0]):
+                    entries.append((offset, good, last_ts))
+                good += len(raw)
+                offset += 1
+            if good < size:
+                logger.warning("LogStore: truncating torn tail of %s (%d bytes)", segment.path.name, size - good)
+                f.truncate(good)
+                size = good
+        if offset == segment.base:
+            self._delete(segment)
+            return None
+        if len(entries) != indexed:
+            self._write_index(segment, entries)
+
+        for entry in entries:
+            segment.add_index(*entry)
+        segment.count = offset - segment.base
+        segment.bytes = size
+        segment.last_ts = last_ts
+        return segment
+
+    @staticmethod
+    def _write_index(segment: _Segment, entries: Sequence[Tuple[int, int, float]]) -> None:
+        try:
+            with open(segment.idx_path, "wb") as f:
+                for entry in entries:
+                    f.write(_IDX.pack(*entry))
+        except OSError as exc:
+            logger.warning("LogStore: cannot write index %s: %s", segment.idx_path.name, exc)
+
+    @staticmethod
+    def _delete(segment: _Segment) -> None:
+        for path in (segment.path, segment.idx_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                logger.warning("LogStore: cannot delete %s: %s", path.name, exc)
+
+    # -- Offsets --------------------------------------------------------------
+
+    @property
+    def first_offset(self) -> int:
+        """Oldest offset still retained."""
+        if not self._opened:
+            self.open()
+        return self._segments[0].base if self._segments else 0
+
+    @property
+    def next_offset(self) -> int:
+        """Offset the next appended line will get."""
+        if not self._opened:
+            self.open()
+        return self._segments[-1].end if self._segments else 0
+
+    def total_bytes(self) -> int:
+        return sum(s.bytes for s in self._segments)
+
+    # -- Writes ---------------------------------------------------------------
+
+    def append(self, messages: Sequence[str], ts: Optional[float] = None) -> int:
+        """Append *messages*; returns the offset of the first one."""
+        with self._lock:
+            return self._append(messages, ts)
+
+    def _append(self, messages: Sequence[str], ts: Optional[float]) -> int:
+        if not self._opened:
+            self.open()
+        first = self.next_offset
+        if not messages:
+            return first
+        ts = time.time() if ts is None else ts
+        prefix = b"%.3f\t" % ts
+
+        segment = self._segments[-1] if self._segments else None
+        if segment is None or segment.bytes >= self.segment_bytes or self._fh is None:
+            segment = self._active_segment(roll=segment is not None and segment.bytes >= self.segment_bytes)
+            if segment is None:
+                return first
+
+        parts = []
+        index_parts = []
+        pos = segment.bytes
+        offset = segment.end
+        interval = self.index_interval
+        for message in messages:
+            record = prefix + _escape(message).encode("utf-8", errors="replace") + b"\n"
+            if (offset - segment.base) % interval == 0:
+                segment.add_index(offset, pos, ts)
+                index_parts.append(_IDX.pack(offset, pos, ts))
+            parts.append(record)
+            pos += len(record)
+            offset += 1
+        try:
+            self._fh.write(b"".join(parts))
+            if index_parts:
+                self._idx_fh.write(b"".join(index_parts))
+        except OSError as exc:
+            logger.warning("LogStore: write to %s failed: %s", segment.path.name, exc)
+            return first
+        segment.count = offset - segment.base
+        segment.bytes = pos
+        segment.last_ts = ts
+        self._pending += len(messages)
+        if self._pending >= 1000:
+            self.flush()
+        return first
+
+    def _active_segment(self, roll: bool) -> Optional[_Segment]:
+        """Open the newest segment for appending, or start a new one when *roll* (or none exists)."""
+        self._close_files()
+        if roll or not self._segments:
+            segment = _Segment(self.directory, self.next_offset)
+            self._segments.append(segment)
+            self._bases.append(segment.base)
+            self._apply_retention()
+        segment = self._segments[-1]
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._fh = open(segment.path, "ab")
+            self._idx_fh = open(segment.idx_path, "ab")
+        except OSError as exc:
+            logger.warning("LogStore: cannot open segment %s: %s", segment.path, exc)
+            self._close_files()
+            return None
+        return segment
+
+    def _apply_retention(self) -> None:
+        """Drop whole segments, oldest first, while over ``max_bytes`` (the active one is kept)."""
+        total = self.total_bytes()
+        while len(self._segments) > 1 and total > self.max_bytes:
+            oldest = self._segments.pop(0)
+            self._bases.pop(0)
+            total -= oldest.bytes
+            self._delete(oldest)
+            logger.info("LogStore: dropped log segment %s", oldest.path.name)
+
+    def flush(self) -> None:
+        with self._lock:
+            for fh in (self._fh, self._idx_fh):
+                if fh is not None:
+                    try:
+                        fh.flush()
+                    except OSError:
+                        pass
+            self._pending = 0
+
+    def _close_files(self) -> None:
+        self.flush()
+        for fh in (self._fh, self._idx_fh):
+            if fh is not None:
+                try:
+                    fh.close()
+                except OSError:
+                    pass
+        self._fh = self._idx_fh = None
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_files()
+
+    def destroy(self) -> None:
+        """Close and delete every segment of this instance."""
+        with self._lock:
+            self._close_files()
+            self._segments = []
+            self._bases = []
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+    # -- Reads ----------------------------------------------------------------
+
+    def _segment_for(self, offset: int) -> Optional[int]:
+        i = bisect_right(self._bases, offset) - 1
+        return i if i >= 0 else None
+
+    def read(self, start: int, limit: int) -> Tuple[int, List[Tuple[float, str]]]:
+        """Read up to *limit* lines from offset *start* (clamped to what is retained).
+
+        Returns ``(first_offset, [(ts, message), ...])``.
+        """
+        with self._lock:
+            return self._read(start, limit)
+
+    def _read(self, start: int, limit: int) -> Tuple[int, List[Tuple[float, str]]]:
+        if not self._opened:
+            self.open()
+        self.flush()
+        start = max(start, self.first_offset)
+        out: List[Tuple[float, str]] = []
+        i = self._segment_for(start)
+        if i is None:
+            return start, out
+        first = start
+        while i < len(self._segments) and len(out) < limit:
+            segment = self._segments[i]
+            if start < segment.end:
+                offset, pos = segment.seek_entry(start)
+                self._read_segment(segment, offset, pos, start, limit - len(out), out)
+                start = segment.end
+            i += 1
+        return first, out
+
+    @staticmethod
+    def _read_segment(segment: _Segment, offset: int, pos: int, start: int, limit: int, out: list) -> None:
+        try:
+            f = open(segment.path, "rb")
+        except OSError as exc:
+            logger.warning("LogStore: cannot read %s: %s", segment.path.name, exc)
+            return
+        with f:
+            f.seek(pos)
+            for raw in f:
+                if offset >= segment.end or limit <= 0:
+                    break
+                if offset >= start:
+                    out.append(_parse(raw))
+                    limit -= 1
+                offset += 1
+
+    def offset_for_ts(self, ts: float) -> int:
+        """Offset of the first retained line logged at or after *ts* (``next_offset`` if none)."""
+        with self._lock:
+            return self._offset_for_ts(ts)
+
+    def _offset_for_ts(self, ts: float) -> int:
+        if not self._opened:
+            self.open()
+        self.flush()
+        for segment in self._segments:
+            if segment.last_ts < ts:
+                continue
+            offset, pos = segment.seek_ts(ts)
+            try:
+                with open(segment.path, "rb") as f:
+                    f.seek(pos)
+                    for raw in f:
+                        if offset >= segment.end:
+                            break
+                        if _parse(raw)[0] >= ts:
+                            return offset
+                        offset += 1
+            except OSError as exc:
+                logger.warning("LogStore: cannot read %s: %s", segment.path.name, exc)
+        return self.next_offset
+
+
+class LogArchive:
+    """Lazily opened ``LogStore`` per instance id under one root directory."""
+
+    def __init__(self, root: Path, **store_kwargs):
+        self.root = Path(root)
+        self._store_kwargs = store_kwargs
+        self._stores: Dict[str, LogStore] = {}
+        self._lock = threading.Lock()
+
+    def get(self, instance_id: str) -> LogStore:
+        store = self._stores.get(instance_id)
+        if store is None:
+            if not _SAFE_ID.match(instance_id):
+                raise ValueError(f"invalid instance id for log storage: {instance_id!r}")
+            with self._lock:
+                # Two threads may ask for a new instance at once; only one may open its files
+                store = self._stores.get(instance_id)
+                if store is None:
+                    store = LogStore(self.root / instance_id, **self._store_kwargs)
+                    store.open()
+                    self._stores[instance_id] = store
+        return store
+
+    def exists(self, instance_id: str) -> bool:
+        if instance_id in self._stores:
+            return True
+        return bool(_SAFE_ID.match(instance_id)) and (self.root / instance_id).is_dir()
+
+    def instance_ids(self) -> List[str]:
+        """Ids with stored logs (open or on disk)."""
+        ids = set(self._stores)
+        try:
+            ids.update(p.name for p in self.root.iterdir() if p.is_dir() and _SAFE_ID.match(p.name))
+        except OSError:
+            pass
+        return sorted(ids)
+
+    def drop(self, instance_id: str) -> None:
+        """Delete an instance's stored logs (e.g. when the instance is removed)."""
+        store = self._stores.pop(instance_id, None)
+        if store is None:
+            if not self.exists(instance_id):
+                return
+            store = LogStore(self.root / instance_id)
+        store.destroy()
+
+    def flush(self) -> None:
+        for store in self._stores.values():
+            store.flush()
+
+    def close(self) -> None:
+        for store in self._stores.values():
+            store.close()
+        self._stores = {}
+
+
+def default_log_root() -> Path:
+    return Path(os.environ.get("VLLM_PLAYGROUND_LOG_DIR") or Path.home() / ".vllm-playground" / "logs")
@@ -0,0 +1,487 @@
+"""
+Columnar metrics history for MetricStore.
+
+Snapshots used to be stored as a ``deque`` of dicts, each repeating every
+``vllm:*`` key plus an ISO timestamp string.  ``ColumnarHistory`` instead
+keeps one ``array('d')`` ring for timestamps (epoch seconds) and one per
+metric, all sharing the same ring position.  Missing samples are NaN.
+
+Readers get either column views (``window()``) for charting / derivation, or
+legacy snapshot dicts (``to_snapshots()``) for the JSON API.  Windows are
+located by binary search on the timestamp ring, and ``downsample()`` bounds
+the number of points returned for wide windows.
+
+``RollupTier`` keeps coarser aggregates (min/max/avg/last for gauges,
+last/delta for counters) per fixed-size time bucket in its own
+``ColumnarHistory``, with columns named ``<metric>@<agg>``.
+``select_tier()`` picks the coarsest tier that still satisfies a query.
+"""
+
+from array import array
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+_NAN = float("nan")
+
+DOWNSAMPLE_MODES = ("minmax", "lttb", "avg")
+ROLLUP_AGGS = ("auto", "avg", "min", "max", "last", "delta")
+
+
+def _to_epoch(ts) -> Optional[float]:
+    """Accept epoch seconds, ``datetime`` or an ISO string."""
+    if ts is None:
+        return None
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    if isinstance(ts, datetime):
+        return ts.timestamp()
+    try:
+        return datetime.fromisoformat(str(ts)).timestamp()
+    except ValueError:
+        return None
+
+
+class ColumnarHistory:
+    """Fixed-capacity ring of metric snapshots stored column-wise.
+
+    Timestamps are expected to be non-decreasing in append order; windowing
+    relies on that for its binary search.
+    """
+
+    def __init__(self, maxlen: int):
+        if maxlen <= 0:
+            raise ValueError("maxlen must be positive")
+        self._maxlen = maxlen
+        self._ts = array("d", [_NAN]) * maxlen
+        self._cols: Dict[str, array] = {}
+        self._head = 0  # physical index of the next write
+        self._len = 0
+
+    # -- Container protocol --------------------------------------------------
+
+    @property
+    def maxlen(self) -> int:
+        return self._maxlen
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __bool__(self) -> bool:
+        return self._len > 0
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self.to_snapshots(*self.window()))
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("history index out of range")
+        p = self._phys(index)
+        snap = {"timestamp": datetime.fromtimestamp(self._ts[p]).isoformat()}
+        for name, col in self._cols.items():
+            v = col[p]
+            if v == v:
+                snap[name] = v
+        return snap
+
+    def clear(self) -> None:
+        self._ts = array("d", [_NAN]) * self._maxlen
+        self._cols = {}
+        self._head = 0
+        self._len = 0
+
+    # -- Writes ---------------------------------------------------------------
+
+    def append(self, ts: float, values: Mapping[str, Optional[float]]) -> None:
+        """Append one snapshot taken at epoch *ts*.  Non-numeric values become NaN."""
+        p = self._head
+        self._ts[p] = ts
+        cols = self._cols
+        for name, v in values.items():
+            col = cols.get(name)
+            if col is None:
+                col = cols[name] = array("d", [_NAN]) * self._maxlen
+            if v is None or isinstance(v, bool) or not isinstance(v, (int, float)):
+                col[p] = _NAN
+            else:
+                col[p] = v
+        if len(values) < len(cols):
+            for name, col in cols.items():
+                if name not in values:
+                    col[p] = _NAN
+        self._head = (p + 1) % self._maxlen
+        if self._len < self._maxlen:
+            self._len += 1
+
+    def append_snapshot(self, snapshot: Mapping) -> bool:
+        """Append a legacy ``{"timestamp": iso, key: value, ...}`` snapshot."""
+        ts = _to_epoch(snapshot.get("timestamp"))
+        if ts is None:
+            return False
+        self.append(ts, {k: v for k, v in snapshot.items() if k != "timestamp"})
+        return True
+
+    # -- Reads ----------------------------------------------------------------
+
+    def _phys(self, logical: int) -> int:
+        return (self._head - self._len + logical) % self._maxlen
+
+    def _slice(self, arr: array, lo: int, hi: int) -> List[float]:
+        count = hi - lo
+        if count <= 0:
+            return []
+        p = self._phys(lo)
+        end = p + count
+        if end <= self._maxlen:
+            return arr[p:end].tolist()
+        return arr[p:].tolist() + arr[: end - self._maxlen].tolist()
+
+    def oldest_ts(self) -> Optional[float]:
+        return self._ts[self._phys(0)] if self._len else None
+
+    def newest_ts(self) -> Optional[float]:
+        return self._ts[self._phys(self._len - 1)] if self._len else None
+
+    def metric_names(self) -> List[str]:
+        return list(self._cols)
+
+    def _bisect(self, ts: float) -> int:
+        """Logical index of the first sample with timestamp >= *ts*."""
+        lo, hi = 0, self._len
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._ts[self._phys(mid)] < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def window(
+        self,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        names: Optional[Iterable[str]] = None,
+    ) -> Tuple[List[float], Dict[str, List[float]]]:
+        """Return ``(timestamps, {metric: values})`` for ``since <= ts < until``.
+
+        *names* restricts the returned columns; unknown names are skipped.
+        """
+        lo = self._bisect(since) if since is not None else 0
+        hi = self._bisect(until) if until is not None else self._len
+        timestamps = self._slice(self._ts, lo, hi)
+        if names is None:
+            selected = self._cols.items()
+        else:
+            selected = [(n, self._cols[n]) for n in names if n in self._cols]
+        columns = {name: self._slice(col, lo, hi) for name, col in selected}
+        return timestamps, columns
+
+    @staticmethod
+    def to_snapshots(timestamps: List[float], columns: Dict[str, List[float]]) -> List[dict]:
+        """Convert column views back into legacy snapshot dicts (NaN omitted)."""
+        snaps = [{"timestamp": datetime.fromtimestamp(ts).isoformat()} for ts in timestamps]
+        for name, values in columns.items():
+            for snap, v in zip(snaps, values):
+                if v == v and v is not None:
+                    snap[name] = v
+        return snaps
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the ring buffers."""
+        per_col = self._ts.itemsize * self._maxlen
+        return per_col * (1 + len(self._cols))
+
+
+# ---------------------------------------------------------------------------
+# Rollup tiers
+# ---------------------------------------------------------------------------
+
+
+class _Acc:
+    """Running aggregate for one metric inside the current bucket."""
+
+    __slots__ = ("min", "max", "sum", "n", "last", "delta")
+
+    def __init__(self, v: float):
+        self.min = self.max = self.sum = self.last = v
+        self.n = 1
+        self.delta = 0.0
+
+
+class RollupTier:
+    """Fixed-resolution aggregates of raw samples.
+
+    Gauges are rolled up into ``@avg``/``@min``/``@max``/``@last`` columns;
+    counters into ``@last`` and ``@delta``, where the delta sums positive
+    increments and treats a drop (counter reset on server restart) as a
+    restart from zero.  The bucket being filled is only appended to ``rows``
+    once a sample from a later bucket arrives, but queries include it.
+    """
+
+    def __init__(self, name: str, resolution: float, maxlen: int):
+        self.name = name
+        self.resolution = resolution
+        self.rows = ColumnarHistory(maxlen)
+        self._bucket: Optional[int] = None
+        self._acc: Dict[str, _Acc] = {}
+        self._counters: set = set()
+        self._prev: Dict[str, float] = {}  # last counter value, carried across buckets
+        self._first_ts: Optional[float] = None  # first sample fed into an empty tier
+
+    def clear(self) -> None:
+        self.rows.clear()
+        self._bucket = None
+        self._acc = {}
+        self._counters = set()
+        self._prev = {}
+        self._first_ts = None
+
+    def add(
+        self, ts: float, values: Mapping[str, Optional[float]], counters: Iterable[str] = ()
+    ) -> Optional[Tuple[float, Dict[str, float]]]:
+        """Feed one raw sample.  Returns ``(bucket_ts, row)`` when a bucket closes."""
+        self._counters.update(counters)
+        if self._first_ts is None and self._bucket is None and not self.rows:
+            self._first_ts = ts
+        bucket = int(ts // self.resolution)
+        closed = None
+        if self._bucket is not None and bucket > self._bucket:
+            closed = self._close()
+        if self._bucket is None or bucket > self._bucket:
+            self._bucket = bucket
+
+        acc = self._acc
+        prev = self._prev
+        counters_set = self._counters
+        for name, v in values.items():
+            if v is None or isinstance(v, bool) or not isinstance(v, (int, float)) or v != v:
+                continue
+            a = acc.get(name)
+            if a is None:
+                a = acc[name] = _Acc(v)
+            else:
+                if v < a.min:
+                    a.min = v
+                if v > a.max:
+                    a.max = v
+                a.sum += v
+                a.n += 1
+                a.last = v
+            if name in counters_set:
+                p = prev.get(name)
+                if p is not None:
+                    a.delta += v - p if v >= p else v
+                prev[name] = v
+        return closed
+
+    def _row(self) -> Dict[str, float]:
+        row: Dict[str, float] = {}
+        for name, a in self._acc.items():
+            row[name + "@last"] = a.last
+            if name in self._counters:
+                row[name + "@delta"] = a.delta
+            else:
+                row[name + "@avg"] = a.sum / a.n
+                row[name + "@min"] = a.min
+                row[name + "@max"] = a.max
+        return row
+
+    def _close(self) -> Optional[Tuple[float, Dict[str, float]]]:
+        if self._bucket is None or not self._acc:
+            return None
+        bucket_ts = self._bucket * self.resolution
+        row = self._row()
+        self.rows.append(bucket_ts, row)
+        self._acc = {}
+        return bucket_ts, row
+
+    def oldest_ts(self) -> Optional[float]:
+        """Time of the oldest data held.
+
+        For a tier filled in this process that is the first raw sample, not the
+        start of its bucket, so a young tier does not look older than the raw
+        ring it was built from.
+        """
+        oldest = self.rows.oldest_ts()
+        if oldest is None and self._acc:
+            oldest = self._bucket * self.resolution
+        if oldest is not None and self._first_ts is not None:
+            oldest = max(oldest, self._first_ts)
+        return oldest
+
+    def window(
+        self,
+        since: Optional[float] = None,
+        names: Optional[Iterable[str]] = None,
+        agg: str = "auto",
+    ) -> Tuple[List[float], Dict[str, List[float]]]:
+        """Return ``(timestamps, {metric: values})`` using one aggregate per metric.
+
+        ``agg="auto"`` uses ``@avg`` for gauges and ``@last`` for counters, so
+        rollup series line up with raw samples.  The open bucket is appended.
+        """
+        if agg not in ROLLUP_AGGS:
+            raise ValueError(f"Unknown rollup aggregate '{agg}'. Expected one of {ROLLUP_AGGS}")
+        partial = self._row() if self._acc else None
+        available = set(self.rows.metric_names())
+        if partial:
+            available.update(partial)
+        if names is None:
+            names = sorted({col.rsplit("@", 1)[0] for col in available})
+
+        column_for: Dict[str, str] = {}
+        for name in names:
+            if agg == "auto":
+                col = name + "@avg" if name + "@avg" in available else name + "@last"
+            else:
+                col = f"{name}@{agg}"
+            if col in available:
+                column_for[name] = col
+
+        timestamps, raw_cols = self.rows.window(since, names=column_for.values())
+        columns = {name: raw_cols.get(col, [_NAN] * len(timestamps)) for name, col in column_for.items()}
+        if partial and (since is None or self._bucket * self.resolution + self.resolution > since):
+            timestamps.append(self._bucket * self.resolution)
+            for name, col in column_for.items():
+                columns[name].append(partial.get(col, _NAN))
+        return timestamps, columns
+
+
+def select_tier(tiers: List, since: Optional[float], now: float, max_points: Optional[int]):
+    """Pick the coarsest tier that covers ``[since, now]`` at the requested resolution.
+
+    *tiers* are ordered finest first and expose ``resolution`` and
+    ``oldest_ts()``.  A window reaching back before the oldest retained data
+    is clamped to it first.  With *max_points* the acceptable resolution is
+    ``window / max_points``; without it the finest covering tier wins.
+    """
+    populated = [t for t in tiers if t.oldest_ts() is not None]
+    if since is None or not populated:
+        return tiers[0]
+    since = max(since, min(t.oldest_ts() for t in populated))
+    covering = [t for t in populated if t.oldest_ts() <= since + t.resolution]
+    if not max_points:
+        return covering[0]
+    wanted = (now - since) / max_points
+    fitting = [t for t in covering if t.resolution <= wanted]
+    return fitting[-1] if fitting else covering[0]
+
+
+# ---------------------------------------------------------------------------
+# Downsampling
+# ---------------------------------------------------------------------------
+
+
+def _bucket_bounds(n: int, buckets: int) -> List[Tuple[int, int]]:
+    """Split ``range(n)`` into *buckets* contiguous, near-equal index ranges."""
+    return [(n * b // buckets, n * (b + 1) // buckets) for b in range(buckets)]
+
+
+def _present(values: List[float]) -> List[float]:
+    return [v for v in values if v == v]
+
+
+def _downsample_minmax(timestamps, columns, max_points):
+    """Two rows per bucket: the per-series minimum at the bucket's first
+    timestamp and the maximum at its last, so spikes survive."""
+    out_ts: List[float] = []
+    out_cols: Dict[str, List[float]] = {name: [] for name in columns}
+    for a, b in _bucket_bounds(len(timestamps), max(1, max_points // 2)):
+        if b - a == 1:
+            out_ts.append(timestamps[a])
+            for name, values in columns.items():
+                out_cols[name].append(values[a])
+            continue
+        out_ts.append(timestamps[a])
+        out_ts.append(timestamps[b - 1])
+        for name, values in columns.items():
+            seg = _present(values[a:b])
+            out_cols[name].append(min(seg) if seg else _NAN)
+            out_cols[name].append(max(seg) if seg else _NAN)
+    return out_ts, out_cols
+
+
+def _downsample_avg(timestamps, columns, max_points):
+    """One row per bucket at its midpoint with per-series means."""
+    out_ts: List[float] = []
+    out_cols: Dict[str, List[float]] = {name: [] for name in columns}
+    for a, b in _bucket_bounds(len(timestamps), max_points):
+        out_ts.append((timestamps[a] + timestamps[b - 1]) / 2)
+        for name, values in columns.items():
+            seg = _present(values[a:b])
+            out_cols[name].append(sum(seg) / len(seg) if seg else _NAN)
+    return out_ts, out_cols
+
+
+def _downsample_lttb(timestamps, columns, max_points):
+    """Largest-Triangle-Three-Buckets over a shared time axis.
+
+    Each bucket keeps the sample that maximises the summed triangle area
+    across all series, with every series scaled to its own range so that
+    large-magnitude counters do not drown out fractions.
+    """
+    n = len(timestamps)
+    series = []
+    for values in columns.values():
+        seg = _present(values)
+        if not seg:
+            continue
+        lo, hi = min(seg), max(seg)
+        scale = 1.0 / (hi - lo) if hi > lo else 0.0
+        series.append([(v - lo) * scale if v == v else 0.0 for v in values])
+
+    keep = [0]
+    bounds = _bucket_bounds(n - 2, max_points - 2)
+    for idx, (a, b) in enumerate(bounds):
+        a, b = a + 1, b + 1
+        if a >= b:
+            continue
+        if idx + 1 < len(bounds):
+            na, nb = bounds[idx + 1][0] + 1, bounds[idx + 1][1] + 1
+        else:
+            na, nb = n - 1, n
+        next_t = sum(timestamps[na:nb]) / (nb - na)
+        next_vals = [sum(s[na:nb]) / (nb - na) for s in series]
+        p = keep[-1]
+        pt = timestamps[p]
+        best, best_area = a, -1.0
+        for i in range(a, b):
+            dt_next = next_t - pt
+            dt_i = timestamps[i] - pt
+            area = 0.0
+            for s, nv in zip(series, next_vals):
+                area += abs((s[p] - nv) * dt_i - (s[p] - s[i]) * dt_next)
+            if area > best_area:
+                best, best_area = i, area
+        keep.append(best)
+    keep.append(n - 1)
+
+    out_ts = [timestamps[i] for i in keep]
+    out_cols = {name: [values[i] for i in keep] for name, values in columns.items()}
+    return out_ts, out_cols
+
+
+def downsample(
+    timestamps: List[float],
+    columns: Dict[str, List[float]],
+    max_points: int,
+    mode: str = "minmax",
+) -> Tuple[List[float], Dict[str, List[float]]]:
+    """Reduce a column window to at most *max_points* rows.
+
+    Modes: ``minmax`` (per-bucket envelope, default), ``lttb`` (shape
+    preserving point selection) and ``avg`` (per-bucket mean).  Windows that
+    already fit are returned unchanged.
+    """
+    if mode not in DOWNSAMPLE_MODES:
+        raise ValueError(f"Unknown downsample mode '{mode}'. Expected one of {DOWNSAMPLE_MODES}")
+    if max_points <= 0 or len(timestamps) <= max_points:
+        return timestamps, columns
+    if mode == "lttb":
+        if max_points < 3:
+            return _downsample_avg(timestamps, columns, max_points)
+        return _downsample_lttb(timestamps, columns, max_points)
+    if mode == "avg":
+        return _downsample_avg(timestamps, columns, max_points)
+    return _downsample_minmax(timestamps, columns, max_points)
@@ -0,0 +1,373 @@
+"""
+Segmented binary persistence for MetricStore history.
+
+History is written to append-only segment files under
+``~/.vllm-playground/metrics-history/``, one segment per time bucket
+(1 hour by default).  A small ``index.json`` records each sealed segment's
+time range, snapshot count and size, so that:
+
+  - retention deletes whole segments (by age, then by total size), and
+  - a restart only memory-maps the newest segments needed to refill the
+    in-memory ring, instead of parsing one large JSONL file.
+
+Segment layout (little-endian)::
+
+    magic   b"VPMSEG1\\n"
+    record  b"N" <u16 id> <u16 len> <utf-8 name>          metric name definition
+    record  b"S" <f64 ts> <u16 n> n * (<u16 id> <f64 v>)   snapshot (NaN omitted)
+
+Names are defined inline the first time a segment uses them, so every
+segment is self-describing.  A torn trailing record (crash mid-write) is
+ignored on read.
+
+``migrate_jsonl()`` converts the previous ``metrics-history.jsonl`` file
+once and renames it to ``*.migrated``.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"VPMSEG1\n"
+_REC_NAME = ord("N")
+_REC_SNAP = ord("S")
+_NAME_HDR = struct.Struct("<BHH")
+_SNAP_HDR = struct.Struct("<BdH")
+_PAIR = struct.Struct("<Hd")
+_MAX_NAMES = 0xFFFF
+_INDEX_VERSION = 1
+
+
+def _read_segment(path: Path) -> Iterator[Tuple[float, Dict[str, float]]]:
+    """Yield ``(ts, values)`` records from a segment via a read-only mmap."""
+    try:
+        f = open(path, "rb")
+    except OSError as exc:
+        logger.warning("MetricStore: cannot open segment %s: %s", path, exc)
+        return
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if size <= len(_MAGIC):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[: len(_MAGIC)] != _MAGIC:
+                logger.warning("MetricStore: %s is not a metrics segment, skipping", path.name)
+                return
+            names: Dict[int, str] = {}
+            off = len(_MAGIC)
+            while off < size:
+                rtype = mm[off]
+                if rtype == _REC_NAME:
+                    if off + _NAME_HDR.size > size:
+                        break
+                    _, mid, length = _NAME_HDR.unpack_from(mm, off)
+                    start = off + _NAME_HDR.size
+                    if start + length > size:
+                        break
+                    names[mid] = mm[start : start + length].decode("utf-8")
+                    off = start + length
+                elif rtype == _REC_SNAP:
+                    if off + _SNAP_HDR.size > size:
+                        break
+                    _, ts, count = _SNAP_HDR.unpack_from(mm, off)
+                    start = off + _SNAP_HDR.size
+                    end = start + count * _PAIR.size
+                    if end > size:
+                        break
+                    values = {names[mid]: v for mid, v in _PAIR.iter_unpack(mm[start:end]) if mid in names}
+                    yield ts, values
+                    off = end
+                else:
+                    logger.warning("MetricStore: corrupt record in %s at offset %d, truncating read", path.name, off)
+                    break
+
+
+class SegmentStore:
+    """Time-bucketed, append-only segment files plus a JSON index."""
+
+    def __init__(
+        self,
+        directory: Path,
+        segment_seconds: float = 3600.0,
+        retention_seconds: float = 7 * 24 * 3600.0,
+        max_bytes: int = 50 * 1024 * 1024,
+    ):
+        self.directory = Path(directory)
+        self.segment_seconds = segment_seconds
+        self.retention_seconds = retention_seconds
+        self.max_bytes = max_bytes
+        self._index_path = self.directory / "index.json"
+        self._segments: List[Dict[str, Any]] = []  # sealed, oldest first
+        self._opened = False
+
+        # Active (unsealed) segment
+        self._fh: Optional[Any] = None
+        self._active: Optional[Dict[str, Any]] = None
+        self._bucket: Optional[int] = None
+        self._name_ids: Dict[str, int] = {}
+        self._write_count = 0
+
+    # -- Index ----------------------------------------------------------------
+
+    def open(self) -> None:
+        """Load the index, recover unindexed segments, and apply retention."""
+        if self._opened:
+            return
+        self._opened = True
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            logger.warning("MetricStore: cannot create history dir %s: %s", self.directory, exc)
+            return
+
+        indexed: Dict[str, Dict[str, Any]] = {}
+        if self._index_path.exists():
+            try:
+                with open(self._index_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == _INDEX_VERSION:
+                    indexed = {s["file"]: s for s in data.get("segments", [])}
+            except (OSError, json.JSONDecodeError, ValueError, KeyError, TypeError) as exc:
+                logger.warning("MetricStore: corrupted segment index, rebuilding: %s", exc)
+
+        segments = []
+        for path in sorted(self.directory.glob("seg-*.bin")):
+            meta = indexed.get(path.name)
+            if meta is None or meta.get("bytes") != path.stat().st_size:
+                meta = self._scan(path)
+                if meta is None:
+                    continue
+            segments.append(meta)
+        segments.sort(key=lambda s: s["start"])
+        self._segments = segments
+        self._apply_retention()
+        self._write_index()
+
+    @staticmethod
+    def _scan(path: Path) -> Optional[Dict[str, Any]]:
+        """Rebuild index metadata for a segment missing from the index (e.g. after a crash)."""
+        start = end = None
+        count = 0
+        for ts, _ in _read_segment(path):
+            if start is None:
+                start = ts
+            end = ts
+            count += 1
+        if start is None:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            return None
+        return {"file": path.name, "start": start, "end": end, "count": count, "bytes": path.stat().st_size}
+
+    def _write_index(self) -> None:
+        payload = {"version": _INDEX_VERSION, "segments": self._segments}
+        tmp_path = self._index_path.with_suffix(".json.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            tmp_path.replace(self._index_path)
+        except OSError as exc:
+            logger.warning("MetricStore: cannot write segment index: %s", exc)
+
+    def _apply_retention(self) -> None:
+        """Delete whole sealed segments older than the retention window or over the size cap."""
+        cutoff = time.time() - self.retention_seconds
+        keep = []
+        total = sum(s["bytes"] for s in self._segments)
+        last = len(self._segments) - 1
+        for idx, seg in enumerate(self._segments):
+            expired = seg["end"] < cutoff
+            oversize = total > self.max_bytes and idx < last
+            if expired or oversize:
+                try:
+                    (self.directory / seg["file"]).unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as exc:
+                    logger.warning("MetricStore: cannot delete segment %s: %s", seg["file"], exc)
+                    keep.append(seg)
+                    continue
+                total -= seg["bytes"]
+                logger.info("MetricStore: dropped history segment %s", seg["file"])
+            else:
+                keep.append(seg)
+        self._segments = keep
+
+    @property
+    def segments(self) -> List[Dict[str, Any]]:
+        """Sealed segment metadata, oldest first."""
+        return list(self._segments)
+
+    def total_bytes(self) -> int:
+        active = self._active["bytes"] if self._active else 0
+        return sum(s["bytes"] for s in self._segments) + active
+
+    # -- Writes ---------------------------------------------------------------
+
+    def append(self, ts: float, values: Mapping[str, Any]) -> None:
+        """Append a snapshot, rolling to a new segment when *ts* crosses a bucket."""
+        if not self._opened:
+            self.open()
+        bucket = int(ts // self.segment_seconds)
+        if self._fh is None or bucket != self._bucket:
+            self._seal()
+            if not self._start_segment(ts, bucket):
+                return
+
+        parts = []
+        pairs = []
+        name_ids = self._name_ids
+        for name, v in values.items():
+            if v is None or isinstance(v, bool) or not isinstance(v, (int, float)) or v != v:
+                continue
+            mid = name_ids.get(name)
+            if mid is None:
+                if len(name_ids) >= _MAX_NAMES:
+                    continue
+                mid = name_ids[name] = len(name_ids)
+                encoded = name.encode("utf-8")
+                parts.append(_NAME_HDR.pack(_REC_NAME, mid, len(encoded)))
+                parts.append(encoded)
+            pairs.append(_PAIR.pack(mid, v))
+        parts.append(_SNAP_HDR.pack(_REC_SNAP, ts, len(pairs)))
+        parts.extend(pairs)
+        data = b"".join(parts)
+
+        try:
+            self._fh.write(data)
+        except OSError as exc:
+            logger.warning("MetricStore: disk write failed: %s", exc)
+            return
+        active = self._active
+        active["end"] = ts
+        active["count"] += 1
+        active["bytes"] += len(data)
+        self._write_count += 1
+        if self._write_count >= 10:
+            self.flush()
+
+    def _start_segment(self, ts: float, bucket: int) -> bool:
+        name = f"seg-{int(ts)}.bin"
+        path = self.directory / name
+        suffix = 1
+        while path.exists():
+            name = f"seg-{int(ts)}-{suffix}.bin"
+            path = self.directory / name
+            suffix += 1
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._fh = open(path, "wb")
+            self._fh.write(_MAGIC)
+        except OSError as exc:
+            logger.warning("MetricStore: cannot open segment %s: %s", path, exc)
+            self._fh = None
+            return False
+        self._bucket = bucket
+        self._name_ids = {}
+        self._write_count = 0
+        self._active = {"file": name, "start": ts, "end": ts, "count": 0, "bytes": len(_MAGIC)}
+        return True
+
+    def _seal(self) -> None:
+        """Close the active segment and record it in the index."""
+        if self._fh is None:
+            return
+        try:
+            self._fh.close()
+        except OSError:
+            pass
+        self._fh = None
+        active, self._active = self._active, None
+        if active and active["count"] > 0:
+            self._segments.append(active)
+        elif active:
+            try:
+                (self.directory / active["file"]).unlink()
+            except OSError:
+                pass
+        self._apply_retention()
+        self._write_index()
+
+    def flush(self) -> None:
+        if self._fh is not None:
+            try:
+                self._fh.flush()
+            except OSError:
+                pass
+        self._write_count = 0
+
+    def close(self) -> None:
+        self._seal()
+
+    # -- Reads ----------------------------------------------------------------
+
+    def iter_recent(self, max_snapshots: int) -> Iterator[Tuple[float, Dict[str, float]]]:
+        """Yield the newest *max_snapshots* records in chronological order.
+
+        Only the newest segments whose counts cover *max_snapshots* are read.
+        """
+        needed = []
+        total = 0
+        for seg in reversed(self._segments):
+            needed.append(seg)
+            total += seg["count"]
+            if total >= max_snapshots:
+                break
+        skip = max(0, total - max_snapshots)
+        for seg in reversed(needed):
+            for record in _read_segment(self.directory / seg["file"]):
+                if skip:
+                    skip -= 1
+                    continue
+                yield record
+
+
+def migrate_jsonl(
+    jsonl_path: Path,
+    store: SegmentStore,
+    on_snapshot: Optional[Callable[[float, Dict[str, Any]], None]] = None,
+) -> int:
+    """One-shot migration of a legacy ``metrics-history.jsonl`` file into *store*.
+
+    Each migrated snapshot is also passed to *on_snapshot* (e.g. to replay it
+    through the rollup tiers).  The source is renamed to ``<name>.migrated``
+    afterwards so the migration never runs twice.  Returns the number of
+    snapshots migrated.
+    """
+    migrated = 0
+    try:
+        with open(jsonl_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    snap = json.loads(line)
+                    ts = datetime.fromisoformat(snap.pop("timestamp")).timestamp()
+                except (json.JSONDecodeError, ValueError, KeyError, TypeError, AttributeError):
+                    continue
+                store.append(ts, snap)
+                if on_snapshot is not None:
+                    on_snapshot(ts, snap)
+                migrated += 1
+    except OSError as exc:
+        logger.warning("MetricStore: cannot read legacy history file %s: %s", jsonl_path, exc)
+        return 0
+    store.close()
+
+    try:
+        jsonl_path.replace(jsonl_path.with_name(jsonl_path.name + ".migrated"))
+    except OSError as exc:
+        logger.warning("MetricStore: cannot rename migrated history file: %s", exc)
+    logger.info("MetricStore: migrated %d snapshots from %s to segments", migrated, jsonl_path.name)
+    return migrated
@@ -0,0 +1,163 @@
+"""
+Push-based delta stream of a MetricStore's ``/metrics/all`` state.
+
+``/api/vllm/metrics/all`` copies and serializes the whole metric dict (every
+``_bucket_le_*`` entry included) on every poll from every tab.  A
+``MetricsStream`` instead diffs the state once per update and versions each
+metric, so a subscriber gets the full state once and afterwards only the
+entries that changed since the version it last saw:
+
+    {"type": "full",  "seq": 7, "metrics": {...}, <meta>}
+    {"type": "delta", "seq": 9, "base": 7, "changed": {...}, "removed": [...], <meta>}
+    {"type": "meta",  "seq": 9, <meta>}                      (keep-alive)
+
+``<meta>`` carries the non-metric fields of the ``/metrics/all`` payload
+(``source``, ``scrape_age_seconds``, ``metric_count``, ``run_mode``).
+
+Subscribers that fall behind are never queued up: whenever they are ready
+they receive one delta covering everything since their last version.
+Unfiltered deltas are serialized once and shared by every subscriber at the
+same base version; filtered subscribers (exact names, or ``prefix*``
+patterns) get their own frames.
+"""
+
+import asyncio
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+_META_KEYS = ("source", "scrape_age_seconds", "metric_count", "run_mode")
+
+
+class MetricFilter:
+    """Per-subscriber metric selection: exact names plus ``prefix*`` patterns."""
+
+    __slots__ = ("names", "prefixes")
+
+    def __init__(self, patterns: Optional[Iterable[str]] = None):
+        self.names: Set[str] = set()
+        self.prefixes: Tuple[str, ...] = ()
+        prefixes = []
+        for p in patterns or ():
+            p = p.strip()
+            if not p:
+                continue
+            if p.endswith("*"):
+                prefixes.append(p[:-1])
+            else:
+                self.names.add(p)
+        self.prefixes = tuple(prefixes)
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> Optional["MetricFilter"]:
+        """Build a filter from a comma-separated string (``None`` = everything)."""
+        if not value:
+            return None
+        flt = cls(value.split(","))
+        return flt if flt.names or flt.prefixes else None
+
+    def __call__(self, name: str) -> bool:
+        return name in self.names or (bool(self.prefixes) and name.startswith(self.prefixes))
+
+
+class MetricsStream:
+    """Versioned view of one store's metrics with shared delta frames."""
+
+    def __init__(self):
+        self.version = 0
+        self._state: Dict[str, Any] = {}
+        self._meta: Dict[str, Any] = {}
+        self._changed_at: Dict[str, int] = {}
+        self._removed_at: Dict[str, int] = {}
+        self._dirty = True
+        self._waiters: Set[asyncio.Event] = set()
+        # (base_version, version) -> serialized unfiltered delta
+        self._frame_cache: Dict[Tuple[int, int], str] = {}
+
+    # -- Producer side --------------------------------------------------------
+
+    def mark_dirty(self) -> None:
+        """Called by the store after every recorded snapshot; wakes subscribers."""
+        self._dirty = True
+        self.wake_all()
+
+    def wake_all(self) -> None:
+        for event in self._waiters:
+            event.set()
+
+    def refresh(self, build_payload: Callable[[], Dict[str, Any]]) -> bool:
+        """Rebuild the state if the store changed; returns True if a new version was cut.
+
+        *build_payload* returns a ``/metrics/all``-shaped dict.  Runs at most
+        once per store update no matter how many subscribers are attached.
+        """
+        if not self._dirty:
+            return False
+        self._dirty = False
+        payload = build_payload()
+        metrics = payload.get("metrics") or {}
+        self._meta = {k: payload.get(k) for k in _META_KEYS}
+
+        state = self._state
+        version = self.version + 1
+        changed = False
+        for name, entry in metrics.items():
+            if state.get(name) != entry:
+                self._changed_at[name] = version
+                self._removed_at.pop(name, None)
+                changed = True
+        for name in state.keys() - metrics.keys():
+            self._removed_at[name] = version
+            self._changed_at.pop(name, None)
+            changed = True
+        self._state = dict(metrics)
+        if changed:
+            self.version = version
+            self._frame_cache.clear()
+        return changed
+
+    # -- Subscriber side ------------------------------------------------------
+
+    def add_waiter(self) -> asyncio.Event:
+        event = asyncio.Event()
+        self._waiters.add(event)
+        return event
+
+    def remove_waiter(self, event: asyncio.Event) -> None:
+        self._waiters.discard(event)
+
+    def full_frame(self, flt: Optional[MetricFilter] = None, **extra) -> str:
+        metrics = self._state if flt is None else {k: v for k, v in self._state.items() if flt(k)}
+        return json.dumps({"type": "full", "seq": self.version, "metrics": metrics, **self._meta, **extra})
+
+    def meta_frame(self, **extra) -> str:
+        return json.dumps({"type": "meta", "seq": self.version, **self._meta, **extra})
+
+    def delta_frame(self, base: int, flt: Optional[MetricFilter] = None, **extra) -> Optional[str]:
+        """Frame with every change after version *base*, or ``None`` if nothing relevant changed."""
+        if base >= self.version:
+            return None
+        cache_key = (base, self.version)
+        if flt is None and not extra:
+            cached = self._frame_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        state = self._state
+        changed = {k: state[k] for k, v in self._changed_at.items() if v > base and (flt is None or flt(k))}
+        removed: List[str] = [k for k, v in self._removed_at.items() if v > base and (flt is None or flt(k))]
+        if not changed and not removed:
+            return None
+        frame = json.dumps(
+            {
+                "type": "delta",
+                "seq": self.version,
+                "base": base,
+                "changed": changed,
+                "removed": removed,
+                **self._meta,
+                **extra,
+            }
+        )
+        if flt is None and not extra:
+            self._frame_cache[cache_key] = frame
+        return frame
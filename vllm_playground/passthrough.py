@@ -0,0 +1,147 @@
+"""
+Raw-bytes pass-through helpers for the ``/v1`` gateway.
+
+Routing a request only needs its ``model`` (and ``stream``) fields, but
+``json.loads`` on a multimodal chat body materialises every base64 image as
+a Python string, and re-encoding it for the upstream call copies it again.
+``scan_request`` reads the wanted top-level fields straight from the body
+bytes: nested values are skipped by jumping between structural characters
+(``bytes.find`` / ``re.search`` run in C, so a multi-megabyte string costs
+one call), and only the wanted values are decoded.  The original bytes are
+then forwarded unchanged.
+
+The scan is bounded: it gives up (returns None) after ``max_tokens``
+structural tokens, e.g. for a body with tens of thousands of small
+messages, and the caller falls back to ``json.loads``.  It does not
+validate the parts it skips; malformed bodies are rejected by the backend
+as before.
+
+``response_headers`` selects the upstream response headers that can be
+forwarded as-is when the response body is streamed through unchanged.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+DEFAULT_MAX_TOKENS = 20000
+
+# Hop-by-hop headers (RFC 9110 7.6.1) plus the ones the ASGI server recomputes
+# for the streamed body (aiohttp has already undone any content encoding)
+_DROPPED_HEADERS = frozenset(
+    (
+        "connection",
+        "keep-alive",
+        "proxy-authenticate",
+        "proxy-authorization",
+        "te",
+        "trailer",
+        "transfer-encoding",
+        "upgrade",
+        "content-length",
+        "content-encoding",
+        "date",
+        "server",
+    )
+)
+
+_STRUCTURAL = re.compile(rb'["\[\]{}]')
+_SCALAR_END = re.compile(rb"[,\]}\s]")
+_WHITESPACE = b" \t\r\n"
+
+
+def _skip_ws(raw: bytes, pos: int) -> int:
+    n = len(raw)
+    while pos < n and raw[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def _skip_string(raw: bytes, pos: int) -> int:
+    """Index just past the string whose opening quote is at *pos*."""
+    i = pos + 1
+    while True:
+        end = raw.find(b'"', i)
+        if end < 0:
+            raise ValueError("Unterminated string in request body")
+        backslashes = 0
+        while raw[end - 1 - backslashes] == 0x5C:
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return end + 1
+        i = end + 1
+
+
+def _skip_value(raw: bytes, pos: int, budget: int) -> Tuple[int, int]:
+    """``(end, budget)``: index just past the JSON value starting at *pos*, and the tokens left."""
+    first = raw[pos : pos + 1]
+    if first == b'"':
+        return _skip_string(raw, pos), budget - 1
+    if first not in (b"{", b"["):
+        match = _SCALAR_END.search(raw, pos)
+        return (match.start() if match else len(raw)), budget - 1
+
+    depth = 0
+    i = pos
+    while budget > 0:
+        match = _STRUCTURAL.search(raw, i)
+        if match is None:
+            raise ValueError("Unterminated array or object in request body")
+        i = match.start()
+        budget -= 1
+        char = raw[i]
+        if char == 0x22:  # "
+            i = _skip_string(raw, i)
+            continue
+        depth += 1 if char in (0x7B, 0x5B) else -1  # { [ vs } ]
+        i += 1
+        if depth == 0:
+            return i, budget
+    return i, 0
+
+
+def scan_request(
+    raw: bytes, keys: Iterable[str] = ("model", "stream"), max_tokens: int = DEFAULT_MAX_TOKENS
+) -> Optional[Dict[str, Any]]:
+    """The values of the top-level *keys* present in the JSON object *raw*.
+
+    Returns None when the scan exceeds *max_tokens* (parse the body instead);
+    raises ValueError when *raw* is not a JSON object.
+    """
+    wanted = set(keys)
+    found: Dict[str, Any] = {}
+    budget = max_tokens
+    pos = _skip_ws(raw, 0)
+    if raw[pos : pos + 1] != b"{":
+        raise ValueError("Request body must be a JSON object")
+    pos = _skip_ws(raw, pos + 1)
+    if raw[pos : pos + 1] == b"}":
+        return found
+    while True:
+        if raw[pos : pos + 1] != b'"':
+            raise ValueError("Expected a field name in request body")
+        end = _skip_string(raw, pos)
+        key = raw[pos + 1 : end - 1]
+        key = json.loads(raw[pos:end]) if b"\\" in key else key.decode("utf-8", "replace")
+        pos = _skip_ws(raw, end)
+        if raw[pos : pos + 1] != b":":
+            raise ValueError("Expected ':' in request body")
+        pos = _skip_ws(raw, pos + 1)
+        end, budget = _skip_value(raw, pos, budget)
+        if budget <= 0:
+            return None
+        if key in wanted:
+            # Duplicate keys: the last one wins, as with json.loads
+            found[key] = json.loads(raw[pos:end])
+        pos = _skip_ws(raw, end)
+        separator = raw[pos : pos + 1]
+        if separator == b"}":
+            return found
+        if separator != b",":
+            raise ValueError("Expected ',' or '}' in request body")
+        pos = _skip_ws(raw, pos + 1)
+
+
+def response_headers(headers: Mapping[str, str]) -> Dict[str, str]:
+    """Upstream response headers to send along with the unchanged body."""
+    return {name: value for name, value in headers.items() if name.lower() not in _DROPPED_HEADERS}
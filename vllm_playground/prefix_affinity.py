@@ -0,0 +1,183 @@
+"""
+Prefix-affinity routing for the ``/v1`` gateway.
+
+vLLM's automatic prefix cache only pays off when requests sharing a long
+prefix (system prompt, tool schemas, few-shot examples) reach the replica
+that already holds its KV blocks.  ``prefix_key`` reduces a request body to
+a 64-bit hash of its shared prefix, and ``HashRing`` maps that hash onto the
+healthy replicas of the model with consistent hashing, so a key keeps its
+replica while replicas come and go (only the keys of the changed replica
+move).
+
+The prefix is the leading system / developer messages plus the ``tools``
+schema when present; otherwise the first ``prefix_chars`` characters of the
+conversation (about ``prefix_chars / 4`` tokens) or of the completion
+prompt.  Whitespace at the ends of each part is stripped; nothing else is
+normalised, since vLLM matches prefixes token for token.
+
+``HashRing.lookup`` applies bounded loads (consistent hashing with bounded
+loads, Mirrokni et al.): walking the ring from the key's position, a
+replica is skipped while its in-flight count is at or above
+``ceil(load_factor * (total + 1) / replicas)``, so one hot prefix spills to
+the next replicas on the ring instead of swamping its owner.  The ring spans
+every healthy replica of the model; replicas that cannot take the request
+right now (admission limit reached, already tried) are passed as the
+complement of ``allowed`` and walked past the same way, so ownership does
+not shift while they are busy.
+"""
+
+import hashlib
+import json
+import math
+from bisect import bisect_left
+from typing import AbstractSet, Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+DEFAULT_PREFIX_CHARS = 4096
+VIRTUAL_NODES = 64
+DEFAULT_LOAD_FACTOR = 1.25
+
+_LEADING_ROLES = ("system", "developer")
+
+
+def _hash64(data: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big")
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content.strip()
+    if isinstance(content, list):
+        parts = []
+        for part in content:
+            if isinstance(part, dict):
+                # Text parts verbatim; images / audio by type only (their payloads are huge)
+                parts.append(part.get("text", "").strip() if part.get("type") == "text" else f"<{part.get('type')}>")
+            else:
+                parts.append(str(part))
+        return "\n".join(parts)
+    return "" if content is None else str(content)
+
+
+def prefix_text(body: Mapping[str, Any], prefix_chars: int = DEFAULT_PREFIX_CHARS) -> str:
+    """The shared-prefix part of a chat or completion request body ("" if there is none)."""
+    messages = body.get("messages")
+    if isinstance(messages, list):
+        leading = []
+        for message in messages:
+            if not isinstance(message, dict) or message.get("role") not in _LEADING_ROLES:
+                break
+            leading.append(_content_text(message.get("content")))
+        tools = body.get("tools")
+        if tools:
+            leading.append(json.dumps(tools, sort_keys=True, separators=(",", ":")))
+        if any(leading):
+            return "\n".join(leading)[:prefix_chars]
+
+        text = []
+        size = 0
+        for message in messages:
+            if not isinstance(message, dict):
+                continue
+            part = f"{message.get('role')}:{_content_text(message.get('content'))}"
+            text.append(part)
+            size += len(part)
+            if size >= prefix_chars:
+                break
+        return "\n".join(text)[:prefix_chars]
+
+    prompt = body.get("prompt")
+    if isinstance(prompt, list):
+        prompt = prompt[0] if prompt else ""
+    if isinstance(prompt, str):
+        return prompt.strip()[:prefix_chars]
+    return ""
+
+
+def prefix_key(body: Mapping[str, Any], prefix_chars: int = DEFAULT_PREFIX_CHARS) -> Optional[int]:
+    """64-bit hash of the request's model and shared prefix, or None when it has no prefix."""
+    text = prefix_text(body, prefix_chars)
+    if not text:
+        return None
+    return _hash64(f"{body.get('model')}\0{text}".encode("utf-8", "replace"))
+
+
+class HashRing:
+    """Consistent-hash ring over replica ids with ``VIRTUAL_NODES`` points each."""
+
+    def __init__(self, replica_ids: Sequence[str], virtual_nodes: int = VIRTUAL_NODES):
+        self.replica_ids = tuple(replica_ids)
+        points: List[Tuple[int, str]] = []
+        for replica_id in self.replica_ids:
+            for i in range(virtual_nodes):
+                points.append((_hash64(f"{replica_id}#{i}".encode()), replica_id))
+        points.sort()
+        self._hashes = [h for h, _ in points]
+        self._owners = [r for _, r in points]
+
+    def walk(self, key: int):
+        """Distinct replica ids in ring order starting at *key*'s position."""
+        n = len(self._hashes)
+        start = bisect_left(self._hashes, key) % n if n else 0
+        seen = set()
+        for i in range(n):
+            owner = self._owners[(start + i) % n]
+            if owner not in seen:
+                seen.add(owner)
+                yield owner
+                if len(seen) == len(self.replica_ids):
+                    return
+
+    def lookup(
+        self,
+        key: int,
+        in_flight: Mapping[str, int],
+        load_factor: float = DEFAULT_LOAD_FACTOR,
+        allowed: Optional[AbstractSet[str]] = None,
+    ) -> Tuple[str, bool]:
+        """``(replica_id, is_owner)``: the first replica on the ring from *key* that is under the load bound.
+
+        Only replicas in *allowed* (default: all) are returned; the owner is
+        still the first replica on the full ring.  When every allowed replica
+        is at the bound, the first allowed one is returned.
+        """
+        total = sum(in_flight.get(r, 0) for r in self.replica_ids)
+        bound = math.ceil(load_factor * (total + 1) / len(self.replica_ids))
+        owner = fallback = None
+        for replica_id in self.walk(key):
+            if owner is None:
+                owner = replica_id
+            if allowed is not None and replica_id not in allowed:
+                continue
+            if fallback is None:
+                fallback = replica_id
+            if in_flight.get(replica_id, 0) < bound:
+                return replica_id, replica_id == owner
+        return fallback, fallback == owner
+
+
+class AffinityStats:
+    """Per-replica counts of requests routed to their prefix's owner vs. spilled over."""
+
+    def __init__(self):
+        self.owner: Dict[str, int] = {}
+        self.overflow: Dict[str, int] = {}
+        self.keys: Dict[str, set] = {}
+
+    def record(self, replica_id: str, key: int, is_owner: bool) -> None:
+        counts = self.owner if is_owner else self.overflow
+        counts[replica_id] = counts.get(replica_id, 0) + 1
+        keys = self.keys.setdefault(replica_id, set())
+        if len(keys) < 10000:
+            keys.add(key)
+
+    def forget(self, replica_id: str) -> None:
+        self.owner.pop(replica_id, None)
+        self.overflow.pop(replica_id, None)
+        self.keys.pop(replica_id, None)
+
+    def to_dict(self, replica_id: str) -> Dict[str, Any]:
+        return {
+            "owner_routed": self.owner.get(replica_id, 0),
+            "overflow_routed": self.overflow.get(replica_id, 0),
+            "distinct_prefixes": len(self.keys.get(replica_id, ())),
+        }
@@ -0,0 +1,378 @@
+"""
+Streaming Prometheus exposition parser for vLLM ``/metrics`` scrapes.
+
+The parser walks the exposition text once and keeps every label set as its
+own series, so per-``model_name`` / per-``engine`` / per-``finished_reason``
+samples no longer overwrite each other.  Histogram buckets are grouped per
+label set (with ``le`` removed) so percentiles can be computed per series.
+
+Metric names, label names and raw label strings are interned in module-level
+caches: a vLLM server emits the same few hundred names and label sets on
+every scrape, so after the first scrape each line costs a dict lookup
+instead of string surgery.
+
+``to_metric_entries()`` folds a parsed scrape back into the flat
+``{metric_name: {"value", "type", "labels"}}`` shape that ``MetricStore``
+and the Observability frontend consume.
+"""
+
+import sys
+from typing import Dict, List, Optional, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+_INF = float("inf")
+
+# Suffixes that prometheus_client appends to the base metric name.
+_SUFFIXES = ("_total", "_created", "_bucket", "_count", "_sum")
+
+# Bounded caches shared across scrapes.  Cleared wholesale on overflow; the
+# working set of a single vLLM server is far below these limits.
+_CACHE_MAX = 16384
+_NAME_CACHE: Dict[str, Tuple[str, str]] = {}
+_LABEL_CACHE: Dict[str, Tuple[LabelKey, Optional[float], str]] = {}
+
+
+class HistogramSeries:
+    """Cumulative buckets plus ``_sum`` / ``_count`` for one label set."""
+
+    __slots__ = ("labels", "buckets", "sum", "count")
+
+    def __init__(self, labels: str):
+        self.labels = labels
+        self.buckets: List[Tuple[float, float]] = []
+        self.sum: Optional[float] = None
+        self.count: Optional[float] = None
+
+
+class PromScrape:
+    """Result of a single :func:`parse_exposition` pass.
+
+    Attributes:
+        types:      ``{base_name: type}`` from ``# TYPE`` comments.
+        samples:    ``{entry_key: {label_key: value}}`` for plain samples.
+                    ``entry_key`` is the base name for ``_total`` counters and
+                    the full sample name otherwise (matches legacy keys).
+        labels:     ``{label_key: display_str}`` for every label set seen.
+        histograms: ``{base_name: {label_key: HistogramSeries}}``.
+    """
+
+    __slots__ = ("types", "samples", "labels", "histograms")
+
+    def __init__(self):
+        self.types: Dict[str, str] = {}
+        self.samples: Dict[str, Dict[LabelKey, float]] = {}
+        self.labels: Dict[LabelKey, str] = {}
+        self.histograms: Dict[str, Dict[LabelKey, HistogramSeries]] = {}
+
+    def series_count(self) -> int:
+        """Total number of distinct series (histograms count once per label set)."""
+        return sum(len(s) for s in self.samples.values()) + sum(len(h) for h in self.histograms.values())
+
+
+# ---------------------------------------------------------------------------
+# Name / label interning
+# ---------------------------------------------------------------------------
+
+
+def _split_name(name: str) -> Tuple[str, str]:
+    """Return ``(base_name, suffix)`` for a sample name, interned and cached."""
+    info = _NAME_CACHE.get(name)
+    if info is not None:
+        return info
+    base, suffix = name, ""
+    for sfx in _SUFFIXES:
+        if name.endswith(sfx):
+            base, suffix = name[: -len(sfx)], sfx
+            break
+    if len(_NAME_CACHE) >= _CACHE_MAX:
+        _NAME_CACHE.clear()
+    info = (sys.intern(base), suffix)
+    _NAME_CACHE[sys.intern(name)] = info
+    return info
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    out = []
+    i, n = 0, len(value)
+    while i < n:
+        ch = value[i]
+        if ch == "\\" and i + 1 < n:
+            nxt = value[i + 1]
+            out.append("\n" if nxt == "n" else nxt)
+            i += 2
+        else:
+            out.append(ch)
+            i += 1
+    return "".join(out)
+
+
+def _parse_labels(raw: str) -> Tuple[LabelKey, Optional[float], str]:
+    """Parse the text between ``{`` and ``}``.
+
+    Returns ``(label_key, le, display)`` where ``label_key`` excludes ``le``
+    and ``display`` is the canonical ``k="v",...`` form of ``label_key``.
+    Handles quoted values containing commas, braces and escaped quotes.
+    """
+    cached = _LABEL_CACHE.get(raw)
+    if cached is not None:
+        return cached
+
+    pairs: List[Tuple[str, str]] = []
+    le: Optional[float] = None
+    i, n = 0, len(raw)
+    while i < n:
+        eq = raw.find("=", i)
+        if eq < 0:
+            break
+        lname = raw[i:eq].strip(" ,\t")
+        q = raw.find('"', eq)
+        if q < 0:
+            break
+        j = q + 1
+        while True:
+            k = raw.find('"', j)
+            if k < 0:
+                k = n
+                break
+            bs = 0
+            m = k - 1
+            while m > q and raw[m] == "\\":
+                bs += 1
+                m -= 1
+            if bs % 2 == 0:
+                break
+            j = k + 1
+        lval = _unescape(raw[q + 1 : k])
+        if lname == "le":
+            try:
+                le = float(lval)
+            except ValueError:
+                le = None
+        else:
+            pairs.append((sys.intern(lname), lval))
+        i = k + 1
+
+    key: LabelKey = tuple(pairs)
+    display = ",".join(f'{k}="{v}"' for k, v in key)
+    result = (key, le, display)
+    if len(_LABEL_CACHE) >= _CACHE_MAX:
+        _LABEL_CACHE.clear()
+    _LABEL_CACHE[raw] = result
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Single-pass parser
+# ---------------------------------------------------------------------------
+
+
+def parse_exposition(text: str, prefix: str = "vllm:") -> PromScrape:
+    """Parse Prometheus exposition text in one pass.
+
+    Only samples whose name starts with *prefix* are kept (pass ``""`` to
+    keep everything).  ``_created`` samples are dropped.
+    """
+    scrape = PromScrape()
+    types = scrape.types
+    samples = scrape.samples
+    label_names = scrape.labels
+    histograms = scrape.histograms
+    empty: LabelKey = ()
+
+    for line in text.splitlines():
+        if not line:
+            continue
+        first = line[0]
+        if first == "#":
+            if line.startswith("# TYPE "):
+                parts = line.split()
+                if len(parts) >= 4:
+                    types[sys.intern(parts[2])] = parts[3]
+            continue
+        if first == " " or first == "\t":
+            line = line.strip()
+            if not line or line[0] == "#":
+                continue
+        if not line.startswith(prefix):
+            continue
+
+        brace = line.find("{")
+        if brace >= 0:
+            close = line.rfind("}")
+            if close < brace:
+                continue
+            name = line[:brace]
+            label_key, le, display = _parse_labels(line[brace + 1 : close])
+            rest = line[close + 1 :].lstrip()
+        else:
+            sp = line.find(" ")
+            if sp < 0:
+                continue
+            name = line[:sp]
+            label_key, le, display = empty, None, ""
+            rest = line[sp + 1 :].lstrip()
+
+        sp = rest.find(" ")
+        try:
+            value = float(rest if sp < 0 else rest[:sp])
+        except ValueError:
+            continue
+
+        base, suffix = _split_name(name)
+        if suffix == "_created":
+            continue
+
+        if suffix == "_bucket":
+            if le is None:
+                continue
+            series = histograms.setdefault(base, {}).get(label_key)
+            if series is None:
+                series = HistogramSeries(display)
+                histograms[base][label_key] = series
+            series.buckets.append((le, value))
+            continue
+
+        if suffix == "_sum" or suffix == "_count":
+            group = histograms.get(base)
+            if group is not None or types.get(base) in ("histogram", "summary"):
+                series = histograms.setdefault(base, {}).get(label_key)
+                if series is None:
+                    series = HistogramSeries(display)
+                    histograms[base][label_key] = series
+                if suffix == "_sum":
+                    series.sum = value
+                else:
+                    series.count = value
+
+        key = base if suffix == "_total" else name
+        bucket = samples.get(key)
+        if bucket is None:
+            bucket = samples[key] = {}
+        bucket[label_key] = value
+        if label_key not in label_names:
+            label_names[label_key] = display
+
+    return scrape
+
+
+# ---------------------------------------------------------------------------
+# Histogram helpers
+# ---------------------------------------------------------------------------
+
+
+def compute_percentiles(buckets: List[Tuple[float, float]]) -> Dict[str, float]:
+    """Compute p50, p95, p99 from cumulative histogram buckets."""
+    sorted_b = sorted(buckets, key=lambda x: x[0])
+    if not sorted_b:
+        return {}
+
+    total = sorted_b[-1][1]
+    if total <= 0:
+        return {}
+
+    result = {}
+    for pname, target in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+        threshold = total * target
+        prev_le, prev_count = 0.0, 0.0
+        for le, count in sorted_b:
+            if le == _INF:
+                break
+            if count >= threshold:
+                if count == prev_count:
+                    result[pname] = le
+                else:
+                    frac = (threshold - prev_count) / (count - prev_count)
+                    result[pname] = prev_le + frac * (le - prev_le)
+                break
+            prev_le, prev_count = le, count
+        else:
+            result[pname] = prev_le
+
+    return result
+
+
+def merge_buckets(series: List[HistogramSeries]) -> List[Tuple[float, float]]:
+    """Sum cumulative bucket counts across label sets, sorted by ``le``."""
+    if len(series) == 1:
+        return sorted(series[0].buckets)
+    merged: Dict[float, float] = {}
+    for s in series:
+        for le, count in s.buckets:
+            merged[le] = merged.get(le, 0.0) + count
+    return sorted(merged.items())
+
+
+def format_le(le: float) -> str:
+    """Format a bucket bound the way bucket entry keys have always used it."""
+    return "+Inf" if le == _INF else str(le)
+
+
+# ---------------------------------------------------------------------------
+# Flat MetricStore entries
+# ---------------------------------------------------------------------------
+
+
+def to_metric_entries(scrape: PromScrape) -> Dict[str, Dict]:
+    """Fold a parsed scrape into ``{metric_name: entry}`` for ``MetricStore.latest``.
+
+    Each metric keeps a single top-level ``value`` for existing consumers:
+    counters and ``_sum``/``_count`` are summed across label sets, gauges keep
+    the last label set in exposition order.  When a metric has more than one
+    label set, the per-series values are listed under ``"series"``.
+    Histograms get percentiles over the merged buckets plus per-series
+    percentiles, and ``<name>_bucket_le_<le>`` entries for the merged buckets.
+    """
+    types = scrape.types
+    labels = scrape.labels
+    metrics: Dict[str, Dict] = {}
+
+    for key, by_labels in scrape.samples.items():
+        base, suffix = _split_name(key)
+        if suffix in ("_sum", "_count"):
+            mtype = "counter"
+        else:
+            mtype = types.get(base if suffix == "_total" else key) or types.get(base) or "gauge"
+            if mtype == "unknown" or mtype == "untyped":
+                mtype = "gauge"
+
+        if len(by_labels) == 1:
+            ((label_key, value),) = by_labels.items()
+            metrics[key] = {"value": value, "type": mtype, "labels": labels[label_key]}
+            continue
+
+        values = list(by_labels.values())
+        total = sum(values) if mtype == "counter" else values[-1]
+        metrics[key] = {
+            "value": total,
+            "type": mtype,
+            "labels": "",
+            "series": [{"labels": labels[k], "value": v} for k, v in by_labels.items()],
+        }
+
+    for base, groups in scrape.histograms.items():
+        group_list = [g for g in groups.values() if g.buckets]
+        if not group_list:
+            continue
+        merged = merge_buckets(group_list)
+        percentiles = compute_percentiles(merged)
+        if not percentiles:
+            continue
+        entry = {"type": "histogram", "labels": "", **percentiles}
+        if len(group_list) > 1:
+            entry["series"] = [
+                {"labels": g.labels, "count": g.count, "sum": g.sum, **compute_percentiles(g.buckets)}
+                for g in group_list
+            ]
+        metrics[base] = entry
+        for le, count in merged:
+            le_str = format_le(le)
+            metrics[f"{base}_bucket_le_{le_str}"] = {
+                "value": count,
+                "type": "histogram_bucket",
+                "labels": f'le="{le_str}"',
+            }
+
+    return metrics
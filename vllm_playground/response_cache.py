@@ -0,0 +1,369 @@
+"""
+Deterministic response cache for the ``/v1`` gateway.
+
+Eval harnesses replay the same greedy prompts many times; with
+``temperature: 0`` or a fixed ``seed`` vLLM answers them the same way, so
+the gateway can answer a repeat without touching a GPU.  The cache is
+opt-in (``VLLM_PLAYGROUND_RESPONSE_CACHE=1``) and only considers requests
+that ``is_deterministic`` accepts.
+
+The key is a SHA-256 of the endpoint path and the canonical request body:
+keys sorted, no whitespace, ``null`` fields and the ``user`` field dropped,
+integral floats written as integers (``0.0`` and ``0`` are the same
+temperature).  ``stream`` stays in the key: a streamed response is cached
+as its raw SSE bytes and replayed event by event, a non-streamed one as its
+JSON body.  Only complete 200 responses are stored (a stream must end with
+``data: [DONE]``), and only up to ``max_entry_bytes``.
+
+Entries live in two tiers, each an LRU with a byte cap and the same TTL:
+
+  - memory: an ``OrderedDict`` of ``CachedResponse``;
+  - disk (optional): ``<key>.body`` + ``<key>.meta`` files under ``root``,
+    indexed in memory.  Memory misses fall through to disk and disk hits
+    are promoted to memory.
+
+The disk tier does blocking file I/O; ``ResponseCache.lookup`` /
+``store`` run it in a worker thread.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from .self_metrics import RESPONSE_CACHE_BYTES, RESPONSE_CACHE_ENTRIES, RESPONSE_CACHE_LOOKUPS, RESPONSE_CACHE_SERVED
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_BYTES = 1024 * 1024 * 1024
+DEFAULT_MAX_ENTRY_BYTES = 8 * 1024 * 1024
+DEFAULT_TTL = 24 * 3600.0
+
+# Fields that never change what the model generates
+_IGNORED_FIELDS = ("user",)
+
+
+def default_cache_root() -> Path:
+    return Path(os.environ.get("VLLM_PLAYGROUND_RESPONSE_CACHE_DIR") or Path.home() / ".vllm-playground" / "cache")
+
+
+def is_deterministic(fields: Mapping[str, Any]) -> bool:
+    """Greedy sampling (``temperature`` 0) or a fixed integer ``seed``."""
+    temperature = fields.get("temperature")
+    if isinstance(temperature, (int, float)) and not isinstance(temperature, bool) and temperature == 0:
+        return True
+    seed = fields.get("seed")
+    return isinstance(seed, int) and not isinstance(seed, bool)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_normalize(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def cache_key(path: str, body: Mapping[str, Any]) -> str:
+    """Hex SHA-256 of *path* and the canonical form of *body*."""
+    canonical = _normalize({k: v for k, v in body.items() if k not in _IGNORED_FIELDS})
+    text = json.dumps(canonical, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(f"{path}\0{text}".encode("utf-8", "surrogatepass")).hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """A complete upstream response as stored in the cache."""
+
+    key: str
+    model: str
+    path: str
+    stream: bool
+    content_type: str
+    body: bytes
+    backend_id: str = ""
+    created: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "path": self.path,
+            "stream": self.stream,
+            "content_type": self.content_type,
+            "backend_id": self.backend_id,
+            "created": self.created,
+            "size": self.size,
+        }
+
+    def events(self) -> Iterator[bytes]:
+        """The SSE events of a cached stream, one chunk per event."""
+        for event in self.body.split(b"\n\n"):
+            if event.strip():
+                yield event + b"\n\n"
+
+
+class _MemoryTier:
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry.created > self.ttl:
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, entry: CachedResponse) -> None:
+        if entry.size > self.max_bytes:
+            return
+        self._drop(entry.key)
+        self._entries[entry.key] = entry
+        self.bytes += entry.size
+        while self.bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def invalidate(self, model: Optional[str]) -> set:
+        keys = {k for k, e in self._entries.items() if model is None or e.model == model}
+        for key in keys:
+            self._drop(key)
+        return keys
+
+
+class _DiskTier:
+    """``<key>.body`` / ``<key>.meta`` files under *root*, LRU by last access (meta mtime)."""
+
+    def __init__(self, root: Path, max_bytes: int, ttl: float):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._index: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # key -> meta
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def load(self) -> None:
+        """Index the entries already on disk (least recently used first)."""
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.root.is_dir():
+                return
+            found = []
+            for meta_path in self.root.glob("*.meta"):
+                try:
+                    meta = json.loads(meta_path.read_text())
+                    found.append((meta_path.stat().st_mtime, meta_path.stem, meta))
+                except (OSError, ValueError):
+                    continue
+            for _, key, meta in sorted(found, key=lambda item: item[0]):
+                self._index[key] = meta
+                self.bytes += meta.get("size", 0)
+            self._evict()
+        logger.info(f"Response cache: {len(self._index)} entries ({self.bytes} bytes) on disk in {self.root}")
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        self.load()
+        with self._lock:
+            meta = self._index.get(key)
+            if meta is None:
+                return None
+            if time.time() - meta.get("created", 0) > self.ttl:
+                self._drop(key)
+                return None
+            try:
+                body = (self.root / f"{key}.body").read_bytes()
+            except OSError:
+                self._drop(key)
+                return None
+            self._index.move_to_end(key)
+            try:
+                # The meta file's mtime is the entry's last access, for LRU order after a restart
+                os.utime(self.root / f"{key}.meta")
+            except OSError:
+                pass
+        return CachedResponse(
+            key=key,
+            model=meta["model"],
+            path=meta["path"],
+            stream=meta["stream"],
+            content_type=meta["content_type"],
+            body=body,
+            backend_id=meta.get("backend_id", ""),
+            created=meta["created"],
+        )
+
+    def put(self, entry: CachedResponse) -> None:
+        if entry.size > self.max_bytes:
+            return
+        self.load()
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._drop(entry.key)
+            try:
+                # Body first, meta last: an entry only exists once its meta is written
+                tmp = self.root / f"{entry.key}.body.tmp"
+                tmp.write_bytes(entry.body)
+                tmp.replace(self.root / f"{entry.key}.body")
+                (self.root / f"{entry.key}.meta").write_text(json.dumps(entry.meta()))
+            except OSError as e:
+                logger.warning(f"Response cache: could not write {entry.key}: {e}")
+                return
+            self._index[entry.key] = entry.meta()
+            self.bytes += entry.size
+            self._evict()
+
+    def _evict(self) -> None:
+        while self.bytes > self.max_bytes and self._index:
+            self._drop(next(iter(self._index)))
+
+    def _drop(self, key: str) -> None:
+        meta = self._index.pop(key, None)
+        if meta is not None:
+            self.bytes -= meta.get("size", 0)
+        for suffix in (".meta", ".body"):
+            try:
+                (self.root / f"{key}{suffix}").unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Response cache: could not remove {key}{suffix}: {e}")
+
+    def invalidate(self, model: Optional[str]) -> set:
+        self.load()
+        with self._lock:
+            keys = {k for k, meta in self._index.items() if model is None or meta.get("model") == model}
+            for key in keys:
+                self._drop(key)
+        return keys
+
+
+class ResponseCache:
+    """Memory + optional disk tier of complete deterministic ``/v1`` responses."""
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        memory_bytes: int = DEFAULT_MEMORY_BYTES,
+        disk_bytes: int = DEFAULT_DISK_BYTES,
+        root: Optional[Path] = None,
+        ttl: float = DEFAULT_TTL,
+        max_entry_bytes: int = DEFAULT_MAX_ENTRY_BYTES,
+    ):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.memory = _MemoryTier(memory_bytes, ttl)
+        self.disk = _DiskTier(root or default_cache_root(), disk_bytes, ttl) if disk_bytes > 0 else None
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        env = os.environ
+        mb = 1024 * 1024
+        return cls(
+            enabled=env.get("VLLM_PLAYGROUND_RESPONSE_CACHE", "").lower() in ("1", "true", "yes"),
+            memory_bytes=int(float(env.get("VLLM_PLAYGROUND_RESPONSE_CACHE_MEMORY_MB") or 64) * mb),
+            disk_bytes=int(float(env.get("VLLM_PLAYGROUND_RESPONSE_CACHE_DISK_MB") or 1024) * mb),
+            ttl=float(env.get("VLLM_PLAYGROUND_RESPONSE_CACHE_TTL") or DEFAULT_TTL),
+            max_entry_bytes=int(float(env.get("VLLM_PLAYGROUND_RESPONSE_CACHE_MAX_ENTRY_MB") or 8) * mb),
+        )
+
+    def load(self) -> None:
+        if self.enabled and self.disk is not None:
+            self.disk.load()
+            self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        RESPONSE_CACHE_BYTES.set(self.memory.bytes, tier="memory")
+        RESPONSE_CACHE_ENTRIES.set(len(self.memory), tier="memory")
+        if self.disk is not None:
+            RESPONSE_CACHE_BYTES.set(self.disk.bytes, tier="disk")
+            RESPONSE_CACHE_ENTRIES.set(len(self.disk), tier="disk")
+
+    async def lookup(self, key: str, model: str) -> Optional[CachedResponse]:
+        entry = self.memory.get(key)
+        tier = "memory"
+        if entry is None and self.disk is not None:
+            entry = await asyncio.to_thread(self.disk.get, key)
+            tier = "disk"
+            if entry is not None:
+                self.memory.put(entry)
+                self._update_gauges()
+        if entry is None:
+            self.misses[model] = self.misses.get(model, 0) + 1
+            RESPONSE_CACHE_LOOKUPS.inc(model=model, result="miss")
+            return None
+        self.hits[model] = self.hits.get(model, 0) + 1
+        RESPONSE_CACHE_LOOKUPS.inc(model=model, result=f"{tier}_hit")
+        RESPONSE_CACHE_SERVED.inc(entry.size, model=model)
+        return entry
+
+    async def store(self, entry: CachedResponse) -> None:
+        if entry.size > self.max_entry_bytes:
+            return
+        entry.created = entry.created or time.time()
+        self.memory.put(entry)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.put, entry)
+        self._update_gauges()
+
+    async def invalidate(self, model: Optional[str] = None) -> int:
+        """Drop the entries of *model* (all entries when None) from both tiers; returns the count removed."""
+        removed = self.memory.invalidate(model)
+        if self.disk is not None:
+            removed |= await asyncio.to_thread(self.disk.invalidate, model)
+        self._update_gauges()
+        return len(removed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        models = sorted(set(self.hits) | set(self.misses))
+        return {
+            "enabled": self.enabled,
+            "ttl": self.ttl,
+            "max_entry_bytes": self.max_entry_bytes,
+            "memory": {"entries": len(self.memory), "bytes": self.memory.bytes, "max_bytes": self.memory.max_bytes},
+            "disk": (
+                {
+                    "entries": len(self.disk),
+                    "bytes": self.disk.bytes,
+                    "max_bytes": self.disk.max_bytes,
+                    "root": str(self.disk.root),
+                }
+                if self.disk is not None
+                else None
+            ),
+            "models": {m: {"hits": self.hits.get(m, 0), "misses": self.misses.get(m, 0)} for m in models},
+        }
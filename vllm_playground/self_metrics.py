@@ -0,0 +1,353 @@
+"""
+Instrumentation of the playground's own hot paths.
+
+When the playground runs as a gateway in front of vLLM, its own overhead
+(proxy latency, chat stream duration, scrape duration, log fan-out) is
+invisible in the backends' ``/metrics``.  This module provides minimal
+counters, gauges and histograms with labels, and renders them in the
+Prometheus text exposition format (0.0.4) for the playground's own
+``/metrics`` endpoint.
+
+It has no dependency on ``prometheus_client``; recording is a dict lookup
+plus a ``bisect`` on the bucket bounds, cheap enough for per-request and
+per-chunk paths.  All metrics live in ``REGISTRY`` and are named
+``vllm_playground_*``.
+"""
+
+import math
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Latency buckets (seconds) covering sub-millisecond proxy overhead up to long streams
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+STREAM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if value != value:
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else f"{value:.1f}"
+
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def clear(self) -> None:
+        self._children.clear()
+
+    def remove(self, **labels) -> None:
+        self._children.pop(self._key(labels), None)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._children[key] = self._children.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._children.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}_total{_label_str(self.labelnames, key)} {_format_value(v)}"
+            for key, v in self._children.items()
+        ]
+
+
+class Gauge(_Metric):
+    """Point-in-time value per label set, or a callback evaluated at render time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float, **labels) -> None:
+        self._children[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self._children[key] = self._children.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def get(self, **labels) -> float:
+        return self._children.get(self._key(labels), 0.0)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Compute the (unlabelled) value lazily on every render."""
+        self._function = fn
+
+    def _samples(self) -> List[str]:
+        if self._function is not None:
+            try:
+                return [f"{self.name} {_format_value(self._function())}"]
+            except Exception:
+                return []
+        return [
+            f"{self.name}{_label_str(self.labelnames, key)} {_format_value(v)}" for key, v in self._children.items()
+        ]
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, n: int):
+        self.counts = [0] * n
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Bucketed observations per label set (cumulative only at render time)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = _HistogramChild(len(self.buckets))
+        child.counts[bisect_left(self.buckets, value)] += 1
+        child.sum += value
+        child.count += 1
+
+    def time(self, **labels) -> "_Timer":
+        """Context manager observing the elapsed wall time of its block."""
+        return _Timer(self, labels)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, child in self._children.items():
+            cumulative = 0
+            for le, n in zip(self.buckets, child.counts):
+                cumulative += n
+                le_label = f'le="{_format_value(le)}"'
+                lines.append(f"{self.name}_bucket{_label_str(self.labelnames, key, le_label)} {cumulative}")
+            labels = _label_str(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, object]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start, **self._labels)
+        return False
+
+
+class Registry:
+    """Ordered collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Duplicate metric {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# -- Hot-path metrics ----------------------------------------------------------
+
+PROXY_REQUESTS = REGISTRY.counter(
+    "vllm_playground_proxy_requests", "Requests routed by the /v1 proxy.", ("path", "backend", "status")
+)
+PROXY_OVERHEAD = REGISTRY.histogram(
+    "vllm_playground_proxy_overhead_seconds",
+    "Time spent in the playground before the upstream request is sent (body parse, routing).",
+    ("path",),
+)
+PROXY_UPSTREAM_LATENCY = REGISTRY.histogram(
+    "vllm_playground_proxy_upstream_response_seconds",
+    "Time from sending the upstream request to receiving its response headers.",
+    ("path", "backend"),
+)
+PROXY_DURATION = REGISTRY.histogram(
+    "vllm_playground_proxy_request_duration_seconds",
+    "End-to-end /v1 proxy request duration, including streamed bodies.",
+    ("path", "stream"),
+    buckets=STREAM_BUCKETS,
+)
+PROXY_IN_FLIGHT = REGISTRY.gauge("vllm_playground_proxy_in_flight_requests", "Proxy requests currently in flight.")
+PROXY_BACKEND_IN_FLIGHT = REGISTRY.gauge(
+    "vllm_playground_proxy_backend_in_flight_requests", "Proxy requests currently in flight per backend.", ("backend",)
+)
+ADMISSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "vllm_playground_admission_queue_depth", "Proxy requests waiting for an admission slot.", ("model",)
+)
+ADMISSION_WAIT = REGISTRY.histogram(
+    "vllm_playground_admission_wait_seconds",
+    "Time proxy requests waited for an admission slot (0 when admitted at once).",
+    ("model", "outcome"),
+)
+ADMISSION_REJECTED = REGISTRY.counter(
+    "vllm_playground_admission_rejected",
+    "Proxy requests rejected by admission control (429, or 503 when no backend is available).",
+    ("model", "reason"),
+)
+ADMISSION_LIMIT = REGISTRY.gauge(
+    "vllm_playground_admission_backend_limit",
+    "Effective in-flight limit per backend (adaptive or static).",
+    ("backend",),
+)
+RESPONSE_CACHE_LOOKUPS = REGISTRY.counter(
+    "vllm_playground_response_cache_lookups",
+    "Deterministic /v1 requests looked up in the response cache (memory_hit, disk_hit, miss).",
+    ("model", "result"),
+)
+RESPONSE_CACHE_SERVED = REGISTRY.counter(
+    "vllm_playground_response_cache_served_bytes", "Response bytes served from the response cache.", ("model",)
+)
+RESPONSE_CACHE_BYTES = REGISTRY.gauge(
+    "vllm_playground_response_cache_bytes", "Bytes held by the response cache per tier.", ("tier",)
+)
+RESPONSE_CACHE_ENTRIES = REGISTRY.gauge(
+    "vllm_playground_response_cache_entries", "Entries held by the response cache per tier.", ("tier",)
+)
+PROXY_FAILED_ATTEMPTS = REGISTRY.counter(
+    "vllm_playground_proxy_failed_attempts",
+    "Upstream attempts that failed before the first response byte, by what the proxy did next.",
+    ("backend", "reason", "action"),
+)
+PROXY_BACKEND_EJECTIONS = REGISTRY.counter(
+    "vllm_playground_proxy_backend_ejections",
+    "Backends marked unhealthy by the proxy after consecutive failed requests.",
+    ("backend",),
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    "vllm_playground_coalesced_requests",
+    "Identical in-flight /v1 requests answered from another request's upstream call (upstream calls saved).",
+    ("model",),
+)
+UPSTREAM_CONNECTIONS = REGISTRY.counter(
+    "vllm_playground_upstream_connections",
+    "Connections to backends, opened anew or reused from the keep-alive pool.",
+    ("origin", "outcome"),
+)
+
+CHAT_REQUESTS = REGISTRY.counter(
+    "vllm_playground_chat_requests", "/api/chat requests by outcome.", ("stream", "outcome")
+)
+CHAT_STREAM_DURATION = REGISTRY.histogram(
+    "vllm_playground_chat_stream_duration_seconds",
+    "Duration of streamed /api/chat responses, from first upstream byte wait to end of stream.",
+    ("outcome",),
+    buckets=STREAM_BUCKETS,
+)
+CHAT_TIME_TO_FIRST_CHUNK = REGISTRY.histogram(
+    "vllm_playground_chat_time_to_first_chunk_seconds",
+    "Time from the upstream chat request to the first streamed chunk.",
+)
+
+SCRAPE_DURATION = REGISTRY.histogram(
+    "vllm_playground_scrape_duration_seconds",
+    "Duration of vLLM /metrics scrapes by MetricStore.",
+    ("instance", "outcome"),
+)
+
+LOG_BROADCAST_DURATION = REGISTRY.histogram(
+    "vllm_playground_log_broadcast_seconds", "Time to queue a log line or line batch for all /ws/logs clients."
+)
+LOG_BROADCAST_MESSAGES = REGISTRY.counter("vllm_playground_log_broadcast_messages", "Log lines broadcast.")
+LOG_BROADCAST_SEND_ERRORS = REGISTRY.counter(
+    "vllm_playground_log_broadcast_send_errors", "Failed sends to /ws/logs clients (client dropped)."
+)
+LOG_FRAMES_SENT = REGISTRY.counter("vllm_playground_log_frames_sent", "Batched log frames sent to /ws/logs clients.")
+LOG_LINES_DROPPED = REGISTRY.counter(
+    "vllm_playground_log_lines_dropped", "Log lines dropped for /ws/logs clients that could not keep up."
+)
+LOG_WEBSOCKET_CLIENTS = REGISTRY.gauge("vllm_playground_log_websocket_clients", "Connected /ws/logs clients.")
+
+BENCHMARK_RUNNING = REGISTRY.gauge(
+    "vllm_playground_benchmark_running", "1 while a benchmark task is running.", ("kind",)
+)
+BENCHMARK_RUNS = REGISTRY.counter("vllm_playground_benchmark_runs", "Finished benchmark tasks.", ("kind", "outcome"))
+BENCHMARK_DURATION = REGISTRY.histogram(
+    "vllm_playground_benchmark_duration_seconds",
+    "Wall time of finished benchmark tasks.",
+    ("kind",),
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600),
+)
+
+START_TIME = REGISTRY.gauge("vllm_playground_start_time_seconds", "Unix time the playground process started.")
+START_TIME.set(time.time())
@@ -0,0 +1,71 @@
+"""
+Single-flight coalescing of identical in-flight ``/v1`` requests.
+
+Dashboards reloading a page and clients retrying after a timeout send
+byte-identical requests at the same moment.  For deterministic sampling
+(see ``response_cache.is_deterministic``) they would all get the same
+answer, so ``SingleFlight.do`` runs the upstream call once per key and
+hands its result to every request that arrives while it is in flight.
+
+The call runs in its own task: if the request that started it goes away,
+the others still get the result.  Exceptions (an HTTP error from routing
+or admission, a failed upstream call) reach every waiter alike.  Only
+non-streaming requests are coalesced; ``_v1_proxy`` buffers the upstream
+response once and replays it to each waiter.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from .self_metrics import COALESCED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """At most one in-flight call per key; later callers share its result."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.leaders: Dict[str, int] = {}
+        self.saved: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        return cls(enabled=os.environ.get("VLLM_PLAYGROUND_COALESCE", "1").lower() not in ("0", "false", "no", "off"))
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, model: str, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """``(result, shared)``: the result of ``fn()`` for *key*, and whether another caller started it."""
+        task = self._calls.get(key)
+        shared = task is not None
+        if shared:
+            self.saved[model] = self.saved.get(model, 0) + 1
+            COALESCED_REQUESTS.inc(model=model)
+        else:
+            self.leaders[model] = self.leaders.get(model, 0) + 1
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda t: self._done(key, t))
+        # Shielded: a waiter being cancelled must not cancel the call the others wait on
+        return await asyncio.shield(task), shared
+
+    def _done(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here so a failure nobody awaits anymore is not logged as unhandled
+
+    def snapshot(self) -> Dict[str, Any]:
+        models = sorted(set(self.leaders) | set(self.saved))
+        return {
+            "enabled": self.enabled,
+            "in_flight": self.in_flight,
+            "saved_total": sum(self.saved.values()),
+            "models": {m: {"upstream_calls": self.leaders.get(m, 0), "saved": self.saved.get(m, 0)} for m in models},
+        }
@@ -0,0 +1,483 @@
+"""
+Cold-start timelines for managed vLLM launches.
+
+A ``StartupTimeline`` is opened when ``/api/start`` launches a subprocess or
+container.  It collects two kinds of phases:
+
+  - playground-side, measured around our own calls: ``image_pull``,
+    ``container_create`` / ``container_restart``, ``process_spawn``,
+    ``wait_for_ready``;
+  - vLLM-side, recognised in the instance's log lines as ``broadcast_log``
+    ingests them (see ``MILESTONES``): ``weight_download``, ``weight_load``
+    (GiB and seconds), ``torch_compile``, ``cuda_graph_capture``,
+    ``kv_cache_allocation`` (GiB / tokens / blocks), ``engine_init``, and
+    the ``api_server_ready`` event ("Application startup complete").
+
+vLLM-side phases that report their own duration ("took 4.5 seconds") are
+anchored at the line that reports it; the others span from their first to
+their last matching line.  Line times come from vLLM's own ``MM-DD
+HH:MM:SS`` prefix when present (container logs are replayed after the fact)
+corrected by the clock offset seen on the first such line, rounded to a
+whole quarter hour (container time zone); otherwise the ingest time is used.
+
+A timeline ends when the API server reports ready, when the playground's
+readiness wait fails, when the process exits, or after ``MAX_STARTUP_SECONDS``.
+Finished timelines are appended to ``StartupProfileStore`` (JSON lines,
+newest ``max_records`` kept) so cold starts can be compared across configs.
+"""
+
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+MAX_STARTUP_SECONDS = 3600.0
+
+# Config keys that matter for cold-start comparisons
+CONFIG_KEYS = (
+    "tensor_parallel_size",
+    "gpu_memory_utilization",
+    "max_model_len",
+    "dtype",
+    "load_format",
+    "enable_prefix_caching",
+    "use_cpu",
+    "accelerator",
+    "gpu_device",
+    "speculative_method",
+    "local_model_path",
+)
+
+
+class Milestone:
+    """A startup log line: keyword gate, optional pattern, and its role in a phase.
+
+    ``role`` is ``"start"`` / ``"end"`` (of ``phase``), ``"detail"`` (adds
+    fields without moving the phase bounds) or ``"event"`` (a point in time).
+    ``fields`` name the pattern's groups; a ``seconds`` field on an end
+    milestone is the phase duration vLLM measured itself.
+    """
+
+    __slots__ = ("phase", "role", "keyword", "pattern", "fields")
+
+    def __init__(self, phase: str, role: str, keyword: str, pattern: Optional[str] = None, fields: Sequence[str] = ()):
+        self.phase = phase
+        self.role = role
+        self.keyword = keyword
+        self.pattern = re.compile(pattern) if pattern else None
+        self.fields = tuple(fields)
+
+    def match(self, message: str) -> Optional[Dict[str, Any]]:
+        if self.keyword not in message:
+            return None
+        if self.pattern is None:
+            return {}
+        m = self.pattern.search(message)
+        if m is None:
+            return None
+        detail: Dict[str, Any] = {}
+        for name, value in zip(self.fields, m.groups()):
+            if value is None:
+                continue
+            try:
+                detail[name] = float(value.replace(",", ""))
+            except ValueError:
+                detail[name] = value
+        return detail
+
+
+MILESTONES = (
+    Milestone(
+        "weight_download",
+        "end",
+        "downloading weights",
+        r"Time spent downloading weights for (\S+?):? ([\d.]+) seconds",
+        ("model", "seconds"),
+    ),
+    Milestone("weight_load", "start", "Starting to load model"),
+    Milestone(
+        "weight_load", "detail", "Loading weights took", r"Loading weights took ([\d.]+) seconds", ("weights_seconds",)
+    ),
+    Milestone(
+        "weight_load",
+        "end",
+        "Model loading took",
+        r"Model loading took ([\d.]+) (?:GiB|GB)(?: memory)? and ([\d.]+) seconds",
+        ("gib", "seconds"),
+    ),
+    Milestone(
+        "weight_load", "end", "Loading model weights took", r"Loading model weights took ([\d.]+) (?:GiB|GB)", ("gib",)
+    ),
+    Milestone(
+        "torch_compile",
+        "detail",
+        "Dynamo bytecode transform time",
+        r"Dynamo bytecode transform time: ([\d.]+) s",
+        ("dynamo_seconds",),
+    ),
+    Milestone("torch_compile", "end", "torch.compile takes", r"torch.compile takes ([\d.]+) s in total", ("seconds",)),
+    Milestone("cuda_graph_capture", "start", "Capturing CUDA graph"),
+    Milestone("cuda_graph_capture", "start", "Capturing cudagraphs"),
+    Milestone(
+        "cuda_graph_capture",
+        "end",
+        "Graph capturing finished",
+        r"Graph capturing finished in ([\d.]+) secs?(?:, took ([\d.]+) GiB)?",
+        ("seconds", "gib"),
+    ),
+    Milestone(
+        "kv_cache_allocation",
+        "start",
+        "Available KV cache memory",
+        r"Available KV cache memory: ([\d.]+) GiB",
+        ("gib",),
+    ),
+    Milestone("kv_cache_allocation", "end", "KV cache size", r"GPU KV cache size: ([\d,]+) tokens", ("tokens",)),
+    Milestone(
+        "kv_cache_allocation",
+        "end",
+        "# GPU blocks",
+        r"# GPU blocks: (\d+)(?:, # CPU blocks: (\d+))?",
+        ("gpu_blocks", "cpu_blocks"),
+    ),
+    Milestone(
+        "kv_cache_allocation",
+        "detail",
+        "Maximum concurrency",
+        r"Maximum concurrency for ([\d,]+) tokens per request: ([\d.]+)x",
+        ("tokens_per_request", "max_concurrency"),
+    ),
+    Milestone(
+        "engine_init",
+        "end",
+        "init engine",
+        r"init engine \(profile, create kv cache, warmup model\) took ([\d.]+) seconds",
+        ("seconds",),
+    ),
+    Milestone("api_server_ready", "event", "Application startup complete"),
+)
+
+_KEYWORDS = tuple(sorted({m.keyword for m in MILESTONES}))
+_VLLM_TIME = re.compile(r"(?:DEBUG|INFO|WARNING|ERROR|CRITICAL) (\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)")
+_TZ_STEP = 900.0
+
+
+def summarize_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not config:
+        return {}
+    return {key: config[key] for key in CONFIG_KEYS if config.get(key) not in (None, "", False)}
+
+
+class StartupTimeline:
+    """Phases and events of one launch."""
+
+    def __init__(
+        self,
+        run_mode: str,
+        model: Optional[str] = None,
+        config: Optional[Dict[str, Any]] = None,
+        started_at: Optional[float] = None,
+    ):
+        self.started_at = time.time() if started_at is None else started_at
+        self.id = f"{int(self.started_at * 1000):x}"
+        self.instance_id: Optional[str] = None
+        self.run_mode = run_mode
+        self.model = model
+        self.config = summarize_config(config)
+        self.status = "starting"
+        self.finished_at: Optional[float] = None
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.events: List[Dict[str, Any]] = []
+        self._clock_offset: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    # -- Recording --------------------------------------------------------------
+
+    def add_phase(self, name: str, start: float, end: float, **detail: Any) -> None:
+        phase = self.phases.setdefault(name, {"start": start, "end": end, "detail": {}})
+        phase["start"] = min(phase["start"], start)
+        phase["end"] = max(phase["end"], end)
+        phase["detail"].update(detail)
+
+    def add_timings(self, timings: Dict[str, Dict[str, Any]]) -> None:
+        """Add phases measured elsewhere as ``{name: {"start": .., "end": .., **detail}}``."""
+        for name, span in timings.items():
+            detail = {k: v for k, v in span.items() if k not in ("start", "end")}
+            self.add_phase(name, span["start"], span["end"], **detail)
+
+    def begin_phase(self, name: str, ts: Optional[float] = None) -> None:
+        """Open a phase whose end is not known yet; ``finish`` closes it if ``end_phase`` does not."""
+        self.phases[name] = {"start": time.time() if ts is None else ts, "end": None, "detail": {}}
+
+    def end_phase(self, name: str, ts: Optional[float] = None, **detail: Any) -> None:
+        phase = self.phases.get(name)
+        if phase is None or phase["end"] is not None:
+            return
+        phase["end"] = time.time() if ts is None else ts
+        phase["detail"].update(detail)
+
+    def event(self, name: str, ts: Optional[float] = None, **detail: Any) -> None:
+        self.events.append({"name": name, "ts": time.time() if ts is None else ts, "detail": detail})
+
+    def finish(self, status: str, ts: Optional[float] = None) -> None:
+        if self.finished:
+            return
+        self.status = status
+        self.finished_at = time.time() if ts is None else ts
+        for phase in self.phases.values():
+            if phase["end"] is None:
+                phase["end"] = max(phase["start"], self.finished_at)
+
+    def _line_time(self, message: str, ingest_ts: float) -> float:
+        m = _VLLM_TIME.search(message)
+        if m is None:
+            return ingest_ts
+        month, day, hour, minute, second = (int(g) for g in m.groups())
+        now = datetime.fromtimestamp(ingest_ts)
+        try:
+            stamped = datetime(now.year, month, day, hour, minute, second).timestamp()
+        except ValueError:
+            return ingest_ts
+        if self._clock_offset is None:
+            # Replay lag is seconds; anything beyond that is the container's time zone
+            self._clock_offset = round((ingest_ts - stamped) / _TZ_STEP) * _TZ_STEP
+        return min(stamped + self._clock_offset, ingest_ts)
+
+    def observe(self, message: str, ingest_ts: float) -> bool:
+        """Record *message* if it is a startup milestone; True when the API server became ready."""
+        if not any(keyword in message for keyword in _KEYWORDS):
+            return False
+        ready = False
+        for milestone in MILESTONES:
+            detail = milestone.match(message)
+            if detail is None:
+                continue
+            ts = self._line_time(message, ingest_ts)
+            if milestone.role == "event":
+                self.event(milestone.phase, ts, **detail)
+                ready = milestone.phase == "api_server_ready"
+                break
+            phase = self.phases.get(milestone.phase)
+            if milestone.role == "start":
+                self.add_phase(milestone.phase, ts, ts, **detail)
+            elif milestone.role == "detail":
+                if phase is None:
+                    self.add_phase(milestone.phase, ts, ts, **detail)
+                else:
+                    phase["detail"].update(detail)
+            else:
+                # A phase without a start line is back-dated by the duration vLLM reports
+                seconds = detail.get("seconds")
+                self.add_phase(milestone.phase, ts - seconds if isinstance(seconds, float) else ts, ts, **detail)
+            break
+        return ready
+
+    # -- Views ------------------------------------------------------------------
+
+    def to_dict(self) -> Dict[str, Any]:
+        base = self.started_at
+        end = self.finished_at if self.finished else time.time()
+        phases = []
+        for name, phase in sorted(self.phases.items(), key=lambda item: item[1]["start"]):
+            phase_end = end if phase["end"] is None else phase["end"]
+            phases.append(
+                {
+                    "name": name,
+                    "start_s": round(phase["start"] - base, 3),
+                    "end_s": round(phase_end - base, 3),
+                    "duration_s": round(phase_end - phase["start"], 3),
+                    "detail": phase["detail"],
+                }
+            )
+        return {
+            "id": self.id,
+            "instance_id": self.instance_id,
+            "run_mode": self.run_mode,
+            "model": self.model,
+            "config": self.config,
+            "status": self.status,
+            "started_at": datetime.fromtimestamp(base).isoformat(),
+            "total_s": round(end - base, 3),
+            "phases": phases,
+            "events": [
+                {"name": e["name"], "at_s": round(e["ts"] - base, 3), "detail": e["detail"]} for e in self.events
+            ],
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Compact form kept on the ``InstanceEntry``."""
+        data = self.to_dict()
+        return {
+            "id": data["id"],
+            "status": data["status"],
+            "started_at": data["started_at"],
+            "total_s": data["total_s"],
+            "phases": {p["name"]: p["duration_s"] for p in data["phases"]},
+        }
+
+
+class StartupProfileStore:
+    """Finished timelines as JSON lines, newest ``max_records`` kept."""
+
+    def __init__(self, path: Path, max_records: int = 500):
+        self.path = Path(path)
+        self.max_records = max_records
+        self._count: Optional[int] = None
+
+    def load(self) -> List[Dict[str, Any]]:
+        records = []
+        try:
+            with open(self.path, "r") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Cannot read startup profiles {self.path}: {e}")
+        self._count = len(records)
+        return records
+
+    def append(self, record: Dict[str, Any]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if self._count is None:
+                self.load()
+            if self._count >= self.max_records:
+                kept = self.load()[-(self.max_records - 1) :]
+                tmp = self.path.with_suffix(".tmp")
+                with open(tmp, "w") as f:
+                    for r in kept:
+                        f.write(json.dumps(r) + "\n")
+                tmp.replace(self.path)
+                self._count = len(kept)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+            self._count += 1
+        except OSError as e:
+            logger.warning(f"Cannot write startup profile {self.path}: {e}")
+
+    def query(
+        self, instance_id: Optional[str] = None, model: Optional[str] = None, limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        records = self.load()
+        if instance_id:
+            records = [r for r in records if r.get("instance_id") == instance_id]
+        if model:
+            records = [r for r in records if r.get("model") == model]
+        return records[-limit:]
+
+
+class StartupProfiler:
+    """Timelines in progress, keyed by instance id.
+
+    ``on_complete`` is called with each timeline once it has finished and
+    been written to the store.
+    """
+
+    def __init__(self, store: StartupProfileStore, on_complete: Optional[Callable[[StartupTimeline], None]] = None):
+        self.store = store
+        self.on_complete = on_complete
+        self._active: Dict[str, StartupTimeline] = {}
+        self._last: Dict[str, StartupTimeline] = {}
+
+    def begin(self, run_mode: str, model: Optional[str], config: Optional[Dict[str, Any]]) -> StartupTimeline:
+        """Open a timeline for a launch; ``bind`` it once the instance id is known."""
+        return StartupTimeline(run_mode, model, config)
+
+    def bind(self, instance_id: Optional[str], timeline: StartupTimeline) -> None:
+        if not instance_id:
+            return
+        timeline.instance_id = instance_id
+        self._active[instance_id] = timeline
+        self._last[instance_id] = timeline
+
+    def get(self, instance_id: str) -> Optional[StartupTimeline]:
+        """The running or most recent timeline (since this process started) for *instance_id*."""
+        return self._last.get(instance_id)
+
+    def observe(self, instance_id: Optional[str], messages: Sequence[str], ts: float) -> None:
+        timeline = self._active.get(instance_id) if instance_id else None
+        if timeline is None:
+            return
+        if ts - timeline.started_at > MAX_STARTUP_SECONDS:
+            timeline.finish("timeout", ts)
+            self._complete(instance_id)
+            return
+        for message in messages:
+            if timeline.observe(message, ts):
+                timeline.finish("ready", ts)
+                self._complete(instance_id)
+                return
+
+    def finish(self, instance_id: Optional[str], status: str) -> None:
+        """End the instance's timeline if it is still running (readiness wait failed, process exited)."""
+        timeline = self._active.get(instance_id) if instance_id else None
+        if timeline is None:
+            return
+        timeline.finish(status)
+        self._complete(instance_id)
+
+    def _complete(self, instance_id: str) -> None:
+        timeline = self._active.pop(instance_id)
+        self.store.append(timeline.to_dict())
+        if self.on_complete is not None:
+            try:
+                self.on_complete(timeline)
+            except Exception as e:
+                logger.warning(f"Startup profile callback failed: {e}")
+
+    def drop(self, instance_id: str) -> None:
+        self._active.pop(instance_id, None)
+        self._last.pop(instance_id, None)
+
+
+def compare_profiles(records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Group finished timelines by (model, run mode, config) with mean/min/max per phase."""
+    groups: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        key = json.dumps([record.get("model"), record.get("run_mode"), record.get("config")], sort_keys=True)
+        group = groups.setdefault(
+            key,
+            {
+                "model": record.get("model"),
+                "run_mode": record.get("run_mode"),
+                "config": record.get("config"),
+                "launches": 0,
+                "statuses": {},
+                "_durations": {"total": []},
+            },
+        )
+        group["launches"] += 1
+        group["statuses"][record.get("status")] = group["statuses"].get(record.get("status"), 0) + 1
+        group["_durations"]["total"].append(record.get("total_s", 0.0))
+        for phase in record.get("phases", ()):
+            group["_durations"].setdefault(phase["name"], []).append(phase["duration_s"])
+
+    out = []
+    for group in groups.values():
+        durations = group.pop("_durations")
+        group["phases"] = {
+            name: {"mean_s": round(sum(v) / len(v), 3), "min_s": min(v), "max_s": max(v), "launches": len(v)}
+            for name, v in durations.items()
+        }
+        out.append(group)
+    return out
+
+
+def default_profile_path() -> Path:
+    return Path(
+        os.environ.get("VLLM_PLAYGROUND_STARTUP_PROFILES")
+        or Path.home() / ".vllm-playground" / "startup-profiles.jsonl"
+    )
@@ -68,6 +68,7 @@ class VLLMWebUI {
         this._activeInstanceId = null;
         this._chatHistories = {};  // instance_id -> messages[]
         this._logBuffers = {};     // instance_id -> string[]
+        this._logOffsets = {};     // instance_id -> next durable log offset seen
         this._tokenCounts = {};    // instance_id -> {conversationTokens, maxModelLen}
         this._tabBarInitialized = false;
         this._draftMode = false;
@@ -1726,33 +1727,36 @@ number ::= [0-9]+`
         this.ws.onopen = () => {
             this.addLog('WebSocket connected', 'success');
             this.updateStatus('connected', 'Connected');
+            // Subscribe to the shown instance; after a reconnect this also fetches
+            // only the lines logged while we were away
+            this._syncLogSubscription();
         };
 
         this.ws.onmessage = (event) => {
             if (!event.data) return;
+            let data;
             try {
-                const data = JSON.parse(event.data);
-                const instId = data.instance_id;
-                const msg = data.message;
-                if (!msg) return;
-
-                // Buffer per-instance
-                const bufId = instId || this._activeInstanceId;
-                if (bufId) {
-                    if (!this._logBuffers[bufId]) this._logBuffers[bufId] = [];
-                    this._logBuffers[bufId].push(msg);
-                    if (this._logBuffers[bufId].length > 2000) {
-                        this._logBuffers[bufId].shift();
-                    }
-                }
-
-                // Only render if this message belongs to the active instance (or is global)
-                if (!instId || instId === this._activeInstanceId) {
-                    this.addLog(msg);
-                }
+                data = JSON.parse(event.data);
             } catch {
                 // Fallback for non-JSON messages
                 this.addLog(event.data);
+                return;
+            }
+            if (data.type === 'subscriptions') {
+                return;
+            } else if (data.type === 'error') {
+                console.warn('Log stream:', data.detail);
+            } else if (data.type === 'batch') {
+                // Batched frame: lines coalesced by the server, plus lines it
+                // had to drop because this tab fell behind
+                if (data.skipped) {
+                    this.addLog(`[WEBUI] ${data.skipped} log line(s) skipped (connection too slow)`, 'warning');
+                }
+                for (const line of data.lines || []) {
+                    this.handleLogLine(line.instance_id, line.message, line.offset);
+                }
+            } else {
+                this.handleLogLine(data.instance_id, data.message, data.offset);
             }
         };
 
@@ -1769,6 +1773,52 @@ number ::= [0-9]+`
         };
     }
 
+    get _activeInstanceId() {
+        return this._activeInstanceIdValue;
+    }
+
+    set _activeInstanceId(id) {
+        const changed = id !== this._activeInstanceIdValue;
+        this._activeInstanceIdValue = id;
+        if (changed) this._syncLogSubscription();
+    }
+
+    _syncLogSubscription() {
+        if (!this.ws || this.ws.readyState !== WebSocket.OPEN) return;
+        const id = this._activeInstanceId;
+        // Only the shown instance plus instance-less lines; in draft mode every
+        // stream, so an instance being launched is buffered from its first line
+        const streams = id ? [id, '__global__'] : ['*'];
+        this.ws.send(JSON.stringify({ type: 'subscribe', instance_ids: streams, replace: true }));
+        // Lines logged while this instance was not subscribed
+        if (id) this._catchUpLogs(id);
+    }
+
+    handleLogLine(instId, msg, offset) {
+        if (!msg) return;
+
+        // Durable log offset: skip lines already seen (e.g. overlap with a catch-up fetch)
+        if (instId && offset !== undefined && offset !== null) {
+            if (offset < (this._logOffsets[instId] || 0)) return;
+            this._logOffsets[instId] = offset + 1;
+        }
+
+        // Buffer per-instance
+        const bufId = instId || this._activeInstanceId;
+        if (bufId) {
+            if (!this._logBuffers[bufId]) this._logBuffers[bufId] = [];
+            this._logBuffers[bufId].push(msg);
+            if (this._logBuffers[bufId].length > 2000) {
+                this._logBuffers[bufId].shift();
+            }
+        }
+
+        // Only render if this message belongs to the active instance (or is global)
+        if (!instId || instId === this._activeInstanceId) {
+            this.addLog(msg);
+        }
+    }
+
     async checkFeatureAvailability() {
         try {
             const response = await fetch('/api/features');
@@ -7478,6 +7528,26 @@ ${fullText.substring(0, 200)}${fullText.length > 200 ? '...' : ''}`;
         }
     }
 
+    async _catchUpLogs(instanceId) {
+        const since = instanceId ? this._logOffsets[instanceId] : undefined;
+        if (since === undefined) return;
+        try {
+            let more = true;
+            let offset = since;
+            while (more) {
+                const resp = await fetch(`/api/instances/${instanceId}/logs?since_offset=${offset}`);
+                if (!resp.ok) return;
+                const data = await resp.json();
+                if (data.next_offset === undefined) return;
+                (data.logs || []).forEach((msg, i) => this.handleLogLine(instanceId, msg, data.first_offset + i));
+                more = data.has_more && data.next_offset > offset;
+                offset = data.next_offset;
+            }
+        } catch {
+            // Best-effort
+        }
+    }
+
     async _switchLogsToInstance(instanceId) {
         if (!this.elements.logsContainer) return;
         this.elements.logsContainer.innerHTML = '';
@@ -7490,6 +7560,7 @@ ${fullText.substring(0, 200)}${fullText.length > 200 ? '...' : ''}`;
                     const data = await resp.json();
                     buf = data.logs || [];
                     this._logBuffers[instanceId] = buf;
+                    if (data.next_offset !== undefined) this._logOffsets[instanceId] = data.next_offset;
                 }
             } catch {
                 // Best-effort
@@ -7768,6 +7839,7 @@ ${fullText.substring(0, 200)}${fullText.length > 200 ? '...' : ''}`;
             await fetch(`/api/instances/${instance.id}`, { method: 'DELETE' });
             delete this._chatHistories[instance.id];
             delete this._logBuffers[instance.id];
+            delete this._logOffsets[instance.id];
             delete this._tokenCounts[instance.id];
             this._removeChatHistoryFromStorage(instance.id);
             await this.fetchInstances();
@@ -1,9 +1,10 @@
 /**
- * MetricsPoller -- single shared polling loop for all metric consumers.
+ * MetricsPoller -- single shared metrics feed for all metric consumers.
  *
- * Makes one HTTP request per poll cycle (/api/vllm/metrics/all) and
- * derives the legacy flat dict client-side using the key map from
- * metrics-registry.js.
+ * Prefers the /ws/metrics push stream (full state once, then per-scrape
+ * deltas) and falls back to polling /api/vllm/metrics/all while the
+ * socket is unavailable.  Either way it derives the legacy flat dict
+ * client-side using the key map from metrics-registry.js.
  *
  * Usage:
  *   import { metricsPoller } from './metrics-poller.js';
@@ -20,6 +21,10 @@ class MetricsPoller {
         this._subscribers = new Set();
         this._latestAll = null;
         this._latestLegacy = null;
+        this._ws = null;
+        this._wsRetry = null;
+        this._wsBackoff = 1000;
+        this._running = false;
     }
 
     /**
@@ -42,18 +47,94 @@ class MetricsPoller {
     }
 
     start() {
+        if (this._running) return;
+        this._running = true;
+        this._connect();
+    }
+
+    stop() {
+        this._running = false;
+        this._stopPolling();
+        if (this._wsRetry) {
+            clearTimeout(this._wsRetry);
+            this._wsRetry = null;
+        }
+        if (this._ws) {
+            this._ws.onclose = null;
+            this._ws.close();
+            this._ws = null;
+        }
+    }
+
+    _startPolling() {
         if (this._timer) return;
         this._poll();
         this._timer = setInterval(() => this._poll(), this._interval);
     }
 
-    stop() {
+    _stopPolling() {
         if (this._timer) {
             clearInterval(this._timer);
             this._timer = null;
         }
     }
 
+    _connect() {
+        if (!this._running || typeof WebSocket === 'undefined') {
+            this._startPolling();
+            return;
+        }
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        let ws;
+        try {
+            ws = new WebSocket(`${protocol}//${window.location.host}/ws/metrics`);
+        } catch {
+            this._startPolling();
+            return;
+        }
+        this._ws = ws;
+        ws.onopen = () => {
+            this._wsBackoff = 1000;
+        };
+        ws.onmessage = (event) => {
+            let frame;
+            try { frame = JSON.parse(event.data); } catch { return; }
+            this._applyFrame(frame);
+        };
+        ws.onclose = () => {
+            this._ws = null;
+            if (!this._running) return;
+            // Keep consumers fed by polling until the stream is back
+            this._startPolling();
+            this._wsRetry = setTimeout(() => {
+                this._wsRetry = null;
+                this._connect();
+            }, this._wsBackoff);
+            this._wsBackoff = Math.min(this._wsBackoff * 2, 30000);
+        };
+    }
+
+    _applyFrame(frame) {
+        const { type, metrics, changed, removed, seq, base, ...meta } = frame;
+        if (type === 'full') {
+            this._stopPolling();
+            this._latestAll = { ...meta, metrics: { ...metrics } };
+        } else if (type === 'delta' && this._latestAll) {
+            const merged = { ...(this._latestAll.metrics || {}), ...changed };
+            for (const key of removed || []) delete merged[key];
+            this._latestAll = { ...this._latestAll, ...meta, metrics: merged };
+        } else if (type === 'meta' && this._latestAll) {
+            this._latestAll = { ...this._latestAll, ...meta };
+            this._notify(this._latestAll, this._latestLegacy);
+            return;
+        } else {
+            return;
+        }
+        const all = this._latestAll;
+        this._latestLegacy = all.metrics ? toLegacyDict(all.metrics) : null;
+        this._notify(all, this._latestLegacy);
+    }
+
     get latest() {
         return { all: this._latestAll, legacy: this._latestLegacy };
     }
@@ -86,12 +167,21 @@ class MetricsPoller {
      * Fetch time-series history for charting.
      * @param {number} [minutes] - optional window in minutes
      * @param {number} [seconds] - optional window in seconds (takes precedence)
+     * @param {object} [opts]
+     * @param {number} [opts.maxPoints] - server-side downsampling cap
+     * @param {string[]} [opts.metrics] - only return these metric keys
+     * @param {string} [opts.downsample] - 'minmax' (default), 'lttb' or 'avg'
      * @returns {Promise<Array>}
      */
-    async getHistory(minutes, seconds) {
-        let url = '/api/vllm/metrics/history';
-        if (seconds != null) url += `?seconds=${seconds}`;
-        else if (minutes != null) url += `?minutes=${minutes}`;
+    async getHistory(minutes, seconds, opts = {}) {
+        const params = new URLSearchParams();
+        if (seconds != null) params.set('seconds', seconds);
+        else if (minutes != null) params.set('minutes', minutes);
+        if (opts.maxPoints) params.set('max_points', opts.maxPoints);
+        if (opts.metrics && opts.metrics.length) params.set('metrics', opts.metrics.join(','));
+        if (opts.downsample) params.set('downsample', opts.downsample);
+        const qs = params.toString();
+        const url = '/api/vllm/metrics/history' + (qs ? `?${qs}` : '');
         try {
             const resp = await fetch(url);
             return resp.ok ? await resp.json() : [];
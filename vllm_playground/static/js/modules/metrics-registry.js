@@ -237,6 +237,10 @@ export function toLegacyDict(metrics) {
     return out;
 }
 
+// Server-derived series (windowed percentiles, counter rates/increases);
+// shown in the All Metrics table but not as category cards.
+const _DERIVED_TYPES = new Set(['histogram_window', 'counter_rate', 'counter_increase']);
+
 /**
  * Given the full metrics dict from /api/vllm/metrics/all, group metrics
  * by their registered category.  Unregistered metrics go into 'other'.
@@ -250,7 +254,7 @@ export function groupByCategory(metrics) {
     }
 
     for (const [key, entry] of Object.entries(metrics)) {
-        if (entry.type === 'histogram_bucket') continue;
+        if (entry.type === 'histogram_bucket' || _DERIVED_TYPES.has(entry.type)) continue;
         const reg = METRIC_REGISTRY[key];
         const catId = reg ? reg.category : 'other';
         if (!groups[catId]) groups[catId] = [];
@@ -609,7 +609,10 @@ const ObservabilityModule = {
         const defaultMsg = document.getElementById('obs-ts-no-data-msg');
 
         try {
-            this._tsHistory = await metricsPoller.getHistory(null, this._tsSeconds);
+            // One point per horizontal pixel is plenty; the server downsamples wide windows.
+            const wrap = document.getElementById('obs-ts-chart-wrap');
+            const maxPoints = Math.max(300, Math.round(wrap?.clientWidth || 0));
+            this._tsHistory = await metricsPoller.getHistory(null, this._tsSeconds, { maxPoints });
         } catch {
             this._tsHistory = [];
         }